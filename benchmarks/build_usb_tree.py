@@ -0,0 +1,62 @@
+import argparse
+import time
+
+from SilvaViridis.Python.WinAPI.Wrapper import USBDeviceManager, Simulation
+
+def shape(
+    nodes : list[USBDeviceManager.USBNode],
+) -> list[tuple[str, list]]:
+    return [
+        (
+            f"Port {node.device.index}" \
+                if isinstance(node.device, USBDeviceManager.USBPort) \
+                else node.device.id,
+            shape(node.children),
+        ) for node in nodes
+    ]
+
+def main(
+) -> None:
+    parser = argparse.ArgumentParser(description = "Benchmark build_usb_tree on a simulated topology")
+    parser.add_argument("--controllers", type = int, default = 2)
+    parser.add_argument("--depth", type = int, default = 3)
+    parser.add_argument("--ports-per-hub", type = int, default = 4)
+    parser.add_argument("--hubs-per-hub", type = int, default = 2)
+    parser.add_argument("--devices-per-hub", type = int, default = 1)
+    parser.add_argument("--delay", type = float, default = 0.001, help = "seconds per simulated IOCTL")
+    parser.add_argument("--workers", type = int, nargs = "+", default = [1, 2, 4, 8, 16])
+    parser.add_argument("--max-per-controller", type = int, default = 4)
+    args = parser.parse_args()
+
+    index = Simulation.build_simulated_topology(
+        controllers = args.controllers,
+        depth = args.depth,
+        ports_per_hub = args.ports_per_hub,
+        hubs_per_hub = args.hubs_per_hub,
+        devices_per_hub = args.devices_per_hub,
+        delay = args.delay,
+    )
+
+    print(f"controllers={len(index.controllers)} hubs={len(index.hubs)} devices={len(index.devices)} delay={args.delay}s")
+
+    expected = None
+
+    for workers in args.workers:
+        started = time.perf_counter()
+        tree = USBDeviceManager.build_usb_tree(
+            index,
+            max_workers = workers,
+            max_per_controller = args.max_per_controller,
+        )
+        elapsed = time.perf_counter() - started
+
+        result = shape(tree)
+        if expected is None:
+            expected = result
+        elif result != expected:
+            raise RuntimeError(f"Tree built with {workers} workers differs from the serial one")
+
+        print(f"workers={workers:<3} elapsed={elapsed * 1000:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
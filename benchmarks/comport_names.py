@@ -0,0 +1,40 @@
+import argparse
+import time
+
+from SilvaViridis.Python.WinAPI.Wrapper import COMPortDeviceManager, Simulation
+
+def main(
+) -> None:
+    parser = argparse.ArgumentParser(description = "Benchmark COM port name enumeration on a simulated machine. "
+        "The timings are synthetic: every simulated native call sleeps for --delay seconds, "
+        "so they compare native call counts rather than real SetupAPI or registry latency.")
+    parser.add_argument("--ports", type = int, default = 256)
+    parser.add_argument("--delay", type = float, default = 0.00005, help = "seconds per simulated native call")
+    parser.add_argument("--repeat", type = int, default = 5)
+    args = parser.parse_args()
+
+    print(f"ports={args.ports} delay={args.delay}s repeat={args.repeat} (synthetic timings from a simulated machine)")
+
+    expected = None
+
+    for mode, fast in (("setupapi", False), ("serialcomm", True)):
+        with Simulation.SimulatedSerialMachine(args.ports, args.delay) as machine:
+            best = None
+
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                names = COMPortDeviceManager.get_comport_names(fast = fast)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+
+            native_calls = machine.native_calls // args.repeat
+
+        if expected is None:
+            expected = sorted(names)
+        elif sorted(names) != expected:
+            raise RuntimeError(f"Port names from {mode} differ from the SetupAPI ones")
+
+        print(f"mode={mode:<10} ports={len(names):<5} native_calls={native_calls:<6} best={best * 1000:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,477 @@
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from SilvaViridis.Python.WinAPI import instrumentation
+from SilvaViridis.Python.WinAPI.Wrapper import AsyncSerial, Serial, Simulation
+from SilvaViridis.Python.WinAPI.Wrapper.Types import SerialSettings
+
+BITS_PER_BYTE = 10
+WARMUP_FRAMES = 16
+
+def make_frame(
+    size : int,
+) -> bytes:
+    return bytes(0x20 + i % 0x5F for i in range(size - 1)) + b"\n"
+
+def wire_seconds(
+    n_bytes : int,
+    baud : int,
+) -> float:
+    return 0.0 if baud == 0 else n_bytes * BITS_PER_BYTE / baud
+
+def open_pairs(
+    count : int,
+    baud : int,
+    buffer_size : int,
+) -> list[tuple[Serial.SerialPort, Serial.SerialPort]]:
+    return [Serial.open_pty_pair(SerialSettings(baud), buffer_size = buffer_size) for _ in range(count)]
+
+def native_calls(
+    pairs : list[tuple[Serial.SerialPort, Serial.SerialPort]],
+) -> int:
+    counts = [port.stats.native_calls for pair in pairs for port in pair]
+
+    if None in counts:
+        return instrumentation.total_calls("kernel32.")
+
+    return sum(count or 0 for count in counts)
+
+def close_pairs(
+    pairs : list[tuple[Serial.SerialPort, Serial.SerialPort]],
+) -> None:
+    for pair in pairs:
+        for port in pair:
+            port.close()
+
+def throughput_threads(
+    pairs : list[tuple[Serial.SerialPort, Serial.SerialPort]],
+    frame : bytes,
+    baud : int,
+    duration : float,
+) -> tuple[int, float]:
+    sent = [0] * len(pairs)
+    received = [0] * len(pairs)
+    done = [threading.Event() for _ in pairs]
+
+    def write(
+        i : int,
+        port : Serial.SerialPort,
+        started : float,
+    ) -> None:
+        deadline = started + duration
+        while time.perf_counter() < deadline:
+            port.write_all(frame)
+            sent[i] += len(frame)
+            delay = started + wire_seconds(sent[i], baud) - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        done[i].set()
+
+    def read(
+        i : int,
+        port : Serial.SerialPort,
+    ) -> None:
+        while not (done[i].is_set() and received[i] >= sent[i]):
+            received[i] += len(port.read_view())
+
+    started = time.perf_counter()
+    threads = [
+        *(threading.Thread(target = write, args = (i, a, started)) for i, (a, _) in enumerate(pairs)),
+        *(threading.Thread(target = read, args = (i, b)) for i, (_, b) in enumerate(pairs)),
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.perf_counter() - started
+
+    if received != sent:
+        raise RuntimeError(f"Received {sum(received)} bytes out of {sum(sent)}")
+
+    return sum(received), elapsed
+
+class _Source(asyncio.Protocol):
+    def __init__(
+        self,
+    ) -> None:
+        self.can_write = asyncio.Event()
+        self.can_write.set()
+
+    def pause_writing(
+        self,
+    ) -> None:
+        self.can_write.clear()
+
+    def resume_writing(
+        self,
+    ) -> None:
+        self.can_write.set()
+
+class _Sink(asyncio.BufferedProtocol):
+    def __init__(
+        self,
+        buffer_size : int,
+    ) -> None:
+        self.received = 0
+        self.expected : int | None = None
+        self.done = asyncio.get_running_loop().create_future()
+        self._view = memoryview(bytearray(buffer_size))
+
+    def get_buffer(
+        self,
+        sizehint : int,
+    ) -> memoryview:
+        return self._view
+
+    def buffer_updated(
+        self,
+        nbytes : int,
+    ) -> None:
+        self.received += nbytes
+        self.check()
+
+    def expect(
+        self,
+        n_bytes : int,
+    ) -> None:
+        self.expected = n_bytes
+        self.check()
+
+    def check(
+        self,
+    ) -> None:
+        if self.expected is not None and self.received >= self.expected and not self.done.done():
+            self.done.set_result(self.received)
+
+async def throughput_asyncio(
+    pairs : list[tuple[Serial.SerialPort, Serial.SerialPort]],
+    frame : bytes,
+    baud : int,
+    duration : float,
+    buffer_size : int,
+) -> tuple[int, float]:
+    multiplexer = AsyncSerial.PtySerialMultiplexer()
+    sources = [_Source() for _ in pairs]
+    sinks = [_Sink(buffer_size) for _ in pairs]
+    transports = [
+        multiplexer.add(a, lambda source = source: source) for (a, _), source in zip(pairs, sources)
+    ]
+
+    for (_, b), sink in zip(pairs, sinks):
+        multiplexer.add(b, lambda sink = sink: sink, buffer_size)
+
+    await asyncio.sleep(0)
+
+    async def write(
+        transport : AsyncSerial.SerialPortTransport,
+        source : _Source,
+        sink : _Sink,
+        started : float,
+    ) -> None:
+        deadline = started + duration
+        sent = 0
+        while time.perf_counter() < deadline:
+            await source.can_write.wait()
+            transport.write(frame)
+            sent += len(frame)
+            await asyncio.sleep(max(started + wire_seconds(sent, baud) - time.perf_counter(), 0))
+        sink.expect(sent)
+        await sink.done
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            write(transport, source, sink, started) for transport, source, sink in zip(transports, sources, sinks)
+        ))
+        elapsed = time.perf_counter() - started
+    finally:
+        await multiplexer.close()
+
+    return sum(sink.received for sink in sinks), elapsed
+
+def traced_snapshot(
+) -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+async def allocations(
+    run_frame : Callable[[], Awaitable[None]],
+    frames : int,
+) -> tuple[float, float, float]:
+    for _ in range(WARMUP_FRAMES):
+        await run_frame()
+
+    peak_bytes = 0
+    allocated_blocks = 0
+    tracemalloc.start()
+
+    try:
+        before = traced_snapshot()
+
+        for _ in range(frames):
+            frame_before = traced_snapshot()
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            await run_frame()
+            peak_bytes += tracemalloc.get_traced_memory()[1] - current
+            allocated_blocks += sum(
+                max(stat.count_diff, 0) for stat in traced_snapshot().compare_to(frame_before, "lineno")
+            )
+
+        after = traced_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    return peak_bytes / frames, allocated_blocks / frames, max(retained, 0) / frames
+
+async def allocations_threads(
+    frame : bytes,
+    baud : int,
+    frames : int,
+    buffer_size : int,
+) -> tuple[float, float, float]:
+    a, b = Serial.open_pty_pair(SerialSettings(baud), buffer_size = buffer_size)
+
+    async def run_frame(
+    ) -> None:
+        a.write_all(frame)
+        received = 0
+        while received < len(frame):
+            received += len(b.read_view())
+
+    try:
+        return await allocations(run_frame, frames)
+    finally:
+        a.close()
+        b.close()
+
+async def allocations_asyncio(
+    frame : bytes,
+    baud : int,
+    frames : int,
+    buffer_size : int,
+) -> tuple[float, float, float]:
+    a, b = Serial.open_pty_pair(SerialSettings(baud), buffer_size = buffer_size)
+    multiplexer = AsyncSerial.PtySerialMultiplexer()
+    sink = _Sink(buffer_size)
+    transport = multiplexer.add(a, _Source)
+    multiplexer.add(b, lambda: sink, buffer_size)
+    loop = asyncio.get_running_loop()
+
+    async def run_frame(
+    ) -> None:
+        sink.done = loop.create_future()
+        sink.expect(sink.received + len(frame))
+        transport.write(frame)
+        await sink.done
+
+    await asyncio.sleep(0)
+
+    try:
+        return await allocations(run_frame, frames)
+    finally:
+        await multiplexer.close()
+
+def latency_threads(
+    pairs : list[tuple[Serial.SerialPort, Serial.SerialPort]],
+    frame : bytes,
+    frames : int,
+    timeout : float,
+) -> list[int]:
+    samples : list[list[int]] = [[] for _ in pairs]
+
+    def run(
+        i : int,
+        port : Serial.SerialPort,
+    ) -> None:
+        receiver = Serial.EventDrivenReceiver(port)
+        for _ in range(frames):
+            started = time.perf_counter_ns()
+            receiver.transact(frame, timeout)
+            samples[i].append(time.perf_counter_ns() - started)
+
+    devices = [Simulation.SimulatedSerialDevice(b) for _, b in pairs]
+    threads = [threading.Thread(target = run, args = (i, a)) for i, (a, _) in enumerate(pairs)]
+
+    for device in devices:
+        device.start()
+
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for device in devices:
+            device.stop()
+
+    return [sample for port_samples in samples for sample in port_samples]
+
+async def latency_asyncio(
+    pairs : list[tuple[Serial.SerialPort, Serial.SerialPort]],
+    frame : bytes,
+    frames : int,
+    timeout : float,
+) -> list[int]:
+    multiplexer = AsyncSerial.PtySerialMultiplexer()
+    devices = [Simulation.SimulatedSerialDevice(b) for _, b in pairs]
+    connections = [await multiplexer.open_connection(a) for a, _ in pairs]
+
+    async def run(
+        reader : asyncio.StreamReader,
+        writer : asyncio.StreamWriter,
+    ) -> list[int]:
+        samples : list[int] = []
+        for _ in range(frames):
+            started = time.perf_counter_ns()
+            writer.write(frame)
+            await asyncio.wait_for(reader.readuntil(b"\n"), timeout)
+            samples.append(time.perf_counter_ns() - started)
+        return samples
+
+    for device in devices:
+        device.start()
+
+    try:
+        results = await asyncio.gather(*(run(reader, writer) for reader, writer in connections))
+    finally:
+        for device in devices:
+            device.stop()
+        await multiplexer.close()
+
+    return [sample for port_samples in results for sample in port_samples]
+
+def summarize_latency(
+    samples : list[int],
+    frame : bytes,
+    baud : int,
+) -> dict[str, Any]:
+    quantiles = statistics.quantiles(samples, n = 100, method = "inclusive")
+
+    return {
+        "round_trips": len(samples),
+        "p50_us": quantiles[49] / 1000,
+        "p99_us": quantiles[98] / 1000,
+        "mean_us": statistics.fmean(samples) / 1000,
+        "max_us": max(samples) / 1000,
+        "wire_us": 2 * wire_seconds(len(frame), baud) * 1_000_000,
+    }
+
+def run_case(
+    engine : str,
+    ports : int,
+    baud : int,
+    frame_size : int,
+    args : argparse.Namespace,
+) -> dict[str, Any]:
+    frame = make_frame(frame_size)
+
+    pairs = open_pairs(ports, baud, args.buffer_size)
+    try:
+        calls = native_calls(pairs)
+        if engine == "threads":
+            n_bytes, elapsed = throughput_threads(pairs, frame, baud, args.duration)
+        else:
+            n_bytes, elapsed = asyncio.run(throughput_asyncio(pairs, frame, baud, args.duration, args.buffer_size))
+        calls = native_calls(pairs) - calls
+    finally:
+        close_pairs(pairs)
+
+    measure = allocations_threads if engine == "threads" else allocations_asyncio
+    peak_bytes, allocated_blocks, retained_blocks = asyncio.run(measure(frame, baud, args.alloc_frames, args.buffer_size))
+
+    pairs = open_pairs(ports, baud, args.buffer_size)
+    try:
+        if engine == "threads":
+            samples = latency_threads(pairs, frame, args.latency_frames, args.timeout)
+        else:
+            samples = asyncio.run(latency_asyncio(pairs, frame, args.latency_frames, args.timeout))
+    finally:
+        close_pairs(pairs)
+
+    return {
+        "engine": engine,
+        "ports": ports,
+        "baud": baud,
+        "frame_size": frame_size,
+        "duration_s": elapsed,
+        "bytes": n_bytes,
+        "bytes_per_s": n_bytes / elapsed,
+        "syscalls": calls,
+        "syscalls_per_mb": calls / (n_bytes / 1_000_000) if n_bytes > 0 else None,
+        "alloc_peak_bytes_per_frame": peak_bytes,
+        "alloc_blocks_per_frame": allocated_blocks,
+        "retained_blocks_per_frame": retained_blocks,
+        "latency": summarize_latency(samples, frame, baud),
+    }
+
+def main(
+) -> None:
+    parser = argparse.ArgumentParser(description = "Benchmark serial port throughput and latency over pty loopback pairs")
+    parser.add_argument("--ports", type = int, nargs = "+", default = [1, 8])
+    parser.add_argument("--baud", type = int, nargs = "+", default = [115200, 0], help = "0 writes as fast as the transport allows")
+    parser.add_argument("--frame-size", type = int, nargs = "+", default = [64, 1024])
+    parser.add_argument("--engines", nargs = "+", choices = ["threads", "asyncio"], default = ["threads", "asyncio"])
+    parser.add_argument("--duration", type = float, default = 1.0, help = "seconds of throughput traffic per case")
+    parser.add_argument("--latency-frames", type = int, default = 200, help = "round trips per port")
+    parser.add_argument("--alloc-frames", type = int, default = 256)
+    parser.add_argument("--buffer-size", type = int, default = 65536)
+    parser.add_argument("--timeout", type = float, default = 1.0)
+    parser.add_argument("--output", help = "path of the JSON report, - for stdout")
+    args = parser.parse_args()
+
+    if any(size < 2 for size in args.frame_size):
+        parser.error("--frame-size must be at least 2 bytes")
+
+    results = []
+
+    for engine in args.engines:
+        for ports in args.ports:
+            for baud in args.baud:
+                for frame_size in args.frame_size:
+                    result = run_case(engine, ports, baud, frame_size, args)
+                    results.append(result)
+                    latency = result["latency"]
+                    syscalls_per_mb = result["syscalls_per_mb"]
+                    print(
+                        f"engine={engine:<7} ports={ports:<3} baud={baud:<7} frame={frame_size:<5} "
+                        f"rate={result["bytes_per_s"] / 1000:10.1f} kB/s "
+                        f"syscalls/MB={"n/a" if syscalls_per_mb is None else f"{syscalls_per_mb:.0f}":>9} "
+                        f"alloc/frame={result["alloc_peak_bytes_per_frame"]:8.1f} B "
+                        f"{result["alloc_blocks_per_frame"]:6.1f} blocks "
+                        f"p50={latency["p50_us"]:8.1f} us p99={latency["p99_us"]:8.1f} us",
+                        file = sys.stderr if args.output == "-" else sys.stdout,
+                    )
+
+    report = {
+        "benchmark": "serial_io",
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "transport": "pty",
+        "config": vars(args),
+        "results": results,
+    }
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent = 2)
+        print()
+    elif args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent = 2)
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,12 @@
 from SilvaViridis.Python.WinAPI.Wrapper import USBDeviceManager, COMPortDeviceManager, Tools
 
-comports = list(COMPortDeviceManager.enumerate_comport_devices())
+index = USBDeviceManager.build_usb_device_index(include_interfaces = True)
 
-usb_tree = USBDeviceManager.build_usb_tree()
+comports = Tools.ComPortIndex(COMPortDeviceManager.enumerate_comport_devices(), index.interfaces)
 
-def print_comports(node : USBDeviceManager.USBNode) -> str:
-    if not isinstance(node.device, USBDeviceManager.USBPort):
-        ports = Tools.get_comports_for_usb(node.device, comports)
-        if len(ports) > 0:
-            return f" # {", ".join(ports)}"
-    return ""
+usb_tree = USBDeviceManager.build_usb_tree(index)
 
-USBDeviceManager.print_usb_tree(
+USBDeviceManager.render_usb_tree(
     usb_tree,
-    get_additional_info = print_comports,
+    get_additional_info = Tools.comport_annotation(comports),
 )
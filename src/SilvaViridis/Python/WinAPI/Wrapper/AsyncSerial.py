@@ -0,0 +1,675 @@
+from __future__ import annotations
+
+import asyncio
+import ctypes as C
+import os
+import threading
+
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
+
+from .Comm import (
+    get_comm_timeouts,
+    set_comm_timeouts,
+)
+
+from .Exceptions import (
+    ERROR_OPERATION_ABORTED,
+    WinAPIException,
+    raise_ex,
+)
+
+from .IO import (
+    associate_io_completion_port,
+    cancel_io,
+    close_file,
+    create_io_completion_port,
+    get_queued_completion_status,
+    post_queued_completion_status,
+    start_read_file,
+    start_write_file,
+)
+
+from .Serial import (
+    OverlappedSerialTransport,
+    PtySerialTransport,
+    SerialPort,
+)
+
+from .Types import (
+    STREAMING_TIMEOUTS,
+    SerialTimeouts,
+)
+
+from ..types import (
+    OVERLAPPED,
+)
+
+DEFAULT_READ_SIZE = 4096
+DEFAULT_WRITE_HIGH_WATER = 64 * 1024
+
+class SerialPortTransport(asyncio.Transport, ABC):
+    def __init__(
+        self,
+        multiplexer : SerialMultiplexer,
+        port : SerialPort,
+        protocol : asyncio.BaseProtocol,
+        read_size : int = DEFAULT_READ_SIZE,
+    ) -> None:
+        super().__init__({"serial_port": port})
+        self._multiplexer = multiplexer
+        self._loop = multiplexer.loop
+        self._port = port
+        self._protocol = protocol
+        self._buffer = bytearray(read_size)
+        self._view = memoryview(self._buffer)
+        self._reading = True
+        self._closing = False
+        self._closed = False
+        self._write_queue : deque[bytes] = deque()
+        self._write_offset = 0
+        self._write_size = 0
+        self._protocol_paused = False
+        self._high_water = DEFAULT_WRITE_HIGH_WATER
+        self._low_water = DEFAULT_WRITE_HIGH_WATER // 4
+
+    def get_protocol(
+        self,
+    ) -> asyncio.BaseProtocol:
+        return self._protocol
+
+    def set_protocol(
+        self,
+        protocol : asyncio.BaseProtocol,
+    ) -> None:
+        self._protocol = protocol
+
+    def is_closing(
+        self,
+    ) -> bool:
+        return self._closing
+
+    def is_reading(
+        self,
+    ) -> bool:
+        return self._reading and not self._closing
+
+    def pause_reading(
+        self,
+    ) -> None:
+        self._reading = False
+
+    def resume_reading(
+        self,
+    ) -> None:
+        if self._reading or self._closing:
+            return
+        self._reading = True
+        self._start_reading()
+
+    def get_write_buffer_size(
+        self,
+    ) -> int:
+        return self._write_size
+
+    def get_write_buffer_limits(
+        self,
+    ) -> tuple[int, int]:
+        return self._low_water, self._high_water
+
+    def set_write_buffer_limits(
+        self,
+        high : int | None = None,
+        low : int | None = None,
+    ) -> None:
+        self._high_water = DEFAULT_WRITE_HIGH_WATER if high is None else high
+        self._low_water = self._high_water // 4 if low is None else low
+        self._maybe_pause_protocol()
+
+    def can_write_eof(
+        self,
+    ) -> bool:
+        return False
+
+    def write(
+        self,
+        data : bytes | bytearray | memoryview,
+    ) -> None:
+        if self._closing or len(data) == 0:
+            return
+
+        was_idle = len(self._write_queue) == 0
+        self._write_queue.append(bytes(data))
+        self._write_size += len(data)
+
+        if was_idle:
+            self._start_writing()
+
+        self._maybe_pause_protocol()
+
+    def close(
+        self,
+    ) -> None:
+        if self._closing:
+            return
+        self._closing = True
+        self._reading = False
+        self._cancel(False)
+        self._maybe_finish()
+
+    def abort(
+        self,
+    ) -> None:
+        if self._closed:
+            return
+        self._closing = True
+        self._reading = False
+        self._write_queue.clear()
+        self._write_size = 0
+        self._write_offset = 0
+        self._cancel(True)
+        self._maybe_finish()
+
+    def _data_received(
+        self,
+        n : int,
+    ) -> None:
+        if isinstance(self._protocol, asyncio.BufferedProtocol):
+            offset = 0
+            while offset < n:
+                target = memoryview(self._protocol.get_buffer(n - offset))
+                chunk = min(len(target), n - offset)
+                target[:chunk] = self._view[offset:offset + chunk]
+                self._protocol.buffer_updated(chunk)
+                offset += chunk
+        elif isinstance(self._protocol, asyncio.Protocol):
+            self._protocol.data_received(bytes(self._view[:n]))
+
+    def _data_written(
+        self,
+        n : int,
+    ) -> None:
+        if len(self._write_queue) == 0:
+            return
+
+        self._write_size -= n
+        self._write_offset += n
+
+        while len(self._write_queue) > 0 and self._write_offset >= len(self._write_queue[0]):
+            self._write_offset -= len(self._write_queue.popleft())
+
+        self._maybe_resume_protocol()
+
+    def _maybe_pause_protocol(
+        self,
+    ) -> None:
+        if self._protocol_paused or self._write_size <= self._high_water:
+            return
+        self._protocol_paused = True
+        self._protocol.pause_writing()
+
+    def _maybe_resume_protocol(
+        self,
+    ) -> None:
+        if not self._protocol_paused or self._write_size > self._low_water:
+            return
+        self._protocol_paused = False
+        self._protocol.resume_writing()
+
+    def _fatal_error(
+        self,
+        ex : BaseException,
+    ) -> None:
+        if self._closed:
+            return
+        self._closing = True
+        self._reading = False
+        self._write_queue.clear()
+        self._write_size = 0
+        self._write_offset = 0
+        self._cancel(True)
+        self._finish(ex)
+
+    def _maybe_finish(
+        self,
+    ) -> None:
+        if not self._closed and self._closing and self._is_idle():
+            self._finish(None)
+
+    def _finish(
+        self,
+        ex : BaseException | None,
+    ) -> None:
+        self._closed = True
+        self._multiplexer._remove(self)
+        self._close_port()
+        self._loop.call_soon(self._protocol.connection_lost, ex)
+
+    @abstractmethod
+    def _start_reading(
+        self,
+    ) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _start_writing(
+        self,
+    ) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _cancel(
+        self,
+        writes : bool,
+    ) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _is_idle(
+        self,
+    ) -> bool:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _close_port(
+        self,
+    ) -> None:
+        raise NotImplementedError()
+
+class SerialMultiplexer(ABC):
+    def __init__(
+        self,
+        loop : asyncio.AbstractEventLoop | None = None,
+    ) -> None:
+        self.loop = asyncio.get_running_loop() if loop is None else loop
+        self._transports : dict[int, SerialPortTransport] = {}
+        self._next_key = 1
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+    def __len__(
+        self,
+    ) -> int:
+        return len(self._transports)
+
+    def add(
+        self,
+        port : SerialPort,
+        protocol_factory : Callable[[], asyncio.BaseProtocol],
+        read_size : int = DEFAULT_READ_SIZE,
+    ) -> SerialPortTransport:
+        key = self._next_key
+        self._next_key += 1
+        protocol = protocol_factory()
+        transport = self._create_transport(key, port, protocol, read_size)
+        self._transports[key] = transport
+        self._drained.clear()
+        self.loop.call_soon(protocol.connection_made, transport)
+        self.loop.call_soon(transport._start_reading)
+        return transport
+
+    async def open_connection(
+        self,
+        port : SerialPort,
+        limit : int = 2 ** 16,
+        read_size : int = DEFAULT_READ_SIZE,
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader = asyncio.StreamReader(limit = limit, loop = self.loop)
+        protocol = asyncio.StreamReaderProtocol(reader, loop = self.loop)
+        transport = self.add(port, lambda: protocol, read_size)
+        await asyncio.sleep(0)
+        return reader, asyncio.StreamWriter(transport, protocol, reader, self.loop)
+
+    async def close(
+        self,
+    ) -> None:
+        for transport in list(self._transports.values()):
+            transport.close()
+        await self._drained.wait()
+        await self._shutdown()
+
+    def _remove(
+        self,
+        transport : SerialPortTransport,
+    ) -> None:
+        for key, value in list(self._transports.items()):
+            if value is transport:
+                del self._transports[key]
+        if len(self._transports) == 0:
+            self._drained.set()
+
+    @abstractmethod
+    def _create_transport(
+        self,
+        key : int,
+        port : SerialPort,
+        protocol : asyncio.BaseProtocol,
+        read_size : int,
+    ) -> SerialPortTransport:
+        raise NotImplementedError()
+
+    async def _shutdown(
+        self,
+    ) -> None:
+        pass
+
+class _IOCPSerialTransport(SerialPortTransport):
+    def __init__(
+        self,
+        multiplexer : IOCPSerialMultiplexer,
+        port : SerialPort,
+        protocol : asyncio.BaseProtocol,
+        read_size : int,
+    ) -> None:
+        super().__init__(multiplexer, port, protocol, read_size)
+        transport = port.transport
+        if not isinstance(transport, OverlappedSerialTransport):
+            raise TypeError("The serial port is not opened for overlapped I/O")
+        self._fd = transport.fd
+        self._read_overlapped = OVERLAPPED()
+        self._write_overlapped = OVERLAPPED()
+        self._read_address = C.addressof(self._read_overlapped)
+        self._write_address = C.addressof(self._write_overlapped)
+        self._buffer_array = (C.c_char * len(self._buffer)).from_buffer(self._buffer)
+        self._write_source : object = None
+        self._read_pending = False
+        self._write_pending = False
+        self._previous_timeouts : SerialTimeouts | None = None
+
+    def _start_reading(
+        self,
+    ) -> None:
+        if self._read_pending or not self.is_reading():
+            return
+        try:
+            start_read_file(self._fd, C.addressof(self._buffer_array), len(self._buffer), self._read_overlapped)
+        except (WinAPIException, OSError) as ex:
+            self._fatal_error(ex)
+            return
+        self._read_pending = True
+
+    def _start_writing(
+        self,
+    ) -> None:
+        if self._write_pending or len(self._write_queue) == 0:
+            return
+        chunk = self._write_queue[0]
+        self._write_source = C.c_char_p(chunk)
+        address = (C.cast(self._write_source, C.c_void_p).value or 0) + self._write_offset
+        try:
+            start_write_file(self._fd, address, len(chunk) - self._write_offset, self._write_overlapped)
+        except (WinAPIException, OSError) as ex:
+            self._fatal_error(ex)
+            return
+        self._write_pending = True
+
+    def _completed(
+        self,
+        address : int,
+        n : int,
+        error : int,
+    ) -> None:
+        if address == self._read_address:
+            self._read_pending = False
+        elif address == self._write_address:
+            self._write_pending = False
+            self._write_source = None
+        else:
+            return
+
+        if error != 0 and error != ERROR_OPERATION_ABORTED:
+            try:
+                raise_ex(error)
+            except WinAPIException as ex:
+                self._fatal_error(ex)
+            return
+
+        if self._closed:
+            return
+
+        if address == self._read_address:
+            if n > 0:
+                self._data_received(n)
+            self._start_reading()
+        else:
+            self._data_written(n)
+            self._start_writing()
+
+        self._maybe_finish()
+
+    def _cancel(
+        self,
+        writes : bool,
+    ) -> None:
+        if self._read_pending:
+            cancel_io(self._fd, self._read_overlapped)
+        if writes and self._write_pending:
+            cancel_io(self._fd, self._write_overlapped)
+
+    def _is_idle(
+        self,
+    ) -> bool:
+        return not self._read_pending and not self._write_pending and len(self._write_queue) == 0
+
+    def _close_port(
+        self,
+    ) -> None:
+        if self._read_pending or self._write_pending:
+            self._multiplexer._orphan(self)
+        else:
+            self._release_port()
+
+    def _release_port(
+        self,
+    ) -> None:
+        try:
+            if self._previous_timeouts is not None:
+                set_comm_timeouts(self._fd, self._previous_timeouts)
+        except (WinAPIException, OSError):
+            pass
+        finally:
+            self._port.transport.close()
+
+class IOCPSerialMultiplexer(SerialMultiplexer):
+    def __init__(
+        self,
+        loop : asyncio.AbstractEventLoop | None = None,
+    ) -> None:
+        super().__init__(loop)
+        self._iocp = create_io_completion_port()
+        self._orphans : dict[int, _IOCPSerialTransport] = {}
+        self._thread = threading.Thread(target = self._reap, daemon = True)
+        self._thread.start()
+
+    def _create_transport(
+        self,
+        key : int,
+        port : SerialPort,
+        protocol : asyncio.BaseProtocol,
+        read_size : int,
+    ) -> SerialPortTransport:
+        transport = _IOCPSerialTransport(self, port, protocol, read_size)
+        associate_io_completion_port(transport._fd, self._iocp, key)
+        transport._previous_timeouts = get_comm_timeouts(transport._fd)
+        set_comm_timeouts(transport._fd, STREAMING_TIMEOUTS)
+        return transport
+
+    def _orphan(
+        self,
+        transport : _IOCPSerialTransport,
+    ) -> None:
+        self._orphans[id(transport)] = transport
+        self._drained.clear()
+
+    def _reap(
+        self,
+    ) -> None:
+        while True:
+            n, key, address, error = get_queued_completion_status(self._iocp)
+
+            if key == 0 and address == 0:
+                return
+
+            self.loop.call_soon_threadsafe(self._dispatch, key, address, n, error)
+
+    def _dispatch(
+        self,
+        key : int,
+        address : int,
+        n : int,
+        error : int,
+    ) -> None:
+        transport = self._transports.get(key)
+
+        if transport is not None:
+            transport._completed(address, n, error)
+            return
+
+        for orphan_key, orphan in list(self._orphans.items()):
+            if address in (orphan._read_address, orphan._write_address):
+                orphan._completed(address, n, error)
+                if not orphan._read_pending and not orphan._write_pending:
+                    del self._orphans[orphan_key]
+                    orphan._release_port()
+
+        if len(self._transports) == 0 and len(self._orphans) == 0:
+            self._drained.set()
+
+    async def _shutdown(
+        self,
+    ) -> None:
+        post_queued_completion_status(self._iocp, 0)
+        await self.loop.run_in_executor(None, self._thread.join)
+        close_file(self._iocp)
+
+class _PtySerialTransport(SerialPortTransport):
+    def __init__(
+        self,
+        multiplexer : SerialMultiplexer,
+        port : SerialPort,
+        protocol : asyncio.BaseProtocol,
+        read_size : int,
+    ) -> None:
+        super().__init__(multiplexer, port, protocol, read_size)
+        transport = port.transport
+        if not isinstance(transport, PtySerialTransport):
+            raise TypeError("The serial port is not backed by a pty")
+        self._pty = transport
+        self._fd = transport.fd
+        self._reader_added = False
+        self._writer_added = False
+
+    def pause_reading(
+        self,
+    ) -> None:
+        super().pause_reading()
+        self._remove_reader()
+
+    def _remove_reader(
+        self,
+    ) -> None:
+        if self._reader_added:
+            self._loop.remove_reader(self._fd)
+            self._reader_added = False
+
+    def _remove_writer(
+        self,
+    ) -> None:
+        if self._writer_added:
+            self._loop.remove_writer(self._fd)
+            self._writer_added = False
+
+    def _start_reading(
+        self,
+    ) -> None:
+        if self._reader_added or not self.is_reading():
+            return
+        self._loop.add_reader(self._fd, self._on_readable)
+        self._reader_added = True
+
+    def _on_readable(
+        self,
+    ) -> None:
+        try:
+            n = os.readv(self._fd, [self._buffer])
+        except BlockingIOError:
+            return
+        except OSError as ex:
+            self._fatal_error(ex)
+            return
+
+        self._pty.native_calls += 1
+
+        if n > 0:
+            self._data_received(n)
+
+    def _start_writing(
+        self,
+    ) -> None:
+        self._on_writable()
+
+        if len(self._write_queue) > 0 and not self._writer_added and not self._closed:
+            self._loop.add_writer(self._fd, self._on_writable)
+            self._writer_added = True
+
+    def _on_writable(
+        self,
+    ) -> None:
+        while len(self._write_queue) > 0:
+            chunk = memoryview(self._write_queue[0])[self._write_offset:]
+            try:
+                n = os.write(self._fd, chunk)
+            except BlockingIOError:
+                return
+            except OSError as ex:
+                self._fatal_error(ex)
+                return
+
+            self._pty.native_calls += 1
+            self._data_written(n)
+
+            if n < len(chunk):
+                return
+
+        self._remove_writer()
+        self._maybe_finish()
+
+    def _cancel(
+        self,
+        writes : bool,
+    ) -> None:
+        self._remove_reader()
+        if writes:
+            self._remove_writer()
+
+    def _is_idle(
+        self,
+    ) -> bool:
+        return len(self._write_queue) == 0
+
+    def _close_port(
+        self,
+    ) -> None:
+        self._remove_reader()
+        self._remove_writer()
+        self._port.transport.close()
+
+class PtySerialMultiplexer(SerialMultiplexer):
+    def _create_transport(
+        self,
+        key : int,
+        port : SerialPort,
+        protocol : asyncio.BaseProtocol,
+        read_size : int,
+    ) -> SerialPortTransport:
+        transport = _PtySerialTransport(self, port, protocol, read_size)
+        os.set_blocking(transport._fd, False)
+        return transport
+
+def create_serial_multiplexer(
+    loop : asyncio.AbstractEventLoop | None = None,
+) -> SerialMultiplexer:
+    if hasattr(C, "WinDLL"):
+        return IOCPSerialMultiplexer(loop)
+    return PtySerialMultiplexer(loop)
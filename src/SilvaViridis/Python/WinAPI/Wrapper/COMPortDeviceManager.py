@@ -6,11 +6,24 @@ from .DeviceManager import (
     enumerate_devices,
 )
 
+from .Exceptions import (
+    FileNotFound,
+)
+
 from .Types import (
     DevInterfaceGuids,
     DevProperties,
+    RegistryRootKeys,
+)
+
+from .WinReg import (
+    free_regkey,
+    get_registry_string_values,
+    open_registry_key,
 )
 
+SERIALCOMM_KEY = "HARDWARE\\DEVICEMAP\\SERIALCOMM"
+
 class COMPortDevice(Device):
     def get_port_name(
         self,
@@ -28,3 +41,22 @@ def enumerate_comport_devices(
             "PortName",
         ],
     )
+
+def get_serialcomm_ports(
+) -> dict[str, str]:
+    try:
+        regkey = open_registry_key(RegistryRootKeys.LOCAL_MACHINE, SERIALCOMM_KEY)
+    except FileNotFound:
+        return {}
+
+    try:
+        return get_registry_string_values(regkey)
+    finally:
+        free_regkey(regkey)
+
+def get_comport_names(
+    fast : bool = True,
+) -> list[str]:
+    if fast:
+        return list(get_serialcomm_ports().values())
+    return [port.get_port_name() for port in enumerate_comport_devices()]
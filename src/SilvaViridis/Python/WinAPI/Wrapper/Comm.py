@@ -0,0 +1,168 @@
+import ctypes as C
+import ctypes.wintypes as W
+
+from .Exceptions import (
+    ERROR_IO_PENDING,
+    ERROR_OPERATION_ABORTED,
+    raise_ex,
+)
+from .IO import (
+    OverlappedOperation,
+)
+from .Types import (
+    FALSE,
+    INFINITE,
+    TRUE,
+    WAIT_OBJECT_0,
+    CommEvents,
+    Parities,
+    PurgeFlags,
+    SerialSettings,
+    SerialTimeouts,
+)
+
+from ..kernel32 import (
+    CancelIoEx,
+    ClearCommError,
+    GetCommState,
+    GetCommTimeouts,
+    GetOverlappedResult,
+    PurgeComm,
+    SetCommState,
+    SetCommTimeouts,
+    SetupComm,
+    SetCommMask,
+    WaitCommEvent,
+    WaitForSingleObject,
+)
+from ..types import (
+    COMMTIMEOUTS,
+    COMSTAT,
+    DCB,
+)
+
+def get_comm_state(
+    fd : C.c_void_p,
+) -> DCB:
+    dcb = DCB.create()
+
+    if GetCommState(fd, C.byref(dcb)) == FALSE:
+        raise_ex(C.GetLastError())
+
+    return dcb
+
+def set_comm_state(
+    fd : C.c_void_p,
+    settings : SerialSettings,
+) -> None:
+    dcb = get_comm_state(fd)
+    dcb.BaudRate = settings.baud_rate
+    dcb.fBinary = 1
+    dcb.fParity = 0 if settings.parity == Parities.NONE else 1
+    dcb.fOutxCtsFlow = 0
+    dcb.fOutxDsrFlow = 0
+    dcb.fDtrControl = settings.dtr_control.value
+    dcb.fDsrSensitivity = 0
+    dcb.fOutX = 0
+    dcb.fInX = 0
+    dcb.fNull = 0
+    dcb.fRtsControl = settings.rts_control.value
+    dcb.fAbortOnError = 0
+    dcb.ByteSize = settings.byte_size
+    dcb.Parity = settings.parity.value
+    dcb.StopBits = settings.stop_bits.value
+
+    if settings.event_char is not None:
+        dcb.EvtChar = bytes([settings.event_char])
+
+    if SetCommState(fd, C.byref(dcb)) == FALSE:
+        raise_ex(C.GetLastError())
+
+def get_comm_timeouts(
+    fd : C.c_void_p,
+) -> SerialTimeouts:
+    data = COMMTIMEOUTS()
+
+    if GetCommTimeouts(fd, C.byref(data)) == FALSE:
+        raise_ex(C.GetLastError())
+
+    return SerialTimeouts(
+        read_interval = data.ReadIntervalTimeout,
+        read_total_multiplier = data.ReadTotalTimeoutMultiplier,
+        read_total_constant = data.ReadTotalTimeoutConstant,
+        write_total_multiplier = data.WriteTotalTimeoutMultiplier,
+        write_total_constant = data.WriteTotalTimeoutConstant,
+    )
+
+def set_comm_timeouts(
+    fd : C.c_void_p,
+    timeouts : SerialTimeouts,
+) -> None:
+    data = COMMTIMEOUTS()
+    data.ReadIntervalTimeout = timeouts.read_interval
+    data.ReadTotalTimeoutMultiplier = timeouts.read_total_multiplier
+    data.ReadTotalTimeoutConstant = timeouts.read_total_constant
+    data.WriteTotalTimeoutMultiplier = timeouts.write_total_multiplier
+    data.WriteTotalTimeoutConstant = timeouts.write_total_constant
+
+    if SetCommTimeouts(fd, C.byref(data)) == FALSE:
+        raise_ex(C.GetLastError())
+
+def purge_comm(
+    fd : C.c_void_p,
+    flags : PurgeFlags = PurgeFlags.RXCLEAR | PurgeFlags.TXCLEAR,
+) -> None:
+    if PurgeComm(fd, flags.value) == FALSE:
+        raise_ex(C.GetLastError())
+
+def set_comm_queue_sizes(
+    fd : C.c_void_p,
+    input_size : int,
+    output_size : int,
+) -> None:
+    if SetupComm(fd, input_size, output_size) == FALSE:
+        raise_ex(C.GetLastError())
+
+def set_comm_mask(
+    fd : C.c_void_p,
+    mask : CommEvents,
+) -> None:
+    if SetCommMask(fd, mask.value) == FALSE:
+        raise_ex(C.GetLastError())
+
+def get_input_queue_size(
+    fd : C.c_void_p,
+) -> int:
+    errors = W.DWORD(0)
+    stat = COMSTAT()
+
+    if ClearCommError(fd, C.byref(errors), C.byref(stat)) == FALSE:
+        raise_ex(C.GetLastError())
+
+    return stat.cbInQue
+
+def wait_comm_event(
+    fd : C.c_void_p,
+    operation : OverlappedOperation,
+    event_mask : W.DWORD,
+    timeout : float | None = None,
+) -> CommEvents:
+    event_mask.value = 0
+
+    if WaitCommEvent(fd, C.byref(event_mask), C.byref(operation.overlapped)) == FALSE:
+        error = C.GetLastError()
+        if error != ERROR_IO_PENDING:
+            raise_ex(error)
+
+        milliseconds = INFINITE if timeout is None else max(int(timeout * 1000), 0)
+
+        if WaitForSingleObject(operation.overlapped.hEvent, milliseconds) != WAIT_OBJECT_0:
+            CancelIoEx(fd, C.byref(operation.overlapped))
+
+    if GetOverlappedResult(fd, C.byref(operation.overlapped), C.byref(operation.transferred), TRUE) == FALSE:
+        error = C.GetLastError()
+        if error == ERROR_OPERATION_ABORTED:
+            return CommEvents.NONE
+        raise_ex(error)
+
+    return CommEvents(event_mask.value)
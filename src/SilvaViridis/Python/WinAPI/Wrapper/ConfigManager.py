@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import ctypes as C
+import ctypes.wintypes as W
+
+from collections.abc import Callable
+from uuid import UUID
+
+from .Types import (
+    CR_SUCCESS,
+    CMNotifyActions,
+    CMNotifyFilterFlags,
+    CMNotifyFilterTypes,
+    DeviceInterfaceNotification,
+)
+from .Utils import (
+    guid_to_uuid,
+    uuid_to_guid,
+)
+
+from ..cfgmgr32 import (
+    PCM_NOTIFY_CALLBACK,
+    CM_Register_Notification,
+    CM_Unregister_Notification,
+)
+from ..types import (
+    CM_NOTIFY_EVENT_DATA,
+    CM_NOTIFY_EVENT_DATA_DEVICE_INTERFACE,
+    CM_NOTIFY_FILTER,
+    HCMNOTIFICATION,
+)
+
+_SYMBOLIC_LINK_OFFSET = getattr(CM_NOTIFY_EVENT_DATA, "u").offset \
+    + getattr(CM_NOTIFY_EVENT_DATA_DEVICE_INTERFACE, "SymbolicLink").offset
+
+class DeviceInterfaceSubscription:
+    def __init__(
+        self,
+        handle : HCMNOTIFICATION,
+        callback : C._CFuncPtr,
+    ) -> None:
+        self.handle = handle
+        self.callback = callback
+
+def register_device_interface_notification(
+    guid : UUID,
+    callback : Callable[[DeviceInterfaceNotification], None],
+) -> DeviceInterfaceSubscription:
+    def on_event(
+        hnotify : HCMNOTIFICATION,
+        context : W.LPVOID,
+        action : int,
+        event_data : C._Pointer[CM_NOTIFY_EVENT_DATA],
+        event_data_size : int,
+    ) -> int:
+        try:
+            interface = event_data.contents.u.DeviceInterface
+            callback(DeviceInterfaceNotification(
+                action = CMNotifyActions(action),
+                interface_class_guid = guid_to_uuid(interface.ClassGuid),
+                symbolic_link = C.wstring_at(C.addressof(event_data.contents) + _SYMBOLIC_LINK_OFFSET),
+            ))
+        except Exception:
+            pass
+        return CR_SUCCESS
+
+    notify_filter = CM_NOTIFY_FILTER.create()
+    notify_filter.Flags = CMNotifyFilterFlags.NONE.value
+    notify_filter.FilterType = CMNotifyFilterTypes.DEVICEINTERFACE.value
+    notify_filter.u.DeviceInterface.ClassGuid = uuid_to_guid(guid)
+
+    native_callback = PCM_NOTIFY_CALLBACK(on_event)
+    handle = HCMNOTIFICATION()
+
+    status = CM_Register_Notification(
+        C.byref(notify_filter),
+        None,
+        native_callback,
+        C.byref(handle),
+    )
+
+    if status != CR_SUCCESS:
+        raise Exception(f"Cannot register device notification, cr: {status}")
+
+    return DeviceInterfaceSubscription(handle, native_callback)
+
+def unregister_notification(
+    subscription : DeviceInterfaceSubscription,
+) -> None:
+    CM_Unregister_Notification(subscription.handle)
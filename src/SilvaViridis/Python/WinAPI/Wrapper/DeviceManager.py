@@ -1,3 +1,5 @@
+import ctypes as C
+
 from collections.abc import Callable, Generator, Iterable, Sequence
 from typing import Literal
 from uuid import UUID
@@ -5,6 +7,7 @@ from uuid import UUID
 from .Exceptions import (
     InvalidData,
     NoMoreItems,
+    NotFound,
 )
 
 from .SetupAPI import (
@@ -20,6 +23,7 @@ from .SetupAPI import (
 )
 
 from .Types import (
+    DevInfoData,
     DevProperties,
     IncludedInfoFlags,
     DevInterfaceGuids,
@@ -62,6 +66,58 @@ parent = {self.parent}
 {"\n".join([f"[{p.value:02}] {p.name} = {self.properties[p]}" for p in self.properties])}\
 """
 
+def _read_reg_properties(
+    hdevinfo : C.c_void_p,
+    devinfo : DevInfoData,
+    reg_properties : Sequence[str],
+) -> dict[str, str]:
+    reg_props : dict[str, str] = {}
+
+    if len(reg_properties) > 0:
+
+        regkey = get_device_specific_registry_data(hdevinfo, devinfo)
+
+        for reg_prop_name in reg_properties:
+            try:
+                reg_prop_val = get_registry_key_value(regkey, reg_prop_name)
+                reg_props[reg_prop_name] = reg_prop_val
+            except Exception as ex:
+                reg_props[reg_prop_name] = "N/A"
+
+        free_regkey(regkey)
+
+    return reg_props
+
+def _read_properties(
+    hdevinfo : C.c_void_p,
+    devinfo : DevInfoData,
+    properties : Iterable[DevProperties] | Literal["all"],
+) -> dict[DevProperties, str | int | bytes | None]:
+    props : dict[DevProperties, str | int | bytes | None] = {}
+
+    if properties == "all":
+        properties = list(DevProperties)
+
+    for prop_name in properties:
+        try:
+            prop = get_device_registry_property(hdevinfo, devinfo, prop_name)
+            props[prop_name] = prop
+        except InvalidData:
+            props[prop_name] = "N/A"
+        except Exception as ex:
+            props[prop_name] = f"Error: {ex}"
+
+    return props
+
+def _read_parent(
+    hdevinfo : C.c_void_p,
+    devinfo : DevInfoData,
+) -> str:
+    try:
+        return get_device_property(hdevinfo, devinfo, DevPropKeys.Device_Parent)
+    except NotFound:
+        return ""
+
 def enumerate_devices[TOutput : Device](
     guid : DevInterfaceGuids,
     create_device : Callable[
@@ -100,36 +156,11 @@ def enumerate_devices[TOutput : Device](
 
             devid = get_device_instance_id(hdevinfo, devinfo)
 
-            parent = get_device_property(hdevinfo, devinfo, DevPropKeys.Device_Parent)
-
-            reg_props : dict[str, str] = {}
-
-            if len(reg_properties) > 0:
-
-                regkey = get_device_specific_registry_data(hdevinfo, devinfo)
+            parent = _read_parent(hdevinfo, devinfo)
 
-                for reg_prop_name in reg_properties:
-                    try:
-                        reg_prop_val = get_registry_key_value(regkey, reg_prop_name)
-                        reg_props[reg_prop_name] = reg_prop_val
-                    except Exception as ex:
-                        reg_props[reg_prop_name] = "N/A"
+            reg_props = _read_reg_properties(hdevinfo, devinfo, reg_properties)
 
-                free_regkey(regkey)
-
-            props : dict[DevProperties, str | int | bytes | None] = {}
-
-            if properties == "all":
-                properties = list(DevProperties)
-
-            for prop_name in properties:
-                try:
-                    prop = get_device_registry_property(hdevinfo, devinfo, prop_name)
-                    props[prop_name] = prop
-                except InvalidData:
-                    props[prop_name] = "N/A"
-                except Exception as ex:
-                    props[prop_name] = f"Error: {ex}"
+            props = _read_properties(hdevinfo, devinfo, properties)
 
             args = (
                 devinfo.class_guid,
@@ -146,3 +177,86 @@ def enumerate_devices[TOutput : Device](
             index += 1
     finally:
         free_device_list(hdevinfo)
+
+def enumerate_device_instances[TOutput : Device](
+    create_device : Callable[
+        [
+            UUID,
+            UUID,
+            str,
+            str,
+            str,
+            dict[DevProperties, str | int | bytes | None],
+            dict[str, str],
+        ],
+        TOutput,
+    ],
+    enumerator : str | None = None,
+    properties : Iterable[DevProperties] | Literal["all"] = [],
+    reg_properties : Sequence[str] = [],
+    descendants_of : Callable[[str], bool] | None = None,
+) -> Generator[TOutput]:
+    hdevinfo = get_class_devs(
+        None,
+        enumerator,
+        None,
+        IncludedInfoFlags.PRESENT | IncludedInfoFlags.ALLCLASSES,
+    )
+
+    properties = list(DevProperties) if properties == "all" else list(properties)
+
+    try:
+        instances : list[tuple[DevInfoData, str, str]] = []
+        index = 0
+        while True:
+            try:
+                devinfo = next_device_info(hdevinfo, index)
+            except NoMoreItems:
+                break
+
+            instances.append((devinfo, get_device_instance_id(hdevinfo, devinfo), _read_parent(hdevinfo, devinfo)))
+
+            index += 1
+
+        if descendants_of is not None:
+            selected = _select_descendants(
+                {devid.lower(): parent.lower() for _, devid, parent in instances},
+                descendants_of,
+            )
+            instances = [instance for instance in instances if instance[1].lower() in selected]
+
+        for devinfo, devid, parent in instances:
+            yield create_device(
+                devinfo.class_guid,
+                UUID(int = 0),
+                "",
+                devid,
+                parent,
+                _read_properties(hdevinfo, devinfo, properties),
+                _read_reg_properties(hdevinfo, devinfo, reg_properties),
+            )
+    finally:
+        free_device_list(hdevinfo)
+
+def _select_descendants(
+    parents : dict[str, str],
+    is_root : Callable[[str], bool],
+) -> set[str]:
+    selected : set[str] = set()
+    rejected : set[str] = set()
+
+    for devid in parents:
+        chain : list[str] = []
+        current = parents[devid]
+
+        while not is_root(current) and current not in selected and current not in rejected:
+            if current not in parents or current in chain:
+                rejected.add(current)
+                break
+            chain.append(current)
+            current = parents[current]
+
+        found = is_root(current) or current in selected
+        (selected if found else rejected).update([devid, *chain])
+
+    return selected
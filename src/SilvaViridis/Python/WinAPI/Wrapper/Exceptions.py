@@ -1,8 +1,16 @@
 ERROR_SUCCESS = 0
+ERROR_FILE_NOT_FOUND = 2
+ERROR_INVALID_HANDLE = 6
 ERROR_INVALID_DATA = 13
+ERROR_GEN_FAILURE = 31
 ERROR_INVALID_PARAMETER = 87
 ERROR_INSUFFICIENT_BUFFER = 122
 ERROR_NO_MORE_ITEMS = 259
+ERROR_NO_SUCH_DEVICE = 433
+ERROR_OPERATION_ABORTED = 995
+ERROR_IO_PENDING = 997
+ERROR_DEVICE_NOT_CONNECTED = 1167
+ERROR_NOT_FOUND = 1168
 
 APP_ERROR_MASK = 0x20000000
 
@@ -20,6 +28,8 @@ ERROR_INVALID_CLASS_INSTALLER = devinstaller_error(0x20d)
 
 class MemAllocError(Exception): pass
 
+class USBUserRequestError(Exception): pass
+
 class WinAPIException(Exception):
     code : int
 
@@ -28,19 +38,35 @@ class WinAPIException(Exception):
 
 class UnknownException(WinAPIException): pass
 
+class FileNotFound(WinAPIException): pass
+class InvalidHandle(WinAPIException): pass
 class InvalidData(WinAPIException): pass
+class GenFailure(WinAPIException): pass
 class InvalidParameter(WinAPIException): pass
 class InsufficientBuffer(WinAPIException): pass
 class NoMoreItems(WinAPIException): pass
+class NoSuchDevice(WinAPIException): pass
+class DeviceNotConnected(WinAPIException): pass
+class NotFound(WinAPIException): pass
+class OperationAborted(WinAPIException): pass
+class IOPending(WinAPIException): pass
 class InvalidRegProperty(WinAPIException): pass
 class NoSuchDevInst(WinAPIException): pass
 class InvalidClassInstaller(WinAPIException): pass
 
 codes : dict[int, type[WinAPIException]] = {
+    ERROR_FILE_NOT_FOUND: FileNotFound,
+    ERROR_INVALID_HANDLE: InvalidHandle,
     ERROR_INVALID_DATA: InvalidData,
+    ERROR_GEN_FAILURE: GenFailure,
     ERROR_INVALID_PARAMETER : InvalidParameter,
     ERROR_INSUFFICIENT_BUFFER: InsufficientBuffer,
     ERROR_NO_MORE_ITEMS: NoMoreItems,
+    ERROR_NO_SUCH_DEVICE: NoSuchDevice,
+    ERROR_DEVICE_NOT_CONNECTED: DeviceNotConnected,
+    ERROR_NOT_FOUND: NotFound,
+    ERROR_OPERATION_ABORTED: OperationAborted,
+    ERROR_IO_PENDING: IOPending,
     ERROR_INVALID_REG_PROPERTY: InvalidRegProperty,
     ERROR_NO_SUCH_DEVINST: NoSuchDevInst,
     ERROR_INVALID_CLASS_INSTALLER: InvalidClassInstaller,
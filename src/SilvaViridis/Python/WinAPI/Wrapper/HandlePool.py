@@ -0,0 +1,293 @@
+import ctypes as C
+import threading
+import time
+
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+
+from .Exceptions import (
+    DeviceNotConnected,
+    InvalidHandle,
+    NoSuchDevice,
+)
+
+from .IO import (
+    create_file,
+    close_file,
+)
+
+from .Types import (
+    CreationModes,
+    GenericRights,
+    ShareModes,
+)
+
+DEVICE_GONE_EXCEPTIONS = (
+    InvalidHandle,
+    NoSuchDevice,
+    DeviceNotConnected,
+)
+
+@dataclass
+class HandlePoolStats:
+    opens : int = 0
+    reuses : int = 0
+    closes : int = 0
+    invalidations : int = 0
+    open_handles : int = 0
+
+class _PooledHandle:
+    def __init__(
+        self,
+        path : str,
+        fd : C.c_void_p,
+    ) -> None:
+        self.path = path
+        self.fd = fd
+        self.ref_count = 0
+        self.released_at = 0.0
+        self.valid = True
+
+def _fd_key(
+    fd : C.c_void_p | int,
+) -> int:
+    if isinstance(fd, C.c_void_p):
+        return fd.value or 0
+    return int(fd)
+
+def _open_device(
+    path : str,
+) -> C.c_void_p:
+    return create_file(
+        path,
+        GenericRights.WRITE,
+        ShareModes.WRITE,
+        CreationModes.OPEN_EXISTING,
+    )
+
+class HandlePool:
+    def __init__(
+        self,
+        idle_timeout : float = 5.0,
+        open_handle : Callable[[str], C.c_void_p] = _open_device,
+        close_handle : Callable[[C.c_void_p], None] = close_file,
+        clock : Callable[[], float] = time.monotonic,
+        reap : bool = True,
+    ) -> None:
+        self.idle_timeout = idle_timeout
+        self.reap = reap
+        self._open_handle = open_handle
+        self._close_handle = close_handle
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._handles : dict[str, _PooledHandle] = {}
+        self._handles_by_fd : dict[int, _PooledHandle] = {}
+        self._stats = HandlePoolStats()
+        self._invalidation_listeners : list[Callable[[str], None]] = []
+        self._reaper_wakeup = threading.Condition(self._lock)
+        self._reaper : threading.Thread | None = None
+
+    @property
+    def stats(
+        self,
+    ) -> HandlePoolStats:
+        with self._lock:
+            return replace(self._stats, open_handles = len(self._handles_by_fd))
+
+    def add_invalidation_listener(
+        self,
+        listener : Callable[[str], None],
+    ) -> None:
+        self._invalidation_listeners.append(listener)
+
+    @contextmanager
+    def open(
+        self,
+        path : str,
+    ) -> Generator[C.c_void_p]:
+        handle = self._acquire(path)
+        try:
+            yield handle.fd
+        except DEVICE_GONE_EXCEPTIONS:
+            self._invalidate(handle)
+            raise
+        finally:
+            self._release(handle)
+
+    def report_error(
+        self,
+        fd : C.c_void_p,
+        ex : BaseException,
+    ) -> None:
+        if not isinstance(ex, DEVICE_GONE_EXCEPTIONS):
+            return
+
+        with self._lock:
+            handle = self._handles_by_fd.get(_fd_key(fd))
+
+        if handle is not None:
+            self._invalidate(handle)
+
+    def invalidate(
+        self,
+        path : str,
+    ) -> None:
+        with self._lock:
+            handle = self._handles.get(path.lower())
+
+        if handle is not None:
+            self._invalidate(handle)
+
+    def close_idle(
+        self,
+    ) -> None:
+        with self._lock:
+            expired = self._pop_idle(self._clock(), self.idle_timeout)
+        self._close_all(expired)
+
+    def clear(
+        self,
+    ) -> None:
+        with self._lock:
+            expired = self._pop_idle(self._clock(), None)
+        self._close_all(expired)
+
+    def _acquire(
+        self,
+        path : str,
+    ) -> _PooledHandle:
+        key = path.lower()
+
+        with self._lock:
+            expired = self._pop_idle(self._clock(), self.idle_timeout)
+            handle = self._handles.get(key)
+            if handle is not None:
+                handle.ref_count += 1
+                self._stats.reuses += 1
+
+        self._close_all(expired)
+
+        if handle is not None:
+            return handle
+
+        fd = self._open_handle(path)
+
+        with self._lock:
+            handle = self._handles.get(key)
+            is_duplicate = handle is not None
+            if handle is None:
+                handle = _PooledHandle(key, fd)
+                self._handles[key] = handle
+                self._handles_by_fd[_fd_key(fd)] = handle
+                self._stats.opens += 1
+            else:
+                self._stats.reuses += 1
+            handle.ref_count += 1
+
+        if is_duplicate:
+            self._close_handle(fd)
+
+        return handle
+
+    def _release(
+        self,
+        handle : _PooledHandle,
+    ) -> None:
+        with self._lock:
+            handle.ref_count -= 1
+            handle.released_at = self._clock()
+            if handle.ref_count > 0:
+                return
+            if handle.valid and self.idle_timeout > 0:
+                self._start_reaper()
+                return
+            self._forget(handle)
+
+        self._close_all([handle])
+
+    def _start_reaper(
+        self,
+    ) -> None:
+        if not self.reap or self._reaper is not None:
+            return
+        self._reaper = threading.Thread(target = self._run_reaper, daemon = True)
+        self._reaper.start()
+
+    def _run_reaper(
+        self,
+    ) -> None:
+        while True:
+            with self._lock:
+                released = [
+                    handle.released_at for handle in self._handles.values() if handle.ref_count == 0
+                ]
+
+                if len(released) == 0:
+                    self._reaper = None
+                    return
+
+                now = self._clock()
+                remaining = min(released) + self.idle_timeout - now
+
+                if remaining > 0:
+                    self._reaper_wakeup.wait(remaining)
+                    continue
+
+                expired = self._pop_idle(now, self.idle_timeout)
+
+            self._close_all(expired)
+
+    def _invalidate(
+        self,
+        handle : _PooledHandle,
+    ) -> None:
+        with self._lock:
+            if not handle.valid:
+                return
+            handle.valid = False
+            self._stats.invalidations += 1
+            if self._handles.get(handle.path) is handle:
+                del self._handles[handle.path]
+            close_now = handle.ref_count == 0
+            if close_now:
+                self._forget(handle)
+
+        if close_now:
+            self._close_all([handle])
+
+        for listener in self._invalidation_listeners:
+            listener(handle.path)
+
+    def _forget(
+        self,
+        handle : _PooledHandle,
+    ) -> None:
+        if self._handles.get(handle.path) is handle:
+            del self._handles[handle.path]
+        self._handles_by_fd.pop(_fd_key(handle.fd), None)
+
+    def _pop_idle(
+        self,
+        now : float,
+        idle_timeout : float | None,
+    ) -> list[_PooledHandle]:
+        expired = [
+            handle for handle in self._handles.values() \
+                if handle.ref_count == 0 \
+                    and (idle_timeout is None or now - handle.released_at >= idle_timeout)
+        ]
+        for handle in expired:
+            self._forget(handle)
+        return expired
+
+    def _close_all(
+        self,
+        handles : list[_PooledHandle],
+    ) -> None:
+        for handle in handles:
+            self._close_handle(handle.fd)
+            with self._lock:
+                self._stats.closes += 1
+
+handle_pool = HandlePool()
@@ -1,21 +1,47 @@
 import ctypes as C
+import ctypes.wintypes as W
 
-from .Exceptions import raise_ex
+from .Exceptions import (
+    ERROR_IO_PENDING,
+    raise_ex,
+)
+from .Recording import recordable
 from .Types import (
+    FALSE,
+    INFINITE,
     INVALID_HANDLE_VALUE,
+    TRUE,
+    FileFlags,
     GenericRights,
     ShareModes,
     CreationModes,
 )
 from .Utils import str_to_ptr
 
-from ..kernel32 import CreateFile, CloseHandle
+from ..kernel32 import (
+    CancelIoEx,
+    CreateEvent,
+    CreateFile,
+    CreateIoCompletionPort,
+    CloseHandle,
+    GetOverlappedResult,
+    GetQueuedCompletionStatus,
+    PostQueuedCompletionStatus,
+    ReadFile,
+    WriteFile,
+)
+from ..types import (
+    LPOVERLAPPED,
+    OVERLAPPED,
+)
 
+@recordable
 def create_file(
     path : str,
     access : GenericRights,
     share_mode : ShareModes,
     creation_mode : CreationModes,
+    flags : FileFlags = FileFlags.NONE,
 ) -> C.c_void_p:
     fd = CreateFile(
         str_to_ptr(path),
@@ -23,7 +49,7 @@ def create_file(
         share_mode.value,
         None,
         creation_mode.value,
-        0,
+        flags.value,
         None,
     )
 
@@ -32,7 +58,178 @@ def create_file(
 
     return fd
 
+@recordable
 def close_file(
     fd : C.c_void_p,
 ) -> None:
     CloseHandle(fd)
+
+class OverlappedOperation:
+    def __init__(
+        self,
+    ) -> None:
+        self.overlapped = OVERLAPPED()
+        self.transferred = W.DWORD(0)
+
+        event = CreateEvent(None, TRUE, FALSE, None)
+
+        if event is None:
+            raise_ex(C.GetLastError())
+
+        self.overlapped.hEvent = event
+
+    def close(
+        self,
+    ) -> None:
+        if self.overlapped.hEvent is not None:
+            CloseHandle(self.overlapped.hEvent)
+            self.overlapped.hEvent = None
+
+def _complete(
+    fd : C.c_void_p,
+    success : int,
+    operation : OverlappedOperation,
+) -> int:
+    if success == FALSE:
+        error = C.GetLastError()
+        if error != ERROR_IO_PENDING:
+            raise_ex(error)
+
+    if GetOverlappedResult(fd, C.byref(operation.overlapped), C.byref(operation.transferred), TRUE) == FALSE:
+        raise_ex(C.GetLastError())
+
+    return operation.transferred.value
+
+def _buffer_address(
+    buffer : bytes | bytearray | memoryview,
+) -> tuple[int, object]:
+    if isinstance(buffer, memoryview) and buffer.readonly:
+        if isinstance(buffer.obj, bytes) and buffer.nbytes == len(buffer.obj):
+            return _buffer_address(buffer.obj)
+        return _buffer_address(bytes(buffer))
+
+    if isinstance(buffer, bytes):
+        source : object = C.c_char_p(buffer)
+        return C.cast(source, C.c_void_p).value or 0, source
+
+    array = (C.c_char * len(buffer)).from_buffer(buffer)
+
+    return C.addressof(array), array
+
+def read_file_at(
+    fd : C.c_void_p,
+    address : int,
+    size : int,
+    operation : OverlappedOperation,
+) -> int:
+    success = ReadFile(fd, address, size, None, C.byref(operation.overlapped))
+
+    return _complete(fd, success, operation)
+
+def write_file_at(
+    fd : C.c_void_p,
+    address : int,
+    size : int,
+    operation : OverlappedOperation,
+) -> int:
+    success = WriteFile(fd, address, size, None, C.byref(operation.overlapped))
+
+    return _complete(fd, success, operation)
+
+def read_file(
+    fd : C.c_void_p,
+    buffer : bytearray | memoryview,
+    operation : OverlappedOperation,
+) -> int:
+    target = (C.c_char * len(buffer)).from_buffer(buffer)
+
+    return read_file_at(fd, C.addressof(target), len(buffer), operation)
+
+def write_file(
+    fd : C.c_void_p,
+    buffer : bytes | bytearray | memoryview,
+    operation : OverlappedOperation,
+) -> int:
+    address, _source = _buffer_address(buffer)
+
+    return write_file_at(fd, address, len(buffer), operation)
+
+def cancel_io(
+    fd : C.c_void_p,
+    overlapped : OVERLAPPED | None = None,
+) -> None:
+    CancelIoEx(fd, None if overlapped is None else C.byref(overlapped))
+
+def _check_started(
+    success : int,
+) -> None:
+    if success == FALSE:
+        error = C.GetLastError()
+        if error != ERROR_IO_PENDING:
+            raise_ex(error)
+
+def start_read_file(
+    fd : C.c_void_p,
+    address : int,
+    size : int,
+    overlapped : OVERLAPPED,
+) -> None:
+    _check_started(ReadFile(fd, address, size, None, C.byref(overlapped)))
+
+def start_write_file(
+    fd : C.c_void_p,
+    address : int,
+    size : int,
+    overlapped : OVERLAPPED,
+) -> None:
+    _check_started(WriteFile(fd, address, size, None, C.byref(overlapped)))
+
+def create_io_completion_port(
+    concurrency : int = 1,
+) -> C.c_void_p:
+    port = CreateIoCompletionPort(INVALID_HANDLE_VALUE, None, 0, concurrency)
+
+    if port is None:
+        raise_ex(C.GetLastError())
+
+    return C.c_void_p(port)
+
+def associate_io_completion_port(
+    fd : C.c_void_p,
+    port : C.c_void_p,
+    key : int,
+) -> None:
+    if CreateIoCompletionPort(fd, port, key, 0) is None:
+        raise_ex(C.GetLastError())
+
+def get_queued_completion_status(
+    port : C.c_void_p,
+    timeout : float | None = None,
+) -> tuple[int, int, int, int]:
+    transferred = W.DWORD(0)
+    key = C.c_size_t(0)
+    overlapped = LPOVERLAPPED()
+
+    success = GetQueuedCompletionStatus(
+        port,
+        C.byref(transferred),
+        C.byref(key),
+        C.byref(overlapped),
+        INFINITE if timeout is None else max(int(timeout * 1000), 0),
+    )
+
+    error = 0 if success != FALSE else C.GetLastError()
+    address = C.cast(overlapped, C.c_void_p).value or 0
+
+    if success == FALSE and address == 0:
+        raise_ex(error)
+
+    return transferred.value, key.value, address, error
+
+def post_queued_completion_status(
+    port : C.c_void_p,
+    key : int,
+    transferred : int = 0,
+) -> None:
+    if PostQueuedCompletionStatus(port, transferred, key, None) == FALSE:
+        raise_ex(C.GetLastError())
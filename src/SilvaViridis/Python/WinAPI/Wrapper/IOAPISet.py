@@ -1,20 +1,25 @@
 import ctypes as C
 import ctypes.wintypes as W
+import threading
+import time
 
-from collections.abc import Callable
+from collections.abc import Callable, Hashable, Iterable, Sequence
+from typing import Any, cast
 
-from .Exceptions import MemAllocError, raise_ex
+from .Exceptions import MemAllocError, USBUserRequestError, WinAPIException, raise_ex
 from .Memory import alloc, free
+from .Recording import recordable
 from .Types import (
     FALSE,
     CtlCodes,
+    IOCTLCachePolicy,
+    IOCTLCachePolicyKinds,
     USBUserRequestCodes,
     ControllerInfo,
     USBControllerFlavors,
     HCFeatureFlags,
     USBHubNodeInformation,
     USBMIParentNodeInformation,
-    USBHubNodeTypes,
     USBHubTypes,
     USBHubInformation,
     USB30HubInformation,
@@ -22,32 +27,183 @@ from .Types import (
     USBConnectorProps,
     USBNodeConnectionInfoExV2,
     USBNodeConnectionInfoEx,
-    USBConnectionStatuses,
-    USBDeviceSpeeds,
+    USBConfigurationDescriptor,
+    USBDescriptorTypes,
+    USBDeviceDescriptor,
+    USBDeviceStrings,
+    USBRequestCodes,
+    USBRequestTypes,
+    USBBandwidthInfo,
+    USBBusStatistics,
+    USBPowerInfo,
+    USBUserErrorCodes,
+    WDMUSBPowerStates,
 )
 from .Utils import ptr_to_str
+from .Views import (
+    StructView,
+    USBBandwidthInfoView,
+    USBBusStatisticsView,
+    USBDescriptorRequestView,
+    USBHubCapabilitiesView,
+    USBNodeConnectionInfoExV2View,
+    USBNodeConnectionInfoExView,
+    USBNodeInformationView,
+    USBPowerInfoView,
+    USBUserRequestView,
+)
 
+from .. import instrumentation
 from ..kernel32 import (
     DeviceIoControl,
 )
 from ..types import (
     USBUSER_CONTROLLER_INFO_0,
+    USB_CONFIGURATION_DESCRIPTOR,
     USB_HCD_DRIVERKEY_NAME,
     USB_ROOT_HUB_NAME,
-    USB_NODE_INFORMATION,
     USB_HUB_INFORMATION_EX,
-    USB_HUB_CAPABILITIES_EX,
     USB_PORT_CONNECTOR_PROPERTIES,
-    USB_PORT_PROPERTIES,
     PUSB_PORT_CONNECTOR_PROPERTIES,
-    USB_NODE_CONNECTION_INFORMATION_EX_V2,
-    USB_NODE_CONNECTION_INFORMATION_EX,
     USB_NODE_CONNECTION_DRIVERKEY_NAME,
     PUSB_NODE_CONNECTION_DRIVERKEY_NAME,
     USB_NODE_CONNECTION_NAME,
     PUSB_NODE_CONNECTION_NAME,
 )
 
+NEVER_CACHE = IOCTLCachePolicy(IOCTLCachePolicyKinds.NEVER)
+ALWAYS_CACHE = IOCTLCachePolicy(IOCTLCachePolicyKinds.IMMUTABLE)
+
+DEFAULT_IOCTL_CACHE_POLICIES : dict[CtlCodes, IOCTLCachePolicy] = {
+    CtlCodes.GET_HCD_DRIVERKEY_NAME: ALWAYS_CACHE,
+    CtlCodes.USB_USER_REQUEST: ALWAYS_CACHE,
+    CtlCodes.USB_GET_ROOT_HUB_NAME: ALWAYS_CACHE,
+    CtlCodes.USB_GET_NODE_INFORMATION: ALWAYS_CACHE,
+    CtlCodes.USB_GET_HUB_INFORMATION_EX: ALWAYS_CACHE,
+    CtlCodes.USB_GET_HUB_CAPABILITIES_EX: ALWAYS_CACHE,
+    CtlCodes.USB_GET_PORT_CONNECTOR_PROPERTIES: ALWAYS_CACHE,
+    CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX: NEVER_CACHE,
+    CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX_V2: IOCTLCachePolicy(IOCTLCachePolicyKinds.TTL, 5.0),
+    CtlCodes.USB_GET_NODE_CONNECTION_DRIVERKEY_NAME: IOCTLCachePolicy(IOCTLCachePolicyKinds.TTL, 5.0),
+    CtlCodes.USB_GET_NODE_CONNECTION_NAME: IOCTLCachePolicy(IOCTLCachePolicyKinds.TTL, 5.0),
+    CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION: ALWAYS_CACHE,
+}
+
+class IOCTLCache:
+    def __init__(
+        self,
+        policies : dict[CtlCodes, IOCTLCachePolicy] | None = None,
+        clock : Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.policies = dict(DEFAULT_IOCTL_CACHE_POLICIES if policies is None else policies)
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries : dict[str, dict[tuple[CtlCodes, int | None, Hashable], tuple[float, object]]] = {}
+        self._connections : dict[tuple[str, int], Hashable] = {}
+
+    def fetch[O](
+        self,
+        path : str,
+        code : CtlCodes,
+        connection_index : int | None,
+        ioctl : Callable[[], O],
+        variant : Hashable = None,
+        is_cacheable : Callable[[O], bool] | None = None,
+    ) -> O:
+        policy = self.policies.get(code, NEVER_CACHE)
+
+        if policy.kind == IOCTLCachePolicyKinds.NEVER:
+            return ioctl()
+
+        device_key = path.lower()
+        key = (code, connection_index, variant)
+        now = self._clock()
+
+        with self._lock:
+            entry = self._entries.get(device_key, {}).get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if policy.kind == IOCTLCachePolicyKinds.IMMUTABLE or now < expires_at:
+                    self.hits += 1
+                    return cast(O, result)
+            self.misses += 1
+
+        result = ioctl()
+
+        if is_cacheable is not None and not is_cacheable(result):
+            return result
+
+        with self._lock:
+            self._entries.setdefault(device_key, {})[key] = (now + policy.ttl, result)
+
+        return result
+
+    def observe_connection(
+        self,
+        path : str,
+        connection_index : int,
+        state : Hashable,
+    ) -> bool:
+        key = (path.lower(), connection_index)
+
+        with self._lock:
+            previous = self._connections.get(key)
+            self._connections[key] = state
+
+        changed = previous is not None and previous != state
+
+        if changed:
+            self.invalidate_port(path, connection_index)
+
+        return changed
+
+    def invalidate(
+        self,
+        path : str,
+        code : CtlCodes,
+        connection_index : int | None,
+        variant : Hashable = None,
+    ) -> None:
+        with self._lock:
+            entries = self._entries.get(path.lower())
+            if entries is not None:
+                entries.pop((code, connection_index, variant), None)
+
+    def invalidate_port(
+        self,
+        path : str,
+        connection_index : int,
+    ) -> None:
+        with self._lock:
+            entries = self._entries.get(path.lower())
+            if entries is not None:
+                for key in [key for key in entries if key[1] == connection_index]:
+                    del entries[key]
+
+    def invalidate_device(
+        self,
+        path : str,
+    ) -> None:
+        device_key = path.lower()
+
+        with self._lock:
+            self._entries.pop(device_key, None)
+            for key in [key for key in self._connections if key[0] == device_key]:
+                del self._connections[key]
+
+    def clear(
+        self,
+    ) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._connections.clear()
+
+ioctl_cache = IOCTLCache()
+
+DEFAULT_LANGUAGE_ID = 0x0409
+
 def _ioctl[T : C.Structure, O](
     fd : W.HANDLE,
     code : CtlCodes,
@@ -57,71 +213,128 @@ def _ioctl[T : C.Structure, O](
     get_n_bytes : Callable[[T], int] | None = None,
     init_ptr : Callable[[C.c_void_p], None] | None = None,
 ) -> O:
-    data = create()
-    n_bytes = W.DWORD(0)
+    traced = instrumentation.is_enabled()
+    started = time.perf_counter_ns() if traced else 0
+    transferred = 0
 
-    success = DeviceIoControl(
-        fd,
-        code.value,
-        C.byref(data),
-        C.sizeof(data),
-        C.byref(data),
-        C.sizeof(data),
-        C.byref(n_bytes),
-        None,
-    )
+    try:
+        data = create()
+        n_bytes = W.DWORD(0)
+
+        success = DeviceIoControl(
+            fd,
+            code.value,
+            C.byref(data),
+            C.sizeof(data),
+            C.byref(data),
+            C.sizeof(data),
+            C.byref(n_bytes),
+            None,
+        )
+
+        if success == FALSE:
+            raise_ex(C.GetLastError())
+
+        transferred = n_bytes.value
+
+        if require_alloc:
+            if get_n_bytes is None:
+                raise ValueError("Not all required parameters are set")
+
+            n_bytes = get_n_bytes(data)
+            transferred = n_bytes
 
-    if success == FALSE:
-        raise_ex(C.GetLastError())
+            data_ptr = alloc(n_bytes)
 
-    if require_alloc:
-        if get_n_bytes is None:
-            raise ValueError("Not all required parameters are set")
+            if data_ptr is None:
+                raise MemAllocError()
 
-        n_bytes = get_n_bytes(data)
+            if init_ptr is not None:
+                init_ptr(data_ptr)
 
-        data_ptr = alloc(n_bytes)
+            success = DeviceIoControl(
+                fd,
+                code.value,
+                data_ptr,
+                n_bytes,
+                data_ptr,
+                n_bytes,
+                None,
+                None,
+            )
+
+            if success == FALSE:
+                raise_ex(C.GetLastError())
+
+            result = get_result((data_ptr, n_bytes))
+
+            free(data_ptr)
+
+            return result
+        else:
+            return get_result(data)
+    finally:
+        if traced:
+            instrumentation.record(f"IOCTL.{code.name}", time.perf_counter_ns() - started, transferred)
 
-        if data_ptr is None:
-            raise MemAllocError()
+def _ioctl_into[V : StructView[Any]](
+    fd : W.HANDLE,
+    code : CtlCodes,
+    view : V,
+    n_bytes : int | None = None,
+) -> V:
+    data = view.data
 
-        if init_ptr is not None:
-            init_ptr(data_ptr)
+    if n_bytes is None:
+        n_bytes = C.sizeof(data)
 
+    traced = instrumentation.is_enabled()
+    started = time.perf_counter_ns() if traced else 0
+    view.bytes_returned.value = 0
+
+    try:
         success = DeviceIoControl(
             fd,
             code.value,
-            data_ptr,
+            C.byref(data),
             n_bytes,
-            data_ptr,
+            C.byref(data),
             n_bytes,
-            None,
+            C.byref(view.bytes_returned),
             None,
         )
 
         if success == FALSE:
             raise_ex(C.GetLastError())
 
-        result = get_result((data_ptr, n_bytes))
+        return view
+    finally:
+        if traced:
+            instrumentation.record(f"IOCTL.{code.name}", time.perf_counter_ns() - started, view.bytes_returned.value)
 
-        free(data_ptr)
+def _field_offset(
+    struct_type : type[C.Structure],
+    field_name : str,
+) -> int:
+    return getattr(struct_type, field_name).offset
 
-        return result
-    else:
-        return get_result(data)
+_HCD_DRIVERKEY_NAME_OFFSET = _field_offset(USB_HCD_DRIVERKEY_NAME, "DriverKeyName")
+_ROOT_HUB_NAME_OFFSET = _field_offset(USB_ROOT_HUB_NAME, "RootHubName")
+_COMPANION_HUB_SYMLINK_OFFSET = _field_offset(USB_PORT_CONNECTOR_PROPERTIES, "CompanionHubSymbolicLinkName")
+_NODE_CONNECTION_DRIVERKEY_NAME_OFFSET = _field_offset(USB_NODE_CONNECTION_DRIVERKEY_NAME, "DriverKeyName")
+_NODE_CONNECTION_NAME_OFFSET = _field_offset(USB_NODE_CONNECTION_NAME, "NodeName")
 
 def _extract_str(
     ptr : C.c_void_p,
     n_bytes : int,
-    types_to_skip : list[type[C._SimpleCData | C.Structure | C.Union]], # type: ignore
+    offset : int,
 ) -> str:
-    not_str_len = sum([C.sizeof(t) for t in types_to_skip]) # type: ignore
-
     return ptr_to_str(
-        int(ptr) + not_str_len,
-        n_bytes - not_str_len,
+        int(ptr) + offset,
+        n_bytes - offset,
     )
 
+@recordable
 def ioctl_get_hcd_driver_key_name(
     fd : W.HANDLE,
 ) -> str:
@@ -130,7 +343,7 @@ def ioctl_get_hcd_driver_key_name(
     ) -> str:
         if isinstance(data, tuple):
             ptr, n_bytes = data
-            return _extract_str(ptr, n_bytes, [W.ULONG])
+            return _extract_str(ptr, n_bytes, _HCD_DRIVERKEY_NAME_OFFSET)
         raise NotImplementedError()
 
     return _ioctl(
@@ -142,6 +355,7 @@ def ioctl_get_hcd_driver_key_name(
         get_n_bytes = lambda data: data.ActualLength,
     )
 
+@recordable
 def ioctl_get_usb_controller_info(
     fd : W.HANDLE,
 ) -> ControllerInfo:
@@ -173,6 +387,60 @@ def ioctl_get_usb_controller_info(
         get_result,
     )
 
+def _usb_user_request[V : USBUserRequestView[Any]](
+    fd : W.HANDLE,
+    view : V,
+) -> V:
+    view.reset()
+
+    _ioctl_into(fd, CtlCodes.USB_USER_REQUEST, view)
+
+    if view.status != USBUserErrorCodes.Success:
+        raise USBUserRequestError(view.status)
+
+    return view
+
+@recordable
+def ioctl_view_usb_bus_statistics(
+    fd : W.HANDLE,
+    view : USBBusStatisticsView | None = None,
+) -> USBBusStatisticsView:
+    return _usb_user_request(fd, USBBusStatisticsView() if view is None else view)
+
+@recordable
+def ioctl_get_usb_bus_statistics(
+    fd : W.HANDLE,
+) -> USBBusStatistics:
+    return ioctl_view_usb_bus_statistics(fd).to_info()
+
+@recordable
+def ioctl_view_usb_bandwidth_info(
+    fd : W.HANDLE,
+    view : USBBandwidthInfoView | None = None,
+) -> USBBandwidthInfoView:
+    return _usb_user_request(fd, USBBandwidthInfoView() if view is None else view)
+
+@recordable
+def ioctl_get_usb_bandwidth_info(
+    fd : W.HANDLE,
+) -> USBBandwidthInfo:
+    return ioctl_view_usb_bandwidth_info(fd).to_info()
+
+@recordable
+def ioctl_view_usb_power_info(
+    fd : W.HANDLE,
+    view : USBPowerInfoView | None = None,
+) -> USBPowerInfoView:
+    return _usb_user_request(fd, USBPowerInfoView() if view is None else view)
+
+@recordable
+def ioctl_get_usb_power_info(
+    fd : W.HANDLE,
+    system_state : WDMUSBPowerStates = WDMUSBPowerStates.SystemWorking,
+) -> USBPowerInfo:
+    return ioctl_view_usb_power_info(fd, USBPowerInfoView(system_state)).to_info()
+
+@recordable
 def ioctl_get_root_hub_name(
     fd : W.HANDLE,
 ) -> str:
@@ -181,7 +449,7 @@ def ioctl_get_root_hub_name(
     ) -> str:
         if isinstance(data, tuple):
             ptr, n_bytes = data
-            return _extract_str(ptr, n_bytes, [W.ULONG])
+            return _extract_str(ptr, n_bytes, _ROOT_HUB_NAME_OFFSET)
         raise NotImplementedError()
 
     return _ioctl(
@@ -193,39 +461,24 @@ def ioctl_get_root_hub_name(
         get_n_bytes = lambda data: data.ActualLength,
     )
 
-def ioctl_get_usb_node_info(
+@recordable
+def ioctl_view_usb_node_info(
     fd : W.HANDLE,
-) -> USBHubNodeInformation | USBMIParentNodeInformation:
-    def get_result(
-        data : tuple[C.c_void_p, int] | USB_NODE_INFORMATION,
-    ) -> USBHubNodeInformation | USBMIParentNodeInformation:
-        if isinstance(data, tuple):
-            raise NotImplementedError()
-        if data.NodeType == USBHubNodeTypes.UsbHub.value:
-            hub_info = data.u.HubInformation
-            return USBHubNodeInformation(
-                is_bus_powered = bool(hub_info.HubIsBusPowered),
-                number_of_ports = hub_info.HubDescriptor.bNumberOfPorts,
-                hub_characteristics = hub_info.HubDescriptor.wHubCharacteristics,
-                power_on_to_power_good = hub_info.HubDescriptor.bPowerOnToPowerGood,
-                hub_control_current = hub_info.HubDescriptor.bHubControlCurrent,
-                remove_and_power_mask = list(hub_info.HubDescriptor.bRemoveAndPowerMask),
-            )
-        elif data.NodeType == USBHubNodeTypes.UsbMIParent.value:
-            mi_info = data.u.MiParentInformation
-            return USBMIParentNodeInformation(
-                number_of_interfaces = mi_info.NumberOfInterfaces,
-            )
-        else:
-            raise NotImplementedError()
-
-    return _ioctl(
+    view : USBNodeInformationView | None = None,
+) -> USBNodeInformationView:
+    return _ioctl_into(
         fd,
         CtlCodes.USB_GET_NODE_INFORMATION,
-        lambda: USB_NODE_INFORMATION(),
-        get_result,
+        USBNodeInformationView() if view is None else view,
     )
 
+@recordable
+def ioctl_get_usb_node_info(
+    fd : W.HANDLE,
+) -> USBHubNodeInformation | USBMIParentNodeInformation:
+    return ioctl_view_usb_node_info(fd).to_info()
+
+@recordable
 def ioctl_get_usb_hub_extra_info(
     fd : W.HANDLE,
 ) -> USBHubInformation | USB30HubInformation:
@@ -266,32 +519,24 @@ def ioctl_get_usb_hub_extra_info(
         get_result,
     )
 
-def ioctl_get_usb_hub_capabilities_ex(
+@recordable
+def ioctl_view_usb_hub_capabilities_ex(
     fd : W.HANDLE,
-) -> USBHubCapabilities:
-    def get_result(
-        data : tuple[C.c_void_p, int] | USB_HUB_CAPABILITIES_EX,
-    ) -> USBHubCapabilities:
-        if isinstance(data, tuple):
-            raise NotImplementedError()
-        bits = data.CapabilityFlags.bits
-        return USBHubCapabilities(
-            is_high_speed_capable = bool(bits.HubIsHighSpeedCapable),
-            is_high_speed = bool(bits.HubIsHighSpeed),
-            is_multi_tt_capable = bool(bits.HubIsMultiTtCapable),
-            is_multi_tt = bool(bits.HubIsMultiTt),
-            is_root = bool(bits.HubIsRoot),
-            is_armed_wake_on_connect = bool(bits.HubIsArmedWakeOnConnect),
-            is_bus_powered = bool(bits.HubIsBusPowered),
-        )
-
-    return _ioctl(
+    view : USBHubCapabilitiesView | None = None,
+) -> USBHubCapabilitiesView:
+    return _ioctl_into(
         fd,
         CtlCodes.USB_GET_HUB_CAPABILITIES_EX,
-        lambda: USB_HUB_CAPABILITIES_EX(),
-        get_result,
+        USBHubCapabilitiesView() if view is None else view,
     )
 
+@recordable
+def ioctl_get_usb_hub_capabilities_ex(
+    fd : W.HANDLE,
+) -> USBHubCapabilities:
+    return ioctl_view_usb_hub_capabilities_ex(fd).to_info()
+
+@recordable
 def ioctl_get_usb_port_connector_props(
     fd : W.HANDLE,
     connection_index : int,
@@ -312,13 +557,7 @@ def ioctl_get_usb_port_connector_props(
                 connection_index = p.ConnectionIndex,
                 companion_index = p.CompanionIndex,
                 companion_port_number = p.CompanionPortNumber,
-                companion_hub_symlink = _extract_str(ptr, n_bytes, [
-                    W.ULONG,
-                    W.ULONG,
-                    W.USHORT,
-                    W.USHORT,
-                    USB_PORT_PROPERTIES,
-                ]),
+                companion_hub_symlink = _extract_str(ptr, n_bytes, _COMPANION_HUB_SYMLINK_OFFSET),
                 port_is_user_connectable = bool(port_bits.PortIsUserConnectable),
                 port_is_debug_capable = bool(port_bits.PortIsDebugCapable),
                 port_has_multiple_companions = bool(port_bits.PortHasMultipleCompanions),
@@ -342,71 +581,59 @@ def ioctl_get_usb_port_connector_props(
         init_ptr = init_ptr,
     )
 
-def ioctl_get_usb_node_connection_info_ex_v2(
+@recordable
+def ioctl_view_usb_node_connection_info_ex_v2(
     fd : W.HANDLE,
     connection_index : int,
-) -> USBNodeConnectionInfoExV2:
-    def create():
-        data = USB_NODE_CONNECTION_INFORMATION_EX_V2()
-        data.ConnectionIndex = connection_index + 1
-        data.Length = C.sizeof(USB_NODE_CONNECTION_INFORMATION_EX_V2)
-        data.SupportedUsbProtocols.bits.Usb300 = 1
-        return data
-
-    def get_result(
-        data : tuple[C.c_void_p, int] | USB_NODE_CONNECTION_INFORMATION_EX_V2,
-    ) -> USBNodeConnectionInfoExV2:
-        if isinstance(data, tuple):
-            raise NotImplementedError()
-        sbits = data.SupportedUsbProtocols.bits
-        fbits = data.Flags.bits
-        return USBNodeConnectionInfoExV2(
-            connection_index = data.ConnectionIndex,
-            is_usb_110_supported = bool(sbits.Usb110),
-            is_usb_200_supported = bool(sbits.Usb200),
-            is_usb_300_supported = bool(sbits.Usb300),
-            is_device_operating_at_super_speed_or_higher = bool(fbits.DeviceIsOperatingAtSuperSpeedOrHigher),
-            is_device_super_speed_capable_or_higher = bool(fbits.DeviceIsSuperSpeedCapableOrHigher),
-            is_device_operating_at_super_speed_plus_or_higher = bool(fbits.DeviceIsOperatingAtSuperSpeedPlusOrHigher),
-            is_device_super_speed_plus_capable_or_higher = bool(fbits.DeviceIsSuperSpeedPlusCapableOrHigher),
-        )
-
-    return _ioctl(
+    view : USBNodeConnectionInfoExV2View | None = None,
+) -> USBNodeConnectionInfoExV2View:
+    if view is None:
+        view = USBNodeConnectionInfoExV2View()
+
+    data = view.data
+    data.ConnectionIndex = connection_index + 1
+    data.Length = C.sizeof(data)
+    data.SupportedUsbProtocols.ul = 0
+    data.SupportedUsbProtocols.bits.Usb300 = 1
+
+    return _ioctl_into(
         fd,
         CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX_V2,
-        create,
-        get_result,
+        view,
     )
 
-def ioctl_get_usb_node_connection_info_ex(
+@recordable
+def ioctl_get_usb_node_connection_info_ex_v2(
     fd : W.HANDLE,
     connection_index : int,
-) -> USBNodeConnectionInfoEx:
-    def create():
-        data = USB_NODE_CONNECTION_INFORMATION_EX()
-        data.ConnectionIndex = connection_index + 1
-        return data
+) -> USBNodeConnectionInfoExV2:
+    return ioctl_view_usb_node_connection_info_ex_v2(fd, connection_index).to_info()
 
-    def get_result(
-        data : tuple[C.c_void_p, int] | USB_NODE_CONNECTION_INFORMATION_EX,
-    ) -> USBNodeConnectionInfoEx:
-        if isinstance(data, tuple):
-            raise NotImplementedError()
-        return USBNodeConnectionInfoEx(
-            connection_index = data.ConnectionIndex,
-            speed = USBDeviceSpeeds(data.Speed),
-            device_is_hub = bool(data.DeviceIsHub),
-            device_address = data.DeviceAddress,
-            connection_status = USBConnectionStatuses(data.ConnectionStatus),
-        )
+@recordable
+def ioctl_view_usb_node_connection_info_ex(
+    fd : W.HANDLE,
+    connection_index : int,
+    view : USBNodeConnectionInfoExView | None = None,
+) -> USBNodeConnectionInfoExView:
+    if view is None:
+        view = USBNodeConnectionInfoExView()
 
-    return _ioctl(
+    view.data.ConnectionIndex = connection_index + 1
+
+    return _ioctl_into(
         fd,
         CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX,
-        create,
-        get_result,
+        view,
     )
 
+@recordable
+def ioctl_get_usb_node_connection_info_ex(
+    fd : W.HANDLE,
+    connection_index : int,
+) -> USBNodeConnectionInfoEx:
+    return ioctl_view_usb_node_connection_info_ex(fd, connection_index).to_info()
+
+@recordable
 def ioctl_get_usb_node_connection_driver_key_name(
     fd : W.HANDLE,
     connection_index : int,
@@ -421,7 +648,7 @@ def ioctl_get_usb_node_connection_driver_key_name(
     ) -> str:
         if isinstance(data, tuple):
             ptr, n_bytes = data
-            return _extract_str(ptr, n_bytes, [W.ULONG, W.ULONG])
+            return _extract_str(ptr, n_bytes, _NODE_CONNECTION_DRIVERKEY_NAME_OFFSET)
         raise NotImplementedError()
 
     def init_ptr(
@@ -440,6 +667,7 @@ def ioctl_get_usb_node_connection_driver_key_name(
         init_ptr = init_ptr,
     )
 
+@recordable
 def ioctl_get_node_connection_name(
     fd : W.HANDLE,
     connection_index : int,
@@ -454,7 +682,7 @@ def ioctl_get_node_connection_name(
     ) -> str:
         if isinstance(data, tuple):
             ptr, n_bytes = data
-            return _extract_str(ptr, n_bytes, [W.ULONG, W.ULONG])
+            return _extract_str(ptr, n_bytes, _NODE_CONNECTION_NAME_OFFSET)
         raise NotImplementedError()
 
     def init_ptr(
@@ -472,3 +700,187 @@ def ioctl_get_node_connection_name(
         get_n_bytes = lambda data: data.ActualLength,
         init_ptr = init_ptr,
     )
+
+@recordable
+def ioctl_get_descriptor_from_node_connection(
+    fd : W.HANDLE,
+    connection_index : int,
+    descriptor_type : USBDescriptorTypes,
+    descriptor_index : int = 0,
+    language_id : int = 0,
+    length : int | None = None,
+    view : USBDescriptorRequestView | None = None,
+) -> memoryview:
+    if view is None:
+        view = USBDescriptorRequestView()
+
+    if length is None:
+        length = view.max_data_length
+
+    request = view.data
+    request.ConnectionIndex = connection_index + 1
+
+    setup = request.SetupPacket
+    setup.bmRequest = (USBRequestTypes.DEVICE_TO_HOST | USBRequestTypes.STANDARD | USBRequestTypes.DEVICE).value
+    setup.bRequest = USBRequestCodes.GET_DESCRIPTOR.value
+    setup.wValue = (descriptor_type.value << 8) | descriptor_index
+    setup.wIndex = language_id
+    setup.wLength = length
+
+    _ioctl_into(
+        fd,
+        CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION,
+        view,
+        view.data_offset + length,
+    )
+
+    return view.payload
+
+@recordable
+def ioctl_get_usb_configuration_descriptor(
+    fd : W.HANDLE,
+    connection_index : int,
+    configuration_index : int = 0,
+    view : USBDescriptorRequestView | None = None,
+) -> USBConfigurationDescriptor:
+    payload = ioctl_get_descriptor_from_node_connection(
+        fd,
+        connection_index,
+        USBDescriptorTypes.CONFIGURATION,
+        configuration_index,
+        view = view,
+    )
+
+    if len(payload) < C.sizeof(USB_CONFIGURATION_DESCRIPTOR):
+        raise ValueError("Incomplete configuration descriptor")
+
+    raw = bytes(payload)
+    data = USB_CONFIGURATION_DESCRIPTOR.from_buffer_copy(raw)
+
+    return USBConfigurationDescriptor(
+        total_length = data.wTotalLength,
+        number_of_interfaces = data.bNumInterfaces,
+        configuration_value = data.bConfigurationValue,
+        configuration_index = data.iConfiguration,
+        attributes = data.bmAttributes,
+        max_power = data.MaxPower,
+        raw = raw[:data.wTotalLength],
+    )
+
+def _decode_string_descriptor(
+    payload : memoryview,
+) -> str:
+    if len(payload) < 2 or payload[1] != USBDescriptorTypes.STRING.value:
+        raise ValueError("Not a string descriptor")
+
+    n_bytes = min(payload[0], len(payload))
+
+    return bytes(payload[2:n_bytes]).decode("utf-16-le")
+
+@recordable
+def ioctl_get_usb_language_ids(
+    fd : W.HANDLE,
+    connection_index : int,
+    view : USBDescriptorRequestView | None = None,
+) -> list[int]:
+    payload = ioctl_get_descriptor_from_node_connection(
+        fd,
+        connection_index,
+        USBDescriptorTypes.STRING,
+        view = view,
+    )
+
+    n_bytes = min(payload[0], len(payload)) if len(payload) > 0 else 0
+
+    return [
+        payload[i] | (payload[i + 1] << 8) \
+            for i in range(2, n_bytes - 1, 2)
+    ]
+
+@recordable
+def ioctl_get_usb_string_descriptors(
+    fd : W.HANDLE,
+    connection_index : int,
+    indices : Iterable[int],
+    language_ids : Sequence[int],
+    view : USBDescriptorRequestView | None = None,
+) -> dict[tuple[int, int], str]:
+    if view is None:
+        view = USBDescriptorRequestView()
+
+    strings : dict[tuple[int, int], str] = {}
+
+    for index in sorted(set(indices) - {0}):
+        for language_id in language_ids:
+            try:
+                payload = ioctl_get_descriptor_from_node_connection(
+                    fd,
+                    connection_index,
+                    USBDescriptorTypes.STRING,
+                    index,
+                    language_id,
+                    view = view,
+                )
+                strings[(index, language_id)] = _decode_string_descriptor(payload)
+            except (WinAPIException, ValueError):
+                pass
+
+    return strings
+
+@recordable
+def ioctl_get_usb_device_strings(
+    fd : W.HANDLE,
+    connection_index : int,
+    device_descriptor : USBDeviceDescriptor,
+    language_ids : Sequence[int] | None = None,
+    view : USBDescriptorRequestView | None = None,
+) -> USBDeviceStrings:
+    if view is None:
+        view = USBDescriptorRequestView()
+
+    indices = [
+        device_descriptor.manufacturer_index,
+        device_descriptor.product_index,
+        device_descriptor.serial_number_index,
+    ]
+
+    if language_ids is None and any(indices):
+        try:
+            language_ids = ioctl_get_usb_language_ids(fd, connection_index, view)
+        except (WinAPIException, ValueError):
+            language_ids = []
+        if len(language_ids) == 0:
+            language_ids = [DEFAULT_LANGUAGE_ID]
+    elif language_ids is None:
+        language_ids = []
+
+    strings = ioctl_get_usb_string_descriptors(
+        fd,
+        connection_index,
+        indices,
+        language_ids,
+        view,
+    )
+
+    def first_language(
+        index : int,
+    ) -> str | None:
+        return next(
+            (
+                strings[(index, language_id)] for language_id in language_ids \
+                    if (index, language_id) in strings
+            ),
+            None,
+        )
+
+    return USBDeviceStrings(
+        language_ids = list(language_ids),
+        manufacturer = first_language(device_descriptor.manufacturer_index),
+        product = first_language(device_descriptor.product_index),
+        serial_number = first_language(device_descriptor.serial_number_index),
+        strings = strings,
+        missing = [
+            (index, language_id) for index in sorted(set(indices) - {0}) for language_id in language_ids \
+                if (index, language_id) not in strings
+        ],
+    )
@@ -0,0 +1,521 @@
+from __future__ import annotations
+
+import base64
+import builtins
+import copy
+import ctypes as C
+import ctypes.wintypes as W
+import functools
+import gzip
+import importlib
+import inspect
+import json
+import sys
+import threading
+import time
+
+from collections import deque
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, fields, is_dataclass
+from enum import Enum
+from typing import Any, cast
+from uuid import UUID
+
+from .Views import (
+    StructView,
+)
+
+RECORDING_VERSION = 2
+
+_PACKAGE = __name__.rsplit(".", 2)[0]
+
+class ReplayMismatch(Exception): pass
+
+@dataclass(frozen = True)
+class _Handle:
+    value : int | None
+
+@dataclass(frozen = True)
+class _FrozenView:
+    view_type : type[StructView[Any]]
+    struct_type : type[C.Structure]
+    raw : bytes
+    bytes_returned : int
+    attributes : dict[str, Any]
+
+@dataclass
+class RecordedCall:
+    name : str
+    key : Hashable
+    failed : bool
+    value : Any
+    elapsed_ns : int
+
+_VIEW_INTERNALS = ("_buffer", "data", "bytes_returned")
+
+_OUTPUT_VIEW_ARG = "view"
+
+def _normalize(
+    value : Any,
+) -> Hashable:
+    if value is None or isinstance(value, (bool, int, float, str, bytes, Enum, UUID)):
+        return value
+    if isinstance(value, C._SimpleCData):
+        return cast(Hashable, value.value)
+    if isinstance(value, StructView):
+        return type(value).__name__
+    if isinstance(value, (tuple, list)):
+        return tuple(_normalize(item) for item in cast(list[Any], value))
+    if is_dataclass(value):
+        return (type(value).__name__, *(_normalize(getattr(value, f.name)) for f in fields(value)))
+    return type(value).__qualname__
+
+def _freeze_view(
+    view : StructView[Any],
+) -> _FrozenView:
+    return _FrozenView(
+        view_type = type(view),
+        struct_type = type(view.data),
+        raw = bytes(view.buffer),
+        bytes_returned = view.bytes_returned.value,
+        attributes = {
+            name: value for name, value in vars(view).items() \
+                if name not in _VIEW_INTERNALS
+        },
+    )
+
+def _thaw_view(
+    frozen : _FrozenView,
+    target : StructView[Any] | None,
+) -> StructView[Any]:
+    if target is None or len(target.buffer) != len(frozen.raw):
+        target = frozen.view_type.__new__(frozen.view_type)
+        vars(target).update(frozen.attributes)
+        target._buffer = bytearray(frozen.raw)
+        target.data = frozen.struct_type.from_buffer(target._buffer)
+        target.bytes_returned = W.DWORD(0)
+    else:
+        target._buffer[:] = frozen.raw
+
+    target.bytes_returned.value = frozen.bytes_returned
+
+    return target
+
+def _freeze(
+    value : Any,
+) -> Any:
+    if isinstance(value, C.c_void_p):
+        return _Handle(value.value)
+    if isinstance(value, StructView):
+        return _freeze_view(cast(StructView[Any], value))
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    if isinstance(value, tuple):
+        return tuple(_freeze(item) for item in cast(tuple[Any, ...], value))
+    return value
+
+def _thaw(
+    value : Any,
+    target : StructView[Any] | None,
+) -> Any:
+    if isinstance(value, _Handle):
+        return C.c_void_p(value.value)
+    if isinstance(value, _FrozenView):
+        return _thaw_view(value, target)
+    if isinstance(value, tuple):
+        return tuple(_thaw(item, None) for item in cast(tuple[Any, ...], value))
+    return value
+
+def _type_name(
+    cls : type,
+) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+def _is_allowed_type(
+    cls : type,
+) -> bool:
+    if cls.__module__ == "builtins":
+        return issubclass(cls, BaseException)
+    if cls.__module__ in ("ctypes", "ctypes.wintypes"):
+        return issubclass(cls, C._SimpleCData)
+    if cls.__module__ == _PACKAGE or cls.__module__.startswith(f"{_PACKAGE}."):
+        return issubclass(cls, (Enum, StructView, C.Structure, C._SimpleCData, BaseException)) or is_dataclass(cls)
+    return False
+
+def _resolve_type(
+    name : str,
+) -> type:
+    module_name, _, qualname = name.partition(":")
+
+    if module_name == "builtins":
+        module = builtins
+    elif module_name in ("ctypes", "ctypes.wintypes") \
+        or module_name == _PACKAGE or module_name.startswith(f"{_PACKAGE}."):
+        module = importlib.import_module(module_name)
+    else:
+        raise ValueError(f"Recorded type {name} is not allowed")
+
+    value : Any = module
+
+    for part in qualname.split("."):
+        if part.startswith("_"):
+            raise ValueError(f"Recorded type {name} is not allowed")
+        value = getattr(value, part, None)
+
+    if not isinstance(value, type) or not _is_allowed_type(value):
+        raise ValueError(f"Recorded type {name} is not allowed")
+
+    return value
+
+def _encode_bytes(
+    value : bytes | bytearray | memoryview,
+) -> str:
+    return base64.b64encode(value).decode("ascii")
+
+def _encode(
+    value : Any,
+) -> Any:
+    if isinstance(value, Enum):
+        return {"$enum": _type_name(type(value)), "value": _encode(value.value)}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"$bytes": _encode_bytes(value)}
+    if isinstance(value, UUID):
+        return {"$uuid": str(value)}
+    if isinstance(value, _Handle):
+        return {"$handle": value.value}
+    if isinstance(value, _FrozenView):
+        return {
+            "$view": _type_name(value.view_type),
+            "struct": _type_name(value.struct_type),
+            "raw": _encode_bytes(value.raw),
+            "bytes_returned": value.bytes_returned,
+            "attributes": _encode(value.attributes),
+        }
+    if isinstance(value, tuple):
+        return {"$tuple": [_encode(item) for item in cast(tuple[Any, ...], value)]}
+    if isinstance(value, list):
+        return [_encode(item) for item in cast(list[Any], value)]
+    if isinstance(value, dict):
+        return {"$dict": [[_encode(k), _encode(v)] for k, v in cast(dict[Any, Any], value).items()]}
+    if isinstance(value, BaseException) and _is_allowed_type(type(value)):
+        return {
+            "$error": _type_name(type(value)),
+            "args": [_encode(arg) for arg in value.args],
+            "code": getattr(value, "code", None),
+        }
+    if isinstance(value, C._SimpleCData) and _is_allowed_type(type(value)):
+        return {"$ctype": _type_name(type(value)), "value": _encode(value.value)}
+    if isinstance(value, C.Structure) and _is_allowed_type(type(value)):
+        return {"$struct": _type_name(type(value)), "raw": _encode_bytes(bytes(value))}
+    if is_dataclass(value) and not isinstance(value, type) and _is_allowed_type(type(value)):
+        return {
+            "$dataclass": _type_name(type(value)),
+            "fields": {f.name: _encode(getattr(value, f.name)) for f in fields(value)},
+        }
+    raise TypeError(f"Cannot record a value of type {type(value).__qualname__}")
+
+def _decode(
+    value : Any,
+) -> Any:
+    if isinstance(value, list):
+        return [_decode(item) for item in cast(list[Any], value)]
+    if not isinstance(value, dict):
+        return value
+
+    data = cast(dict[str, Any], value)
+
+    if "$bytes" in data:
+        return base64.b64decode(data["$bytes"])
+    if "$uuid" in data:
+        return UUID(data["$uuid"])
+    if "$handle" in data:
+        return _Handle(data["$handle"])
+    if "$tuple" in data:
+        return tuple(_decode(item) for item in data["$tuple"])
+    if "$dict" in data:
+        return {_decode(k): _decode(v) for k, v in data["$dict"]}
+    if "$enum" in data:
+        return _resolve_type(data["$enum"])(_decode(data["value"]))
+    if "$ctype" in data:
+        return _resolve_type(data["$ctype"])(_decode(data["value"]))
+    if "$struct" in data:
+        return cast(type[C.Structure], _resolve_type(data["$struct"])).from_buffer_copy(base64.b64decode(data["raw"]))
+    if "$view" in data:
+        return _FrozenView(
+            view_type = _resolve_type(data["$view"]),
+            struct_type = cast(type[C.Structure], _resolve_type(data["struct"])),
+            raw = base64.b64decode(data["raw"]),
+            bytes_returned = data["bytes_returned"],
+            attributes = _decode(data["attributes"]),
+        )
+    if "$error" in data:
+        ex = _resolve_type(data["$error"])(*(_decode(arg) for arg in data["args"]))
+        if data.get("code") is not None:
+            ex.code = data["code"]
+        return ex
+    if "$dataclass" in data:
+        cls = _resolve_type(data["$dataclass"])
+        instance = cls.__new__(cls)
+        for name, field_value in cast(dict[str, Any], data["fields"]).items():
+            object.__setattr__(instance, name, _decode(field_value))
+        return instance
+
+    raise ValueError(f"Unknown recorded value: {sorted(data)}")
+
+def _freeze_error(
+    ex : Exception,
+) -> Exception:
+    try:
+        _encode(ex)
+        return ex
+    except Exception:
+        return Exception(str(ex))
+
+class Backend:
+    def call(
+        self,
+        name : str,
+        key : Hashable,
+        target : StructView[Any] | None,
+        func : Callable[..., Any],
+        args : tuple[Any, ...],
+        kwargs : dict[str, Any],
+    ) -> Any:
+        raise NotImplementedError()
+
+class Recorder(Backend):
+    def __init__(
+        self,
+        path : str,
+        source : Backend | None = None,
+    ) -> None:
+        self.path = path
+        self.source = source
+        self.calls : list[RecordedCall] = []
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        name : str,
+        key : Hashable,
+        target : StructView[Any] | None,
+        func : Callable[..., Any],
+        args : tuple[Any, ...],
+        kwargs : dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter_ns()
+
+        try:
+            result = func(*args, **kwargs) \
+                if self.source is None \
+                else self.source.call(name, key, target, func, args, kwargs)
+        except Exception as ex:
+            self._append(RecordedCall(name, key, True, _freeze_error(ex), time.perf_counter_ns() - started))
+            raise
+
+        self._append(RecordedCall(name, key, False, _freeze(result), time.perf_counter_ns() - started))
+
+        return result
+
+    def _append(
+        self,
+        call : RecordedCall,
+    ) -> None:
+        with self._lock:
+            self.calls.append(call)
+
+    def save(
+        self,
+    ) -> None:
+        header = {
+            "version": RECORDING_VERSION,
+            "platform": sys.platform,
+            "created": time.time(),
+        }
+
+        with self._lock:
+            calls = list(self.calls)
+
+        document = {
+            "header": header,
+            "calls": [
+                {
+                    "name": call.name,
+                    "key": _encode(call.key),
+                    "failed": call.failed,
+                    "value": _encode(call.value),
+                    "elapsed_ns": call.elapsed_ns,
+                } for call in calls
+            ],
+        }
+
+        with gzip.open(self.path, "wt", encoding = "utf-8") as file:
+            json.dump(document, file)
+
+    def __enter__(
+        self,
+    ) -> Recorder:
+        install(self)
+        return self
+
+    def __exit__(
+        self,
+        *args : Any,
+    ) -> None:
+        uninstall(self)
+        self.save()
+
+def load_recording(
+    path : str,
+) -> tuple[dict[str, Any], list[RecordedCall]]:
+    with gzip.open(path, "rt", encoding = "utf-8") as file:
+        document = json.load(file)
+
+    header = document["header"]
+
+    if header.get("version") != RECORDING_VERSION:
+        raise ValueError(f"Unsupported recording version: {header.get("version")}")
+
+    return header, [
+        RecordedCall(
+            name = call["name"],
+            key = _decode(call["key"]),
+            failed = call["failed"],
+            value = _decode(call["value"]),
+            elapsed_ns = call["elapsed_ns"],
+        ) for call in document["calls"]
+    ]
+
+class Player(Backend):
+    def __init__(
+        self,
+        path : str,
+        latency_scale : float = 0.0,
+        strict : bool = False,
+    ) -> None:
+        self.path = path
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.header, calls = load_recording(path)
+        self._queues : dict[tuple[str, Hashable], deque[RecordedCall]] = {}
+        self._last : dict[tuple[str, Hashable], RecordedCall] = {}
+        self._lock = threading.Lock()
+
+        for call in calls:
+            self._queues.setdefault((call.name, call.key), deque()).append(call)
+
+    def call(
+        self,
+        name : str,
+        key : Hashable,
+        target : StructView[Any] | None,
+        func : Callable[..., Any],
+        args : tuple[Any, ...],
+        kwargs : dict[str, Any],
+    ) -> Any:
+        call = self._next(name, key)
+
+        if self.latency_scale > 0:
+            time.sleep(call.elapsed_ns * self.latency_scale / 1e9)
+
+        if call.failed:
+            raise copy.copy(call.value)
+
+        return _thaw(call.value, target)
+
+    def _next(
+        self,
+        name : str,
+        key : Hashable,
+    ) -> RecordedCall:
+        with self._lock:
+            queue = self._queues.get((name, key))
+
+            if queue:
+                call = queue.popleft()
+                self._last[(name, key)] = call
+                return call
+
+            call = self._last.get((name, key))
+
+        if call is None:
+            raise ReplayMismatch(f"No recorded call {name}{key}")
+        if self.strict:
+            raise ReplayMismatch(f"Recorded calls to {name}{key} are exhausted")
+
+        return call
+
+    @property
+    def remaining(
+        self,
+    ) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def __enter__(
+        self,
+    ) -> Player:
+        install(self)
+        return self
+
+    def __exit__(
+        self,
+        *args : Any,
+    ) -> None:
+        uninstall(self)
+
+_backend : Backend | None = None
+_state = threading.local()
+
+def install(
+    backend : Backend,
+) -> None:
+    global _backend
+    if _backend is not None:
+        raise RuntimeError("Another recorder or player is already installed")
+    _backend = backend
+
+def uninstall(
+    backend : Backend,
+) -> None:
+    global _backend
+    if _backend is backend:
+        _backend = None
+
+def recordable[**P, R](
+    func : Callable[P, R],
+) -> Callable[P, R]:
+    name = f"{func.__module__.rsplit(".", 1)[-1]}.{func.__name__}"
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(
+        *args : P.args,
+        **kwargs : P.kwargs,
+    ) -> R:
+        backend = _backend
+
+        if backend is None or getattr(_state, "active", False):
+            return func(*args, **kwargs)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+
+        target = bound.arguments.pop(_OUTPUT_VIEW_ARG, None)
+
+        _state.active = True
+        try:
+            return backend.call(
+                name,
+                _normalize(tuple(bound.arguments.values())),
+                target if isinstance(target, StructView) else None,
+                func,
+                args,
+                kwargs,
+            )
+        finally:
+            _state.active = False
+
+    return wrapper
@@ -0,0 +1,596 @@
+from __future__ import annotations
+
+import ctypes as C
+import ctypes.wintypes as W
+import os
+import select
+import time
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from typing import Any
+
+from ..instrumentation import (
+    LatencySamples,
+)
+
+from .Comm import (
+    purge_comm,
+    set_comm_mask,
+    set_comm_queue_sizes,
+    set_comm_state,
+    set_comm_timeouts,
+    wait_comm_event,
+)
+
+from .COMPortDeviceManager import (
+    COMPortDevice,
+)
+
+from .IO import (
+    OverlappedOperation,
+    cancel_io,
+    close_file,
+    create_file,
+    _buffer_address,
+    read_file_at,
+    write_file_at,
+)
+
+from .Types import (
+    EVENT_DRIVEN_TIMEOUTS,
+    MAXDWORD,
+    CommEvents,
+    CreationModes,
+    FileFlags,
+    GenericRights,
+    SerialSettings,
+    SerialTimeouts,
+    ShareModes,
+)
+
+@dataclass
+class SerialPortStats:
+    reads : int = 0
+    writes : int = 0
+    bytes_read : int = 0
+    bytes_written : int = 0
+    native_calls : int | None = None
+
+class SerialTransport(ABC):
+    native_calls : int | None = None
+
+    @abstractmethod
+    def configure(
+        self,
+        settings : SerialSettings,
+        timeouts : SerialTimeouts,
+    ) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def readinto(
+        self,
+        buffer : bytearray | memoryview,
+    ) -> int:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def write(
+        self,
+        buffer : bytes | bytearray | memoryview,
+    ) -> int:
+        raise NotImplementedError()
+
+    def pin(
+        self,
+        buffer : bytearray,
+    ) -> None:
+        pass
+
+    def readinto_at(
+        self,
+        buffer : bytearray,
+        offset : int,
+        size : int,
+    ) -> int:
+        return self.readinto(memoryview(buffer)[offset:offset + size])
+
+    def write_at(
+        self,
+        buffer : bytes | bytearray,
+        offset : int,
+        size : int,
+    ) -> int:
+        return self.write(memoryview(buffer)[offset:offset + size])
+
+    @abstractmethod
+    def set_event_mask(
+        self,
+        mask : CommEvents,
+    ) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def wait_event(
+        self,
+        timeout : float | None = None,
+    ) -> CommEvents:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def close(
+        self,
+    ) -> None:
+        raise NotImplementedError()
+
+def _check_range(
+    buffer : bytes | bytearray,
+    offset : int,
+    size : int,
+) -> None:
+    if offset < 0 or size < 0 or offset + size > len(buffer):
+        raise ValueError("The range does not fit into the buffer")
+
+class OverlappedSerialTransport(SerialTransport):
+    def __init__(
+        self,
+        fd : C.c_void_p,
+        queue_size : int = 0,
+    ) -> None:
+        self.fd = fd
+        self.queue_size = queue_size
+        self._read = OverlappedOperation()
+        self._write = OverlappedOperation()
+        self._wait = OverlappedOperation()
+        self._event_mask = W.DWORD(0)
+        self._pinned : dict[int, tuple[bytearray, C.Array[C.c_char]]] = {}
+
+    def configure(
+        self,
+        settings : SerialSettings,
+        timeouts : SerialTimeouts,
+    ) -> None:
+        if self.queue_size > 0:
+            set_comm_queue_sizes(self.fd, self.queue_size, self.queue_size)
+
+        set_comm_state(self.fd, settings)
+        set_comm_timeouts(self.fd, timeouts)
+        purge_comm(self.fd)
+
+    def readinto(
+        self,
+        buffer : bytearray | memoryview,
+    ) -> int:
+        target = (C.c_char * len(buffer)).from_buffer(buffer)
+        return read_file_at(self.fd, C.addressof(target), len(target), self._read)
+
+    def write(
+        self,
+        buffer : bytes | bytearray | memoryview,
+    ) -> int:
+        address, _source = _buffer_address(buffer)
+        return write_file_at(self.fd, address, len(buffer), self._write)
+
+    def pin(
+        self,
+        buffer : bytearray,
+    ) -> None:
+        self._pinned[id(buffer)] = (buffer, (C.c_char * len(buffer)).from_buffer(buffer))
+
+    def _pinned_address(
+        self,
+        buffer : bytes | bytearray,
+    ) -> int | None:
+        pinned = self._pinned.get(id(buffer))
+        return None if pinned is None else C.addressof(pinned[1])
+
+    def readinto_at(
+        self,
+        buffer : bytearray,
+        offset : int,
+        size : int,
+    ) -> int:
+        _check_range(buffer, offset, size)
+        address = self._pinned_address(buffer)
+
+        if address is None:
+            return super().readinto_at(buffer, offset, size)
+
+        return read_file_at(self.fd, address + offset, size, self._read)
+
+    def write_at(
+        self,
+        buffer : bytes | bytearray,
+        offset : int,
+        size : int,
+    ) -> int:
+        _check_range(buffer, offset, size)
+        address = self._pinned_address(buffer)
+        _source : object = None
+
+        if address is None:
+            address, _source = _buffer_address(buffer)
+
+        return write_file_at(self.fd, address + offset, size, self._write)
+
+    def set_event_mask(
+        self,
+        mask : CommEvents,
+    ) -> None:
+        set_comm_mask(self.fd, mask)
+
+    def wait_event(
+        self,
+        timeout : float | None = None,
+    ) -> CommEvents:
+        return wait_comm_event(self.fd, self._wait, self._event_mask, timeout)
+
+    def close(
+        self,
+    ) -> None:
+        cancel_io(self.fd)
+        self._read.close()
+        self._write.close()
+        self._wait.close()
+        self._pinned.clear()
+        close_file(self.fd)
+
+def _read_timeout(
+    timeouts : SerialTimeouts,
+    size : int,
+) -> tuple[float | None, bool]:
+    if timeouts.read_interval == MAXDWORD and timeouts.read_total_multiplier == 0:
+        return timeouts.read_total_constant / 1000, False
+
+    if timeouts.read_interval == MAXDWORD and timeouts.read_total_multiplier == MAXDWORD:
+        return timeouts.read_total_constant / 1000, False
+
+    if timeouts.read_total_multiplier == 0 and timeouts.read_total_constant == 0:
+        return None, True
+
+    return (timeouts.read_total_multiplier * size + timeouts.read_total_constant) / 1000, True
+
+class PtySerialTransport(SerialTransport):
+    def __init__(
+        self,
+        fd : int,
+    ) -> None:
+        self.fd = fd
+        self.native_calls : int = 0
+        self.settings : SerialSettings | None = None
+        self.timeouts = SerialTimeouts()
+        self.event_mask = CommEvents.NONE
+
+    def configure(
+        self,
+        settings : SerialSettings,
+        timeouts : SerialTimeouts,
+    ) -> None:
+        self.settings = settings
+        self.timeouts = timeouts
+
+    def readinto(
+        self,
+        buffer : bytearray | memoryview,
+    ) -> int:
+        timeout, fill = _read_timeout(self.timeouts, len(buffer))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        total = 0
+
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            self.native_calls += 1
+
+            if len(ready) == 0:
+                break
+
+            total += os.readv(self.fd, [buffer if total == 0 else memoryview(buffer)[total:]])
+            self.native_calls += 1
+
+            if not fill or total == len(buffer):
+                break
+
+        return total
+
+    def write(
+        self,
+        buffer : bytes | bytearray | memoryview,
+    ) -> int:
+        self.native_calls += 1
+        return os.write(self.fd, buffer)
+
+    def set_event_mask(
+        self,
+        mask : CommEvents,
+    ) -> None:
+        self.event_mask = mask
+
+    def wait_event(
+        self,
+        timeout : float | None = None,
+    ) -> CommEvents:
+        if not self.event_mask & (CommEvents.RXCHAR | CommEvents.RXFLAG):
+            time.sleep(0 if timeout is None else timeout)
+            return CommEvents.NONE
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        self.native_calls += 1
+
+        return CommEvents.RXCHAR if len(ready) > 0 else CommEvents.NONE
+
+    def close(
+        self,
+    ) -> None:
+        fd, self.fd = self.fd, -1
+        if fd >= 0:
+            os.close(fd)
+
+class SerialPort:
+    def __init__(
+        self,
+        transport : SerialTransport,
+        buffer_size : int = 65536,
+    ) -> None:
+        self.transport = transport
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._stats = SerialPortStats()
+
+        transport.pin(self._buffer)
+
+    @property
+    def buffer_size(
+        self,
+    ) -> int:
+        return len(self._buffer)
+
+    @property
+    def stats(
+        self,
+    ) -> SerialPortStats:
+        return replace(self._stats, native_calls = self.transport.native_calls)
+
+    def configure(
+        self,
+        settings : SerialSettings,
+        timeouts : SerialTimeouts | None = None,
+    ) -> None:
+        self.transport.configure(settings, SerialTimeouts() if timeouts is None else timeouts)
+
+    def _count_read(
+        self,
+        n : int,
+    ) -> int:
+        self._stats.reads += 1
+        self._stats.bytes_read += n
+        return n
+
+    def _count_write(
+        self,
+        n : int,
+    ) -> int:
+        self._stats.writes += 1
+        self._stats.bytes_written += n
+        return n
+
+    def readinto(
+        self,
+        buffer : bytearray | memoryview,
+    ) -> int:
+        return self._count_read(self.transport.readinto(buffer))
+
+    def readinto_at(
+        self,
+        buffer : bytearray,
+        offset : int,
+        size : int,
+    ) -> int:
+        return self._count_read(self.transport.readinto_at(buffer, offset, size))
+
+    def read_view(
+        self,
+        size : int | None = None,
+    ) -> memoryview:
+        n = self.readinto_at(self._buffer, 0, len(self._buffer) if size is None else min(size, len(self._buffer)))
+        return self._view[:n]
+
+    def read(
+        self,
+        size : int | None = None,
+    ) -> bytes:
+        return bytes(self.read_view(size))
+
+    def write(
+        self,
+        data : bytes | bytearray | memoryview,
+    ) -> int:
+        return self._count_write(self.transport.write(data))
+
+    def write_all(
+        self,
+        data : bytes | bytearray | memoryview,
+    ) -> None:
+        written = self.write(data)
+
+        if written == len(data):
+            return
+
+        if isinstance(data, memoryview):
+            while written < len(data):
+                written += self.write(data[written:])
+            return
+
+        while written < len(data):
+            written += self._count_write(self.transport.write_at(data, written, len(data) - written))
+
+    def close(
+        self,
+    ) -> None:
+        self.transport.close()
+
+    def __enter__(
+        self,
+    ) -> SerialPort:
+        return self
+
+    def __exit__(
+        self,
+        *args : Any,
+    ) -> None:
+        self.close()
+
+class SerialTimeout(Exception): pass
+
+class EventDrivenReceiver:
+    def __init__(
+        self,
+        port : SerialPort,
+        terminator : bytes = b"\n",
+        mask : CommEvents = CommEvents.RXCHAR | CommEvents.RXFLAG,
+        latency_capacity : int = 65536,
+    ) -> None:
+        if len(terminator) == 0:
+            raise ValueError("The terminator must not be empty")
+
+        self.port = port
+        self.terminator = terminator
+        self.latency = LatencySamples(latency_capacity)
+        self.wakeups = 0
+        self._buffer = bytearray(port.buffer_size)
+        self._view = memoryview(self._buffer)
+        self._filled = 0
+        self._consumed = 0
+
+        port.transport.pin(self._buffer)
+        port.transport.set_event_mask(mask)
+
+    def _compact(
+        self,
+    ) -> None:
+        if self._consumed == 0:
+            return
+
+        remaining = self._filled - self._consumed
+        self._view[:remaining] = self._view[self._consumed:self._filled]
+        self._filled = remaining
+        self._consumed = 0
+
+    def _find_terminator(
+        self,
+        start : int,
+    ) -> int:
+        position = self._buffer.find(self.terminator, max(start - len(self.terminator) + 1, 0), self._filled)
+        return -1 if position < 0 else position + len(self.terminator)
+
+    def receive(
+        self,
+        timeout : float | None = None,
+    ) -> memoryview:
+        self._compact()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        end = self._find_terminator(0)
+
+        while end < 0:
+            if self._filled == len(self._buffer):
+                raise BufferError("The response does not fit into the receive buffer")
+
+            start = self._filled
+            n = self.port.readinto_at(self._buffer, start, len(self._buffer) - start)
+            self._filled += n
+
+            if n > 0:
+                end = self._find_terminator(start)
+                continue
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+
+            if remaining is not None and remaining <= 0:
+                raise SerialTimeout(f"No terminator received within {timeout} s")
+
+            self.port.transport.wait_event(remaining)
+            self.wakeups += 1
+
+        self._consumed = end
+
+        return self._view[:end]
+
+    def transact(
+        self,
+        request : bytes | bytearray | memoryview,
+        timeout : float | None = None,
+    ) -> memoryview:
+        started = time.perf_counter_ns()
+        self.port.write_all(request)
+        response = self.receive(timeout)
+        self.latency.add(time.perf_counter_ns() - started, len(response))
+        return response
+
+def open_event_driven_port(
+    port : str | COMPortDevice,
+    settings : SerialSettings,
+    terminator : bytes = b"\n",
+    buffer_size : int = 4096,
+) -> EventDrivenReceiver:
+    if settings.event_char is None and len(terminator) == 1:
+        settings = replace(settings, event_char = terminator[0])
+
+    return EventDrivenReceiver(
+        open_serial_port(port, settings, EVENT_DRIVEN_TIMEOUTS, buffer_size),
+        terminator,
+    )
+
+def _comport_path(
+    port : str | COMPortDevice,
+) -> str:
+    if isinstance(port, COMPortDevice):
+        return port.path
+    if port.startswith("\\\\"):
+        return port
+    return f"\\\\.\\{port}"
+
+def open_serial_port(
+    port : str | COMPortDevice,
+    settings : SerialSettings,
+    timeouts : SerialTimeouts | None = None,
+    buffer_size : int = 65536,
+    queue_size : int = 65536,
+) -> SerialPort:
+    fd = create_file(
+        _comport_path(port),
+        GenericRights.READ | GenericRights.WRITE,
+        ShareModes(0),
+        CreationModes.OPEN_EXISTING,
+        FileFlags.OVERLAPPED,
+    )
+
+    try:
+        serial_port = SerialPort(OverlappedSerialTransport(fd, queue_size), buffer_size)
+        serial_port.configure(settings, timeouts)
+    except Exception:
+        close_file(fd)
+        raise
+
+    return serial_port
+
+def open_pty_pair(
+    settings : SerialSettings,
+    timeouts : SerialTimeouts | None = None,
+    buffer_size : int = 65536,
+) -> tuple[SerialPort, SerialPort]:
+    import tty
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+
+    ports = (
+        SerialPort(PtySerialTransport(master), buffer_size),
+        SerialPort(PtySerialTransport(slave), buffer_size),
+    )
+
+    for serial_port in ports:
+        serial_port.configure(settings, timeouts)
+
+    return ports
@@ -14,6 +14,9 @@ from .Memory import (
     alloc,
     free,
 )
+from .Recording import (
+    recordable,
+)
 from .Types import (
     INVALID_HANDLE_VALUE,
     FALSE,
@@ -51,14 +54,15 @@ from ..types import (
     PSP_DEVICE_INTERFACE_DETAIL_DATA,
 )
 
+@recordable
 def get_class_devs(
-    guid : UUID,
+    guid : UUID | None,
     enumerator : str | None,
     parent_hwnd : W.HWND | None,
     flags : IncludedInfoFlags,
 ) -> C.c_void_p:
     hdevinfo = SetupDiGetClassDevs(
-        C.byref(uuid_to_guid(guid)),
+        None if guid is None else C.byref(uuid_to_guid(guid)),
         None if enumerator is None else str_to_ptr(enumerator),
         parent_hwnd,
         flags.value,
@@ -70,6 +74,7 @@ def get_class_devs(
 
     return hdevinfo
 
+@recordable
 def next_device_info(
     hdevinfo : C.c_void_p,
     index : int,
@@ -88,6 +93,7 @@ def next_device_info(
 
     return DevInfoData.create(data)
 
+@recordable
 def get_device_registry_property(
     hdevinfo : C.c_void_p,
     devinfo : DevInfoData,
@@ -163,6 +169,7 @@ def get_device_registry_property(
 
     return prop
 
+@recordable
 def get_device_interface(
     hdevinfo : C.c_void_p,
     guid : UUID,
@@ -183,6 +190,7 @@ def get_device_interface(
 
     return DevInterfaceData.create(data)
 
+@recordable
 def get_device_interface_devpath(
     hdevinfo : C.c_void_p,
     interface_data : DevInterfaceData,
@@ -233,11 +241,13 @@ def get_device_interface_devpath(
 
     return devpath
 
+@recordable
 def free_device_list(
     hdevinfo : C.c_void_p,
 ) -> None:
     SetupDiDestroyDeviceInfoList(hdevinfo)
 
+@recordable
 def get_device_instance_id(
     hdevinfo : C.c_void_p,
     devinfo : DevInfoData,
@@ -283,6 +293,7 @@ def get_device_instance_id(
 
     return devid
 
+@recordable
 def get_device_property(
     hdevinfo : C.c_void_p,
     devinfo : DevInfoData,
@@ -338,6 +349,7 @@ def get_device_property(
 
     return prop_value
 
+@recordable
 def get_device_specific_registry_data(
     hdevinfo : C.c_void_p,
     devinfo : DevInfoData,
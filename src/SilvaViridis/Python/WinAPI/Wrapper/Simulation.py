@@ -0,0 +1,909 @@
+from __future__ import annotations
+
+import ctypes as C
+import threading
+import time
+
+from collections.abc import Callable, Generator, Hashable, Iterable
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, cast
+from uuid import UUID
+
+from .. import instrumentation
+
+from .DeviceManager import (
+    Device,
+)
+
+from .Exceptions import (
+    ERROR_FILE_NOT_FOUND,
+    ERROR_INVALID_DATA,
+    ERROR_INVALID_PARAMETER,
+    ERROR_NO_MORE_ITEMS,
+    ERROR_NOT_FOUND,
+    raise_ex,
+)
+
+from .Serial import (
+    EventDrivenReceiver,
+    SerialPort,
+    SerialTimeout,
+)
+
+from .Recording import (
+    Backend,
+    ReplayMismatch,
+    install,
+    uninstall,
+)
+
+from .Types import (
+    CtlCodes,
+    DevInfoData,
+    DevInterfaceData,
+    DevInterfaceFlags,
+    DevInterfaceGuids,
+    DevProperties,
+    DevPropKeys,
+    USBConfigurationDescriptor,
+    USBConnectionStatuses,
+    USBConnectorProps,
+    USBDeviceDescriptor,
+    USBDeviceSpeeds,
+    USBDeviceStrings,
+    USBHubCapabilities,
+    USBHubInformation,
+    USBHubNodeInformation,
+    USBNodeConnectionInfoEx,
+    USBNodeConnectionInfoExV2,
+)
+
+from .Views import (
+    StructView,
+)
+
+from .USBDeviceManager import (
+    USBDevice,
+    USBDeviceIndex,
+    USBHostController,
+    USBHub,
+    USBInterface,
+    USBPort,
+)
+
+_SIMULATED_GUID = UUID(int = 0)
+
+@dataclass
+class SimulatedConnection:
+    driver_key_name : str
+    device_is_hub : bool
+    device_address : int
+    product_id : int = 0
+
+def _simulated_properties(
+    driver_key_name : str,
+    description : str,
+) -> dict[DevProperties, str | int | bytes | None]:
+    return {
+        DevProperties.DRIVER: driver_key_name,
+        DevProperties.DEVICEDESC: description,
+    }
+
+def _simulated_connection_info(
+    index : int,
+    connection : SimulatedConnection | None,
+) -> USBNodeConnectionInfoEx:
+    return USBNodeConnectionInfoEx(
+        connection_index = index,
+        device_descriptor = USBDeviceDescriptor(
+            0x0200, 0, 0, 0, 64, 0, 0 if connection is None else connection.product_id, 0, 0, 0, 0, 1,
+        ),
+        current_configuration_value = 1,
+        speed = USBDeviceSpeeds.UsbHighSpeed,
+        device_is_hub = connection is not None and connection.device_is_hub,
+        device_address = 0 if connection is None else connection.device_address,
+        number_of_open_pipes = 0,
+        connection_status = USBConnectionStatuses.NoDeviceConnected \
+            if connection is None \
+            else USBConnectionStatuses.DeviceConnected,
+        pipe_list = [],
+    )
+
+def _simulated_connector_props(
+    index : int,
+    hub : SimulatedHub,
+) -> USBConnectorProps:
+    companion = hub.companions.get(index)
+
+    return USBConnectorProps(
+        connection_index = index,
+        companion_index = 0 if companion is None else 1,
+        companion_port_number = 0 if companion is None else companion[1],
+        companion_hub_symlink = "" if companion is None else f"\\\\?\\{companion[0]}",
+        port_is_user_connectable = True,
+        port_is_debug_capable = False,
+        port_has_multiple_companions = False,
+        port_connector_is_type_c = False,
+    )
+
+class SimulatedHostController(USBHostController):
+    def __init__(
+        self,
+        name : str,
+        root_hub_name : str,
+        delay : float,
+    ) -> None:
+        super().__init__(
+            _SIMULATED_GUID,
+            _SIMULATED_GUID,
+            f"\\\\?\\{name}",
+            name,
+            "",
+            _simulated_properties(name, "Simulated host controller"),
+            {},
+        )
+        self.root_hub_name = root_hub_name
+        self.delay = delay
+
+    @contextmanager
+    def open_file(
+        self,
+    ) -> Generator[C.c_void_p]:
+        yield C.c_void_p(0)
+
+    def get_root_hub_name(
+        self,
+        hcfd : C.c_void_p,
+    ) -> str | None:
+        time.sleep(self.delay)
+        return self.root_hub_name
+
+class SimulatedPort(USBPort):
+    def __init__(
+        self,
+        index : int,
+        hub : SimulatedHub,
+    ) -> None:
+        super().__init__(index, hub.path)
+        self.hub = hub
+
+    @property
+    def connection(
+        self,
+    ) -> SimulatedConnection | None:
+        return self.hub.ports[self.index - 1]
+
+    @property
+    def delay(
+        self,
+    ) -> float:
+        return self.hub.delay
+
+    def get_connection_info(
+        self,
+        hubfd : C.c_void_p,
+    ) -> USBNodeConnectionInfoEx | None:
+        time.sleep(self.delay)
+        return _simulated_connection_info(self.index, self.connection)
+
+    def get_connection_driver_key_name(
+        self,
+        hubfd : C.c_void_p,
+        refresh : bool = False,
+    ) -> str | None:
+        time.sleep(self.delay)
+        return None if self.connection is None else self.connection.driver_key_name
+
+    def get_connector_props(
+        self,
+        hubfd : C.c_void_p,
+    ) -> USBConnectorProps | None:
+        time.sleep(self.delay)
+        return _simulated_connector_props(self.index, self.hub)
+
+class SimulatedHub(USBHub):
+    def __init__(
+        self,
+        name : str,
+        ports : list[SimulatedConnection | None],
+        delay : float,
+        parent : str = "",
+        companions : dict[int, tuple[str, int]] | None = None,
+    ) -> None:
+        super().__init__(
+            _SIMULATED_GUID,
+            _SIMULATED_GUID,
+            f"\\\\?\\{name}",
+            name,
+            parent,
+            _simulated_properties(name, "Simulated hub"),
+            {},
+        )
+        self.ports = ports
+        self.delay = delay
+        self.companions = {} if companions is None else companions
+
+    @contextmanager
+    def open_file(
+        self,
+    ) -> Generator[C.c_void_p]:
+        yield C.c_void_p(0)
+
+    def get_port(
+        self,
+        index : int,
+    ) -> USBPort:
+        return SimulatedPort(index, self)
+
+    def get_node_info(
+        self,
+        hubfd : C.c_void_p,
+    ) -> USBHubNodeInformation | None:
+        time.sleep(self.delay)
+
+        return USBHubNodeInformation(
+            is_bus_powered = False,
+            number_of_ports = len(self.ports),
+            hub_characteristics = 0,
+            power_on_to_power_good = 0,
+            hub_control_current = 0,
+            remove_and_power_mask = [],
+        )
+
+def build_simulated_topology(
+    controllers : int = 2,
+    depth : int = 3,
+    ports_per_hub : int = 4,
+    hubs_per_hub : int = 2,
+    devices_per_hub : int = 1,
+    interfaces_per_device : int = 0,
+    delay : float = 0.001,
+) -> USBDeviceIndex:
+    hcs : list[USBHostController] = []
+    hubs : list[USBHub] = []
+    devs : list[USBDevice] = []
+    interfaces : list[USBInterface] = []
+
+    def add_hub(
+        name : str,
+        parent : str,
+        level : int,
+    ) -> SimulatedHub:
+        ports : list[SimulatedConnection | None] = []
+
+        for i in range(ports_per_hub):
+            child_name = f"{name}.{i + 1}"
+
+            if level < depth and i < hubs_per_hub:
+                add_hub(child_name, name, level + 1)
+                ports.append(SimulatedConnection(child_name, True, len(ports) + 1))
+            elif i < hubs_per_hub + devices_per_hub:
+                devs.append(USBDevice(
+                    _SIMULATED_GUID,
+                    _SIMULATED_GUID,
+                    f"\\\\?\\{child_name}",
+                    child_name,
+                    name,
+                    _simulated_properties(child_name, "Simulated device"),
+                    {},
+                ))
+                ports.append(SimulatedConnection(child_name, False, len(ports) + 1))
+
+                for k in range(interfaces_per_device):
+                    interfaces.append(USBInterface(
+                        _SIMULATED_GUID,
+                        _SIMULATED_GUID,
+                        "",
+                        f"{child_name}&MI_{k:02}",
+                        child_name,
+                        _simulated_properties(f"{child_name}&MI_{k:02}", "Simulated interface"),
+                        {},
+                    ))
+            else:
+                ports.append(None)
+
+        hub = SimulatedHub(name, ports, delay, parent)
+        hubs.append(hub)
+
+        return hub
+
+    for i in range(controllers):
+        root_hub = add_hub(f"HC{i}.ROOT", f"HC{i}", 1)
+        hcs.append(SimulatedHostController(f"HC{i}", root_hub.path[4:], delay))
+
+    return USBDeviceIndex(
+        controllers = hcs,
+        hubs = hubs,
+        devices = devs,
+        interfaces = interfaces,
+    )
+
+_USB_IOCTLS = {
+    "IOAPISet.ioctl_get_root_hub_name": CtlCodes.USB_GET_ROOT_HUB_NAME,
+    "IOAPISet.ioctl_get_usb_node_info": CtlCodes.USB_GET_NODE_INFORMATION,
+    "IOAPISet.ioctl_get_usb_hub_extra_info": CtlCodes.USB_GET_HUB_INFORMATION_EX,
+    "IOAPISet.ioctl_get_usb_hub_capabilities_ex": CtlCodes.USB_GET_HUB_CAPABILITIES_EX,
+    "IOAPISet.ioctl_get_usb_port_connector_props": CtlCodes.USB_GET_PORT_CONNECTOR_PROPERTIES,
+    "IOAPISet.ioctl_get_usb_node_connection_info_ex": CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX,
+    "IOAPISet.ioctl_get_usb_node_connection_info_ex_v2": CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX_V2,
+    "IOAPISet.ioctl_get_usb_node_connection_driver_key_name": CtlCodes.USB_GET_NODE_CONNECTION_DRIVERKEY_NAME,
+    "IOAPISet.ioctl_get_usb_configuration_descriptor": CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION,
+    "IOAPISet.ioctl_get_usb_device_strings": CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION,
+}
+
+class SimulatedUSBMachine(Backend):
+    def __init__(
+        self,
+        topology : USBDeviceIndex | None = None,
+        delay : float = 0.0,
+        others : Iterable[Device] = (),
+    ) -> None:
+        self.topology = build_simulated_topology(delay = 0.0) if topology is None else topology
+        self.delay = delay
+        self.others = list(others)
+        self.native_calls = 0
+        self.calls : dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._device_lists : dict[int, list[Device]] = {}
+        self._handles : dict[int, Device] = {}
+        self._next_handle = 1
+        self._handlers : dict[str, Callable[..., Any]] = {
+            "SetupAPI.get_class_devs": self._get_class_devs,
+            "SetupAPI.next_device_info": self._next_device_info,
+            "SetupAPI.get_device_interface": self._get_device_interface,
+            "SetupAPI.get_device_interface_devpath": self._get_device_interface_devpath,
+            "SetupAPI.get_device_instance_id": lambda hdevinfo, devinfo: self._device(hdevinfo, devinfo.dev_inst_handle).id,
+            "SetupAPI.get_device_property": self._get_device_property,
+            "SetupAPI.get_device_registry_property": self._get_device_registry_property,
+            "SetupAPI.free_device_list": self._free_device_list,
+            "IO.create_file": self._create_file,
+            "IO.close_file": self._close_file,
+            "IOAPISet.ioctl_get_root_hub_name": self._get_root_hub_name,
+            "IOAPISet.ioctl_get_usb_node_info": self._get_node_info,
+            "IOAPISet.ioctl_get_usb_hub_extra_info": self._get_hub_info,
+            "IOAPISet.ioctl_get_usb_hub_capabilities_ex": self._get_hub_capabilities,
+            "IOAPISet.ioctl_get_usb_port_connector_props": self._get_connector_props,
+            "IOAPISet.ioctl_get_usb_node_connection_info_ex": self._get_connection_info,
+            "IOAPISet.ioctl_get_usb_node_connection_info_ex_v2": self._get_connection_info_v2,
+            "IOAPISet.ioctl_get_usb_node_connection_driver_key_name": self._get_driver_key_name,
+            "IOAPISet.ioctl_get_usb_configuration_descriptor": self._get_configuration_descriptor,
+            "IOAPISet.ioctl_get_usb_device_strings": self._get_device_strings,
+        }
+
+    def _get_class_devs(
+        self,
+        guid : UUID | None,
+        enumerator : str | None,
+        parent_hwnd : Any,
+        flags : Any,
+    ) -> C.c_void_p:
+        topology = self.topology
+        devices : list[Device]
+
+        if guid == DevInterfaceGuids.USB_HOST_CONTROLLER.value:
+            devices = list(topology.controllers)
+        elif guid == DevInterfaceGuids.USB_HUB.value:
+            devices = list(topology.hubs)
+        elif guid == DevInterfaceGuids.USB_DEVICE.value:
+            devices = list(topology.devices)
+        elif guid is None:
+            devices = [
+                device for device in [
+                    *topology.controllers,
+                    *topology.hubs,
+                    *topology.devices,
+                    *topology.interfaces,
+                    *self.others,
+                ] if enumerator is None or device.id.split("\\", 1)[0].lower() == enumerator.lower()
+            ]
+        else:
+            devices = []
+
+        with self._lock:
+            hdevinfo = self._next_handle
+            self._next_handle += 1
+            self._device_lists[hdevinfo] = devices
+
+        return C.c_void_p(hdevinfo)
+
+    def _device(
+        self,
+        hdevinfo : C.c_void_p,
+        index : int,
+    ) -> Device:
+        with self._lock:
+            devices = self._device_lists.get(hdevinfo.value or 0, [])
+
+        if not 0 <= index < len(devices):
+            raise_ex(ERROR_INVALID_PARAMETER)
+
+        return devices[index]
+
+    def _next_device_info(
+        self,
+        hdevinfo : C.c_void_p,
+        index : int,
+    ) -> DevInfoData:
+        with self._lock:
+            count = len(self._device_lists.get(hdevinfo.value or 0, []))
+
+        if index >= count:
+            raise_ex(ERROR_NO_MORE_ITEMS)
+
+        return DevInfoData(self._device(hdevinfo, index).class_guid, index, C.c_void_p(0))
+
+    def _get_device_interface(
+        self,
+        hdevinfo : C.c_void_p,
+        guid : UUID,
+        index : int,
+    ) -> DevInterfaceData:
+        return DevInterfaceData(guid, DevInterfaceFlags.ACTIVE, C.c_void_p(index + 1))
+
+    def _get_device_interface_devpath(
+        self,
+        hdevinfo : C.c_void_p,
+        interfaceinfo : DevInterfaceData,
+    ) -> str:
+        return self._device(hdevinfo, (interfaceinfo.reserved.value or 0) - 1).path
+
+    def _get_device_property(
+        self,
+        hdevinfo : C.c_void_p,
+        devinfo : DevInfoData,
+        prop_key : DevPropKeys,
+    ) -> str:
+        parent = self._device(hdevinfo, devinfo.dev_inst_handle).parent
+
+        if prop_key != DevPropKeys.Device_Parent or parent == "":
+            raise_ex(ERROR_NOT_FOUND)
+
+        return parent
+
+    def _get_device_registry_property(
+        self,
+        hdevinfo : C.c_void_p,
+        devinfo : DevInfoData,
+        property : DevProperties,
+    ) -> str | int | bytes | None:
+        properties = self._device(hdevinfo, devinfo.dev_inst_handle).properties
+
+        if property not in properties:
+            raise_ex(ERROR_INVALID_DATA)
+
+        return properties[property]
+
+    def _free_device_list(
+        self,
+        hdevinfo : C.c_void_p,
+    ) -> None:
+        with self._lock:
+            self._device_lists.pop(hdevinfo.value or 0, None)
+
+    def _create_file(
+        self,
+        path : str,
+        *args : Any,
+    ) -> C.c_void_p:
+        key = path.lower()
+        devices = {
+            device.path.lower(): device for device in [*self.topology.controllers, *self.topology.hubs]
+        }
+
+        if key not in devices:
+            raise_ex(ERROR_FILE_NOT_FOUND)
+
+        with self._lock:
+            fd = self._next_handle
+            self._next_handle += 1
+            self._handles[fd] = devices[key]
+
+        return C.c_void_p(fd)
+
+    def _close_file(
+        self,
+        fd : C.c_void_p,
+    ) -> None:
+        with self._lock:
+            self._handles.pop(fd.value or 0, None)
+
+    def _opened[T](
+        self,
+        fd : C.c_void_p,
+        device_type : type[T],
+    ) -> T:
+        with self._lock:
+            device = self._handles.get(fd.value or 0)
+
+        if not isinstance(device, device_type):
+            raise_ex(ERROR_INVALID_PARAMETER)
+
+        return cast(T, device)
+
+    def _port(
+        self,
+        fd : C.c_void_p,
+        connection_index : int,
+    ) -> SimulatedConnection | None:
+        hub = self._opened(fd, SimulatedHub)
+
+        if not 0 <= connection_index < len(hub.ports):
+            raise_ex(ERROR_INVALID_PARAMETER)
+
+        return hub.ports[connection_index]
+
+    def _connected(
+        self,
+        fd : C.c_void_p,
+        connection_index : int,
+    ) -> SimulatedConnection:
+        connection = self._port(fd, connection_index)
+
+        if connection is None:
+            raise_ex(ERROR_INVALID_PARAMETER)
+
+        return cast(SimulatedConnection, connection)
+
+    def _get_root_hub_name(
+        self,
+        fd : C.c_void_p,
+    ) -> str:
+        return self._opened(fd, SimulatedHostController).root_hub_name
+
+    def _get_node_info(
+        self,
+        fd : C.c_void_p,
+    ) -> USBHubNodeInformation:
+        hub = self._opened(fd, SimulatedHub)
+
+        return USBHubNodeInformation(
+            is_bus_powered = False,
+            number_of_ports = len(hub.ports),
+            hub_characteristics = 0,
+            power_on_to_power_good = 0,
+            hub_control_current = 0,
+            remove_and_power_mask = [],
+        )
+
+    def _get_hub_info(
+        self,
+        fd : C.c_void_p,
+    ) -> USBHubInformation:
+        hub = self._opened(fd, SimulatedHub)
+
+        return USBHubInformation(
+            highest_port_number = len(hub.ports),
+            number_of_ports = len(hub.ports),
+            hub_characteristics = 0,
+            power_on_to_power_good = 0,
+            hub_control_current = 0,
+            remove_and_power_mask = [],
+        )
+
+    def _get_hub_capabilities(
+        self,
+        fd : C.c_void_p,
+    ) -> USBHubCapabilities:
+        hub = self._opened(fd, SimulatedHub)
+
+        return USBHubCapabilities(
+            is_high_speed_capable = True,
+            is_high_speed = True,
+            is_multi_tt_capable = False,
+            is_multi_tt = False,
+            is_root = any(hc.id == hub.parent for hc in self.topology.controllers),
+            is_armed_wake_on_connect = False,
+            is_bus_powered = False,
+        )
+
+    def _get_connector_props(
+        self,
+        fd : C.c_void_p,
+        connection_index : int,
+    ) -> USBConnectorProps:
+        self._port(fd, connection_index)
+
+        return _simulated_connector_props(connection_index + 1, self._opened(fd, SimulatedHub))
+
+    def _get_connection_info(
+        self,
+        fd : C.c_void_p,
+        connection_index : int,
+    ) -> USBNodeConnectionInfoEx:
+        return _simulated_connection_info(connection_index + 1, self._port(fd, connection_index))
+
+    def _get_connection_info_v2(
+        self,
+        fd : C.c_void_p,
+        connection_index : int,
+    ) -> USBNodeConnectionInfoExV2:
+        self._port(fd, connection_index)
+
+        return USBNodeConnectionInfoExV2(
+            connection_index = connection_index + 1,
+            is_usb_110_supported = True,
+            is_usb_200_supported = True,
+            is_usb_300_supported = False,
+            is_device_operating_at_super_speed_or_higher = False,
+            is_device_super_speed_capable_or_higher = False,
+            is_device_operating_at_super_speed_plus_or_higher = False,
+            is_device_super_speed_plus_capable_or_higher = False,
+        )
+
+    def _get_driver_key_name(
+        self,
+        fd : C.c_void_p,
+        connection_index : int,
+    ) -> str:
+        return self._connected(fd, connection_index).driver_key_name
+
+    def _get_configuration_descriptor(
+        self,
+        fd : C.c_void_p,
+        connection_index : int,
+        configuration_index : int = 0,
+        view : Any = None,
+    ) -> USBConfigurationDescriptor:
+        self._connected(fd, connection_index)
+        raw = bytes([9, 2, 9, 0, 0, 1, 0, 0x80, 50])
+
+        return USBConfigurationDescriptor(
+            total_length = len(raw),
+            number_of_interfaces = 0,
+            configuration_value = 1,
+            configuration_index = configuration_index,
+            attributes = 0x80,
+            max_power = 50,
+            raw = raw,
+        )
+
+    def _get_device_strings(
+        self,
+        fd : C.c_void_p,
+        connection_index : int,
+        device_descriptor : USBDeviceDescriptor,
+        language_ids : Any = None,
+        view : Any = None,
+    ) -> USBDeviceStrings:
+        connection = self._connected(fd, connection_index)
+
+        return USBDeviceStrings(
+            language_ids = [0x0409],
+            manufacturer = "Simulated",
+            product = connection.driver_key_name,
+            serial_number = None,
+            strings = {(1, 0x0409): "Simulated", (2, 0x0409): connection.driver_key_name},
+        )
+
+    def call(
+        self,
+        name : str,
+        key : Hashable,
+        target : StructView[Any] | None,
+        func : Callable[..., Any],
+        args : tuple[Any, ...],
+        kwargs : dict[str, Any],
+    ) -> Any:
+        handler = self._handlers.get(name)
+
+        if handler is None:
+            raise ReplayMismatch(f"No simulated call {name}{key}")
+
+        code = _USB_IOCTLS.get(name)
+        traced = code is not None and instrumentation.is_enabled()
+        started = time.perf_counter_ns() if traced else 0
+
+        with self._lock:
+            self.native_calls += 1
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+        try:
+            if self.delay > 0:
+                time.sleep(self.delay)
+            return handler(*args, **kwargs)
+        finally:
+            if traced and code is not None:
+                instrumentation.record(f"IOCTL.{code.name}", time.perf_counter_ns() - started, 0)
+
+    def __enter__(
+        self,
+    ) -> SimulatedUSBMachine:
+        install(self)
+        return self
+
+    def __exit__(
+        self,
+        *args : Any,
+    ) -> None:
+        uninstall(self)
+
+_SERIALCOMM_KEY_HANDLE = 0x5E71A1
+
+_NATIVE_CALLS = {
+    "SetupAPI.get_class_devs": 1,
+    "SetupAPI.next_device_info": 1,
+    "SetupAPI.get_device_interface": 1,
+    "SetupAPI.get_device_interface_devpath": 2,
+    "SetupAPI.get_device_instance_id": 2,
+    "SetupAPI.get_device_property": 2,
+    "SetupAPI.get_device_specific_registry_data": 1,
+    "SetupAPI.free_device_list": 1,
+    "WinReg.open_registry_key": 1,
+    "WinReg.get_registry_key_value": 2,
+    "WinReg.free_regkey": 1,
+}
+
+class SimulatedSerialMachine(Backend):
+    def __init__(
+        self,
+        ports : int = 256,
+        delay : float = 0.00005,
+    ) -> None:
+        self.ports = ports
+        self.delay = delay
+        self.native_calls = 0
+        self._handlers : dict[str, Callable[..., Any]] = {
+            "SetupAPI.get_class_devs": lambda *args: C.c_void_p(1),
+            "SetupAPI.next_device_info": self._next_device_info,
+            "SetupAPI.get_device_interface": self._get_device_interface,
+            "SetupAPI.get_device_interface_devpath": self._get_device_interface_devpath,
+            "SetupAPI.get_device_instance_id": self._get_device_instance_id,
+            "SetupAPI.get_device_property": lambda *args: "SIMCOM\\BUS",
+            "SetupAPI.get_device_specific_registry_data": self._get_device_specific_registry_data,
+            "SetupAPI.free_device_list": lambda *args: None,
+            "WinReg.open_registry_key": lambda *args: C.c_void_p(_SERIALCOMM_KEY_HANDLE),
+            "WinReg.get_registry_key_value": self._get_registry_key_value,
+            "WinReg.get_registry_string_values": self._get_registry_string_values,
+            "WinReg.free_regkey": lambda *args: None,
+        }
+
+    def _next_device_info(
+        self,
+        hdevinfo : C.c_void_p,
+        index : int,
+    ) -> DevInfoData:
+        if index >= self.ports:
+            raise_ex(ERROR_NO_MORE_ITEMS)
+
+        return DevInfoData(DevInterfaceGuids.COMPORT.value, index + 1, C.c_void_p(0))
+
+    def _get_device_interface(
+        self,
+        hdevinfo : C.c_void_p,
+        guid : UUID,
+        index : int,
+    ) -> DevInterfaceData:
+        return DevInterfaceData(guid, DevInterfaceFlags.ACTIVE, C.c_void_p(index + 1))
+
+    def _get_device_interface_devpath(
+        self,
+        hdevinfo : C.c_void_p,
+        interfaceinfo : DevInterfaceData,
+    ) -> str:
+        return f"\\\\?\\SIMCOM#{interfaceinfo.reserved.value}"
+
+    def _get_device_instance_id(
+        self,
+        hdevinfo : C.c_void_p,
+        devinfo : DevInfoData,
+    ) -> str:
+        return f"SIMCOM\\PORT{devinfo.dev_inst_handle}"
+
+    def _get_device_specific_registry_data(
+        self,
+        hdevinfo : C.c_void_p,
+        devinfo : DevInfoData,
+    ) -> C.c_void_p:
+        return C.c_void_p(devinfo.dev_inst_handle)
+
+    def _get_registry_key_value(
+        self,
+        regkey : C.c_void_p,
+        field_name : str,
+    ) -> str:
+        return f"COM{regkey.value}"
+
+    def _get_registry_string_values(
+        self,
+        regkey : C.c_void_p,
+    ) -> dict[str, str]:
+        return {
+            f"\\Device\\Serial{i}": f"COM{i + 1}" for i in range(self.ports)
+        }
+
+    def call(
+        self,
+        name : str,
+        key : Hashable,
+        target : StructView[Any] | None,
+        func : Callable[..., Any],
+        args : tuple[Any, ...],
+        kwargs : dict[str, Any],
+    ) -> Any:
+        handler = self._handlers.get(name)
+
+        if handler is None:
+            raise ReplayMismatch(f"No simulated call {name}{key}")
+
+        native_calls = self.ports + 2 \
+            if name == "WinReg.get_registry_string_values" \
+            else _NATIVE_CALLS[name]
+        self.native_calls += native_calls
+        time.sleep(self.delay * native_calls)
+
+        return handler(*args, **kwargs)
+
+    def __enter__(
+        self,
+    ) -> SimulatedSerialMachine:
+        install(self)
+        return self
+
+    def __exit__(
+        self,
+        *args : Any,
+    ) -> None:
+        uninstall(self)
+
+class SimulatedSerialDevice:
+    def __init__(
+        self,
+        port : SerialPort,
+        terminator : bytes = b"\n",
+        respond : Callable[[memoryview], bytes | bytearray | memoryview] | None = None,
+        delay : float = 0.0,
+    ) -> None:
+        self.receiver = EventDrivenReceiver(port, terminator)
+        self.respond = respond
+        self.delay = delay
+        self.transactions = 0
+        self._stopping = threading.Event()
+        self._thread : threading.Thread | None = None
+
+    def start(
+        self,
+    ) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+    def stop(
+        self,
+    ) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(
+        self,
+    ) -> None:
+        while not self._stopping.is_set():
+            try:
+                request = self.receiver.receive(0.05)
+            except SerialTimeout:
+                continue
+            except OSError:
+                return
+
+            if self.delay > 0:
+                time.sleep(self.delay)
+
+            self.receiver.port.write_all(request if self.respond is None else self.respond(request))
+            self.transactions += 1
+
+    def __enter__(
+        self,
+    ) -> SimulatedSerialDevice:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        *args : Any,
+    ) -> None:
+        self.stop()
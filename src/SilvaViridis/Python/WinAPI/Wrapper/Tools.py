@@ -1,14 +1,152 @@
-from .COMPortDeviceManager import COMPortDevice
-from .USBDeviceManager import Device
+from collections.abc import Callable, Iterable, Mapping, Sequence
+
+from .COMPortDeviceManager import COMPortDevice, enumerate_comport_devices
+from .USBDeviceManager import Device, USBInterface, USBNode, USBPort, walk_usb_tree
+
+def index_comports_by_parent(
+    comports : Sequence[COMPortDevice],
+) -> dict[str, list[COMPortDevice]]:
+    result : dict[str, list[COMPortDevice]] = {}
+
+    for port in comports:
+        result.setdefault(port.parent.lower(), []).append(port)
+
+    return result
+
+class ComPortIndex:
+    def __init__(
+        self,
+        comports : Iterable[COMPortDevice] | None = None,
+        interfaces : Iterable[Device] = (),
+    ) -> None:
+        self.by_instance_id : dict[str, COMPortDevice] = {}
+        self.by_parent : dict[str, list[COMPortDevice]] = {}
+        self.by_usb_device : dict[str, list[COMPortDevice]] = {}
+        self._parents = {
+            interface.id.lower(): interface.parent.lower() for interface in interfaces
+        }
+        self._keys : dict[str, tuple[str, str | None]] = {}
+
+        for port in enumerate_comport_devices() if comports is None else comports:
+            self.add(port)
+
+    def __len__(
+        self,
+    ) -> int:
+        return len(self.by_instance_id)
+
+    def _usb_device_of(
+        self,
+        parent : str,
+    ) -> str | None:
+        seen = {parent}
+        current = parent
+
+        while USBInterface.mi_pattern.search(current) is None:
+            current = self._parents.get(current)
+
+            if current is None or current in seen:
+                return None
+
+            seen.add(current)
+
+        return self._parents.get(current)
+
+    def add(
+        self,
+        port : COMPortDevice,
+    ) -> None:
+        key = port.id.lower()
+
+        if key in self.by_instance_id:
+            self.remove(port.id)
+
+        parent = port.parent.lower()
+        usb_device = self._usb_device_of(parent)
+
+        self.by_instance_id[key] = port
+        self.by_parent.setdefault(parent, []).append(port)
+
+        if usb_device is not None:
+            self.by_usb_device.setdefault(usb_device, []).append(port)
+
+        self._keys[key] = (parent, usb_device)
+
+    def remove(
+        self,
+        instance_id : str,
+    ) -> COMPortDevice | None:
+        key = instance_id.lower()
+        port = self.by_instance_id.pop(key, None)
+
+        if port is None:
+            return None
+
+        parent, usb_device = self._keys.pop(key)
+
+        for ports_by_key, ports_key in ((self.by_parent, parent), (self.by_usb_device, usb_device)):
+            if ports_key is None:
+                continue
+            ports = ports_by_key[ports_key]
+            ports.remove(port)
+            if len(ports) == 0:
+                del ports_by_key[ports_key]
+
+        return port
+
+    def find(
+        self,
+        instance_id : str,
+    ) -> list[COMPortDevice]:
+        key = instance_id.lower()
+        return [*self.by_parent.get(key, []), *self.by_usb_device.get(key, [])]
+
+    def map_usb_tree(
+        self,
+        usb_tree : list[USBNode],
+        expand_lazy : bool = False,
+    ) -> dict[USBNode, list[COMPortDevice]]:
+        result : dict[USBNode, list[COMPortDevice]] = {}
+
+        for node, _ in walk_usb_tree(usb_tree, expand_lazy = expand_lazy):
+            if isinstance(node.device, USBPort):
+                continue
+
+            ports = self.find(node.device.id)
+
+            if len(ports) > 0:
+                result[node] = ports
+
+        return result
 
 def get_comports_for_usb(
     device : Device,
-    comports : list[COMPortDevice],
+    comports : Sequence[COMPortDevice] | Mapping[str, list[COMPortDevice]] | ComPortIndex,
 ) -> list[str]:
-    result : list[str] = []
+    if isinstance(comports, ComPortIndex):
+        return [port.get_port_name() for port in comports.find(device.id)]
 
-    for port in comports:
-        if port.parent.lower() == device.id.lower():
-            result.append(port.get_port_name())
+    if not isinstance(comports, Mapping):
+        comports = index_comports_by_parent(comports)
 
-    return result
+    return [
+        port.get_port_name() for port in comports.get(device.id.lower(), [])
+    ]
+
+def comport_annotation(
+    comports : Sequence[COMPortDevice] | Mapping[str, list[COMPortDevice]] | ComPortIndex,
+) -> Callable[[USBNode], str]:
+    if not isinstance(comports, (Mapping, ComPortIndex)):
+        comports = ComPortIndex(comports)
+
+    index = comports
+
+    def get_additional_info(
+        node : USBNode,
+    ) -> str:
+        if isinstance(node.device, USBPort):
+            return ""
+        ports = get_comports_for_usb(node.device, index)
+        return "" if len(ports) == 0 else f" # {", ".join(ports)}"
+
+    return get_additional_info
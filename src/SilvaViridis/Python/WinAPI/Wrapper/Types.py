@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import ctypes as C
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, Flag
 from uuid import UUID
 
@@ -19,6 +19,12 @@ from ..types import (
 
 INVALID_HANDLE_VALUE = -1
 
+MAXDWORD = 0xFFFFFFFF
+
+INFINITE = 0xFFFFFFFF
+WAIT_OBJECT_0 = 0x00000000
+WAIT_TIMEOUT = 0x00000102
+
 TRUE = 1
 FALSE = 0
 
@@ -56,6 +62,12 @@ class CreationModes(Enum):
     OPEN_ALWAYS = 4
     TRUNCATE_EXISTING = 5
 
+class FileFlags(Flag):
+    NONE = 0x00000000
+    OVERLAPPED = 0x40000000
+    NO_BUFFERING = 0x20000000
+    WRITE_THROUGH = 0x80000000
+
 class DeviceTypes(Enum):
     BEEP = 0x00000001
     CD_ROM = 0x00000002
@@ -229,6 +241,17 @@ class CtlCodes(Enum):
     USB_GET_NODE_CONNECTION_INFORMATION_EX = usb_ctl(UserModeIOCTLFunctionCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX)
     USB_GET_NODE_CONNECTION_DRIVERKEY_NAME = usb_ctl(UserModeIOCTLFunctionCodes.USB_GET_NODE_CONNECTION_DRIVERKEY_NAME)
     USB_GET_NODE_CONNECTION_NAME = usb_ctl(UserModeIOCTLFunctionCodes.USB_GET_NODE_CONNECTION_NAME)
+    USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION = usb_ctl(UserModeIOCTLFunctionCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION)
+
+class IOCTLCachePolicyKinds(Enum):
+    NEVER = 0
+    TTL = 1
+    IMMUTABLE = 2
+
+@dataclass(frozen = True)
+class IOCTLCachePolicy:
+    kind : IOCTLCachePolicyKinds
+    ttl : float = 0.0
 
 class USBUserRequestCodes(Enum):
     GET_CONTROLLER_INFO_0 = 0x00000001
@@ -310,6 +333,66 @@ class ControllerInfo:
     controller_flavor : USBControllerFlavors
     hc_feature_flags : HCFeatureFlags
 
+class WDMUSBPowerStates(Enum):
+    NotMapped = 0
+    SystemUnspecified = 100
+    SystemWorking = 101
+    SystemSleeping1 = 102
+    SystemSleeping2 = 103
+    SystemSleeping3 = 104
+    SystemHibernate = 105
+    SystemShutdown = 106
+    DeviceUnspecified = 200
+    DeviceD0 = 201
+    DeviceD1 = 202
+    DeviceD2 = 203
+    DeviceD3 = 204
+
+@dataclass
+class USBBusStatistics:
+    device_count : int
+    current_system_time : int
+    current_usb_frame : int
+    bulk_bytes : int
+    iso_bytes : int
+    interrupt_bytes : int
+    control_data_bytes : int
+    pci_interrupt_count : int
+    hard_reset_count : int
+    worker_signal_count : int
+    common_buffer_bytes : int
+    worker_idle_time_ms : int
+    root_hub_enabled : bool
+    root_hub_device_power_state : int
+    name_index : int
+
+@dataclass
+class USBBandwidthInfo:
+    device_count : int
+    total_bus_bandwidth : int
+    total_32sec_bandwidth : int
+    alloced_bulk_and_control : int
+    alloced_iso : int
+    alloced_interrupt_1ms : int
+    alloced_interrupt_2ms : int
+    alloced_interrupt_4ms : int
+    alloced_interrupt_8ms : int
+    alloced_interrupt_16ms : int
+    alloced_interrupt_32ms : int
+
+@dataclass
+class USBPowerInfo:
+    system_state : WDMUSBPowerStates
+    hc_device_power_state : WDMUSBPowerStates
+    hc_device_wake : WDMUSBPowerStates
+    hc_system_wake : WDMUSBPowerStates
+    rh_device_power_state : WDMUSBPowerStates
+    rh_device_wake : WDMUSBPowerStates
+    rh_system_wake : WDMUSBPowerStates
+    last_system_sleep_state : WDMUSBPowerStates
+    can_wakeup : bool
+    is_powered : bool
+
 class GMems(Flag):
     FIXED = 0x0000
     MOVEABLE = 0x0002
@@ -335,6 +418,36 @@ class DevInterfaceGuids(Enum):
     USB_HOST_CONTROLLER = UUID("3abf6f2d-71c4-462a-8a92-1e6861e6af27")
     COMPORT = UUID("86e0d1e0-8089-11d0-9ce4-08003e301f73")
 
+CR_SUCCESS = 0
+
+class CMNotifyFilterTypes(Enum):
+    DEVICEINTERFACE = 0
+    DEVICEHANDLE = 1
+    DEVICEINSTANCE = 2
+
+class CMNotifyFilterFlags(Flag):
+    NONE = 0x00000000
+    ALL_INTERFACE_CLASSES = 0x00000001
+    ALL_DEVICE_INSTANCES = 0x00000002
+
+class CMNotifyActions(Enum):
+    DEVICEINTERFACEARRIVAL = 0
+    DEVICEINTERFACEREMOVAL = 1
+    DEVICEQUERYREMOVE = 2
+    DEVICEQUERYREMOVEFAILED = 3
+    DEVICEREMOVEPENDING = 4
+    DEVICEREMOVECOMPLETE = 5
+    DEVICECUSTOMEVENT = 6
+    DEVICEINSTANCEENUMERATED = 7
+    DEVICEINSTANCESTARTED = 8
+    DEVICEINSTANCEREMOVED = 9
+
+@dataclass(frozen = True)
+class DeviceInterfaceNotification:
+    action : CMNotifyActions
+    interface_class_guid : UUID
+    symbolic_link : str
+
 class IncludedInfoFlags(Flag):
     DEFAULT = 0x00000001
     PRESENT = 0x00000002
@@ -522,14 +635,93 @@ class USBConnectionStatuses(Enum):
     DeviceEnumerating = 9
     DeviceReset = 10
 
-# TODO: more fields
+@dataclass
+class USBDeviceDescriptor:
+    bcd_usb : int
+    device_class : int
+    device_sub_class : int
+    device_protocol : int
+    max_packet_size_0 : int
+    vendor_id : int
+    product_id : int
+    bcd_device : int
+    manufacturer_index : int
+    product_index : int
+    serial_number_index : int
+    number_of_configurations : int
+
+@dataclass
+class USBEndpointDescriptor:
+    endpoint_address : int
+    attributes : int
+    max_packet_size : int
+    interval : int
+
+@dataclass
+class USBPipeInfo:
+    endpoint_descriptor : USBEndpointDescriptor
+    schedule_offset : int
+
+class USBRequestTypes(Flag):
+    HOST_TO_DEVICE = 0x00
+    DEVICE_TO_HOST = 0x80
+    STANDARD = 0x00
+    CLASS = 0x20
+    VENDOR = 0x40
+    DEVICE = 0x00
+    INTERFACE = 0x01
+    ENDPOINT = 0x02
+
+class USBRequestCodes(Enum):
+    GET_STATUS = 0x00
+    CLEAR_FEATURE = 0x01
+    SET_FEATURE = 0x03
+    SET_ADDRESS = 0x05
+    GET_DESCRIPTOR = 0x06
+    SET_DESCRIPTOR = 0x07
+    GET_CONFIGURATION = 0x08
+    SET_CONFIGURATION = 0x09
+    GET_INTERFACE = 0x0a
+    SET_INTERFACE = 0x0b
+    SYNC_FRAME = 0x0c
+
+class USBDescriptorTypes(Enum):
+    DEVICE = 0x01
+    CONFIGURATION = 0x02
+    STRING = 0x03
+    INTERFACE = 0x04
+    ENDPOINT = 0x05
+
+@dataclass
+class USBConfigurationDescriptor:
+    total_length : int
+    number_of_interfaces : int
+    configuration_value : int
+    configuration_index : int
+    attributes : int
+    max_power : int
+    raw : bytes
+
+@dataclass
+class USBDeviceStrings:
+    language_ids : list[int]
+    manufacturer : str | None
+    product : str | None
+    serial_number : str | None
+    strings : dict[tuple[int, int], str]
+    missing : list[tuple[int, int]] = field(default_factory = list[tuple[int, int]])
+
 @dataclass
 class USBNodeConnectionInfoEx:
     connection_index : int
+    device_descriptor : USBDeviceDescriptor
+    current_configuration_value : int
     speed : USBDeviceSpeeds
     device_is_hub : bool
     device_address : int
+    number_of_open_pipes : int
     connection_status : USBConnectionStatuses
+    pipe_list : list[USBPipeInfo]
 
 @dataclass
 class USBControllerDevIDInfo:
@@ -600,3 +792,85 @@ class RegistryAccessRights(Flag):
     WOW64_32KEY = 0x0200
     WOW64_64KEY = 0x0100
     WOW64_RES = 0x0300
+    READ = 0x00020019
+
+class RegistryRootKeys(Enum):
+    CLASSES_ROOT = 0x80000000
+    CURRENT_USER = 0x80000001
+    LOCAL_MACHINE = 0x80000002
+    USERS = 0x80000003
+
+class Parities(Enum):
+    NONE = 0
+    ODD = 1
+    EVEN = 2
+    MARK = 3
+    SPACE = 4
+
+class StopBits(Enum):
+    ONE = 0
+    ONE_POINT_FIVE = 1
+    TWO = 2
+
+class DTRControls(Enum):
+    DISABLE = 0
+    ENABLE = 1
+    HANDSHAKE = 2
+
+class RTSControls(Enum):
+    DISABLE = 0
+    ENABLE = 1
+    HANDSHAKE = 2
+    TOGGLE = 3
+
+class PurgeFlags(Flag):
+    TXABORT = 0x0001
+    RXABORT = 0x0002
+    TXCLEAR = 0x0004
+    RXCLEAR = 0x0008
+
+class CommEvents(Flag):
+    NONE = 0x0000
+    RXCHAR = 0x0001
+    RXFLAG = 0x0002
+    TXEMPTY = 0x0004
+    CTS = 0x0008
+    DSR = 0x0010
+    RLSD = 0x0020
+    BREAK = 0x0040
+    ERR = 0x0080
+    RING = 0x0100
+    PERR = 0x0200
+    RX80FULL = 0x0400
+    EVENT1 = 0x0800
+    EVENT2 = 0x1000
+
+@dataclass
+class SerialSettings:
+    baud_rate : int
+    byte_size : int = 8
+    parity : Parities = Parities.NONE
+    stop_bits : StopBits = StopBits.ONE
+    dtr_control : DTRControls = DTRControls.ENABLE
+    rts_control : RTSControls = RTSControls.ENABLE
+    event_char : int | None = None
+
+@dataclass
+class SerialTimeouts:
+    read_interval : int = MAXDWORD
+    read_total_multiplier : int = MAXDWORD
+    read_total_constant : int = 100
+    write_total_multiplier : int = 0
+    write_total_constant : int = 0
+
+EVENT_DRIVEN_TIMEOUTS = SerialTimeouts(
+    read_interval = MAXDWORD,
+    read_total_multiplier = 0,
+    read_total_constant = 0,
+)
+
+STREAMING_TIMEOUTS = SerialTimeouts(
+    read_interval = MAXDWORD,
+    read_total_multiplier = MAXDWORD,
+    read_total_constant = MAXDWORD - 1,
+)
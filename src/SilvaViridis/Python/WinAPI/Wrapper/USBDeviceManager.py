@@ -2,26 +2,35 @@ from __future__ import annotations
 
 import ctypes as C
 import re
+import sys
 
-from collections.abc import Callable, Generator, Iterable
+from collections import deque
+from collections.abc import Callable, Generator, Hashable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Literal
+from typing import Literal, TextIO
 
 from .DeviceManager import (
     Device,
+    enumerate_device_instances,
     enumerate_devices,
 )
 
-from .IO import (
-    create_file,
-    close_file,
+from .HandlePool import (
+    DEVICE_GONE_EXCEPTIONS,
+    handle_pool,
 )
 
 from .IOAPISet import (
+    ioctl_cache,
     ioctl_get_hcd_driver_key_name,
     ioctl_get_root_hub_name,
+    ioctl_get_usb_bandwidth_info,
+    ioctl_get_usb_bus_statistics,
+    ioctl_get_usb_configuration_descriptor,
     ioctl_get_usb_controller_info,
+    ioctl_get_usb_device_strings,
     ioctl_get_usb_hub_capabilities_ex,
     ioctl_get_usb_hub_extra_info,
     ioctl_get_usb_node_connection_driver_key_name,
@@ -30,68 +39,113 @@ from .IOAPISet import (
     ioctl_get_node_connection_name,
     ioctl_get_usb_node_info,
     ioctl_get_usb_port_connector_props,
+    ioctl_get_usb_power_info,
+)
+
+from .Views import (
+    USBDescriptorRequestView,
 )
 
 from .Types import (
     ControllerInfo,
-    CreationModes,
+    CtlCodes,
     DevProperties,
-    GenericRights,
-    ShareModes,
     USB30HubInformation,
     USBConnectorProps,
+    USBBandwidthInfo,
+    USBBusStatistics,
+    USBConfigurationDescriptor,
     USBConnectionStatuses,
     USBControllerDevIDInfo,
+    USBDeviceStrings,
     DevInterfaceGuids,
     USBHubCapabilities,
     USBHubInformation,
     USBHubNodeInformation,
     USBNodeConnectionInfoEx,
     USBNodeConnectionInfoExV2,
+    USBPowerInfo,
+    WDMUSBPowerStates,
 )
 
+handle_pool.add_invalidation_listener(ioctl_cache.invalidate_device)
+
+def _try_ioctl[T](
+    fd : C.c_void_p,
+    ioctl : Callable[[], T],
+    path : str | None = None,
+    code : CtlCodes | None = None,
+    connection_index : int | None = None,
+    variant : Hashable = None,
+    is_cacheable : Callable[[T], bool] | None = None,
+) -> T | None:
+    try:
+        if path is None or code is None:
+            return ioctl()
+        return ioctl_cache.fetch(path, code, connection_index, ioctl, variant, is_cacheable)
+    except Exception as ex:
+        handle_pool.report_error(fd, ex)
+        return None
+
 class USBHostController(Device):
     @contextmanager
     def open_file(
         self,
     ) -> Generator[C.c_void_p]:
-        hcfd = create_file(
-            self.path,
-            GenericRights.WRITE,
-            ShareModes.WRITE,
-            CreationModes.OPEN_EXISTING,
-        )
-        try:
+        with handle_pool.open(self.path) as hcfd:
             yield hcfd
-        finally:
-            close_file(hcfd)
 
     def get_root_hub_name(
         self,
         hcfd : C.c_void_p,
     ) -> str | None:
-        try:
-            return ioctl_get_root_hub_name(hcfd)
-        except:
-            return None
+        return _try_ioctl(
+            hcfd,
+            lambda: ioctl_get_root_hub_name(hcfd),
+            self.path,
+            CtlCodes.USB_GET_ROOT_HUB_NAME,
+        )
 
     def get_driver_key_name(
         self,
         hcfd : C.c_void_p,
     ) -> str | None:
-        try:
-            return ioctl_get_hcd_driver_key_name(hcfd)
-        except:
-            return None
+        return _try_ioctl(
+            hcfd,
+            lambda: ioctl_get_hcd_driver_key_name(hcfd),
+            self.path,
+            CtlCodes.GET_HCD_DRIVERKEY_NAME,
+        )
 
     def get_controller_info(
         self,
         hcfd : C.c_void_p,
     ) -> ControllerInfo | None:
-        try:
-            return ioctl_get_usb_controller_info(hcfd)
-        except:
-            return None
+        return _try_ioctl(
+            hcfd,
+            lambda: ioctl_get_usb_controller_info(hcfd),
+            self.path,
+            CtlCodes.USB_USER_REQUEST,
+        )
+
+    def get_bus_statistics(
+        self,
+        hcfd : C.c_void_p,
+    ) -> USBBusStatistics | None:
+        return _try_ioctl(hcfd, lambda: ioctl_get_usb_bus_statistics(hcfd))
+
+    def get_bandwidth_info(
+        self,
+        hcfd : C.c_void_p,
+    ) -> USBBandwidthInfo | None:
+        return _try_ioctl(hcfd, lambda: ioctl_get_usb_bandwidth_info(hcfd))
+
+    def get_power_info(
+        self,
+        hcfd : C.c_void_p,
+        system_state : WDMUSBPowerStates = WDMUSBPowerStates.SystemWorking,
+    ) -> USBPowerInfo | None:
+        return _try_ioctl(hcfd, lambda: ioctl_get_usb_power_info(hcfd, system_state))
 
     hc_devid_pattern = re.compile(r"^PCI\\VEN_(.+)&DEV_(.+)&SUBSYS_(.+)&REV_(.+)\\.+$")
 
@@ -113,113 +167,247 @@ class USBHostController(Device):
         )
 
 class USBHub(Device):
+    hub_info : USBHubInformation | USB30HubInformation | None = None
+    capabilities : USBHubCapabilities | None = None
+
     @contextmanager
     def open_file(
         self,
     ) -> Generator[C.c_void_p]:
-        hubfd = create_file(
-            self.path,
-            GenericRights.WRITE,
-            ShareModes.WRITE,
-            CreationModes.OPEN_EXISTING,
-        )
-        try:
+        with handle_pool.open(self.path) as hubfd:
             yield hubfd
-        finally:
-            close_file(hubfd)
+
+    def get_port(
+        self,
+        index : int,
+    ) -> USBPort:
+        return USBPort(index, self.path)
 
     def get_node_info(
         self,
         hubfd : C.c_void_p,
     ) -> USBHubNodeInformation | None:
         try:
-            info = ioctl_get_usb_node_info(hubfd)
+            info = ioctl_cache.fetch(
+                self.path,
+                CtlCodes.USB_GET_NODE_INFORMATION,
+                None,
+                lambda: ioctl_get_usb_node_info(hubfd),
+            )
 
             if not isinstance(info, USBHubNodeInformation):
                 raise ValueError("The USB node is not a hub")
 
             return info
-        except:
+        except Exception as ex:
+            handle_pool.report_error(hubfd, ex)
             return None
 
     def get_hub_info(
         self,
         hubfd : C.c_void_p,
     ) -> USBHubInformation | USB30HubInformation | None:
-        try:
-            return ioctl_get_usb_hub_extra_info(hubfd)
-        except:
-            return None
+        return _try_ioctl(
+            hubfd,
+            lambda: ioctl_get_usb_hub_extra_info(hubfd),
+            self.path,
+            CtlCodes.USB_GET_HUB_INFORMATION_EX,
+        )
 
     def get_capabilities(
         self,
         hubfd : C.c_void_p,
     ) -> USBHubCapabilities | None:
-        try:
-            return ioctl_get_usb_hub_capabilities_ex(hubfd)
-        except:
-            return None
+        return _try_ioctl(
+            hubfd,
+            lambda: ioctl_get_usb_hub_capabilities_ex(hubfd),
+            self.path,
+            CtlCodes.USB_GET_HUB_CAPABILITIES_EX,
+        )
+
+type USBPortConnectionState = tuple[USBConnectionStatuses, int, str | None]
 
 class USBPort:
     def __init__(
         self,
         index : int,
+        hub_path : str | None = None,
     ):
         self.index = index
+        self.hub_path = hub_path
+        self.connection_state : USBPortConnectionState | None = None
+        self.connection_info : USBNodeConnectionInfoEx | None = None
+        self.connection_info_v2 : USBNodeConnectionInfoExV2 | None = None
+        self.connector_props : USBConnectorProps | None = None
+        self.configuration_descriptor : USBConfigurationDescriptor | None = None
+        self.device_strings : USBDeviceStrings | None = None
+
+    @property
+    def connection_index(
+        self,
+    ) -> int:
+        return self.index - 1
 
     def get_connector_props(
         self,
         hubfd : C.c_void_p,
     ) -> USBConnectorProps | None:
-        try:
-            return ioctl_get_usb_port_connector_props(hubfd, self.index)
-        except:
-            return None
+        return _try_ioctl(
+            hubfd,
+            lambda: ioctl_get_usb_port_connector_props(hubfd, self.connection_index),
+            self.hub_path,
+            CtlCodes.USB_GET_PORT_CONNECTOR_PROPERTIES,
+            self.index,
+        )
 
     def get_connection_info(
         self,
         hubfd : C.c_void_p,
     ) -> USBNodeConnectionInfoEx | None:
-        try:
-            return ioctl_get_usb_node_connection_info_ex(hubfd, self.index)
-        except:
-            return None
+        info = _try_ioctl(hubfd, lambda: ioctl_get_usb_node_connection_info_ex(hubfd, self.connection_index))
+
+        if info is not None and self.hub_path is not None:
+            ioctl_cache.observe_connection(
+                self.hub_path,
+                self.index,
+                (info.connection_status, info.device_address, info.device_is_hub),
+            )
+
+        return info
 
     def get_connection_info_2(
         self,
         hubfd : C.c_void_p,
     ) -> USBNodeConnectionInfoExV2 | None:
-        try:
-            return ioctl_get_usb_node_connection_info_ex_v2(hubfd, self.index)
-        except:
-            return None
+        return _try_ioctl(
+            hubfd,
+            lambda: ioctl_get_usb_node_connection_info_ex_v2(hubfd, self.connection_index),
+            self.hub_path,
+            CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX_V2,
+            self.index,
+        )
 
     def get_connection_driver_key_name(
         self,
         hubfd : C.c_void_p,
+        refresh : bool = False,
     ) -> str | None:
-        try:
-            return ioctl_get_usb_node_connection_driver_key_name(hubfd, self.index)
-        except:
-            return None
+        if refresh and self.hub_path is not None:
+            ioctl_cache.invalidate(self.hub_path, CtlCodes.USB_GET_NODE_CONNECTION_DRIVERKEY_NAME, self.index)
+
+        return _try_ioctl(
+            hubfd,
+            lambda: ioctl_get_usb_node_connection_driver_key_name(hubfd, self.connection_index),
+            self.hub_path,
+            CtlCodes.USB_GET_NODE_CONNECTION_DRIVERKEY_NAME,
+            self.index,
+        )
 
     def get_connection_name(
         self,
         hubfd : C.c_void_p,
     ) -> str | None:
-        try:
-            return ioctl_get_node_connection_name(hubfd, self.index)
-        except:
-            return None
+        return _try_ioctl(
+            hubfd,
+            lambda: ioctl_get_node_connection_name(hubfd, self.connection_index),
+            self.hub_path,
+            CtlCodes.USB_GET_NODE_CONNECTION_NAME,
+            self.index,
+        )
+
+    def get_device_strings(
+        self,
+        hubfd : C.c_void_p,
+        connection_info : USBNodeConnectionInfoEx,
+        view : USBDescriptorRequestView | None = None,
+    ) -> USBDeviceStrings | None:
+        return _try_ioctl(
+            hubfd,
+            lambda: ioctl_get_usb_device_strings(
+                hubfd,
+                self.connection_index,
+                connection_info.device_descriptor,
+                view = view,
+            ),
+            self.hub_path,
+            CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION,
+            self.index,
+            ("strings", connection_info.device_address),
+            lambda strings: len(strings.missing) == 0,
+        )
+
+    def get_configuration_descriptor(
+        self,
+        hubfd : C.c_void_p,
+        connection_info : USBNodeConnectionInfoEx,
+        configuration_index : int = 0,
+        view : USBDescriptorRequestView | None = None,
+    ) -> USBConfigurationDescriptor | None:
+        return _try_ioctl(
+            hubfd,
+            lambda: ioctl_get_usb_configuration_descriptor(
+                hubfd,
+                self.connection_index,
+                configuration_index,
+                view,
+            ),
+            self.hub_path,
+            CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION,
+            self.index,
+            ("configuration", connection_info.device_address, configuration_index),
+        )
 
 class USBDevice(Device):
     pass
 
-@dataclass
+class USBInterface(Device):
+    mi_pattern = re.compile(r"&MI_[0-9A-F]{2}(\\|$)", re.IGNORECASE)
+
+    @property
+    def is_interface(
+        self,
+    ) -> bool:
+        return self.mi_pattern.search(self.id) is not None
+
+@dataclass(eq = False, init = False)
 class USBNode:
     parent : USBNode | None
-    device : USBHostController | USBHub | USBPort | USBDevice
-    children : list[USBNode] = field(default_factory = list["USBNode"])
+    device : USBHostController | USBHub | USBPort | USBDevice | USBInterface
+    expander : Callable[[USBNode], None] | None = field(default = None, repr = False)
+
+    def __init__(
+        self,
+        parent : USBNode | None,
+        device : USBHostController | USBHub | USBPort | USBDevice | USBInterface,
+        children : list[USBNode] | None = None,
+        expander : Callable[[USBNode], None] | None = None,
+    ) -> None:
+        self.parent = parent
+        self.device = device
+        self.expander = expander
+        self._children = [] if children is None else children
+
+    @property
+    def children(
+        self,
+    ) -> list[USBNode]:
+        expander = self.expander
+
+        if expander is not None:
+            self.expander = None
+            try:
+                expander(self)
+            except BaseException:
+                self.expander = expander
+                raise
+
+        return self._children
+
+    @property
+    def is_expanded(
+        self,
+    ) -> bool:
+        return self.expander is None
 
 def enumerate_usb_host_controllers(
     properties : Iterable[DevProperties] | Literal["all"] = [],
@@ -248,118 +436,834 @@ def enumerate_usb_devices(
         properties,
     )
 
+def _is_usb_instance(
+    instance_id : str,
+) -> bool:
+    return instance_id.startswith("usb\\")
+
+def enumerate_usb_interfaces(
+    properties : Iterable[DevProperties] | Literal["all"] = [],
+) -> Generator[USBInterface]:
+    return enumerate_device_instances(
+        USBInterface,
+        "USB",
+        properties,
+        descendants_of = _is_usb_instance,
+    )
+
+def _symlink_key(
+    symlink : str,
+) -> str:
+    return symlink.removeprefix("\\\\?\\").removeprefix("\\??\\").lower()
+
+@dataclass
+class USBDeviceIndex:
+    controllers : list[USBHostController]
+    hubs : list[USBHub]
+    devices : list[USBDevice]
+    interfaces : list[USBInterface] = field(default_factory = list[USBInterface])
+    hubs_by_driver : dict[str, USBHub] = field(default_factory = dict[str, USBHub])
+    devices_by_driver : dict[str, USBDevice] = field(default_factory = dict[str, USBDevice])
+    hubs_by_path : dict[str, USBHub] = field(default_factory = dict[str, USBHub])
+    by_instance_id : dict[str, Device] = field(default_factory = dict[str, Device])
+    interfaces_by_parent : dict[str, list[USBInterface]] = field(default_factory = dict[str, list[USBInterface]])
+
+    def __post_init__(
+        self,
+    ) -> None:
+        for dev in [*self.controllers, *self.hubs, *self.devices]:
+            self.by_instance_id.setdefault(dev.id.lower(), dev)
+
+        for interface in self.interfaces:
+            self.interfaces_by_parent.setdefault(interface.parent.lower(), []).append(interface)
+
+        for hub in self.hubs:
+            driver = hub.properties.get(DevProperties.DRIVER)
+            if isinstance(driver, str):
+                self.hubs_by_driver.setdefault(driver.lower(), hub)
+            self.hubs_by_path.setdefault(hub.path[4:].lower(), hub)
+
+        for dev in self.devices:
+            driver = dev.properties.get(DevProperties.DRIVER)
+            if isinstance(driver, str):
+                self.devices_by_driver.setdefault(driver.lower(), dev)
+
+    def find_root_hub(
+        self,
+        root_hub_name : str,
+    ) -> USBHub | None:
+        return self.hubs_by_path.get(root_hub_name.lower())
+
+    def find_hub(
+        self,
+        hub_path_or_instance_id : str,
+    ) -> USBHub | None:
+        key = hub_path_or_instance_id.lower()
+        hub = self.hubs_by_path.get(_symlink_key(key))
+
+        if hub is not None:
+            return hub
+
+        hub = self.by_instance_id.get(key)
+
+        return hub if isinstance(hub, USBHub) else None
+
+    def find_interfaces(
+        self,
+        device : USBDevice,
+    ) -> list[USBInterface]:
+        interfaces = self.interfaces_by_parent.get(device.id.lower(), [])
+
+        if not any(interface.is_interface for interface in interfaces):
+            return []
+
+        return interfaces
+
+    def find_connected(
+        self,
+        driver_key_name : str | None,
+        is_hub : bool,
+    ) -> USBHub | USBDevice | None:
+        if driver_key_name is None:
+            return None
+        if is_hub:
+            return self.hubs_by_driver.get(driver_key_name.lower())
+        return self.devices_by_driver.get(driver_key_name.lower())
+
+def build_usb_device_index(
+    properties : Iterable[DevProperties] = (DevProperties.DEVICEDESC,),
+    include_controllers : bool = True,
+    include_devices : bool = True,
+    include_interfaces : bool = False,
+) -> USBDeviceIndex:
+    properties = list(properties)
+    matched_properties = [DevProperties.DRIVER] + [p for p in properties if p != DevProperties.DRIVER]
+
+    return USBDeviceIndex(
+        controllers = list(enumerate_usb_host_controllers(properties)) if include_controllers else [],
+        hubs = list(enumerate_usb_hubs(matched_properties)),
+        devices = list(enumerate_usb_devices(matched_properties)) if include_devices else [],
+        interfaces = list(enumerate_usb_interfaces(properties)) if include_interfaces else [],
+    )
+
+def resolve_usb_ancestors(
+    device : Device,
+    index : USBDeviceIndex,
+) -> list[Device]:
+    ancestors : list[Device] = []
+    seen = {device.id.lower()}
+    parent = index.by_instance_id.get(device.parent.lower())
+
+    while parent is not None and parent.id.lower() not in seen:
+        ancestors.append(parent)
+        seen.add(parent.id.lower())
+        parent = index.by_instance_id.get(parent.parent.lower())
+
+    ancestors.reverse()
+
+    return ancestors
+
+USB_TREE_FIELDS = frozenset({
+    "connection",
+    "devices",
+    "speed_v2",
+    "connector",
+    "descriptor",
+    "strings",
+    "hub_info",
+    "capabilities",
+    "interfaces",
+})
+
+DEFAULT_USB_TREE_FIELDS = frozenset({
+    "connection",
+    "devices",
+})
+
+@dataclass(frozen = True)
+class _USBTreePlan:
+    resolve_devices : bool
+    speed_v2 : bool
+    connector : bool
+    descriptor : bool
+    strings : bool
+    hub_info : bool
+    capabilities : bool
+    interfaces : bool
+
+def _compile_plan(
+    fields : Iterable[str],
+) -> _USBTreePlan:
+    fields = frozenset(fields)
+    unknown = fields - USB_TREE_FIELDS
+
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown USB tree fields: {", ".join(sorted(unknown))}")
+
+    return _USBTreePlan(
+        resolve_devices = "devices" in fields,
+        speed_v2 = "speed_v2" in fields,
+        connector = "connector" in fields,
+        descriptor = "descriptor" in fields,
+        strings = "strings" in fields,
+        hub_info = "hub_info" in fields,
+        capabilities = "capabilities" in fields,
+        interfaces = "interfaces" in fields,
+    )
+
+type _HubTask = tuple[USBNode, USBHub]
+
+def _expand_controller(
+    node : USBNode,
+    hc : USBHostController,
+    index : USBDeviceIndex,
+) -> list[_HubTask]:
+    with hc.open_file() as hcfd:
+        root_hub_name = hc.get_root_hub_name(hcfd)
+
+    if root_hub_name is None:
+        return []
+
+    root_hub = index.find_root_hub(root_hub_name)
+
+    if root_hub is None:
+        return []
+
+    node_root_hub = USBNode(
+        parent = None,
+        device = root_hub,
+    )
+    node.children.append(node_root_hub)
+
+    return [(node_root_hub, root_hub)]
+
+def _connection_state(
+    connection_info : USBNodeConnectionInfoEx | None,
+    connection_dkn : str | None,
+) -> USBPortConnectionState | None:
+    if connection_info is None:
+        return None
+    return (
+        connection_info.connection_status,
+        connection_info.device_address,
+        connection_dkn,
+    )
+
+def _same_connection(
+    previous : USBPortConnectionState | None,
+    current : USBPortConnectionState | None,
+) -> bool:
+    if previous is None or current is None:
+        return previous == current
+    if previous[:2] != current[:2]:
+        return False
+    return previous[2] is None or current[2] is None or previous[2] == current[2]
+
+def _attach_connection(
+    node_port : USBNode,
+    connection_info : USBNodeConnectionInfoEx | None,
+    connection_dkn : str | None,
+    index : USBDeviceIndex,
+) -> _HubTask | None:
+    if (
+        connection_info is None
+        or connection_info.connection_status == USBConnectionStatuses.NoDeviceConnected
+    ):
+        return None
+
+    connected_dev = index.find_connected(
+        connection_dkn,
+        connection_info.device_is_hub,
+    )
+
+    if connected_dev is None:
+        return None
+
+    node_connected_dev = USBNode(
+        parent = node_port,
+        device = connected_dev,
+    )
+    node_port.children.append(node_connected_dev)
+
+    if isinstance(connected_dev, USBHub):
+        return (node_connected_dev, connected_dev)
+
+    _attach_interfaces(node_connected_dev, connected_dev, index)
+
+    return None
+
+def _attach_interfaces(
+    node : USBNode,
+    device : USBDevice,
+    index : USBDeviceIndex,
+) -> None:
+    stack = [
+        (node, interface) for interface in reversed(index.find_interfaces(device))
+    ]
+
+    while len(stack) > 0:
+        node_parent, interface = stack.pop()
+        node_interface = USBNode(
+            parent = node_parent,
+            device = interface,
+        )
+        node_parent.children.append(node_interface)
+        stack.extend(
+            (node_interface, child) for child in \
+                reversed(index.interfaces_by_parent.get(interface.id.lower(), []))
+        )
+
+def _connection_changed(
+    previous : USBNodeConnectionInfoEx | None,
+    current : USBNodeConnectionInfoEx,
+) -> bool:
+    return (
+        previous is None
+        or previous.connection_status != current.connection_status
+        or previous.device_address != current.device_address
+        or previous.device_is_hub != current.device_is_hub
+        or previous.device_descriptor != current.device_descriptor
+    )
+
+def _read_connection(
+    port : USBPort,
+    hubfd : C.c_void_p,
+    plan : _USBTreePlan,
+    update : bool = False,
+) -> tuple[USBNodeConnectionInfoEx | None, str | None]:
+    previous = port.connection_info
+    connection_info = port.get_connection_info(hubfd)
+    port.connection_info = connection_info
+
+    if (
+        connection_info is None
+        or connection_info.connection_status == USBConnectionStatuses.NoDeviceConnected
+        or not (plan.resolve_devices or connection_info.device_is_hub)
+    ):
+        return connection_info, None
+
+    if (
+        update
+        and port.connection_state is not None
+        and port.connection_state[2] is not None
+        and not _connection_changed(previous, connection_info)
+    ):
+        return connection_info, port.connection_state[2]
+
+    return connection_info, port.get_connection_driver_key_name(hubfd, update)
+
+def _read_port_details(
+    port : USBPort,
+    hubfd : C.c_void_p,
+    plan : _USBTreePlan,
+    connection_info : USBNodeConnectionInfoEx | None,
+) -> None:
+    if plan.speed_v2:
+        port.connection_info_v2 = port.get_connection_info_2(hubfd)
+    if plan.connector:
+        port.connector_props = port.get_connector_props(hubfd)
+
+    if (
+        connection_info is None
+        or connection_info.connection_status != USBConnectionStatuses.DeviceConnected
+    ):
+        return
+
+    if plan.descriptor:
+        port.configuration_descriptor = port.get_configuration_descriptor(hubfd, connection_info)
+    if plan.strings:
+        port.device_strings = port.get_device_strings(hubfd, connection_info)
+
+def _expand_hub(
+    node : USBNode,
+    hub : USBHub,
+    index : USBDeviceIndex,
+    plan : _USBTreePlan,
+) -> list[_HubTask]:
+    pending : list[_HubTask] = []
+
+    with hub.open_file() as hubfd:
+        hub_node_info = hub.get_node_info(hubfd)
+
+        if hub_node_info is None:
+            return pending
+
+        if plan.hub_info:
+            hub.hub_info = hub.get_hub_info(hubfd)
+        if plan.capabilities:
+            hub.capabilities = hub.get_capabilities(hubfd)
+
+        for i in range(hub_node_info.number_of_ports):
+            port = hub.get_port(i + 1)
+            node_port = USBNode(
+                parent = node,
+                device = port,
+            )
+            node.children.append(node_port)
+
+            connection_info, connection_dkn = _read_connection(port, hubfd, plan)
+            _read_port_details(port, hubfd, plan, connection_info)
+            port.connection_state = _connection_state(connection_info, connection_dkn)
+
+            task = _attach_connection(node_port, connection_info, connection_dkn, index)
+
+            if task is not None:
+                pending.append(task)
+
+    return pending
+
+def _expand_hub_lazily(
+    node : USBNode,
+    hub : USBHub,
+    index : USBDeviceIndex,
+    plan : _USBTreePlan,
+) -> None:
+    for task in _expand_hub(node, hub, index, plan):
+        _defer_hub(task, index, plan)
+
+def _defer_hub(
+    task : _HubTask,
+    index : USBDeviceIndex,
+    plan : _USBTreePlan,
+) -> None:
+    node, hub = task
+    node.expander = lambda node: _expand_hub_lazily(node, hub, index, plan)
+
+def _is_deferred(
+    depth : int,
+    max_depth : int | None,
+) -> bool:
+    return max_depth is not None and depth >= max_depth
+
+def _expand_serial(
+    tasks : list[_HubTask],
+    index : USBDeviceIndex,
+    plan : _USBTreePlan,
+    max_depth : int | None = None,
+) -> None:
+    stack = [(task, 0) for task in reversed(tasks)]
+
+    while len(stack) > 0:
+        task, depth = stack.pop()
+
+        if _is_deferred(depth, max_depth):
+            _defer_hub(task, index, plan)
+            continue
+
+        hub_node, hub = task
+        stack.extend(
+            (child_task, depth + 1) for child_task in reversed(_expand_hub(hub_node, hub, index, plan))
+        )
+
+def _build_usb_tree_serial(
+    nodes : list[USBNode],
+    index : USBDeviceIndex,
+    plan : _USBTreePlan,
+    max_depth : int | None,
+) -> None:
+    for node, hc in zip(nodes, index.controllers):
+        _expand_serial(_expand_controller(node, hc, index), index, plan, max_depth)
+
+def _build_usb_tree_parallel(
+    nodes : list[USBNode],
+    index : USBDeviceIndex,
+    plan : _USBTreePlan,
+    max_workers : int,
+    max_per_controller : int,
+    max_depth : int | None,
+) -> None:
+    in_flight = [0] * len(nodes)
+    waiting : list[deque[tuple[_HubTask, int]]] = [deque() for _ in nodes]
+    futures : dict[Future[list[_HubTask]], tuple[int, int]] = {}
+
+    with ThreadPoolExecutor(max_workers = max_workers) as executor:
+        def schedule(
+            controller : int,
+        ) -> None:
+            while in_flight[controller] < max_per_controller and len(waiting[controller]) > 0:
+                (hub_node, hub), depth = waiting[controller].popleft()
+                futures[executor.submit(_expand_hub, hub_node, hub, index, plan)] = (controller, depth + 1)
+                in_flight[controller] += 1
+
+        for controller, (node, hc) in enumerate(zip(nodes, index.controllers)):
+            futures[executor.submit(_expand_controller, node, hc, index)] = (controller, 0)
+            in_flight[controller] += 1
+
+        while len(futures) > 0:
+            done, _ = wait(futures, return_when = FIRST_COMPLETED)
+
+            for future in done:
+                controller, depth = futures.pop(future)
+                in_flight[controller] -= 1
+
+                for task in future.result():
+                    if _is_deferred(depth, max_depth):
+                        _defer_hub(task, index, plan)
+                    else:
+                        waiting[controller].append((task, depth))
+
+                schedule(controller)
+
 def build_usb_tree(
+    index : USBDeviceIndex | None = None,
+    max_workers : int = 1,
+    max_per_controller : int = 4,
+    lazy : bool = False,
+    eager_depth : int = 0,
+    fields : Iterable[str] = DEFAULT_USB_TREE_FIELDS,
 ) -> list[USBNode]:
-    hcs = enumerate_usb_host_controllers([
-        DevProperties.DEVICEDESC,
-    ])
-    hubs = list(enumerate_usb_hubs([
-        DevProperties.DRIVER,
-        DevProperties.DEVICEDESC,
-    ]))
-    devs = list(enumerate_usb_devices([
-        DevProperties.DRIVER,
-        DevProperties.DEVICEDESC,
-    ]))
-
-    def _enumerate_hub(
-        hub : USBHub,
-        parent : USBNode | None,
-    ) -> USBNode:
-        node = USBNode(
-            parent = parent,
-            device = hub,
-        )
+    plan = _compile_plan(fields)
+
+    if index is None:
+        index = build_usb_device_index(include_interfaces = plan.interfaces)
 
-        with hub.open_file() as hubfd:
-            hub_node_info = hub.get_node_info(hubfd)
-
-            if hub_node_info is not None:
-                for i in range(hub_node_info.number_of_ports):
-                    port = USBPort(i + 1)
-                    node_port = USBNode(
-                        parent = node,
-                        device = port,
-                    )
-                    node.children.append(node_port)
-
-                    connection_info = port.get_connection_info(hubfd)
-                    connection_dkn = port.get_connection_driver_key_name(hubfd)
-
-                    if (
-                        connection_info is not None
-                        and connection_info.connection_status != USBConnectionStatuses.NoDeviceConnected
-                    ):
-                        connection_options = hubs \
-                            if connection_info.device_is_hub \
-                            else devs
-
-                        connected_dev = next(
-                            (
-                                dev for dev in connection_options \
-                                    if dev.properties[DevProperties.DRIVER] == connection_dkn
-                            ),
-                            None,
-                        )
-
-                        if connected_dev is not None:
-                            if (
-                                connection_info.device_is_hub
-                                and isinstance(connected_dev, USBHub)
-                            ):
-                                node_connected_dev = _enumerate_hub(
-                                    connected_dev,
-                                    node_port,
-                                )
-                            else:
-                                node_connected_dev = USBNode(
-                                    parent = node_port,
-                                    device = connected_dev,
-                                )
-
-                            node_port.children.append(node_connected_dev)
-
-        return node
-
-    nodes : list[USBNode] = []
-
-    for hc in hcs:
-        node = USBNode(
+    max_depth = eager_depth if lazy else None
+
+    nodes = [
+        USBNode(
             parent = None,
             device = hc,
+        ) for hc in index.controllers
+    ]
+
+    if max_workers <= 1:
+        _build_usb_tree_serial(nodes, index, plan, max_depth)
+    else:
+        _build_usb_tree_parallel(nodes, index, plan, max_workers, max(max_per_controller, 1), max_depth)
+
+    return nodes
+
+def build_usb_subtree(
+    hub_path_or_instance_id : str,
+    index : USBDeviceIndex | None = None,
+    lazy : bool = False,
+    eager_depth : int = 0,
+    fields : Iterable[str] = DEFAULT_USB_TREE_FIELDS,
+) -> USBNode | None:
+    plan = _compile_plan(fields)
+
+    if index is None:
+        index = build_usb_device_index(
+            include_controllers = False,
+            include_devices = plan.resolve_devices,
+            include_interfaces = plan.interfaces,
         )
 
-        with hc.open_file() as hcfd:
-            root_hub_name = hc.get_root_hub_name(hcfd)
+    hub = index.find_hub(hub_path_or_instance_id)
 
-        if root_hub_name is not None:
-            root_hub = next(
-                (
-                    hub for hub in hubs \
-                        if hub.path[4:].lower() == root_hub_name.lower()
-                ),
-                None,
-            )
+    if hub is None:
+        return None
+
+    node = USBNode(
+        parent = None,
+        device = hub,
+    )
 
-            if root_hub is not None:
-                node.children.append(
-                    _enumerate_hub(root_hub, None),
-                )
+    _expand_serial([(node, hub)], index, plan, eager_depth if lazy else None)
 
-        nodes.append(node)
+    return node
 
-    return nodes
+@dataclass
+class USBTreeChanges:
+    changed_ports : list[USBNode] = field(default_factory = list[USBNode])
+    added : list[USBNode] = field(default_factory = list[USBNode])
+    removed : list[USBNode] = field(default_factory = list[USBNode])
+
+    @property
+    def is_empty(
+        self,
+    ) -> bool:
+        return len(self.changed_ports) == 0
+
+def _node_depth(
+    node : USBNode,
+) -> int:
+    depth = 0
+
+    while node.parent is not None:
+        node = node.parent
+        depth += 1
+
+    return depth
+
+def _is_attached(
+    node : USBNode,
+) -> bool:
+    while node.parent is not None:
+        if not any(child is node for child in node.parent.children):
+            return False
+        node = node.parent
+
+    return True
+
+def _update_hubs(
+    hub_nodes : list[USBNode],
+    index : USBDeviceIndex | Callable[[], USBDeviceIndex] | None,
+    plan : _USBTreePlan,
+    descend : bool,
+) -> USBTreeChanges:
+    changes = USBTreeChanges()
+    reprobe : list[tuple[USBNode, USBNodeConnectionInfoEx | None, str | None]] = []
+    stack = list(hub_nodes)
+
+    while len(stack) > 0:
+        hub_node = stack.pop()
+        hub = hub_node.device
+
+        if not isinstance(hub, USBHub) or not hub_node.is_expanded:
+            continue
+
+        if not descend and not _is_attached(hub_node):
+            continue
+
+        try:
+            with hub.open_file() as hubfd:
+                for node_port in hub_node.children:
+                    port = node_port.device
+
+                    if not isinstance(port, USBPort):
+                        continue
+
+                    connection_info, connection_dkn = _read_connection(port, hubfd, plan, True)
+                    state = _connection_state(connection_info, connection_dkn)
+
+                    if _same_connection(port.connection_state, state):
+                        if state is not None and state[2] is not None:
+                            port.connection_state = state
+                        if descend:
+                            stack.extend(
+                                child for child in node_port.children \
+                                    if isinstance(child.device, USBHub)
+                            )
+                        continue
+
+                    _read_port_details(port, hubfd, plan, connection_info)
+                    port.connection_state = state
+                    changes.changed_ports.append(node_port)
+                    changes.removed.extend(node_port.children)
+                    node_port.children.clear()
+                    reprobe.append((node_port, connection_info, connection_dkn))
+        except DEVICE_GONE_EXCEPTIONS:
+            continue
+
+    if not any(
+        connection_info is not None
+        and connection_info.connection_status != USBConnectionStatuses.NoDeviceConnected
+        for _, connection_info, _ in reprobe
+    ):
+        return changes
+
+    if index is None:
+        index = build_usb_device_index(include_interfaces = plan.interfaces)
+    elif not isinstance(index, USBDeviceIndex):
+        index = index()
+
+    tasks : list[_HubTask] = []
+
+    for node_port, connection_info, connection_dkn in reprobe:
+        task = _attach_connection(node_port, connection_info, connection_dkn, index)
+        changes.added.extend(node_port.children)
+
+        if task is not None:
+            tasks.append(task)
+
+    _expand_serial(tasks, index, plan)
+
+    return changes
+
+def update_usb_tree(
+    previous : list[USBNode],
+    index : USBDeviceIndex | Callable[[], USBDeviceIndex] | None = None,
+    fields : Iterable[str] = DEFAULT_USB_TREE_FIELDS,
+) -> USBTreeChanges:
+    return _update_hubs(
+        [
+            child for node in previous for child in node.children \
+                if isinstance(child.device, USBHub)
+        ],
+        index,
+        _compile_plan(fields),
+        True,
+    )
+
+def update_usb_hubs(
+    hub_nodes : Iterable[USBNode],
+    index : USBDeviceIndex | Callable[[], USBDeviceIndex] | None = None,
+    fields : Iterable[str] = DEFAULT_USB_TREE_FIELDS,
+) -> USBTreeChanges:
+    return _update_hubs(
+        sorted(hub_nodes, key = _node_depth, reverse = True),
+        index,
+        _compile_plan(fields),
+        False,
+    )
+
+def get_usb_device_strings(
+    usb_tree : list[USBNode],
+) -> dict[str, USBDeviceStrings]:
+    result : dict[str, USBDeviceStrings] = {}
+    view = USBDescriptorRequestView()
+    stack = list(usb_tree)
+
+    while len(stack) > 0:
+        node = stack.pop()
+        stack.extend(node.children)
+
+        if not isinstance(node.device, USBHub):
+            continue
+
+        with node.device.open_file() as hubfd:
+            for node_port in node.children:
+                port = node_port.device
+
+                if not isinstance(port, USBPort) or len(node_port.children) == 0:
+                    continue
+
+                connected_dev = node_port.children[0].device
+
+                if not isinstance(connected_dev, (USBHub, USBDevice)):
+                    continue
+
+                connection_info = port.get_connection_info(hubfd)
+
+                if (
+                    connection_info is None
+                    or connection_info.connection_status != USBConnectionStatuses.DeviceConnected
+                ):
+                    continue
+
+                strings = port.get_device_strings(hubfd, connection_info, view)
+
+                if strings is not None:
+                    result[connected_dev.id] = strings
+
+    return result
+
+@dataclass(eq = False)
+class USBConnector:
+    ports : list[USBNode] = field(default_factory = list[USBNode])
+
+    @property
+    def connected(
+        self,
+    ) -> list[USBNode]:
+        return [child for node_port in self.ports for child in node_port.children]
+
+    @property
+    def is_user_connectable(
+        self,
+    ) -> bool | None:
+        props = self._connector_props()
+        return None if len(props) == 0 else any(p.port_is_user_connectable for p in props)
+
+    @property
+    def is_type_c(
+        self,
+    ) -> bool | None:
+        props = self._connector_props()
+        return None if len(props) == 0 else any(p.port_connector_is_type_c for p in props)
+
+    def _connector_props(
+        self,
+    ) -> list[USBConnectorProps]:
+        return [
+            node_port.device.connector_props for node_port in self.ports \
+                if isinstance(node_port.device, USBPort) and node_port.device.connector_props is not None
+        ]
+
+def _companion_key(
+    props : USBConnectorProps | None,
+) -> tuple[str, int] | None:
+    if props is None or props.companion_port_number == 0 or len(props.companion_hub_symlink) == 0:
+        return None
+    return (_symlink_key(props.companion_hub_symlink), props.companion_port_number)
+
+def build_usb_connectors(
+    usb_tree : list[USBNode],
+    expand_lazy : bool = False,
+) -> list[USBConnector]:
+    connectors : list[USBConnector] = []
+    by_port : dict[tuple[str, int], USBConnector] = {}
+
+    for node, _ in walk_usb_tree(usb_tree, expand_lazy = expand_lazy):
+        port = node.device
+
+        if not isinstance(port, USBPort) or port.hub_path is None:
+            continue
+
+        key = (_symlink_key(port.hub_path), port.index)
+        companion_key = _companion_key(port.connector_props)
+        connector = by_port.get(key)
+
+        if connector is None and companion_key is not None:
+            connector = by_port.get(companion_key)
+
+        if connector is None:
+            connector = USBConnector()
+            connectors.append(connector)
+
+        connector.ports.append(node)
+        by_port[key] = connector
+
+        if companion_key is not None:
+            by_port.setdefault(companion_key, connector)
+
+    return connectors
+
+def walk_usb_tree(
+    usb_tree : list[USBNode],
+    prune : Callable[[USBNode, int], bool] | None = None,
+    expand_lazy : bool = True,
+    level : int = 0,
+) -> Generator[tuple[USBNode, int]]:
+    stack = [(node, level) for node in reversed(usb_tree)]
+
+    while len(stack) > 0:
+        node, depth = stack.pop()
+
+        yield node, depth
+
+        if prune is not None and prune(node, depth):
+            continue
+
+        if expand_lazy or node.is_expanded:
+            stack.extend((child, depth + 1) for child in reversed(node.children))
+
+def format_usb_node(
+    node : USBNode,
+) -> str:
+    if isinstance(node.device, USBPort):
+        return f"[USBPort] Port {node.device.index:02}"
+    return f"[{type(node.device).__name__}] {node.device.id} ({node.device.properties.get(DevProperties.DEVICEDESC)})"
+
+def render_usb_tree(
+    usb_tree : list[USBNode],
+    stream : TextIO | None = None,
+    get_additional_info : Callable[[USBNode], str] | None = None,
+    prune : Callable[[USBNode, int], bool] | None = None,
+    expand_lazy : bool = True,
+    level : int = 0,
+    indent : str = "  ",
+) -> None:
+    lines : list[str] = []
+
+    for node, depth in walk_usb_tree(usb_tree, prune, expand_lazy, level):
+        line = indent * depth + format_usb_node(node)
+        if get_additional_info is not None:
+            line += get_additional_info(node)
+        lines.append(line)
+
+    lines.append("")
+
+    (sys.stdout if stream is None else stream).write("\n".join(lines))
 
 def print_usb_tree(
     usb_tree : list[USBNode],
     level : int = 0,
     get_additional_info : Callable[[USBNode], str] | None = None,
 ):
-    for node in usb_tree:
-        if isinstance(node.device, USBPort):
-            s = f"Port {node.device.index:02}"
-        else:
-            s = f"{node.device.id} ({node.device.properties[DevProperties.DEVICEDESC]})"
-        additional_info = "" if get_additional_info is None else get_additional_info(node)
-        print(f"{"  " * level}[{type(node.device).__name__}] {s}{additional_info}")
-        print_usb_tree(node.children, level + 1, get_additional_info)
+    render_usb_tree(
+        usb_tree,
+        get_additional_info = get_additional_info,
+        level = level,
+    )
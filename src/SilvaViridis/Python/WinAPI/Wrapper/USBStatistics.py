@@ -0,0 +1,303 @@
+import ctypes as C
+import threading
+import time
+
+from collections.abc import Callable, Sequence
+
+from ..instrumentation import (
+    nearest_rank,
+)
+
+from .HandlePool import (
+    handle_pool,
+)
+
+from .IOAPISet import (
+    ioctl_view_usb_bandwidth_info,
+    ioctl_view_usb_bus_statistics,
+    ioctl_view_usb_power_info,
+)
+
+from .USBDeviceManager import (
+    USBHostController,
+)
+
+from .Views import (
+    USBBandwidthInfoView,
+    USBBusStatisticsView,
+    USBPowerInfoView,
+)
+
+class USBBusSample(C.Structure):
+    _fields_ = [
+        ("timestamp", C.c_double),
+        ("controller", C.c_uint32),
+        ("flags", C.c_uint32),
+        ("device_count", C.c_uint32),
+        ("bulk_bytes", C.c_uint32),
+        ("iso_bytes", C.c_uint32),
+        ("interrupt_bytes", C.c_uint32),
+        ("control_data_bytes", C.c_uint32),
+        ("total_bus_bandwidth", C.c_uint32),
+        ("alloced_bandwidth", C.c_uint32),
+        ("hc_device_power_state", C.c_int32),
+    ]
+
+SAMPLE_HAS_BUS_STATISTICS = 0x1
+SAMPLE_HAS_BANDWIDTH = 0x2
+SAMPLE_HAS_POWER_STATE = 0x4
+
+SAMPLE_FLAGS = (
+    SAMPLE_HAS_BUS_STATISTICS,
+    SAMPLE_HAS_BANDWIDTH,
+    SAMPLE_HAS_POWER_STATE,
+)
+
+COUNTER_FIELDS = (
+    "bulk_bytes",
+    "iso_bytes",
+    "interrupt_bytes",
+    "control_data_bytes",
+)
+
+class _ControllerProbe:
+    def __init__(
+        self,
+        controller : USBHostController,
+    ) -> None:
+        self.controller = controller
+        self.bus_statistics = USBBusStatisticsView()
+        self.bandwidth = USBBandwidthInfoView()
+        self.power = USBPowerInfoView()
+        self.flags = 0
+        self.failures : dict[int, int] = {}
+        self.retry_at : dict[int, float] = {}
+
+    def request(
+        self,
+        hcfd : C.c_void_p,
+        flag : int,
+    ) -> None:
+        if flag == SAMPLE_HAS_BUS_STATISTICS:
+            ioctl_view_usb_bus_statistics(hcfd, self.bus_statistics)
+        elif flag == SAMPLE_HAS_BANDWIDTH:
+            ioctl_view_usb_bandwidth_info(hcfd, self.bandwidth)
+        elif flag == SAMPLE_HAS_POWER_STATE:
+            ioctl_view_usb_power_info(hcfd, self.power)
+
+class USBBusSampler:
+    def __init__(
+        self,
+        controllers : Sequence[USBHostController],
+        interval : float = 1.0,
+        capacity : int = 4096,
+        clock : Callable[[], float] = time.monotonic,
+        max_backoff : float = 60.0,
+        on_error : Callable[[Exception], None] | None = None,
+    ) -> None:
+        self.interval = interval
+        self.capacity = capacity
+        self.max_backoff = max_backoff
+        self.on_error = on_error
+        self.errors = 0
+        self.last_error : Exception | None = None
+        self._clock = clock
+        self._probes = [_ControllerProbe(hc) for hc in controllers]
+        self._samples = (USBBusSample * capacity)()
+        self._head = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread : threading.Thread | None = None
+
+    def start(
+        self,
+    ) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+    def stop(
+        self,
+    ) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(
+        self,
+    ) -> None:
+        while not self._stop.is_set():
+            started = self._clock()
+            try:
+                self.sample_once()
+            except Exception as ex:
+                self._report_error(ex)
+            self._stop.wait(max(self.interval - (self._clock() - started), 0.0))
+
+    def sample_once(
+        self,
+    ) -> None:
+        for controller_index, probe in enumerate(self._probes):
+            now = self._clock()
+            due = [flag for flag in SAMPLE_FLAGS if probe.retry_at.get(flag, now) <= now]
+
+            if len(due) == 0:
+                continue
+
+            flags = 0
+
+            try:
+                with probe.controller.open_file() as hcfd:
+                    for flag in due:
+                        if self._poll(probe, hcfd, flag):
+                            flags |= flag
+            except Exception as ex:
+                self._report_error(ex)
+                for flag in due:
+                    self._back_off(probe, flag)
+                continue
+
+            probe.flags = flags
+
+            if flags != 0:
+                self._store(controller_index, probe)
+
+    def _poll(
+        self,
+        probe : _ControllerProbe,
+        hcfd : C.c_void_p,
+        flag : int,
+    ) -> bool:
+        try:
+            probe.request(hcfd, flag)
+        except Exception as ex:
+            handle_pool.report_error(hcfd, ex)
+            self._report_error(ex)
+            self._back_off(probe, flag)
+            return False
+
+        probe.failures.pop(flag, None)
+        probe.retry_at.pop(flag, None)
+
+        return True
+
+    def _back_off(
+        self,
+        probe : _ControllerProbe,
+        flag : int,
+    ) -> None:
+        failures = probe.failures.get(flag, 0) + 1
+        probe.failures[flag] = failures
+        delay = self.interval * (2 ** min(failures - 1, 32) - 1)
+        probe.retry_at[flag] = self._clock() + min(delay, self.max_backoff)
+
+    def _report_error(
+        self,
+        ex : Exception,
+    ) -> None:
+        self.errors += 1
+        self.last_error = ex
+
+        if self.on_error is not None:
+            self.on_error(ex)
+
+    def _store(
+        self,
+        controller_index : int,
+        probe : _ControllerProbe,
+    ) -> None:
+        with self._lock:
+            sample = self._samples[self._head]
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+            sample.timestamp = self._clock()
+            sample.controller = controller_index
+            sample.flags = probe.flags
+
+            stats = probe.bus_statistics.data.BusStatistics0
+            sample.device_count = stats.DeviceCount
+            sample.bulk_bytes = stats.BulkBytes
+            sample.iso_bytes = stats.IsoBytes
+            sample.interrupt_bytes = stats.InterruptBytes
+            sample.control_data_bytes = stats.ControlDataBytes
+
+            sample.total_bus_bandwidth = probe.bandwidth.total_bus_bandwidth
+            sample.alloced_bandwidth = probe.bandwidth.alloced_bandwidth
+
+            sample.hc_device_power_state = probe.power.data.PowerInformation.HcDevicePowerState
+
+    def __len__(
+        self,
+    ) -> int:
+        return self._count
+
+    def samples(
+        self,
+        controller_index : int | None = None,
+    ) -> list[USBBusSample]:
+        with self._lock:
+            start = (self._head - self._count) % self.capacity
+            ordered = [
+                USBBusSample.from_buffer_copy(self._samples[(start + i) % self.capacity]) \
+                    for i in range(self._count)
+            ]
+        return [
+            sample for sample in ordered \
+                if controller_index is None or sample.controller == controller_index
+        ]
+
+    def rates(
+        self,
+        controller_index : int,
+        field : str,
+    ) -> list[float]:
+        samples = [
+            sample for sample in self.samples(controller_index) \
+                if sample.flags & SAMPLE_HAS_BUS_STATISTICS
+        ]
+
+        result : list[float] = []
+
+        for previous, current in zip(samples, samples[1:]):
+            elapsed = current.timestamp - previous.timestamp
+            if elapsed <= 0:
+                continue
+            delta = (getattr(current, field) - getattr(previous, field)) & 0xFFFFFFFF
+            result.append(delta / elapsed)
+
+        return result
+
+    def rate_percentiles(
+        self,
+        controller_index : int,
+        field : str,
+        percentiles : Sequence[float] = (50, 90, 99),
+    ) -> dict[float, float]:
+        rates = sorted(self.rates(controller_index, field))
+
+        if len(rates) == 0:
+            return {p: 0.0 for p in percentiles}
+
+        return {p: nearest_rank(rates, p) for p in percentiles}
+
+    def bandwidth_utilization(
+        self,
+        controller_index : int,
+    ) -> float | None:
+        samples = [
+            sample for sample in self.samples(controller_index) \
+                if sample.flags & SAMPLE_HAS_BANDWIDTH and sample.total_bus_bandwidth > 0
+        ]
+
+        if len(samples) == 0:
+            return None
+
+        latest = samples[-1]
+
+        return latest.alloced_bandwidth / latest.total_bus_bandwidth
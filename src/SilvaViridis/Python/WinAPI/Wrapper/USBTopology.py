@@ -0,0 +1,256 @@
+import re
+
+from .Types import (
+    DevProperties,
+)
+
+from .USBDeviceManager import (
+    USBHostController,
+    USBInterface,
+    USBNode,
+    USBPort,
+    USBTreeChanges,
+)
+
+type USBLocation = tuple[int, ...]
+
+_vid_pid_pattern = re.compile(r"VID_([0-9A-F]{4})&PID_([0-9A-F]{4})", re.IGNORECASE)
+
+def parse_vid_pid(
+    device_id : str,
+) -> tuple[int, int] | None:
+    m = _vid_pid_pattern.search(device_id)
+
+    if m is None:
+        return None
+
+    vid, pid = m.groups()
+
+    return int(vid, 16), int(pid, 16)
+
+def _remove_from[K, V](
+    index : dict[K, list[V]],
+    key : K,
+    value : V,
+) -> None:
+    values = index.get(key)
+
+    if values is None:
+        return
+
+    if value in values:
+        values.remove(value)
+
+    if len(values) == 0:
+        del index[key]
+
+class USBTopologyIndex:
+    def __init__(
+        self,
+        usb_tree : list[USBNode] | None = None,
+    ) -> None:
+        self.by_instance_id : dict[str, USBNode] = {}
+        self.by_driver_key : dict[str, USBNode] = {}
+        self.by_vid_pid : dict[tuple[int, int], list[USBNode]] = {}
+        self.by_vid : dict[int, list[USBNode]] = {}
+        self.by_parent_id : dict[str, list[USBNode]] = {}
+        self.by_location : dict[USBLocation, USBNode] = {}
+        self._locations : dict[USBNode, USBLocation] = {}
+
+        if usb_tree is not None:
+            for controller_index, node in enumerate(usb_tree):
+                self._add_subtree(node, (controller_index,))
+
+    def __len__(
+        self,
+    ) -> int:
+        return len(self._locations)
+
+    def find_by_instance_id(
+        self,
+        instance_id : str,
+    ) -> USBNode | None:
+        return self.by_instance_id.get(instance_id.lower())
+
+    def find_by_driver_key(
+        self,
+        driver_key_name : str,
+    ) -> USBNode | None:
+        return self.by_driver_key.get(driver_key_name)
+
+    def find_by_vid_pid(
+        self,
+        vendor_id : int,
+        product_id : int | None = None,
+    ) -> list[USBNode]:
+        if product_id is None:
+            return list(self.by_vid.get(vendor_id, []))
+        return list(self.by_vid_pid.get((vendor_id, product_id), []))
+
+    def find_by_parent_id(
+        self,
+        parent_id : str,
+    ) -> list[USBNode]:
+        return list(self.by_parent_id.get(parent_id.lower(), []))
+
+    def find_by_location(
+        self,
+        controller_index : int,
+        *ports : int,
+    ) -> USBNode | None:
+        return self.by_location.get((controller_index, *ports))
+
+    def location_of(
+        self,
+        node : USBNode,
+    ) -> USBLocation | None:
+        return self._locations.get(node)
+
+    def add_subtree(
+        self,
+        node : USBNode,
+    ) -> None:
+        if node in self._locations:
+            self._add_subtree(node, self._locations[node])
+            return
+
+        if node.parent is None or node.parent not in self._locations:
+            raise ValueError("The parent of the node is not indexed")
+
+        self._add_subtree(node, self._child_location(node.parent, node))
+
+    def remove_subtree(
+        self,
+        node : USBNode,
+    ) -> None:
+        stack = [node]
+
+        while len(stack) > 0:
+            current = stack.pop()
+
+            if current.is_expanded:
+                stack.extend(current.children)
+
+            location = self._locations.pop(current, None)
+
+            if location is None or isinstance(current.device, USBPort):
+                continue
+
+            if self.by_location.get(location) is current:
+                del self.by_location[location]
+
+            device = current.device
+
+            if self.by_instance_id.get(device.id.lower()) is current:
+                del self.by_instance_id[device.id.lower()]
+
+            driver = device.properties.get(DevProperties.DRIVER)
+
+            if isinstance(driver, str) and self.by_driver_key.get(driver) is current:
+                del self.by_driver_key[driver]
+
+            vid_pid = parse_vid_pid(device.id)
+
+            if vid_pid is not None:
+                _remove_from(self.by_vid_pid, vid_pid, current)
+                _remove_from(self.by_vid, vid_pid[0], current)
+
+            _remove_from(self.by_parent_id, device.parent.lower(), current)
+
+    def apply(
+        self,
+        changes : USBTreeChanges,
+    ) -> None:
+        for node in changes.removed:
+            self.remove_subtree(node)
+
+        for node in changes.added:
+            self.add_subtree(node)
+
+    def _child_location(
+        self,
+        parent : USBNode,
+        node : USBNode,
+    ) -> USBLocation:
+        location = self._locations[parent]
+
+        if isinstance(node.device, USBPort):
+            return (*location, node.device.index)
+
+        return location
+
+    def _add_subtree(
+        self,
+        node : USBNode,
+        location : USBLocation,
+    ) -> None:
+        stack = [(node, location)]
+
+        while len(stack) > 0:
+            current, location = stack.pop()
+
+            if current not in self._locations:
+                self._locations[current] = location
+                self._add_node(current, location)
+
+                if not current.is_expanded:
+                    self._add_on_expand(current)
+
+            if current.is_expanded:
+                stack.extend(
+                    (
+                        child,
+                        (*location, child.device.index) \
+                            if isinstance(child.device, USBPort) \
+                            else location,
+                    ) for child in current.children
+                )
+
+    def _add_on_expand(
+        self,
+        node : USBNode,
+    ) -> None:
+        expander = node.expander
+
+        if expander is None:
+            return
+
+        def expand(
+            node : USBNode,
+        ) -> None:
+            expander(node)
+
+            location = self._locations.get(node)
+
+            if location is not None:
+                self._add_subtree(node, location)
+
+        node.expander = expand
+
+    def _add_node(
+        self,
+        node : USBNode,
+        location : USBLocation,
+    ) -> None:
+        device = node.device
+
+        if isinstance(device, USBPort):
+            return
+
+        if not isinstance(device, (USBHostController, USBInterface)):
+            self.by_location[location] = node
+
+        self.by_instance_id[device.id.lower()] = node
+
+        driver = device.properties.get(DevProperties.DRIVER)
+
+        if isinstance(driver, str):
+            self.by_driver_key[driver] = node
+
+        vid_pid = parse_vid_pid(device.id)
+
+        if vid_pid is not None:
+            self.by_vid_pid.setdefault(vid_pid, []).append(node)
+            self.by_vid.setdefault(vid_pid[0], []).append(node)
+
+        self.by_parent_id.setdefault(device.parent.lower(), []).append(node)
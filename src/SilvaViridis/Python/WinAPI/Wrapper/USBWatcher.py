@@ -0,0 +1,279 @@
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Sequence
+
+from .ConfigManager import (
+    DeviceInterfaceSubscription,
+    register_device_interface_notification,
+    unregister_notification,
+)
+
+from .Types import (
+    CMNotifyActions,
+    DeviceInterfaceNotification,
+    DevInterfaceGuids,
+)
+
+from .USBDeviceManager import (
+    DEFAULT_USB_TREE_FIELDS,
+    USBDeviceIndex,
+    USBHub,
+    USBNode,
+    USBTreeChanges,
+    build_usb_device_index,
+    update_usb_hubs,
+    update_usb_tree,
+)
+
+from .USBTopology import (
+    USBTopologyIndex,
+)
+
+def instance_id_from_symbolic_link(
+    symbolic_link : str,
+) -> str:
+    parts = symbolic_link.removeprefix("\\\\?\\").split("#")
+
+    if len(parts) > 1 and parts[-1].startswith("{"):
+        parts = parts[:-1]
+
+    return "\\".join(parts)
+
+class NotificationSource(ABC):
+    @abstractmethod
+    def start(
+        self,
+        callback : Callable[[DeviceInterfaceNotification], None],
+    ) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def stop(
+        self,
+    ) -> None:
+        raise NotImplementedError()
+
+class ConfigManagerNotificationSource(NotificationSource):
+    def __init__(
+        self,
+        guids : Iterable[DevInterfaceGuids] = (DevInterfaceGuids.USB_DEVICE, DevInterfaceGuids.USB_HUB),
+    ) -> None:
+        self.guids = list(guids)
+        self._subscriptions : list[DeviceInterfaceSubscription] = []
+
+    def start(
+        self,
+        callback : Callable[[DeviceInterfaceNotification], None],
+    ) -> None:
+        for guid in self.guids:
+            self._subscriptions.append(register_device_interface_notification(guid.value, callback))
+
+    def stop(
+        self,
+    ) -> None:
+        for subscription in self._subscriptions:
+            unregister_notification(subscription)
+        self._subscriptions.clear()
+
+class ManualNotificationSource(NotificationSource):
+    def __init__(
+        self,
+    ) -> None:
+        self._callback : Callable[[DeviceInterfaceNotification], None] | None = None
+
+    def start(
+        self,
+        callback : Callable[[DeviceInterfaceNotification], None],
+    ) -> None:
+        self._callback = callback
+
+    def stop(
+        self,
+    ) -> None:
+        self._callback = None
+
+    def push(
+        self,
+        notification : DeviceInterfaceNotification,
+    ) -> None:
+        if self._callback is not None:
+            self._callback(notification)
+
+def _parent_hub(
+    node : USBNode,
+) -> USBNode | None:
+    node_port = node.parent
+    hub_node = None if node_port is None else node_port.parent
+
+    if hub_node is None or not isinstance(hub_node.device, USBHub):
+        return None
+
+    return hub_node
+
+class USBTopologyWatcher:
+    def __init__(
+        self,
+        usb_tree : list[USBNode],
+        source : NotificationSource,
+        on_changes : Callable[[USBTreeChanges], None] | None = None,
+        debounce : float = 0.25,
+        fields : Iterable[str] = DEFAULT_USB_TREE_FIELDS,
+        topology : USBTopologyIndex | None = None,
+        build_index : Callable[[], USBDeviceIndex] = build_usb_device_index,
+        clock : Callable[[], float] = time.monotonic,
+        on_error : Callable[[Exception], None] | None = None,
+    ) -> None:
+        self.usb_tree = usb_tree
+        self.source = source
+        self.on_changes = on_changes
+        self.debounce = debounce
+        self.fields = frozenset(fields)
+        self.topology = USBTopologyIndex(usb_tree) if topology is None else topology
+        self._build_index = build_index
+        self._clock = clock
+        self._pending : list[DeviceInterfaceNotification] = []
+        self._last_event = 0.0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread : threading.Thread | None = None
+        self._process_lock = threading.Lock()
+        self.on_error = on_error
+        self.errors = 0
+        self.last_error : Exception | None = None
+
+    def start(
+        self,
+    ) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self.source.start(self.notify)
+        self._thread = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+    def stop(
+        self,
+    ) -> None:
+        if self._thread is None:
+            return
+        self.source.stop()
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+
+    def notify(
+        self,
+        notification : DeviceInterfaceNotification,
+    ) -> None:
+        with self._condition:
+            self._pending.append(notification)
+            self._last_event = self._clock()
+            self._condition.notify()
+
+    def flush(
+        self,
+    ) -> USBTreeChanges:
+        with self._condition:
+            batch, self._pending = self._pending, []
+        return self.process(batch)
+
+    def _run(
+        self,
+    ) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping and len(self._pending) == 0:
+                    self._condition.wait()
+
+                if self._stopping:
+                    return
+
+                remaining = self.debounce - (self._clock() - self._last_event)
+
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+
+                batch, self._pending = self._pending, []
+
+            try:
+                changes = self.process(batch)
+
+                if not changes.is_empty and self.on_changes is not None:
+                    self.on_changes(changes)
+            except Exception as ex:
+                self._report_error(ex)
+
+    def _report_error(
+        self,
+        ex : Exception,
+    ) -> None:
+        self.errors += 1
+        self.last_error = ex
+
+        if self.on_error is not None:
+            self.on_error(ex)
+
+    def process(
+        self,
+        notifications : Sequence[DeviceInterfaceNotification],
+    ) -> USBTreeChanges:
+        with self._process_lock:
+            return self._process(notifications)
+
+    def _process(
+        self,
+        notifications : Sequence[DeviceInterfaceNotification],
+    ) -> USBTreeChanges:
+        affected : dict[USBNode, None] = {}
+        arrivals : dict[str, None] = {}
+        full_update = False
+
+        for notification in notifications:
+            instance_id = instance_id_from_symbolic_link(notification.symbolic_link)
+
+            if notification.action == CMNotifyActions.DEVICEINTERFACEARRIVAL:
+                arrivals[instance_id.lower()] = None
+            elif notification.action == CMNotifyActions.DEVICEINTERFACEREMOVAL:
+                node = self.topology.find_by_instance_id(instance_id)
+                hub_node = None if node is None else _parent_hub(node)
+                if hub_node is not None:
+                    affected[hub_node] = None
+
+        if len(affected) == 0 and len(arrivals) == 0:
+            return USBTreeChanges()
+
+        index : USBDeviceIndex | Callable[[], USBDeviceIndex] = self._build_index
+
+        if len(arrivals) > 0:
+            index = self._build_index()
+            devices = {
+                dev.id.lower(): dev for dev in [*index.hubs, *index.devices] \
+                    if dev.id.lower() in arrivals
+            }
+
+            for instance_id in arrivals:
+                dev = devices.get(instance_id)
+
+                if dev is None:
+                    continue
+
+                parent = self.topology.find_by_instance_id(dev.parent)
+
+                if parent is not None and isinstance(parent.device, USBHub):
+                    affected[parent] = None
+                elif dev.parent.lower() not in arrivals:
+                    full_update = True
+
+        if full_update:
+            changes = update_usb_tree(self.usb_tree, index, self.fields)
+        else:
+            changes = update_usb_hubs(affected, index, self.fields)
+
+        self.topology.apply(changes)
+
+        return changes
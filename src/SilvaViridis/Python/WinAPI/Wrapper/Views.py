@@ -0,0 +1,504 @@
+import ctypes as C
+import ctypes.wintypes as W
+
+from .Types import (
+    USBBandwidthInfo,
+    USBBusStatistics,
+    USBConnectionStatuses,
+    USBDeviceDescriptor,
+    USBDeviceSpeeds,
+    USBEndpointDescriptor,
+    USBHubCapabilities,
+    USBHubNodeInformation,
+    USBHubNodeTypes,
+    USBMIParentNodeInformation,
+    USBNodeConnectionInfoEx,
+    USBNodeConnectionInfoExV2,
+    USBPipeInfo,
+    USBPowerInfo,
+    USBUserErrorCodes,
+    USBUserRequestCodes,
+    WDMUSBPowerStates,
+)
+
+from ..types import (
+    USB_DESCRIPTOR_REQUEST,
+    USB_DEVICE_DESCRIPTOR,
+    USB_HUB_CAPABILITIES_EX,
+    USB_NODE_CONNECTION_INFORMATION_EX,
+    USB_NODE_CONNECTION_INFORMATION_EX_V2,
+    USB_NODE_INFORMATION,
+    USB_PIPE_INFO,
+    USBUSER_BANDWIDTH_INFO_REQUEST,
+    USBUSER_BUS_STATISTICS_0_REQUEST,
+    USBUSER_POWER_INFO_REQUEST,
+)
+
+def _decode_device_descriptor(
+    data : USB_DEVICE_DESCRIPTOR,
+) -> USBDeviceDescriptor:
+    return USBDeviceDescriptor(
+        bcd_usb = data.bcdUSB,
+        device_class = data.bDeviceClass,
+        device_sub_class = data.bDeviceSubClass,
+        device_protocol = data.bDeviceProtocol,
+        max_packet_size_0 = data.bMaxPacketSize0,
+        vendor_id = data.idVendor,
+        product_id = data.idProduct,
+        bcd_device = data.bcdDevice,
+        manufacturer_index = data.iManufacturer,
+        product_index = data.iProduct,
+        serial_number_index = data.iSerialNumber,
+        number_of_configurations = data.bNumConfigurations,
+    )
+
+def _decode_pipe_info(
+    data : USB_PIPE_INFO,
+) -> USBPipeInfo:
+    endpoint = data.EndpointDescriptor
+    return USBPipeInfo(
+        endpoint_descriptor = USBEndpointDescriptor(
+            endpoint_address = endpoint.bEndpointAddress,
+            attributes = endpoint.bmAttributes,
+            max_packet_size = endpoint.wMaxPacketSize,
+            interval = endpoint.bInterval,
+        ),
+        schedule_offset = data.ScheduleOffset,
+    )
+
+class StructView[T : C.Structure]:
+    def __init__(
+        self,
+        struct_type : type[T],
+        buffer : bytearray | None = None,
+    ) -> None:
+        self._buffer = bytearray(C.sizeof(struct_type)) if buffer is None else buffer
+        self.data = struct_type.from_buffer(self._buffer)
+        self.bytes_returned = W.DWORD(0)
+
+    @property
+    def buffer(
+        self,
+    ) -> memoryview:
+        return memoryview(self._buffer).toreadonly()
+
+class USBNodeInformationView(StructView[USB_NODE_INFORMATION]):
+    def __init__(
+        self,
+        buffer : bytearray | None = None,
+    ) -> None:
+        super().__init__(USB_NODE_INFORMATION, buffer)
+
+    @property
+    def node_type(
+        self,
+    ) -> USBHubNodeTypes:
+        return USBHubNodeTypes(self.data.NodeType)
+
+    @property
+    def number_of_ports(
+        self,
+    ) -> int:
+        return self.data.u.HubInformation.HubDescriptor.bNumberOfPorts
+
+    @property
+    def is_bus_powered(
+        self,
+    ) -> bool:
+        return bool(self.data.u.HubInformation.HubIsBusPowered)
+
+    @property
+    def number_of_interfaces(
+        self,
+    ) -> int:
+        return self.data.u.MiParentInformation.NumberOfInterfaces
+
+    def to_info(
+        self,
+    ) -> USBHubNodeInformation | USBMIParentNodeInformation:
+        node_type = self.node_type
+        if node_type == USBHubNodeTypes.UsbHub:
+            hub_info = self.data.u.HubInformation
+            return USBHubNodeInformation(
+                is_bus_powered = bool(hub_info.HubIsBusPowered),
+                number_of_ports = hub_info.HubDescriptor.bNumberOfPorts,
+                hub_characteristics = hub_info.HubDescriptor.wHubCharacteristics,
+                power_on_to_power_good = hub_info.HubDescriptor.bPowerOnToPowerGood,
+                hub_control_current = hub_info.HubDescriptor.bHubControlCurrent,
+                remove_and_power_mask = list(hub_info.HubDescriptor.bRemoveAndPowerMask),
+            )
+        elif node_type == USBHubNodeTypes.UsbMIParent:
+            return USBMIParentNodeInformation(
+                number_of_interfaces = self.number_of_interfaces,
+            )
+        else:
+            raise NotImplementedError()
+
+class USBHubCapabilitiesView(StructView[USB_HUB_CAPABILITIES_EX]):
+    def __init__(
+        self,
+        buffer : bytearray | None = None,
+    ) -> None:
+        super().__init__(USB_HUB_CAPABILITIES_EX, buffer)
+
+    @property
+    def is_high_speed(
+        self,
+    ) -> bool:
+        return bool(self.data.CapabilityFlags.bits.HubIsHighSpeed)
+
+    @property
+    def is_root(
+        self,
+    ) -> bool:
+        return bool(self.data.CapabilityFlags.bits.HubIsRoot)
+
+    def to_info(
+        self,
+    ) -> USBHubCapabilities:
+        bits = self.data.CapabilityFlags.bits
+        return USBHubCapabilities(
+            is_high_speed_capable = bool(bits.HubIsHighSpeedCapable),
+            is_high_speed = bool(bits.HubIsHighSpeed),
+            is_multi_tt_capable = bool(bits.HubIsMultiTtCapable),
+            is_multi_tt = bool(bits.HubIsMultiTt),
+            is_root = bool(bits.HubIsRoot),
+            is_armed_wake_on_connect = bool(bits.HubIsArmedWakeOnConnect),
+            is_bus_powered = bool(bits.HubIsBusPowered),
+        )
+
+class USBNodeConnectionInfoExView(StructView[USB_NODE_CONNECTION_INFORMATION_EX]):
+    def __init__(
+        self,
+        buffer : bytearray | None = None,
+    ) -> None:
+        super().__init__(USB_NODE_CONNECTION_INFORMATION_EX, buffer)
+
+    @property
+    def connection_index(
+        self,
+    ) -> int:
+        return self.data.ConnectionIndex
+
+    @property
+    def device_descriptor(
+        self,
+    ) -> USBDeviceDescriptor:
+        return _decode_device_descriptor(self.data.DeviceDescriptor)
+
+    @property
+    def vendor_id(
+        self,
+    ) -> int:
+        return self.data.DeviceDescriptor.idVendor
+
+    @property
+    def product_id(
+        self,
+    ) -> int:
+        return self.data.DeviceDescriptor.idProduct
+
+    @property
+    def bcd_device(
+        self,
+    ) -> int:
+        return self.data.DeviceDescriptor.bcdDevice
+
+    @property
+    def current_configuration_value(
+        self,
+    ) -> int:
+        return self.data.CurrentConfigurationValue
+
+    @property
+    def speed(
+        self,
+    ) -> USBDeviceSpeeds:
+        return USBDeviceSpeeds(self.data.Speed)
+
+    @property
+    def device_is_hub(
+        self,
+    ) -> bool:
+        return bool(self.data.DeviceIsHub)
+
+    @property
+    def device_address(
+        self,
+    ) -> int:
+        return self.data.DeviceAddress
+
+    @property
+    def number_of_open_pipes(
+        self,
+    ) -> int:
+        return min(self.data.NumberOfOpenPipes, len(self.data.PipeList))
+
+    @property
+    def connection_status(
+        self,
+    ) -> USBConnectionStatuses:
+        return USBConnectionStatuses(self.data.ConnectionStatus)
+
+    @property
+    def pipe_list(
+        self,
+    ) -> list[USBPipeInfo]:
+        pipes = self.data.PipeList
+        return [_decode_pipe_info(pipes[i]) for i in range(self.number_of_open_pipes)]
+
+    def to_info(
+        self,
+    ) -> USBNodeConnectionInfoEx:
+        return USBNodeConnectionInfoEx(
+            connection_index = self.connection_index,
+            device_descriptor = self.device_descriptor,
+            current_configuration_value = self.current_configuration_value,
+            speed = self.speed,
+            device_is_hub = self.device_is_hub,
+            device_address = self.device_address,
+            number_of_open_pipes = self.number_of_open_pipes,
+            connection_status = self.connection_status,
+            pipe_list = self.pipe_list,
+        )
+
+class USBNodeConnectionInfoExV2View(StructView[USB_NODE_CONNECTION_INFORMATION_EX_V2]):
+    def __init__(
+        self,
+        buffer : bytearray | None = None,
+    ) -> None:
+        super().__init__(USB_NODE_CONNECTION_INFORMATION_EX_V2, buffer)
+
+    @property
+    def connection_index(
+        self,
+    ) -> int:
+        return self.data.ConnectionIndex
+
+    @property
+    def is_device_operating_at_super_speed_or_higher(
+        self,
+    ) -> bool:
+        return bool(self.data.Flags.bits.DeviceIsOperatingAtSuperSpeedOrHigher)
+
+    @property
+    def is_device_operating_at_super_speed_plus_or_higher(
+        self,
+    ) -> bool:
+        return bool(self.data.Flags.bits.DeviceIsOperatingAtSuperSpeedPlusOrHigher)
+
+    def to_info(
+        self,
+    ) -> USBNodeConnectionInfoExV2:
+        sbits = self.data.SupportedUsbProtocols.bits
+        fbits = self.data.Flags.bits
+        return USBNodeConnectionInfoExV2(
+            connection_index = self.data.ConnectionIndex,
+            is_usb_110_supported = bool(sbits.Usb110),
+            is_usb_200_supported = bool(sbits.Usb200),
+            is_usb_300_supported = bool(sbits.Usb300),
+            is_device_operating_at_super_speed_or_higher = bool(fbits.DeviceIsOperatingAtSuperSpeedOrHigher),
+            is_device_super_speed_capable_or_higher = bool(fbits.DeviceIsSuperSpeedCapableOrHigher),
+            is_device_operating_at_super_speed_plus_or_higher = bool(fbits.DeviceIsOperatingAtSuperSpeedPlusOrHigher),
+            is_device_super_speed_plus_capable_or_higher = bool(fbits.DeviceIsSuperSpeedPlusCapableOrHigher),
+        )
+
+class USBDescriptorRequestView(StructView[USB_DESCRIPTOR_REQUEST]):
+    data_offset = getattr(USB_DESCRIPTOR_REQUEST, "Data").offset
+
+    def __init__(
+        self,
+        max_data_length : int = 4096,
+        buffer : bytearray | None = None,
+    ) -> None:
+        if buffer is None:
+            buffer = bytearray(self.data_offset + max_data_length)
+        super().__init__(USB_DESCRIPTOR_REQUEST, buffer)
+        self.max_data_length = len(buffer) - self.data_offset
+
+    @property
+    def payload(
+        self,
+    ) -> memoryview:
+        n_bytes = max(self.bytes_returned.value - self.data_offset, 0)
+        return self.buffer[self.data_offset:self.data_offset + n_bytes]
+
+class USBUserRequestView[T : C.Structure](StructView[T]):
+    def __init__(
+        self,
+        struct_type : type[T],
+        request : USBUserRequestCodes,
+        buffer : bytearray | None = None,
+    ) -> None:
+        super().__init__(struct_type, buffer)
+        self.request = request
+        self.reset()
+
+    def reset(
+        self,
+    ) -> None:
+        header = self.data.Header
+        header.UsbUserRequest = self.request.value
+        header.UsbUserStatusCode = USBUserErrorCodes.Success.value
+        header.RequestBufferLength = C.sizeof(self.data)
+        header.ActualBufferLength = 0
+
+    @property
+    def status(
+        self,
+    ) -> USBUserErrorCodes:
+        return USBUserErrorCodes(self.data.Header.UsbUserStatusCode)
+
+class USBBusStatisticsView(USBUserRequestView[USBUSER_BUS_STATISTICS_0_REQUEST]):
+    def __init__(
+        self,
+        buffer : bytearray | None = None,
+    ) -> None:
+        super().__init__(
+            USBUSER_BUS_STATISTICS_0_REQUEST,
+            USBUserRequestCodes.GET_BUS_STATISTICS_0,
+            buffer,
+        )
+
+    @property
+    def device_count(
+        self,
+    ) -> int:
+        return self.data.BusStatistics0.DeviceCount
+
+    @property
+    def bulk_bytes(
+        self,
+    ) -> int:
+        return self.data.BusStatistics0.BulkBytes
+
+    @property
+    def iso_bytes(
+        self,
+    ) -> int:
+        return self.data.BusStatistics0.IsoBytes
+
+    @property
+    def interrupt_bytes(
+        self,
+    ) -> int:
+        return self.data.BusStatistics0.InterruptBytes
+
+    @property
+    def control_data_bytes(
+        self,
+    ) -> int:
+        return self.data.BusStatistics0.ControlDataBytes
+
+    def to_info(
+        self,
+    ) -> USBBusStatistics:
+        stats = self.data.BusStatistics0
+        return USBBusStatistics(
+            device_count = stats.DeviceCount,
+            current_system_time = stats.CurrentSystemTime,
+            current_usb_frame = stats.CurrentUsbFrame,
+            bulk_bytes = stats.BulkBytes,
+            iso_bytes = stats.IsoBytes,
+            interrupt_bytes = stats.InterruptBytes,
+            control_data_bytes = stats.ControlDataBytes,
+            pci_interrupt_count = stats.PciInterruptCount,
+            hard_reset_count = stats.HardResetCount,
+            worker_signal_count = stats.WorkerSignalCount,
+            common_buffer_bytes = stats.CommonBufferBytes,
+            worker_idle_time_ms = stats.WorkerIdleTimeMs,
+            root_hub_enabled = bool(stats.RootHubEnabled),
+            root_hub_device_power_state = stats.RootHubDevicePowerState,
+            name_index = stats.NameIndex,
+        )
+
+class USBBandwidthInfoView(USBUserRequestView[USBUSER_BANDWIDTH_INFO_REQUEST]):
+    def __init__(
+        self,
+        buffer : bytearray | None = None,
+    ) -> None:
+        super().__init__(
+            USBUSER_BANDWIDTH_INFO_REQUEST,
+            USBUserRequestCodes.GET_BANDWIDTH_INFORMATION,
+            buffer,
+        )
+
+    @property
+    def total_bus_bandwidth(
+        self,
+    ) -> int:
+        return self.data.BandwidthInformation.TotalBusBandwidth
+
+    @property
+    def alloced_bandwidth(
+        self,
+    ) -> int:
+        info = self.data.BandwidthInformation
+        return info.AllocedBulkAndControl \
+            + info.AllocedIso \
+            + info.AllocedInterrupt_1ms \
+            + info.AllocedInterrupt_2ms \
+            + info.AllocedInterrupt_4ms \
+            + info.AllocedInterrupt_8ms \
+            + info.AllocedInterrupt_16ms \
+            + info.AllocedInterrupt_32ms
+
+    def to_info(
+        self,
+    ) -> USBBandwidthInfo:
+        info = self.data.BandwidthInformation
+        return USBBandwidthInfo(
+            device_count = info.DeviceCount,
+            total_bus_bandwidth = info.TotalBusBandwidth,
+            total_32sec_bandwidth = info.Total32secBandwidth,
+            alloced_bulk_and_control = info.AllocedBulkAndControl,
+            alloced_iso = info.AllocedIso,
+            alloced_interrupt_1ms = info.AllocedInterrupt_1ms,
+            alloced_interrupt_2ms = info.AllocedInterrupt_2ms,
+            alloced_interrupt_4ms = info.AllocedInterrupt_4ms,
+            alloced_interrupt_8ms = info.AllocedInterrupt_8ms,
+            alloced_interrupt_16ms = info.AllocedInterrupt_16ms,
+            alloced_interrupt_32ms = info.AllocedInterrupt_32ms,
+        )
+
+class USBPowerInfoView(USBUserRequestView[USBUSER_POWER_INFO_REQUEST]):
+    def __init__(
+        self,
+        system_state : WDMUSBPowerStates = WDMUSBPowerStates.SystemWorking,
+        buffer : bytearray | None = None,
+    ) -> None:
+        self.system_state = system_state
+        super().__init__(
+            USBUSER_POWER_INFO_REQUEST,
+            USBUserRequestCodes.GET_POWER_STATE_MAP,
+            buffer,
+        )
+
+    def reset(
+        self,
+    ) -> None:
+        super().reset()
+        self.data.PowerInformation.SystemState = self.system_state.value
+
+    @property
+    def hc_device_power_state(
+        self,
+    ) -> WDMUSBPowerStates:
+        return WDMUSBPowerStates(self.data.PowerInformation.HcDevicePowerState)
+
+    def to_info(
+        self,
+    ) -> USBPowerInfo:
+        info = self.data.PowerInformation
+        return USBPowerInfo(
+            system_state = WDMUSBPowerStates(info.SystemState),
+            hc_device_power_state = WDMUSBPowerStates(info.HcDevicePowerState),
+            hc_device_wake = WDMUSBPowerStates(info.HcDeviceWake),
+            hc_system_wake = WDMUSBPowerStates(info.HcSystemWake),
+            rh_device_power_state = WDMUSBPowerStates(info.RhDevicePowerState),
+            rh_device_wake = WDMUSBPowerStates(info.RhDeviceWake),
+            rh_system_wake = WDMUSBPowerStates(info.RhSystemWake),
+            last_system_sleep_state = WDMUSBPowerStates(info.LastSystemSleepState),
+            can_wakeup = bool(info.CanWakeup),
+            is_powered = bool(info.IsPowered),
+        )
@@ -5,6 +5,7 @@ from .Exceptions import (
     ERROR_SUCCESS,
     InsufficientBuffer,
     MemAllocError,
+    NoMoreItems,
     raise_ex,
 )
 
@@ -13,20 +14,35 @@ from .Memory import (
     free,
 )
 
+from .Recording import (
+    recordable,
+)
+
+from .Types import (
+    RegistryAccessRights,
+    RegistryRootKeys,
+    ValueTypes,
+)
+
 from .Utils import (
     ptr_to_str,
 )
 
 from ..advapi32 import (
     RegCloseKey,
+    RegEnumValue,
+    RegOpenKeyEx,
+    RegQueryInfoKey,
     RegQueryValueEx,
 )
 
+@recordable
 def free_regkey(
     regkey_ptr : C.c_void_p,
 ) -> None:
     RegCloseKey(regkey_ptr)
 
+@recordable
 def get_registry_key_value(
     regkey_ptr : C.c_void_p,
     field_name : str,
@@ -74,3 +90,89 @@ def get_registry_key_value(
     free(buffer)
 
     return prop_value
+
+@recordable
+def open_registry_key(
+    root : RegistryRootKeys,
+    sub_key : str,
+    access : RegistryAccessRights = RegistryAccessRights.READ,
+) -> C.c_void_p:
+    regkey = W.HKEY()
+
+    status = RegOpenKeyEx(
+        W.HKEY(C.c_int32(root.value).value),
+        sub_key,
+        0,
+        access.value,
+        C.byref(regkey),
+    )
+
+    raise_ex(status)
+
+    return C.c_void_p(regkey.value)
+
+@recordable
+def get_registry_string_values(
+    regkey_ptr : C.c_void_p,
+) -> dict[str, str]:
+    values_count = W.DWORD(0)
+    max_name_length = W.DWORD(0)
+    max_value_size = W.DWORD(0)
+
+    status = RegQueryInfoKey(
+        regkey_ptr,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        C.byref(values_count),
+        C.byref(max_name_length),
+        C.byref(max_value_size),
+        None,
+        None,
+    )
+
+    raise_ex(status)
+
+    name_buffer = C.create_unicode_buffer(max_name_length.value + 1)
+    value_buffer = (C.c_ubyte * (max_value_size.value + 2))()
+    name_length = W.DWORD(0)
+    value_size = W.DWORD(0)
+    regtype = W.DWORD(0)
+
+    result : dict[str, str] = {}
+    index = 0
+
+    while True:
+        name_length.value = len(name_buffer)
+        value_size.value = len(value_buffer) - 2
+
+        status = RegEnumValue(
+            regkey_ptr,
+            index,
+            name_buffer,
+            C.byref(name_length),
+            None,
+            C.byref(regtype),
+            value_buffer,
+            C.byref(value_size),
+        )
+
+        try:
+            raise_ex(status)
+        except NoMoreItems:
+            break
+
+        index += 1
+
+        if regtype.value not in (ValueTypes.SZ.value, ValueTypes.EXPAND_SZ.value):
+            continue
+
+        value_buffer[value_size.value] = 0
+        value_buffer[value_size.value + 1] = 0
+
+        result[name_buffer.value] = ptr_to_str(C.addressof(value_buffer), value_size.value + 2)
+
+    return result
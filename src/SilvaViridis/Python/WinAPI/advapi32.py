@@ -1,7 +1,8 @@
-import ctypes as C
 import ctypes.wintypes as W
 
-_advapi32 = C.windll.LoadLibrary("Advapi32.dll")
+from .instrumentation import load_library
+
+_advapi32 = load_library("Advapi32.dll")
 
 RegCloseKey = _advapi32.RegCloseKey
 RegCloseKey.argtypes = [
@@ -19,3 +20,43 @@ RegQueryValueEx.argtypes = [
     W.LPDWORD, # lpcbData
 ]
 RegQueryValueEx.restype = W.LONG
+
+RegOpenKeyEx = _advapi32.RegOpenKeyExW
+RegOpenKeyEx.argtypes = [
+    W.HKEY, # hKey
+    W.LPCWSTR, # lpSubKey
+    W.DWORD, # ulOptions
+    W.DWORD, # samDesired
+    W.PHKEY, # phkResult
+]
+RegOpenKeyEx.restype = W.LONG
+
+RegQueryInfoKey = _advapi32.RegQueryInfoKeyW
+RegQueryInfoKey.argtypes = [
+    W.HKEY, # hKey
+    W.LPWSTR, # lpClass
+    W.LPDWORD, # lpcchClass
+    W.LPDWORD, # lpReserved
+    W.LPDWORD, # lpcSubKeys
+    W.LPDWORD, # lpcbMaxSubKeyLen
+    W.LPDWORD, # lpcbMaxClassLen
+    W.LPDWORD, # lpcValues
+    W.LPDWORD, # lpcbMaxValueNameLen
+    W.LPDWORD, # lpcbMaxValueLen
+    W.LPDWORD, # lpcbSecurityDescriptor
+    W.PFILETIME, # lpftLastWriteTime
+]
+RegQueryInfoKey.restype = W.LONG
+
+RegEnumValue = _advapi32.RegEnumValueW
+RegEnumValue.argtypes = [
+    W.HKEY, # hKey
+    W.DWORD, # dwIndex
+    W.LPWSTR, # lpValueName
+    W.LPDWORD, # lpcchValueName
+    W.LPDWORD, # lpReserved
+    W.LPDWORD, # lpType
+    W.LPBYTE, # lpData
+    W.LPDWORD, # lpcbData
+]
+RegEnumValue.restype = W.LONG
@@ -0,0 +1,36 @@
+import ctypes as C
+import ctypes.wintypes as W
+
+from .instrumentation import load_library
+from .types import (
+    HCMNOTIFICATION,
+    PCM_NOTIFY_EVENT_DATA,
+    PCM_NOTIFY_FILTER,
+    PHCMNOTIFICATION,
+)
+
+_cfgmgr32 = load_library("CfgMgr32.dll")
+
+PCM_NOTIFY_CALLBACK = getattr(C, "WINFUNCTYPE", C.CFUNCTYPE)(
+    W.DWORD, # return
+    HCMNOTIFICATION, # hNotify
+    W.LPVOID, # Context
+    C.c_int, # Action
+    PCM_NOTIFY_EVENT_DATA, # EventData
+    W.DWORD, # EventDataSize
+)
+
+CM_Register_Notification = _cfgmgr32.CM_Register_Notification
+CM_Register_Notification.argtypes = [
+    PCM_NOTIFY_FILTER, # pFilter
+    W.LPVOID, # pContext
+    PCM_NOTIFY_CALLBACK, # pCallback
+    PHCMNOTIFICATION, # pNotifyContext
+]
+CM_Register_Notification.restype = W.DWORD
+
+CM_Unregister_Notification = _cfgmgr32.CM_Unregister_Notification
+CM_Unregister_Notification.argtypes = [
+    HCMNOTIFICATION, # NotifyContext
+]
+CM_Unregister_Notification.restype = W.DWORD
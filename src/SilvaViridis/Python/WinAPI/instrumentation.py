@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import ctypes as C
+import math
+import sys
+import threading
+import time
+
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+HISTOGRAM_BUCKETS = 32
+
+NATIVE_AVAILABLE = hasattr(C, "WinDLL")
+
+_TRANSFER_SIZE_ARGS : dict[str, int] = {
+    "DeviceIoControl": 6,
+    "GetOverlappedResult": 2,
+    "ReadFile": 3,
+    "RegEnumValueW": 7,
+    "RegQueryValueExW": 5,
+    "SetupDiGetDeviceRegistryPropertyW": 6,
+    "SetupDiGetDevicePropertyW": 6,
+    "WriteFile": 3,
+}
+
+def nearest_rank[T](
+    ordered : Sequence[T],
+    percentile : float,
+) -> T:
+    if len(ordered) == 0:
+        raise ValueError("No samples to rank")
+
+    rank = max(math.ceil(len(ordered) * percentile / 100), 1)
+
+    return ordered[min(rank, len(ordered)) - 1]
+
+@dataclass
+class CallStats:
+    calls : int = 0
+    bytes : int = 0
+    total_ns : int = 0
+    max_ns : int = 0
+    histogram : list[int] = field(default_factory = lambda: [0] * HISTOGRAM_BUCKETS)
+
+    @property
+    def mean_us(
+        self,
+    ) -> float:
+        return 0.0 if self.calls == 0 else self.total_ns / self.calls / 1000
+
+    def percentile_us(
+        self,
+        percentile : float,
+    ) -> float:
+        if self.calls == 0:
+            return 0.0
+
+        threshold = self.calls * percentile / 100
+        seen = 0
+
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= threshold:
+                return float(1 << bucket)
+
+        return float(1 << (HISTOGRAM_BUCKETS - 1))
+
+    def add(
+        self,
+        elapsed_ns : int,
+        n_bytes : int = 0,
+    ) -> None:
+        self.calls += 1
+        self.bytes += n_bytes
+        self.total_ns += elapsed_ns
+        self.max_ns = max(self.max_ns, elapsed_ns)
+        self.histogram[min((elapsed_ns // 1000).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+class LatencySamples:
+    def __init__(
+        self,
+        capacity : int = 65536,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("The capacity must be positive")
+
+        self.capacity = capacity
+        self.calls = 0
+        self.bytes = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.samples : deque[int] = deque(maxlen = capacity)
+
+    @property
+    def mean_us(
+        self,
+    ) -> float:
+        return 0.0 if self.calls == 0 else self.total_ns / self.calls / 1000
+
+    def percentile_us(
+        self,
+        percentile : float,
+    ) -> float:
+        if len(self.samples) == 0:
+            return 0.0
+
+        return nearest_rank(sorted(self.samples), percentile) / 1000
+
+    def add(
+        self,
+        elapsed_ns : int,
+        n_bytes : int = 0,
+    ) -> None:
+        self.calls += 1
+        self.bytes += n_bytes
+        self.total_ns += elapsed_ns
+        self.max_ns = max(self.max_ns, elapsed_ns)
+        self.samples.append(elapsed_ns)
+
+_enabled = False
+_lock = threading.Lock()
+_stats : dict[str, CallStats] = {}
+_native_functions : list[NativeFunction] = []
+
+def _rebind(
+    enabled : bool,
+) -> None:
+    with _lock:
+        functions = list(_native_functions)
+
+    swaps = {
+        id(source): (source, target) for source, target in (
+            (function.func, function) if enabled else (function, function.func) \
+                for function in functions
+        )
+    }
+    package = __name__.rsplit(".", 1)[0]
+
+    for module_name, module in list(sys.modules.items()):
+        if module is None or not (module_name == package or module_name.startswith(f"{package}.")):
+            continue
+
+        namespace = vars(module)
+
+        for attribute, value in list(namespace.items()):
+            swap = swaps.get(id(value))
+            if swap is not None and swap[0] is value:
+                namespace[attribute] = swap[1]
+
+def enable(
+) -> None:
+    global _enabled
+    _enabled = True
+    _rebind(True)
+
+def disable(
+) -> None:
+    global _enabled
+    _enabled = False
+    _rebind(False)
+
+def is_enabled(
+) -> bool:
+    return _enabled
+
+def record(
+    name : str,
+    elapsed_ns : int,
+    n_bytes : int = 0,
+) -> None:
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = CallStats()
+        stats.add(elapsed_ns, n_bytes)
+
+def snapshot(
+) -> dict[str, CallStats]:
+    with _lock:
+        return {
+            name: replace(stats, histogram = list(stats.histogram)) \
+                for name, stats in _stats.items()
+        }
+
+def total_calls(
+    prefix : str = "",
+) -> int:
+    with _lock:
+        return sum(stats.calls for name, stats in _stats.items() if name.startswith(prefix))
+
+def reset(
+) -> None:
+    with _lock:
+        _stats.clear()
+
+def report(
+) -> str:
+    stats = sorted(snapshot().items(), key = lambda item: item[1].total_ns, reverse = True)
+
+    lines = [
+        f"{"name":<56} {"calls":>9} {"bytes":>12} {"mean_us":>10} {"p50_us":>10} {"p99_us":>10} {"max_us":>10}",
+    ]
+
+    for name, s in stats:
+        lines.append(
+            f"{name:<56} {s.calls:>9} {s.bytes:>12} {s.mean_us:>10.1f}"
+            f" {s.percentile_us(50):>10.0f} {s.percentile_us(99):>10.0f} {s.max_ns / 1000:>10.1f}"
+        )
+
+    return "\n".join(lines) + "\n"
+
+def _transferred_bytes(
+    arg : Any,
+) -> int:
+    value = getattr(getattr(arg, "_obj", arg), "value", arg)
+    return value if isinstance(value, int) else 0
+
+class NativeFunction:
+    def __init__(
+        self,
+        library_name : str,
+        name : str,
+        func : Any,
+        get_last_error : Callable[[], int],
+        set_last_error : Callable[[int], Any],
+    ) -> None:
+        self.name = f"{library_name}.{name}"
+        self.func = func
+        self._bytes_arg = _TRANSFER_SIZE_ARGS.get(name)
+        self._get_last_error = get_last_error
+        self._set_last_error = set_last_error
+
+    @property
+    def argtypes(
+        self,
+    ) -> Any:
+        return self.func.argtypes
+
+    @argtypes.setter
+    def argtypes(
+        self,
+        value : Any,
+    ) -> None:
+        self.func.argtypes = value
+
+    @property
+    def restype(
+        self,
+    ) -> Any:
+        return self.func.restype
+
+    @restype.setter
+    def restype(
+        self,
+        value : Any,
+    ) -> None:
+        self.func.restype = value
+
+    def __call__(
+        self,
+        *args : Any,
+    ) -> Any:
+        if not _enabled:
+            return self.func(*args)
+
+        started = time.perf_counter_ns()
+        result = self.func(*args)
+        error = self._get_last_error()
+        elapsed = time.perf_counter_ns() - started
+
+        n_bytes = 0 \
+            if self._bytes_arg is None or len(args) <= self._bytes_arg \
+            else _transferred_bytes(args[self._bytes_arg])
+
+        record(self.name, elapsed, n_bytes)
+        self._set_last_error(error)
+
+        return result
+
+class _UnavailableFunction:
+    def __init__(
+        self,
+        name : str,
+    ) -> None:
+        self.name = name
+        self.argtypes : Any = None
+        self.restype : Any = None
+
+    def __call__(
+        self,
+        *args : Any,
+    ) -> Any:
+        raise OSError(
+            f"{self.name} is not available on {sys.platform}; only recorded or simulated backends can run here"
+        )
+
+class _UnavailableLibrary:
+    def __init__(
+        self,
+        name : str,
+    ) -> None:
+        self.name = name
+
+    def __getattr__(
+        self,
+        name : str,
+    ) -> _UnavailableFunction:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _UnavailableFunction(f"{self.name}.{name}")
+
+class NativeLibrary:
+    def __init__(
+        self,
+        name : str,
+    ) -> None:
+        self.name = name.lower().removesuffix(".dll")
+        self._functions : dict[str, NativeFunction] = {}
+
+        if NATIVE_AVAILABLE:
+            self._dll : Any = C.WinDLL(name)
+            kernel32 = C.WinDLL("Kernel32.dll")
+            self._get_last_error : Callable[[], int] = kernel32.GetLastError
+            self._set_last_error : Callable[[int], Any] = kernel32.SetLastError
+        else:
+            self._dll = _UnavailableLibrary(name)
+            self._get_last_error = lambda: 0
+            self._set_last_error = lambda error: None
+
+    def __getattr__(
+        self,
+        name : str,
+    ) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        function = self._functions.get(name)
+
+        if function is None:
+            function = NativeFunction(
+                self.name,
+                name,
+                getattr(self._dll, name),
+                self._get_last_error,
+                self._set_last_error,
+            )
+            self._functions[name] = function
+
+            with _lock:
+                _native_functions.append(function)
+
+        return function if _enabled else function.func
+
+def load_library(
+    name : str,
+) -> NativeLibrary:
+    return NativeLibrary(name)
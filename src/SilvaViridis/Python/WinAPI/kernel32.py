@@ -1,12 +1,16 @@
 import ctypes as C
 import ctypes.wintypes as W
 
+from .instrumentation import load_library
 from .types import (
+    LPCOMMTIMEOUTS,
+    LPCOMSTAT,
+    LPDCB,
     LPSECURITY_ATTRIBUTES,
     LPOVERLAPPED,
 )
 
-_kernel32 = C.windll.LoadLibrary("Kernel32.dll")
+_kernel32 = load_library("Kernel32.dll")
 
 GlobalAlloc = _kernel32.GlobalAlloc
 GlobalAlloc.argtypes = [
@@ -51,3 +55,149 @@ DeviceIoControl.argtypes = [
     LPOVERLAPPED, # lpOverlapped
 ]
 DeviceIoControl.restype = W.BOOL
+
+ReadFile = _kernel32.ReadFile
+ReadFile.argtypes = [
+    W.HANDLE, # hFile
+    W.LPVOID, # lpBuffer
+    W.DWORD, # nNumberOfBytesToRead
+    W.LPDWORD, # lpNumberOfBytesRead
+    LPOVERLAPPED, # lpOverlapped
+]
+ReadFile.restype = W.BOOL
+
+WriteFile = _kernel32.WriteFile
+WriteFile.argtypes = [
+    W.HANDLE, # hFile
+    W.LPCVOID, # lpBuffer
+    W.DWORD, # nNumberOfBytesToWrite
+    W.LPDWORD, # lpNumberOfBytesWritten
+    LPOVERLAPPED, # lpOverlapped
+]
+WriteFile.restype = W.BOOL
+
+GetOverlappedResult = _kernel32.GetOverlappedResult
+GetOverlappedResult.argtypes = [
+    W.HANDLE, # hFile
+    LPOVERLAPPED, # lpOverlapped
+    W.LPDWORD, # lpNumberOfBytesTransferred
+    W.BOOL, # bWait
+]
+GetOverlappedResult.restype = W.BOOL
+
+CancelIoEx = _kernel32.CancelIoEx
+CancelIoEx.argtypes = [
+    W.HANDLE, # hFile
+    LPOVERLAPPED, # lpOverlapped
+]
+CancelIoEx.restype = W.BOOL
+
+CreateEvent = _kernel32.CreateEventW
+CreateEvent.argtypes = [
+    LPSECURITY_ATTRIBUTES, # lpEventAttributes
+    W.BOOL, # bManualReset
+    W.BOOL, # bInitialState
+    W.LPCWSTR, # lpName
+]
+CreateEvent.restype = W.HANDLE
+
+GetCommState = _kernel32.GetCommState
+GetCommState.argtypes = [
+    W.HANDLE, # hFile
+    LPDCB, # lpDCB
+]
+GetCommState.restype = W.BOOL
+
+SetCommState = _kernel32.SetCommState
+SetCommState.argtypes = [
+    W.HANDLE, # hFile
+    LPDCB, # lpDCB
+]
+SetCommState.restype = W.BOOL
+
+GetCommTimeouts = _kernel32.GetCommTimeouts
+GetCommTimeouts.argtypes = [
+    W.HANDLE, # hFile
+    LPCOMMTIMEOUTS, # lpCommTimeouts
+]
+GetCommTimeouts.restype = W.BOOL
+
+SetCommTimeouts = _kernel32.SetCommTimeouts
+SetCommTimeouts.argtypes = [
+    W.HANDLE, # hFile
+    LPCOMMTIMEOUTS, # lpCommTimeouts
+]
+SetCommTimeouts.restype = W.BOOL
+
+PurgeComm = _kernel32.PurgeComm
+PurgeComm.argtypes = [
+    W.HANDLE, # hFile
+    W.DWORD, # dwFlags
+]
+PurgeComm.restype = W.BOOL
+
+SetupComm = _kernel32.SetupComm
+SetupComm.argtypes = [
+    W.HANDLE, # hFile
+    W.DWORD, # dwInQueue
+    W.DWORD, # dwOutQueue
+]
+SetupComm.restype = W.BOOL
+
+SetCommMask = _kernel32.SetCommMask
+SetCommMask.argtypes = [
+    W.HANDLE, # hFile
+    W.DWORD, # dwEvtMask
+]
+SetCommMask.restype = W.BOOL
+
+WaitCommEvent = _kernel32.WaitCommEvent
+WaitCommEvent.argtypes = [
+    W.HANDLE, # hFile
+    W.LPDWORD, # lpEvtMask
+    LPOVERLAPPED, # lpOverlapped
+]
+WaitCommEvent.restype = W.BOOL
+
+ClearCommError = _kernel32.ClearCommError
+ClearCommError.argtypes = [
+    W.HANDLE, # hFile
+    W.LPDWORD, # lpErrors
+    LPCOMSTAT, # lpStat
+]
+ClearCommError.restype = W.BOOL
+
+WaitForSingleObject = _kernel32.WaitForSingleObject
+WaitForSingleObject.argtypes = [
+    W.HANDLE, # hHandle
+    W.DWORD, # dwMilliseconds
+]
+WaitForSingleObject.restype = W.DWORD
+
+CreateIoCompletionPort = _kernel32.CreateIoCompletionPort
+CreateIoCompletionPort.argtypes = [
+    W.HANDLE, # FileHandle
+    W.HANDLE, # ExistingCompletionPort
+    C.c_size_t, # CompletionKey
+    W.DWORD, # NumberOfConcurrentThreads
+]
+CreateIoCompletionPort.restype = W.HANDLE
+
+GetQueuedCompletionStatus = _kernel32.GetQueuedCompletionStatus
+GetQueuedCompletionStatus.argtypes = [
+    W.HANDLE, # CompletionPort
+    W.LPDWORD, # lpNumberOfBytesTransferred
+    C.POINTER(C.c_size_t), # lpCompletionKey
+    C.POINTER(LPOVERLAPPED), # lpOverlapped
+    W.DWORD, # dwMilliseconds
+]
+GetQueuedCompletionStatus.restype = W.BOOL
+
+PostQueuedCompletionStatus = _kernel32.PostQueuedCompletionStatus
+PostQueuedCompletionStatus.argtypes = [
+    W.HANDLE, # CompletionPort
+    W.DWORD, # dwNumberOfBytesTransferred
+    C.c_size_t, # dwCompletionKey
+    LPOVERLAPPED, # lpOverlapped
+]
+PostQueuedCompletionStatus.restype = W.BOOL
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import ctypes as C
 import ctypes.wintypes as W
 
+from .instrumentation import load_library
 from .types import (
     LPGUID,
     HDEVINFO,
@@ -12,7 +12,7 @@ from .types import (
     PDEVPROPKEY,
 )
 
-_setupapi = C.windll.LoadLibrary("SetupAPI.dll")
+_setupapi = load_library("SetupAPI.dll")
 
 SetupDiEnumDeviceInfo = _setupapi.SetupDiEnumDeviceInfo
 SetupDiEnumDeviceInfo.argtypes = [
@@ -28,6 +28,72 @@ class DEVPROPKEY(C.Structure):
 
 PDEVPROPKEY = C.POINTER(DEVPROPKEY)
 
+# cfgmgr32.h
+
+HCMNOTIFICATION = W.HANDLE
+PHCMNOTIFICATION = C.POINTER(HCMNOTIFICATION)
+
+MAX_DEVICE_ID_LEN = 200
+
+class CM_NOTIFY_FILTER_DEVICE_INTERFACE(C.Structure):
+    _fields_ = [
+        ("ClassGuid", GUID),
+    ]
+
+class CM_NOTIFY_FILTER_DEVICE_HANDLE(C.Structure):
+    _fields_ = [
+        ("hTarget", W.HANDLE),
+    ]
+
+class CM_NOTIFY_FILTER_DEVICE_INSTANCE(C.Structure):
+    _fields_ = [
+        ("InstanceId", W.WCHAR * MAX_DEVICE_ID_LEN),
+    ]
+
+class CM_NOTIFY_FILTER_u(C.Union):
+    _fields_ = [
+        ("DeviceInterface", CM_NOTIFY_FILTER_DEVICE_INTERFACE),
+        ("DeviceHandle", CM_NOTIFY_FILTER_DEVICE_HANDLE),
+        ("DeviceInstance", CM_NOTIFY_FILTER_DEVICE_INSTANCE),
+    ]
+
+class CM_NOTIFY_FILTER(C.Structure):
+    _fields_ = [
+        ("cbSize", W.DWORD),
+        ("Flags", W.DWORD),
+        ("FilterType", C.c_int),
+        ("Reserved", W.DWORD),
+        ("u", CM_NOTIFY_FILTER_u),
+    ]
+
+    @staticmethod
+    def create() -> CM_NOTIFY_FILTER:
+        data = CM_NOTIFY_FILTER()
+        data.cbSize = C.sizeof(CM_NOTIFY_FILTER)
+        return data
+
+PCM_NOTIFY_FILTER = C.POINTER(CM_NOTIFY_FILTER)
+
+class CM_NOTIFY_EVENT_DATA_DEVICE_INTERFACE(C.Structure):
+    _fields_ = [
+        ("ClassGuid", GUID),
+        ("SymbolicLink", W.WCHAR * 1),
+    ]
+
+class CM_NOTIFY_EVENT_DATA_u(C.Union):
+    _fields_ = [
+        ("DeviceInterface", CM_NOTIFY_EVENT_DATA_DEVICE_INTERFACE),
+    ]
+
+class CM_NOTIFY_EVENT_DATA(C.Structure):
+    _fields_ = [
+        ("FilterType", C.c_int),
+        ("Reserved", W.DWORD),
+        ("u", CM_NOTIFY_EVENT_DATA_u),
+    ]
+
+PCM_NOTIFY_EVENT_DATA = C.POINTER(CM_NOTIFY_EVENT_DATA)
+
 # minwinbase.h
 
 class OVERLAPPED_DUMMYSTRUCT(C.Structure):
@@ -129,6 +195,7 @@ class USB_30_HUB_DESCRIPTOR(C.Structure):
 PUSB_30_HUB_DESCRIPTOR = C.POINTER(USB_30_HUB_DESCRIPTOR)
 
 class USB_DEVICE_DESCRIPTOR(C.Structure):
+    _pack_ = 1
     _fields_ = [
         ("bLength", C.c_ubyte),
         ("bDescriptorType", C.c_ubyte),
@@ -149,6 +216,7 @@ class USB_DEVICE_DESCRIPTOR(C.Structure):
 PUSB_DEVICE_DESCRIPTOR = C.POINTER(USB_DEVICE_DESCRIPTOR)
 
 class USB_ENDPOINT_DESCRIPTOR(C.Structure):
+    _pack_ = 1
     _fields_ = [
         ("bLength", C.c_ubyte),
         ("bDescriptorType", C.c_ubyte),
@@ -160,6 +228,31 @@ class USB_ENDPOINT_DESCRIPTOR(C.Structure):
 
 PUSB_ENDPOINT_DESCRIPTOR = C.POINTER(USB_ENDPOINT_DESCRIPTOR)
 
+class USB_CONFIGURATION_DESCRIPTOR(C.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("bLength", C.c_ubyte),
+        ("bDescriptorType", C.c_ubyte),
+        ("wTotalLength", W.USHORT),
+        ("bNumInterfaces", C.c_ubyte),
+        ("bConfigurationValue", C.c_ubyte),
+        ("iConfiguration", C.c_ubyte),
+        ("bmAttributes", C.c_ubyte),
+        ("MaxPower", C.c_ubyte),
+    ]
+
+PUSB_CONFIGURATION_DESCRIPTOR = C.POINTER(USB_CONFIGURATION_DESCRIPTOR)
+
+class USB_STRING_DESCRIPTOR(C.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("bLength", C.c_ubyte),
+        ("bDescriptorType", C.c_ubyte),
+        ("bString", W.WCHAR * 1),
+    ]
+
+PUSB_STRING_DESCRIPTOR = C.POINTER(USB_STRING_DESCRIPTOR)
+
 # usbioctl.h
 
 class USB_HCD_DRIVERKEY_NAME(C.Structure):
@@ -369,6 +462,26 @@ class USB_NODE_CONNECTION_NAME(C.Structure):
 
 PUSB_NODE_CONNECTION_NAME = C.POINTER(USB_NODE_CONNECTION_NAME)
 
+class USB_DESCRIPTOR_REQUEST_SETUP_PACKET(C.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("bmRequest", C.c_ubyte),
+        ("bRequest", C.c_ubyte),
+        ("wValue", W.USHORT),
+        ("wIndex", W.USHORT),
+        ("wLength", W.USHORT),
+    ]
+
+class USB_DESCRIPTOR_REQUEST(C.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("ConnectionIndex", W.ULONG),
+        ("SetupPacket", USB_DESCRIPTOR_REQUEST_SETUP_PACKET),
+        ("Data", C.c_ubyte * 1),
+    ]
+
+PUSB_DESCRIPTOR_REQUEST = C.POINTER(USB_DESCRIPTOR_REQUEST)
+
 # usbuser.h
 
 class USBUSER_REQUEST_HEADER(C.Structure):
@@ -395,6 +508,148 @@ class USBUSER_CONTROLLER_INFO_0(C.Structure):
         ("Info0", USB_CONTROLLER_INFO_0),
     ]
 
+class USB_BUS_STATISTICS_0(C.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("DeviceCount", W.ULONG),
+        ("CurrentSystemTime", W.LARGE_INTEGER),
+        ("CurrentUsbFrame", W.ULONG),
+        ("BulkBytes", W.ULONG),
+        ("IsoBytes", W.ULONG),
+        ("InterruptBytes", W.ULONG),
+        ("ControlDataBytes", W.ULONG),
+        ("PciInterruptCount", W.ULONG),
+        ("HardResetCount", W.ULONG),
+        ("WorkerSignalCount", W.ULONG),
+        ("CommonBufferBytes", W.ULONG),
+        ("WorkerIdleTimeMs", W.ULONG),
+        ("RootHubEnabled", W.BOOLEAN),
+        ("RootHubDevicePowerState", C.c_ubyte),
+        ("Unused", C.c_ubyte),
+        ("NameIndex", C.c_ubyte),
+    ]
+
+class USBUSER_BUS_STATISTICS_0_REQUEST(C.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("Header", USBUSER_REQUEST_HEADER),
+        ("BusStatistics0", USB_BUS_STATISTICS_0),
+    ]
+
+class USB_BANDWIDTH_INFO(C.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("DeviceCount", W.ULONG),
+        ("TotalBusBandwidth", W.ULONG),
+        ("Total32secBandwidth", W.ULONG),
+        ("AllocedBulkAndControl", W.ULONG),
+        ("AllocedIso", W.ULONG),
+        ("AllocedInterrupt_1ms", W.ULONG),
+        ("AllocedInterrupt_2ms", W.ULONG),
+        ("AllocedInterrupt_4ms", W.ULONG),
+        ("AllocedInterrupt_8ms", W.ULONG),
+        ("AllocedInterrupt_16ms", W.ULONG),
+        ("AllocedInterrupt_32ms", W.ULONG),
+    ]
+
+class USBUSER_BANDWIDTH_INFO_REQUEST(C.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("Header", USBUSER_REQUEST_HEADER),
+        ("BandwidthInformation", USB_BANDWIDTH_INFO),
+    ]
+
+class USB_POWER_INFO(C.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("SystemState", C.c_int),
+        ("HcDevicePowerState", C.c_int),
+        ("HcDeviceWake", C.c_int),
+        ("HcSystemWake", C.c_int),
+        ("RhDevicePowerState", C.c_int),
+        ("RhDeviceWake", C.c_int),
+        ("RhSystemWake", C.c_int),
+        ("LastSystemSleepState", C.c_int),
+        ("CanWakeup", W.BOOLEAN),
+        ("IsPowered", W.BOOLEAN),
+    ]
+
+class USBUSER_POWER_INFO_REQUEST(C.Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("Header", USBUSER_REQUEST_HEADER),
+        ("PowerInformation", USB_POWER_INFO),
+    ]
+
+# winbase.h
+
+class DCB(C.Structure):
+    _fields_ = [
+        ("DCBlength", W.DWORD),
+        ("BaudRate", W.DWORD),
+        ("fBinary", W.DWORD, 1),
+        ("fParity", W.DWORD, 1),
+        ("fOutxCtsFlow", W.DWORD, 1),
+        ("fOutxDsrFlow", W.DWORD, 1),
+        ("fDtrControl", W.DWORD, 2),
+        ("fDsrSensitivity", W.DWORD, 1),
+        ("fTXContinueOnXoff", W.DWORD, 1),
+        ("fOutX", W.DWORD, 1),
+        ("fInX", W.DWORD, 1),
+        ("fErrorChar", W.DWORD, 1),
+        ("fNull", W.DWORD, 1),
+        ("fRtsControl", W.DWORD, 2),
+        ("fAbortOnError", W.DWORD, 1),
+        ("fDummy2", W.DWORD, 17),
+        ("wReserved", W.WORD),
+        ("XonLim", W.WORD),
+        ("XoffLim", W.WORD),
+        ("ByteSize", W.BYTE),
+        ("Parity", W.BYTE),
+        ("StopBits", W.BYTE),
+        ("XonChar", C.c_char),
+        ("XoffChar", C.c_char),
+        ("ErrorChar", C.c_char),
+        ("EofChar", C.c_char),
+        ("EvtChar", C.c_char),
+        ("wReserved1", W.WORD),
+    ]
+
+    @staticmethod
+    def create() -> DCB:
+        data = DCB()
+        data.DCBlength = C.sizeof(DCB)
+        return data
+
+LPDCB = C.POINTER(DCB)
+
+class COMMTIMEOUTS(C.Structure):
+    _fields_ = [
+        ("ReadIntervalTimeout", W.DWORD),
+        ("ReadTotalTimeoutMultiplier", W.DWORD),
+        ("ReadTotalTimeoutConstant", W.DWORD),
+        ("WriteTotalTimeoutMultiplier", W.DWORD),
+        ("WriteTotalTimeoutConstant", W.DWORD),
+    ]
+
+LPCOMMTIMEOUTS = C.POINTER(COMMTIMEOUTS)
+
+class COMSTAT(C.Structure):
+    _fields_ = [
+        ("fCtsHold", W.DWORD, 1),
+        ("fDsrHold", W.DWORD, 1),
+        ("fRlsdHold", W.DWORD, 1),
+        ("fXoffHold", W.DWORD, 1),
+        ("fXoffSent", W.DWORD, 1),
+        ("fEof", W.DWORD, 1),
+        ("fTxim", W.DWORD, 1),
+        ("fReserved", W.DWORD, 25),
+        ("cbInQue", W.DWORD),
+        ("cbOutQue", W.DWORD),
+    ]
+
+LPCOMSTAT = C.POINTER(COMSTAT)
+
 # wtypesbase.h
 
 class SECURITY_ATTRIBUTES(C.Structure):
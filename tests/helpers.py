@@ -0,0 +1,148 @@
+import ctypes as C
+import unittest
+
+from uuid import UUID
+
+from SilvaViridis.Python.WinAPI import instrumentation
+from SilvaViridis.Python.WinAPI.Wrapper import Simulation
+from SilvaViridis.Python.WinAPI.Wrapper.HandlePool import handle_pool
+from SilvaViridis.Python.WinAPI.Wrapper.IOAPISet import ioctl_cache
+from SilvaViridis.Python.WinAPI.Wrapper.Types import (
+    CMNotifyActions,
+    CtlCodes,
+    DeviceInterfaceNotification,
+    DevInterfaceGuids,
+    DevProperties,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    USBDevice,
+    USBDeviceIndex,
+)
+
+class FakeClock:
+    def __init__(
+        self,
+    ) -> None:
+        self.now = 0.0
+
+    def __call__(
+        self,
+    ) -> float:
+        return self.now
+
+class FakeHandles:
+    def __init__(
+        self,
+    ) -> None:
+        self.opened : list[str] = []
+        self.closed : list[int] = []
+
+    def open(
+        self,
+        path : str,
+    ) -> C.c_void_p:
+        self.opened.append(path)
+        return C.c_void_p(len(self.opened))
+
+    def close(
+        self,
+        fd : C.c_void_p,
+    ) -> None:
+        self.closed.append(fd.value or 0)
+
+class SimulatedBus:
+    def __init__(
+        self,
+        controllers : int = 1,
+        depth : int = 2,
+        ports_per_hub : int = 4,
+        hubs_per_hub : int = 1,
+        devices_per_hub : int = 2,
+    ) -> None:
+        initial = Simulation.build_simulated_topology(
+            controllers = controllers,
+            depth = depth,
+            ports_per_hub = ports_per_hub,
+            hubs_per_hub = hubs_per_hub,
+            devices_per_hub = devices_per_hub,
+            delay = 0.0,
+        )
+        self.controllers = initial.controllers
+        self.hubs = {hub.id: hub for hub in initial.hubs}
+        self.devices = {dev.id: dev for dev in initial.devices}
+        self.builds = 0
+
+    def index(
+        self,
+    ) -> USBDeviceIndex:
+        self.builds += 1
+        return USBDeviceIndex(
+            controllers = list(self.controllers),
+            hubs = list(self.hubs.values()),
+            devices = list(self.devices.values()),
+        )
+
+    def unplug(
+        self,
+        hub_id : str,
+        port : int,
+    ) -> str:
+        hub = self.hubs[hub_id]
+        connection = hub.ports[port - 1]
+        assert isinstance(hub, Simulation.SimulatedHub) and connection is not None
+        hub.ports[port - 1] = None
+        del self.devices[connection.driver_key_name]
+        return connection.driver_key_name
+
+    def plug(
+        self,
+        hub_id : str,
+        port : int,
+        device_id : str,
+        device_address : int,
+        product_id : int = 1,
+    ) -> None:
+        hub = self.hubs[hub_id]
+        assert isinstance(hub, Simulation.SimulatedHub)
+        hub.ports[port - 1] = Simulation.SimulatedConnection(device_id, False, device_address, product_id)
+        self.devices[device_id] = USBDevice(
+            UUID(int = 0),
+            UUID(int = 0),
+            f"\\\\?\\{device_id}",
+            device_id,
+            hub_id,
+            {DevProperties.DRIVER: device_id, DevProperties.DEVICEDESC: "Simulated device"},
+            {},
+        )
+
+def notification(
+    action : CMNotifyActions,
+    instance_id : str,
+) -> DeviceInterfaceNotification:
+    guid = DevInterfaceGuids.USB_DEVICE.value
+    return DeviceInterfaceNotification(
+        action = action,
+        interface_class_guid = guid,
+        symbolic_link = f"\\\\?\\{instance_id.replace("\\", "#")}#{{{guid}}}",
+    )
+
+def use_machine(
+    test : unittest.TestCase,
+    machine : Simulation.SimulatedUSBMachine,
+) -> Simulation.SimulatedUSBMachine:
+    ioctl_cache.clear()
+    instrumentation.reset()
+    instrumentation.enable()
+    machine.__enter__()
+    test.addCleanup(ioctl_cache.clear)
+    test.addCleanup(instrumentation.reset)
+    test.addCleanup(instrumentation.disable)
+    test.addCleanup(machine.__exit__)
+    test.addCleanup(handle_pool.clear)
+    return machine
+
+def ioctl_calls(
+    code : CtlCodes,
+) -> int:
+    stats = instrumentation.snapshot().get(f"IOCTL.{code.name}")
+    return 0 if stats is None else stats.calls
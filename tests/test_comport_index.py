@@ -0,0 +1,112 @@
+import unittest
+
+from uuid import UUID
+
+from SilvaViridis.Python.WinAPI.Wrapper.COMPortDeviceManager import COMPortDevice
+from SilvaViridis.Python.WinAPI.Wrapper.Tools import ComPortIndex
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    USBDevice,
+    USBHub,
+    USBInterface,
+    USBNode,
+    USBPort,
+)
+
+FTDI_DEVICE = "USB\\VID_0403&PID_6001\\A50285BI"
+COMPOSITE_DEVICE = "USB\\VID_2341&PID_8036\\5&3753427A&0&2"
+COMPOSITE_INTERFACE = "USB\\VID_2341&PID_8036&MI_00\\6&2A5A3C6F&0&0000"
+VENDOR_BUS = "VENDORBUS\\VID_2341&PID_8036\\7&1"
+
+def comport(
+    instance_id : str,
+    parent : str,
+    port_name : str,
+) -> COMPortDevice:
+    return COMPortDevice(UUID(int = 0), UUID(int = 0), "", instance_id, parent, {}, {"PortName": port_name})
+
+def device[T : USBHub | USBDevice | USBInterface](
+    device_type : type[T],
+    instance_id : str,
+    parent : str,
+) -> T:
+    return device_type(UUID(int = 0), UUID(int = 0), "", instance_id, parent, {}, {})
+
+class ComPortIndexTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.ftdi = comport("FTDIBUS\\VID_0403+PID_6001+A50285BIA\\0000", FTDI_DEVICE, "COM3")
+        self.composite = comport(COMPOSITE_INTERFACE, COMPOSITE_INTERFACE, "COM4")
+        self.nested = comport("VENDORBUS\\PORT\\8&1", VENDOR_BUS, "COM5")
+        self.index = ComPortIndex(
+            [self.ftdi, self.composite, self.nested],
+            [
+                device(USBInterface, COMPOSITE_INTERFACE, COMPOSITE_DEVICE),
+                device(USBInterface, VENDOR_BUS, COMPOSITE_INTERFACE),
+            ],
+        )
+
+    def test_find_by_parent_ignores_case(
+        self,
+    ) -> None:
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.find(FTDI_DEVICE.lower()), [self.ftdi])
+        self.assertEqual(self.index.find(VENDOR_BUS), [self.nested])
+
+    def test_composite_ports_resolve_to_the_usb_device(
+        self,
+    ) -> None:
+        self.assertEqual(self.index.find(COMPOSITE_DEVICE), [self.composite, self.nested])
+        self.assertEqual(self.index.find(COMPOSITE_INTERFACE), [self.composite])
+
+    def test_unresolved_interface_is_found_by_parent_only(
+        self,
+    ) -> None:
+        index = ComPortIndex([self.composite])
+
+        self.assertEqual(index.find(COMPOSITE_INTERFACE), [self.composite])
+        self.assertEqual(index.find(COMPOSITE_DEVICE), [])
+
+    def test_remove(
+        self,
+    ) -> None:
+        self.assertIs(self.index.remove(self.composite.id.lower()), self.composite)
+        self.assertIsNone(self.index.remove(self.composite.id))
+
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.find(COMPOSITE_DEVICE), [self.nested])
+        self.assertEqual(self.index.find(COMPOSITE_INTERFACE), [])
+        self.assertNotIn(COMPOSITE_INTERFACE.lower(), self.index.by_parent)
+
+    def test_add_replaces_a_port_with_the_same_id(
+        self,
+    ) -> None:
+        moved = comport(self.ftdi.id, COMPOSITE_INTERFACE, "COM6")
+        self.index.add(moved)
+
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.find(FTDI_DEVICE), [])
+        self.assertEqual(self.index.find(COMPOSITE_DEVICE), [self.composite, self.nested, moved])
+
+    def test_map_usb_tree(
+        self,
+    ) -> None:
+        composite = USBNode(None, device(USBDevice, COMPOSITE_DEVICE, "HUB"))
+        ftdi = USBNode(None, device(USBDevice, FTDI_DEVICE, "HUB"))
+        empty = USBNode(None, USBPort(3))
+        hub = USBNode(None, device(USBHub, "HUB", ""), [
+            USBNode(None, USBPort(1), [composite]),
+            USBNode(None, USBPort(2), [ftdi]),
+            empty,
+        ])
+
+        self.assertEqual(
+            self.index.map_usb_tree([hub]),
+            {
+                composite: [self.composite, self.nested],
+                ftdi: [self.ftdi],
+            },
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import ctypes as C
+import ctypes.wintypes as W
+import unittest
+
+from typing import Any
+from unittest import mock
+
+from SilvaViridis.Python.WinAPI.Wrapper import WinReg
+from SilvaViridis.Python.WinAPI.Wrapper.COMPortDeviceManager import get_comport_names, get_serialcomm_ports
+from SilvaViridis.Python.WinAPI.Wrapper.Exceptions import (
+    ERROR_FILE_NOT_FOUND,
+    ERROR_NO_MORE_ITEMS,
+    ERROR_SUCCESS,
+    raise_ex,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import SimulatedSerialMachine
+from SilvaViridis.Python.WinAPI.Wrapper.Types import ValueTypes
+
+WINDOWS_ABI = C.sizeof(W.ULONG) == 4 and C.sizeof(C.c_wchar) == 2
+
+def missing_key(
+    *args : Any,
+) -> None:
+    raise_ex(ERROR_FILE_NOT_FOUND)
+
+class FakeRegistryKey:
+    def __init__(
+        self,
+        values : list[tuple[str, ValueTypes, bytes]],
+    ) -> None:
+        self.values = values
+        self.enumerated : list[int] = []
+
+    def query_info(
+        self,
+        regkey : Any,
+        *args : Any,
+    ) -> int:
+        args[6]._obj.value = len(self.values)
+        args[7]._obj.value = max(len(name) for name, _, _ in self.values)
+        args[8]._obj.value = max(len(data) for _, _, data in self.values)
+        return ERROR_SUCCESS
+
+    def enum_value(
+        self,
+        regkey : Any,
+        index : int,
+        name_buffer : Any,
+        name_length : Any,
+        reserved : None,
+        regtype : Any,
+        value_buffer : Any,
+        value_size : Any,
+    ) -> int:
+        self.enumerated.append(index)
+
+        if index >= len(self.values):
+            return ERROR_NO_MORE_ITEMS
+
+        name, value_type, data = self.values[index]
+        name_buffer.value = name
+        name_length._obj.value = len(name)
+        regtype._obj.value = value_type.value
+        C.memmove(value_buffer, data, len(data))
+        value_size._obj.value = len(data)
+        return ERROR_SUCCESS
+
+class SerialCommTests(unittest.TestCase):
+    def test_serialcomm_ports_come_from_the_registry(
+        self,
+    ) -> None:
+        with SimulatedSerialMachine(ports = 5, delay = 0.0):
+            ports = get_serialcomm_ports()
+
+        self.assertEqual(ports, {f"\\Device\\Serial{i}": f"COM{i + 1}" for i in range(5)})
+
+    def test_fast_path_matches_setupapi(
+        self,
+    ) -> None:
+        with SimulatedSerialMachine(ports = 16, delay = 0.0) as machine:
+            fast = get_comport_names(fast = True)
+            fast_calls = machine.native_calls
+            slow = get_comport_names(fast = False)
+            slow_calls = machine.native_calls - fast_calls
+
+        self.assertEqual(sorted(fast), sorted(f"COM{i + 1}" for i in range(16)))
+        self.assertEqual(sorted(fast), sorted(slow))
+        self.assertLess(fast_calls, slow_calls)
+
+    def test_missing_serialcomm_key(
+        self,
+    ) -> None:
+        with SimulatedSerialMachine(ports = 3, delay = 0.0) as machine:
+            machine._handlers["WinReg.open_registry_key"] = missing_key
+
+            self.assertEqual(get_serialcomm_ports(), {})
+            self.assertEqual(get_comport_names(fast = True), [])
+            self.assertEqual(len(get_comport_names(fast = False)), 3)
+
+@unittest.skipUnless(WINDOWS_ABI, "Requires the Windows ABI")
+class RegistryStringValuesTests(unittest.TestCase):
+    def test_string_values_are_decoded(
+        self,
+    ) -> None:
+        key = FakeRegistryKey([
+            ("\\Device\\Serial0", ValueTypes.SZ, "COM1\0".encode("utf-16-le")),
+            ("Flags", ValueTypes.DWORD, (7).to_bytes(4, "little")),
+            ("\\Device\\VCP0", ValueTypes.EXPAND_SZ, "COM12".encode("utf-16-le")),
+        ])
+
+        with mock.patch.object(WinReg, "RegQueryInfoKey", key.query_info), \
+                mock.patch.object(WinReg, "RegEnumValue", key.enum_value):
+            values = WinReg.get_registry_string_values(C.c_void_p(1))
+
+        self.assertEqual(values, {"\\Device\\Serial0": "COM1", "\\Device\\VCP0": "COM12"})
+        self.assertEqual(key.enumerated, [0, 1, 2, 3])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from uuid import UUID
+
+from SilvaViridis.Python.WinAPI.Wrapper.DeviceManager import Device, _select_descendants
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import SimulatedUSBMachine
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    USBDevice,
+    USBDeviceIndex,
+    USBHub,
+    USBInterface,
+    _is_usb_instance,
+    enumerate_usb_interfaces,
+)
+
+from .helpers import use_machine
+
+PARENTS = {
+    "htree\\root\\0": "",
+    "pci\\ven_8086\\3": "htree\\root\\0",
+    "usb\\root_hub30\\4": "pci\\ven_8086\\3",
+    "usb\\vid_0403&pid_6010\\a": "usb\\root_hub30\\4",
+    "usb\\vid_0403&pid_6010&mi_00\\5": "usb\\vid_0403&pid_6010\\a",
+    "ftdibus\\vid_0403+pid_6010\\0000": "usb\\vid_0403&pid_6010&mi_00\\5",
+    "acpi\\pnp0501\\1": "htree\\root\\0",
+    "loop\\a": "loop\\b",
+    "loop\\b": "loop\\a",
+}
+
+class SelectDescendantsTests(unittest.TestCase):
+    def test_keeps_usb_descendants_and_their_function_children(
+        self,
+    ) -> None:
+        self.assertEqual(
+            _select_descendants(PARENTS, _is_usb_instance),
+            {
+                "usb\\vid_0403&pid_6010\\a",
+                "usb\\vid_0403&pid_6010&mi_00\\5",
+                "ftdibus\\vid_0403+pid_6010\\0000",
+            },
+        )
+
+    def test_root_without_parent_and_cycles_are_rejected(
+        self,
+    ) -> None:
+        selected = _select_descendants(PARENTS, _is_usb_instance)
+
+        for instance_id in ("htree\\root\\0", "acpi\\pnp0501\\1", "loop\\a", "loop\\b"):
+            self.assertNotIn(instance_id, selected)
+
+def instance[T : Device](
+    device_type : type[T],
+    instance_id : str,
+    parent : str,
+) -> T:
+    return device_type(UUID(int = 0), UUID(int = 0), "", instance_id, parent, {}, {})
+
+class EnumerateUSBInterfacesTests(unittest.TestCase):
+    def test_only_usb_enumerated_instances_are_visited(
+        self,
+    ) -> None:
+        root_hub = "USB\\ROOT_HUB30\\4"
+        device = "USB\\VID_0403&PID_6010\\A"
+        interfaces = [f"USB\\VID_0403&PID_6010&MI_0{i}\\5&{i}" for i in range(2)]
+        machine = use_machine(self, SimulatedUSBMachine(
+            USBDeviceIndex(
+                controllers = [],
+                hubs = [instance(USBHub, root_hub, "PCI\\VEN_8086\\3")],
+                devices = [instance(USBDevice, device, root_hub)],
+                interfaces = [instance(USBInterface, interface, device) for interface in interfaces],
+            ),
+            others = [
+                instance(Device, "PCI\\VEN_8086\\3", "HTREE\\ROOT\\0"),
+                *(instance(Device, f"ACPI\\PNP0C0A\\{i}", "HTREE\\ROOT\\0") for i in range(50)),
+            ],
+        ))
+
+        self.assertEqual(
+            sorted(interface.id for interface in enumerate_usb_interfaces()),
+            sorted([device, *interfaces]),
+        )
+        self.assertEqual(machine.calls["SetupAPI.next_device_info"], 4 + 1)
+
+if __name__ == "__main__":
+    unittest.main()
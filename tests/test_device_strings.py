@@ -0,0 +1,141 @@
+import ctypes as C
+import unittest
+
+from unittest import mock
+
+from SilvaViridis.Python.WinAPI.Wrapper import IOAPISet
+from SilvaViridis.Python.WinAPI.Wrapper.Exceptions import GenFailure
+from SilvaViridis.Python.WinAPI.Wrapper.Types import (
+    CtlCodes,
+    USBDescriptorTypes,
+    USBDeviceDescriptor,
+    USBDeviceStrings,
+)
+
+DEVICE_DESCRIPTOR = USBDeviceDescriptor(
+    bcd_usb = 0x0200,
+    device_class = 0,
+    device_sub_class = 0,
+    device_protocol = 0,
+    max_packet_size_0 = 64,
+    vendor_id = 0x0403,
+    product_id = 0x6010,
+    bcd_device = 0x0700,
+    manufacturer_index = 1,
+    product_index = 2,
+    serial_number_index = 3,
+    number_of_configurations = 1,
+)
+
+def string_descriptor(
+    text : str,
+) -> memoryview:
+    data = text.encode("utf-16-le")
+    return memoryview(bytes([len(data) + 2, USBDescriptorTypes.STRING.value]) + data)
+
+def gen_failure(
+) -> GenFailure:
+    ex = GenFailure()
+    ex.code = 31
+    return ex
+
+class FakeDescriptors:
+    def __init__(
+        self,
+        strings : dict[int, str],
+        stall_language_ids : bool = False,
+    ) -> None:
+        self.strings = strings
+        self.stall_language_ids = stall_language_ids
+        self.requests : list[tuple[int, int]] = []
+
+    def __call__(
+        self,
+        fd : C.c_void_p,
+        connection_index : int,
+        descriptor_type : USBDescriptorTypes,
+        descriptor_index : int = 0,
+        language_id : int = 0,
+        length : int | None = None,
+        view : object = None,
+    ) -> memoryview:
+        self.requests.append((descriptor_index, language_id))
+
+        if descriptor_index == 0:
+            if self.stall_language_ids:
+                raise gen_failure()
+            return memoryview(bytes([4, USBDescriptorTypes.STRING.value, 0x09, 0x04]))
+
+        if descriptor_index not in self.strings:
+            raise gen_failure()
+
+        return string_descriptor(self.strings[descriptor_index])
+
+class DeviceStringsTests(unittest.TestCase):
+    def get_strings(
+        self,
+        descriptors : FakeDescriptors,
+    ) -> USBDeviceStrings:
+        with mock.patch.object(IOAPISet, "ioctl_get_descriptor_from_node_connection", descriptors):
+            return IOAPISet.ioctl_get_usb_device_strings(C.c_void_p(1), 0, DEVICE_DESCRIPTOR)
+
+    def test_reads_all_strings(
+        self,
+    ) -> None:
+        strings = self.get_strings(FakeDescriptors({1: "FTDI", 2: "Dual RS232", 3: "A1B2"}))
+
+        self.assertEqual(strings.language_ids, [0x0409])
+        self.assertEqual((strings.manufacturer, strings.product, strings.serial_number), ("FTDI", "Dual RS232", "A1B2"))
+        self.assertEqual(strings.missing, [])
+
+    def test_stalled_language_ids_fall_back_to_us_english(
+        self,
+    ) -> None:
+        strings = self.get_strings(FakeDescriptors({1: "FTDI", 2: "Dual RS232", 3: "A1B2"}, stall_language_ids = True))
+
+        self.assertEqual(strings.language_ids, [IOAPISet.DEFAULT_LANGUAGE_ID])
+        self.assertEqual(strings.product, "Dual RS232")
+        self.assertEqual(strings.missing, [])
+
+    def test_failed_strings_are_reported_as_missing(
+        self,
+    ) -> None:
+        strings = self.get_strings(FakeDescriptors({1: "FTDI", 2: "Dual RS232"}))
+
+        self.assertIsNone(strings.serial_number)
+        self.assertEqual(strings.missing, [(3, 0x0409)])
+
+    def test_partial_strings_are_not_cached(
+        self,
+    ) -> None:
+        cache = IOAPISet.IOCTLCache()
+        descriptors = FakeDescriptors({1: "FTDI", 2: "Dual RS232"})
+
+        for _ in range(2):
+            cache.fetch(
+                "hub",
+                CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION,
+                0,
+                lambda: self.get_strings(descriptors),
+                "strings",
+                lambda strings: len(strings.missing) == 0,
+            )
+
+        self.assertEqual(cache.misses, 2)
+
+        descriptors.strings[3] = "A1B2"
+
+        for _ in range(2):
+            cache.fetch(
+                "hub",
+                CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION,
+                0,
+                lambda: self.get_strings(descriptors),
+                "strings",
+                lambda strings: len(strings.missing) == 0,
+            )
+
+        self.assertEqual((cache.misses, cache.hits), (3, 1))
+
+if __name__ == "__main__":
+    unittest.main()
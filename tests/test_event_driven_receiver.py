@@ -0,0 +1,100 @@
+import os
+import unittest
+
+from SilvaViridis.Python.WinAPI.instrumentation import LatencySamples
+from SilvaViridis.Python.WinAPI.Wrapper.Serial import (
+    EventDrivenReceiver,
+    SerialTimeout,
+    open_pty_pair,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import SimulatedSerialDevice
+from SilvaViridis.Python.WinAPI.Wrapper.Types import SerialSettings
+
+class LatencySamplesTests(unittest.TestCase):
+    def test_percentiles_are_exact_samples(
+        self,
+    ) -> None:
+        latency = LatencySamples()
+
+        for elapsed_us in range(1, 101):
+            latency.add(elapsed_us * 1000 + 500, 4)
+
+        self.assertEqual(latency.calls, 100)
+        self.assertEqual(latency.bytes, 400)
+        self.assertEqual(latency.percentile_us(50), 50.5)
+        self.assertEqual(latency.percentile_us(99), 99.5)
+        self.assertEqual(latency.percentile_us(100), latency.max_ns / 1000)
+        self.assertEqual(latency.percentile_us(0), 1.5)
+
+    def test_window_keeps_latest_samples(
+        self,
+    ) -> None:
+        latency = LatencySamples(capacity = 3)
+
+        for elapsed_ns in (9000, 1000, 2000, 3000):
+            latency.add(elapsed_ns)
+
+        self.assertEqual(list(latency.samples), [1000, 2000, 3000])
+        self.assertEqual(latency.calls, 4)
+        self.assertEqual(latency.max_ns, 9000)
+        self.assertEqual(latency.percentile_us(100), 3.0)
+
+    def test_empty(
+        self,
+    ) -> None:
+        self.assertEqual(LatencySamples().percentile_us(50), 0.0)
+        self.assertRaises(ValueError, LatencySamples, 0)
+
+@unittest.skipUnless(hasattr(os, "openpty"), "Requires pseudo-terminals")
+class EventDrivenReceiverTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.host, self.device = open_pty_pair(SerialSettings(115200), buffer_size = 256)
+        self.addCleanup(self.device.close)
+        self.addCleanup(self.host.close)
+
+    def test_transact_round_trip_records_latency(
+        self,
+    ) -> None:
+        receiver = EventDrivenReceiver(self.host)
+
+        with SimulatedSerialDevice(self.device, respond = lambda request: bytes(request).upper()) as device:
+            for i in range(20):
+                response = receiver.transact(f"ping {i}\n".encode(), timeout = 5.0)
+                self.assertEqual(bytes(response), f"PING {i}\n".encode())
+
+        self.assertEqual(device.transactions, 20)
+        self.assertEqual(receiver.latency.calls, 20)
+        self.assertEqual(len(receiver.latency.samples), 20)
+        self.assertIn(receiver.latency.percentile_us(50) * 1000, receiver.latency.samples)
+        self.assertEqual(receiver.latency.percentile_us(100), receiver.latency.max_ns / 1000)
+
+    def test_receive_splits_buffered_frames(
+        self,
+    ) -> None:
+        receiver = EventDrivenReceiver(self.host)
+        self.device.write_all(b"one\ntwo\n")
+
+        self.assertEqual(bytes(receiver.receive(5.0)), b"one\n")
+        self.assertEqual(bytes(receiver.receive(5.0)), b"two\n")
+
+    def test_multi_byte_terminator_across_reads(
+        self,
+    ) -> None:
+        receiver = EventDrivenReceiver(self.host, terminator = b"\r\n")
+
+        with SimulatedSerialDevice(self.device, terminator = b"\r\n"):
+            self.assertEqual(bytes(receiver.transact(b"abc\r\n", timeout = 5.0)), b"abc\r\n")
+
+    def test_receive_times_out(
+        self,
+    ) -> None:
+        receiver = EventDrivenReceiver(self.host)
+        self.device.write_all(b"partial")
+
+        with self.assertRaises(SerialTimeout):
+            receiver.receive(0.05)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import time
+import unittest
+
+from SilvaViridis.Python.WinAPI.Wrapper.Exceptions import GenFailure, NoSuchDevice
+from SilvaViridis.Python.WinAPI.Wrapper.HandlePool import HandlePool
+
+from .helpers import FakeClock, FakeHandles
+
+def error(
+    ex_type : type[Exception],
+) -> Exception:
+    ex = ex_type()
+    ex.code = 0
+    return ex
+
+class HandlePoolTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.clock = FakeClock()
+        self.handles = FakeHandles()
+        self.pool = HandlePool(
+            idle_timeout = 5.0,
+            open_handle = self.handles.open,
+            close_handle = self.handles.close,
+            clock = self.clock,
+            reap = False,
+        )
+
+    def test_nested_opens_share_one_handle(
+        self,
+    ) -> None:
+        with self.pool.open("\\\\?\\HUB") as outer:
+            with self.pool.open("\\\\?\\hub") as inner:
+                self.assertEqual(outer.value, inner.value)
+            self.assertEqual(self.handles.closed, [])
+
+        self.assertEqual(self.handles.opened, ["\\\\?\\HUB"])
+        self.assertEqual(self.pool.stats.opens, 1)
+        self.assertEqual(self.pool.stats.reuses, 1)
+        self.assertEqual(self.pool.stats.open_handles, 1)
+
+    def test_released_handle_is_reused_within_idle_timeout(
+        self,
+    ) -> None:
+        with self.pool.open("hub"):
+            pass
+        self.clock.now = 4.0
+        with self.pool.open("hub"):
+            pass
+
+        self.assertEqual(len(self.handles.opened), 1)
+        self.assertEqual(self.handles.closed, [])
+
+    def test_idle_handle_expires(
+        self,
+    ) -> None:
+        with self.pool.open("hub"):
+            pass
+
+        self.clock.now = 4.0
+        self.pool.close_idle()
+        self.assertEqual(self.handles.closed, [])
+
+        self.clock.now = 5.0
+        self.pool.close_idle()
+        self.assertEqual(self.handles.closed, [1])
+        self.assertEqual(self.pool.stats.open_handles, 0)
+
+        with self.pool.open("hub"):
+            pass
+        self.assertEqual(len(self.handles.opened), 2)
+
+    def test_held_handle_does_not_expire(
+        self,
+    ) -> None:
+        with self.pool.open("hub"):
+            self.clock.now = 60.0
+            self.pool.close_idle()
+            self.assertEqual(self.handles.closed, [])
+
+    def test_device_gone_invalidates_and_notifies(
+        self,
+    ) -> None:
+        invalidated : list[str] = []
+        self.pool.add_invalidation_listener(invalidated.append)
+
+        with self.assertRaises(NoSuchDevice):
+            with self.pool.open("hub"):
+                raise error(NoSuchDevice)
+
+        self.assertEqual(invalidated, ["hub"])
+        self.assertEqual(self.handles.closed, [1])
+        self.assertEqual(self.pool.stats.invalidations, 1)
+
+        with self.pool.open("hub"):
+            pass
+        self.assertEqual(len(self.handles.opened), 2)
+
+    def test_invalidated_handle_closes_after_last_release(
+        self,
+    ) -> None:
+        with self.pool.open("hub") as fd:
+            with self.pool.open("hub"):
+                self.pool.report_error(fd, error(NoSuchDevice))
+                self.assertEqual(self.handles.closed, [])
+            self.assertEqual(self.handles.closed, [])
+        self.assertEqual(self.handles.closed, [1])
+
+    def test_gen_failure_keeps_handle(
+        self,
+    ) -> None:
+        invalidated : list[str] = []
+        self.pool.add_invalidation_listener(invalidated.append)
+
+        with self.pool.open("hub") as fd:
+            self.pool.report_error(fd, error(GenFailure))
+
+        with self.assertRaises(GenFailure):
+            with self.pool.open("hub"):
+                raise error(GenFailure)
+
+        self.assertEqual(invalidated, [])
+        self.assertEqual(self.pool.stats.invalidations, 0)
+        self.assertEqual(len(self.handles.opened), 1)
+
+class HandlePoolReaperTests(unittest.TestCase):
+    def test_reaper_closes_idle_handles(
+        self,
+    ) -> None:
+        handles = FakeHandles()
+        pool = HandlePool(
+            idle_timeout = 0.05,
+            open_handle = handles.open,
+            close_handle = handles.close,
+        )
+
+        with pool.open("hub"):
+            pass
+
+        deadline = time.monotonic() + 2.0
+        while len(handles.closed) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(handles.closed, [1])
+        self.assertEqual(pool.stats.open_handles, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import ctypes as C
+import unittest
+
+from unittest import mock
+
+from SilvaViridis.Python.WinAPI import instrumentation, kernel32
+from SilvaViridis.Python.WinAPI.instrumentation import NativeFunction, nearest_rank
+from SilvaViridis.Python.WinAPI.Wrapper import IOAPISet
+from SilvaViridis.Python.WinAPI.Wrapper.IOAPISet import _ioctl_into
+from SilvaViridis.Python.WinAPI.Wrapper.Serial import SerialPort, SerialTransport
+from SilvaViridis.Python.WinAPI.Wrapper.Types import CommEvents, CtlCodes, SerialSettings, SerialTimeouts
+from SilvaViridis.Python.WinAPI.Wrapper.Views import USBBusStatisticsView
+
+IOCTL_NAME = f"IOCTL.{CtlCodes.USB_USER_REQUEST.name}"
+
+class NullTransport(SerialTransport):
+    def configure(
+        self,
+        settings : SerialSettings,
+        timeouts : SerialTimeouts,
+    ) -> None:
+        pass
+
+    def readinto(
+        self,
+        buffer : bytearray | memoryview,
+    ) -> int:
+        return 0
+
+    def write(
+        self,
+        buffer : bytes | bytearray | memoryview,
+    ) -> int:
+        return len(buffer)
+
+    def set_event_mask(
+        self,
+        mask : CommEvents,
+    ) -> None:
+        pass
+
+    def wait_event(
+        self,
+        timeout : float | None = None,
+    ) -> CommEvents:
+        return CommEvents.NONE
+
+    def close(
+        self,
+    ) -> None:
+        pass
+
+class NearestRankTests(unittest.TestCase):
+    def test_ranks(
+        self,
+    ) -> None:
+        ordered = [10, 20, 30, 40]
+
+        self.assertEqual([nearest_rank(ordered, p) for p in (0, 25, 26, 50, 75, 99, 100)], [10, 10, 20, 20, 30, 40, 40])
+
+    def test_empty_is_rejected(
+        self,
+    ) -> None:
+        with self.assertRaises(ValueError):
+            nearest_rank([], 50)
+
+class IOCTLIntoTracingTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        instrumentation.reset()
+        instrumentation.enable()
+        self.addCleanup(instrumentation.reset)
+        self.addCleanup(instrumentation.disable)
+
+    def test_success_records_bytes_returned(
+        self,
+    ) -> None:
+        def device_io_control(
+            *args : object,
+        ) -> int:
+            args[6]._obj.value = 24
+            return 1
+
+        view = USBBusStatisticsView()
+
+        with mock.patch.object(IOAPISet, "DeviceIoControl", device_io_control):
+            self.assertIs(_ioctl_into(C.c_void_p(1), CtlCodes.USB_USER_REQUEST, view), view)
+
+        stats = instrumentation.snapshot()[IOCTL_NAME]
+        self.assertEqual(stats.calls, 1)
+        self.assertEqual(stats.bytes, 24)
+
+    def test_failure_is_recorded(
+        self,
+    ) -> None:
+        def device_io_control(
+            *args : object,
+        ) -> int:
+            raise OSError("DeviceIoControl failed")
+
+        view = USBBusStatisticsView()
+        view.bytes_returned.value = 99
+
+        with mock.patch.object(IOAPISet, "DeviceIoControl", device_io_control):
+            with self.assertRaises(OSError):
+                _ioctl_into(C.c_void_p(1), CtlCodes.USB_USER_REQUEST, view)
+
+        stats = instrumentation.snapshot()[IOCTL_NAME]
+        self.assertEqual(stats.calls, 1)
+        self.assertEqual(stats.bytes, 0)
+
+    def test_disabled_records_nothing(
+        self,
+    ) -> None:
+        instrumentation.disable()
+
+        with mock.patch.object(IOAPISet, "DeviceIoControl", lambda *args: 1):
+            _ioctl_into(C.c_void_p(1), CtlCodes.USB_USER_REQUEST, USBBusStatisticsView())
+
+        self.assertEqual(instrumentation.snapshot(), {})
+
+class NativeCallCountTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        instrumentation.reset()
+        instrumentation.enable()
+        self.addCleanup(instrumentation.reset)
+        self.addCleanup(instrumentation.disable)
+
+    def test_bindings_are_counted_by_name(
+        self,
+    ) -> None:
+        read_file = NativeFunction("kernel32", "ReadFile", lambda *args: 1, lambda: 0, lambda error: None)
+        write_file = NativeFunction("kernel32", "WriteFile", lambda *args: 1, lambda: 0, lambda error: None)
+        reg_close_key = NativeFunction("advapi32", "RegCloseKey", lambda *args: 0, lambda: 0, lambda error: None)
+
+        for _ in range(3):
+            read_file(None, None, 0, C.byref(C.c_uint32(8)), None)
+        write_file(None, None, 0, C.byref(C.c_uint32(5)), None)
+        reg_close_key(None)
+
+        stats = instrumentation.snapshot()
+        self.assertEqual(stats["kernel32.ReadFile"].calls, 3)
+        self.assertEqual(stats["kernel32.ReadFile"].bytes, 24)
+        self.assertEqual(stats["kernel32.WriteFile"].bytes, 5)
+        self.assertEqual(instrumentation.total_calls("kernel32."), 4)
+        self.assertEqual(instrumentation.total_calls(), 5)
+
+    def test_bindings_are_swapped_on_enable_and_disable(
+        self,
+    ) -> None:
+        self.assertIsInstance(IOAPISet.DeviceIoControl, NativeFunction)
+        self.assertIs(IOAPISet.DeviceIoControl, kernel32.DeviceIoControl)
+
+        instrumentation.disable()
+
+        self.assertNotIsInstance(IOAPISet.DeviceIoControl, NativeFunction)
+        self.assertIs(IOAPISet.DeviceIoControl, kernel32.DeviceIoControl)
+        self.assertIs(kernel32._kernel32.DeviceIoControl, IOAPISet.DeviceIoControl)
+
+        instrumentation.enable()
+
+        self.assertIsInstance(IOAPISet.DeviceIoControl, NativeFunction)
+        self.assertIs(IOAPISet.DeviceIoControl, kernel32._kernel32.DeviceIoControl)
+
+    def test_transports_without_own_count_report_none(
+        self,
+    ) -> None:
+        with self.assertRaises(TypeError):
+            SerialTransport()
+
+        self.assertIsNone(SerialPort(NullTransport(), 16).stats.native_calls)
+
+if __name__ == "__main__":
+    unittest.main()
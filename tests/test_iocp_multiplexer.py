@@ -0,0 +1,239 @@
+import asyncio
+import ctypes as C
+import queue
+import unittest
+
+from unittest import mock
+
+from SilvaViridis.Python.WinAPI.Wrapper import AsyncSerial
+from SilvaViridis.Python.WinAPI.Wrapper.AsyncSerial import IOCPSerialMultiplexer
+from SilvaViridis.Python.WinAPI.Wrapper.Exceptions import (
+    ERROR_OPERATION_ABORTED,
+    WinAPIException,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.Serial import (
+    OverlappedSerialTransport,
+    SerialPort,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.Types import (
+    STREAMING_TIMEOUTS,
+    SerialTimeouts,
+)
+
+ERROR_GEN_FAILURE = 31
+
+CALLER_TIMEOUTS = SerialTimeouts(read_interval = 10, read_total_multiplier = 0, read_total_constant = 500)
+
+class FakeOverlappedTransport(OverlappedSerialTransport):
+    def __init__(
+        self,
+        fd : int,
+    ) -> None:
+        self.fd = C.c_void_p(fd)
+        self.queue_size = 0
+        self.native_calls = 0
+        self.closed = False
+        self._pinned = {}
+
+    def close(
+        self,
+    ) -> None:
+        self.closed = True
+
+class FakeCompletionPort:
+    def __init__(
+        self,
+    ) -> None:
+        self.completions : queue.Queue[tuple[int, int, int, int]] = queue.Queue()
+        self.keys : dict[int, int] = {}
+        self.reads : list[tuple[int, int]] = []
+        self.writes : list[bytes] = []
+        self.cancelled : list[int] = []
+        self.timeouts : dict[int, SerialTimeouts] = {}
+
+    def patch(
+        self,
+        test : unittest.TestCase,
+    ) -> None:
+        replacements = {
+            "create_io_completion_port": lambda: C.c_void_p(1),
+            "associate_io_completion_port": self.associate,
+            "get_queued_completion_status": lambda port: self.completions.get(),
+            "post_queued_completion_status": lambda port, key: self.completions.put((0, key, 0, 0)),
+            "start_read_file": lambda fd, address, size, overlapped: self.reads.append((address, size)),
+            "start_write_file": lambda fd, address, size, overlapped: self.writes.append(C.string_at(address, size)),
+            "cancel_io": lambda fd, overlapped = None: self.cancelled.append(C.addressof(overlapped)),
+            "get_comm_timeouts": lambda fd: self.timeouts.get(fd.value, CALLER_TIMEOUTS),
+            "set_comm_timeouts": lambda fd, timeouts: self.timeouts.__setitem__(fd.value, timeouts),
+            "close_file": lambda fd: None,
+        }
+
+        for name, replacement in replacements.items():
+            patcher = mock.patch.object(AsyncSerial, name, replacement)
+            patcher.start()
+            test.addCleanup(patcher.stop)
+
+    def associate(
+        self,
+        fd : C.c_void_p,
+        port : C.c_void_p,
+        key : int,
+    ) -> None:
+        self.keys[fd.value or 0] = key
+
+    def complete(
+        self,
+        fd : int,
+        address : int,
+        n : int,
+        error : int = 0,
+    ) -> None:
+        self.completions.put((n, self.keys[fd], address, error))
+
+class RecordingProtocol(asyncio.Protocol):
+    def __init__(
+        self,
+    ) -> None:
+        self.received = bytearray()
+        self.lost = asyncio.get_running_loop().create_future()
+
+    def data_received(
+        self,
+        data : bytes,
+    ) -> None:
+        self.received += data
+
+    def connection_lost(
+        self,
+        exc : Exception | None,
+    ) -> None:
+        self.lost.set_result(exc)
+
+async def settle(
+) -> None:
+    for _ in range(20):
+        await asyncio.sleep(0.001)
+
+class IOCPSerialMultiplexerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(
+        self,
+    ) -> None:
+        self.iocp = FakeCompletionPort()
+        self.iocp.patch(self)
+        self.multiplexer = IOCPSerialMultiplexer()
+        self.port_transport = FakeOverlappedTransport(7)
+        self.protocol = RecordingProtocol()
+        self.transport = self.multiplexer.add(SerialPort(self.port_transport, 64), lambda: self.protocol, 16)
+        await settle()
+
+    async def test_read_and_write_completions(
+        self,
+    ) -> None:
+        self.assertEqual(self.iocp.timeouts[7], STREAMING_TIMEOUTS)
+        self.assertEqual(len(self.iocp.reads), 1)
+
+        self.transport._buffer[:5] = b"hello"
+        self.iocp.complete(7, self.transport._read_address, 5)
+        await settle()
+
+        self.assertEqual(bytes(self.protocol.received), b"hello")
+        self.assertEqual(len(self.iocp.reads), 2)
+
+        self.transport.write(b"abcdef")
+        self.assertEqual(self.iocp.writes, [b"abcdef"])
+        self.iocp.complete(7, self.transport._write_address, 4)
+        await settle()
+
+        self.assertEqual(self.iocp.writes, [b"abcdef", b"ef"])
+        self.iocp.complete(7, self.transport._write_address, 2)
+        await settle()
+
+        self.assertEqual(self.transport.get_write_buffer_size(), 0)
+        self.assertFalse(self.transport._write_pending)
+
+    async def test_close_waits_for_cancelled_read(
+        self,
+    ) -> None:
+        self.transport.close()
+        await settle()
+
+        self.assertEqual(self.iocp.cancelled, [self.transport._read_address])
+        self.assertEqual(len(self.multiplexer), 1)
+        self.assertFalse(self.port_transport.closed)
+
+        closing = asyncio.ensure_future(self.multiplexer.close())
+        await settle()
+        self.assertFalse(closing.done())
+
+        self.iocp.complete(7, self.transport._read_address, 0, ERROR_OPERATION_ABORTED)
+        await asyncio.wait_for(closing, 5.0)
+
+        self.assertTrue(self.port_transport.closed)
+        self.assertEqual(self.iocp.timeouts[7], CALLER_TIMEOUTS)
+        self.assertIsNone(await self.protocol.lost)
+
+    async def test_failure_with_pending_write_orphans_until_aborted(
+        self,
+    ) -> None:
+        self.transport.write(b"abc")
+        self.iocp.complete(7, self.transport._read_address, 0, ERROR_GEN_FAILURE)
+        error = await asyncio.wait_for(self.protocol.lost, 5.0)
+
+        self.assertIsInstance(error, WinAPIException)
+        self.assertEqual(self.iocp.cancelled, [self.transport._write_address])
+        self.assertEqual(len(self.multiplexer), 0)
+        self.assertIn(id(self.transport), self.multiplexer._orphans)
+        self.assertFalse(self.port_transport.closed)
+
+        self.iocp.complete(7, self.transport._write_address, 0, ERROR_OPERATION_ABORTED)
+        await asyncio.wait_for(self.multiplexer.close(), 5.0)
+
+        self.assertEqual(self.multiplexer._orphans, {})
+        self.assertTrue(self.port_transport.closed)
+        self.assertEqual(self.iocp.timeouts[7], CALLER_TIMEOUTS)
+
+    async def test_stale_completion_is_ignored(
+        self,
+    ) -> None:
+        self.iocp.completions.put((3, 99, 1234, 0))
+        self.iocp.complete(7, 1234, 3)
+        await settle()
+
+        self.assertEqual(len(self.multiplexer), 1)
+        self.assertTrue(self.transport._read_pending)
+        self.assertEqual(bytes(self.protocol.received), b"")
+
+        self.transport.abort()
+        self.iocp.complete(7, self.transport._read_address, 0, ERROR_OPERATION_ABORTED)
+        await asyncio.wait_for(self.multiplexer.close(), 5.0)
+
+    async def test_failed_completion_is_fatal(
+        self,
+    ) -> None:
+        self.iocp.complete(7, self.transport._read_address, 0, ERROR_GEN_FAILURE)
+        error = await asyncio.wait_for(self.protocol.lost, 5.0)
+
+        self.assertIsInstance(error, WinAPIException)
+        self.assertTrue(self.port_transport.closed)
+        self.assertEqual(self.iocp.timeouts[7], CALLER_TIMEOUTS)
+
+        await asyncio.wait_for(self.multiplexer.close(), 5.0)
+
+@unittest.skipUnless(hasattr(C, "WinDLL"), "Requires Windows")
+class WindowsCompletionPortTests(unittest.IsolatedAsyncioTestCase):
+    async def test_posted_completions_reach_the_loop(
+        self,
+    ) -> None:
+        multiplexer = IOCPSerialMultiplexer()
+        dispatched : asyncio.Queue[tuple[int, int, int, int]] = asyncio.Queue()
+        multiplexer._dispatch = lambda *args: dispatched.put_nowait(args)
+
+        AsyncSerial.post_queued_completion_status(multiplexer._iocp, 42, 5)
+
+        self.assertEqual(await asyncio.wait_for(dispatched.get(), 5.0), (42, 0, 5, 0))
+
+        await asyncio.wait_for(multiplexer.close(), 5.0)
+        self.assertFalse(multiplexer._thread.is_alive())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import ctypes as C
+import unittest
+
+from types import SimpleNamespace
+from unittest import mock
+
+from SilvaViridis.Python.WinAPI.Wrapper import USBDeviceManager
+from SilvaViridis.Python.WinAPI.Wrapper.Exceptions import NoSuchDevice
+from SilvaViridis.Python.WinAPI.Wrapper.HandlePool import HandlePool
+from SilvaViridis.Python.WinAPI.Wrapper.IOAPISet import IOCTLCache, ioctl_cache
+from SilvaViridis.Python.WinAPI.Wrapper.Types import (
+    CtlCodes,
+    USBConnectionStatuses,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import USBPort
+
+from .helpers import FakeClock, FakeHandles
+
+HUB = "\\\\?\\USB#ROOT_HUB30#HUB"
+
+class CountingIOCTL:
+    def __init__(
+        self,
+    ) -> None:
+        self.calls = 0
+
+    def __call__(
+        self,
+    ) -> int:
+        self.calls += 1
+        return self.calls
+
+class IOCTLCacheTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.clock = FakeClock()
+        self.cache = IOCTLCache(clock = self.clock)
+
+    def fetch(
+        self,
+        code : CtlCodes,
+        ioctl : CountingIOCTL,
+        connection_index : int | None = 1,
+        path : str = HUB,
+    ) -> int:
+        return self.cache.fetch(path, code, connection_index, ioctl)
+
+    def test_ttl_entries_expire(
+        self,
+    ) -> None:
+        ioctl = CountingIOCTL()
+        code = CtlCodes.USB_GET_NODE_CONNECTION_DRIVERKEY_NAME
+
+        self.assertEqual(self.fetch(code, ioctl), 1)
+        self.clock.now = 4.9
+        self.assertEqual(self.fetch(code, ioctl), 1)
+        self.clock.now = 5.0
+        self.assertEqual(self.fetch(code, ioctl), 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_immutable_entries_never_expire(
+        self,
+    ) -> None:
+        ioctl = CountingIOCTL()
+        code = CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION
+
+        self.assertEqual(self.fetch(code, ioctl), 1)
+        self.clock.now = 1e9
+        self.assertEqual(self.fetch(code, ioctl), 1)
+        self.assertEqual(ioctl.calls, 1)
+
+    def test_connection_status_is_never_cached(
+        self,
+    ) -> None:
+        ioctl = CountingIOCTL()
+        code = CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX
+
+        self.assertEqual([self.fetch(code, ioctl) for _ in range(3)], [1, 2, 3])
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 0))
+
+    def test_entries_are_keyed_by_path_port_and_variant(
+        self,
+    ) -> None:
+        ioctl = CountingIOCTL()
+        code = CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION
+
+        self.assertEqual(self.fetch(code, ioctl, path = HUB.upper()), 1)
+        self.assertEqual(self.fetch(code, ioctl, path = HUB.lower()), 1)
+        self.assertEqual(self.fetch(code, ioctl, connection_index = 2), 2)
+        self.assertEqual(self.cache.fetch(HUB, code, 1, ioctl, variant = 0x0409), 3)
+
+    def test_uncacheable_results_are_not_stored(
+        self,
+    ) -> None:
+        ioctl = CountingIOCTL()
+        code = CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION
+
+        self.assertEqual(self.cache.fetch(HUB, code, 1, ioctl, is_cacheable = lambda result: result > 1), 1)
+        self.assertEqual(self.cache.fetch(HUB, code, 1, ioctl, is_cacheable = lambda result: result > 1), 2)
+        self.assertEqual(self.fetch(code, ioctl), 2)
+
+    def test_observe_connection_invalidates_the_port(
+        self,
+    ) -> None:
+        ioctl = CountingIOCTL()
+        code = CtlCodes.USB_GET_DESCRIPTOR_FROM_NODE_CONNECTION
+        self.fetch(code, ioctl, connection_index = 1)
+        self.fetch(code, ioctl, connection_index = 2)
+
+        self.assertFalse(self.cache.observe_connection(HUB, 1, (USBConnectionStatuses.DeviceConnected, 5)))
+        self.assertFalse(self.cache.observe_connection(HUB, 1, (USBConnectionStatuses.DeviceConnected, 5)))
+        self.assertEqual(self.fetch(code, ioctl, connection_index = 1), 1)
+
+        self.assertTrue(self.cache.observe_connection(HUB, 1, (USBConnectionStatuses.DeviceConnected, 6)))
+        self.assertEqual(self.fetch(code, ioctl, connection_index = 1), 3)
+        self.assertEqual(self.fetch(code, ioctl, connection_index = 2), 2)
+
+    def test_hub_re_enumeration_drops_the_hub(
+        self,
+    ) -> None:
+        handles = FakeHandles()
+        pool = HandlePool(open_handle = handles.open, close_handle = handles.close, clock = self.clock, reap = False)
+        pool.add_invalidation_listener(self.cache.invalidate_device)
+
+        ioctl = CountingIOCTL()
+        code = CtlCodes.USB_GET_NODE_INFORMATION
+        other = "\\\\?\\USB#ROOT_HUB30#OTHER"
+        self.fetch(code, ioctl, None)
+        self.fetch(code, ioctl, None, other)
+        self.cache.observe_connection(HUB, 1, (USBConnectionStatuses.DeviceConnected, 5))
+
+        with self.assertRaises(NoSuchDevice):
+            with pool.open(HUB):
+                raise NoSuchDevice()
+
+        self.assertEqual(self.fetch(code, ioctl, None), 3)
+        self.assertEqual(self.fetch(code, ioctl, None, other), 2)
+        self.assertFalse(self.cache.observe_connection(HUB, 1, (USBConnectionStatuses.DeviceConnected, 6)))
+
+class USBPortCacheTests(unittest.TestCase):
+    def test_connection_change_invalidates_cached_port_data(
+        self,
+    ) -> None:
+        ioctl_cache.clear()
+        self.addCleanup(ioctl_cache.clear)
+
+        port = USBPort(1, HUB)
+        connections = iter([
+            SimpleNamespace(connection_status = USBConnectionStatuses.DeviceConnected, device_address = 5, device_is_hub = False),
+            SimpleNamespace(connection_status = USBConnectionStatuses.DeviceConnected, device_address = 6, device_is_hub = False),
+        ])
+        names = iter(["{old}\\0001", "{new}\\0002"])
+
+        with mock.patch.multiple(
+            USBDeviceManager,
+            ioctl_get_usb_node_connection_info_ex = lambda fd, connection_index: next(connections),
+            ioctl_get_usb_node_connection_driver_key_name = lambda fd, connection_index: next(names),
+        ):
+            port.get_connection_info(C.c_void_p(1))
+            self.assertEqual(port.get_connection_driver_key_name(C.c_void_p(1)), "{old}\\0001")
+            self.assertEqual(port.get_connection_driver_key_name(C.c_void_p(1)), "{old}\\0001")
+
+            port.get_connection_info(C.c_void_p(1))
+            self.assertEqual(port.get_connection_driver_key_name(C.c_void_p(1)), "{new}\\0002")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import ctypes as C
+import unittest
+
+from unittest import mock
+
+from SilvaViridis.Python.WinAPI.Wrapper import Serial
+from SilvaViridis.Python.WinAPI.Wrapper.Serial import (
+    EventDrivenReceiver,
+    OverlappedSerialTransport,
+    SerialPort,
+)
+
+def address_of(
+    buffer : bytes | bytearray,
+) -> int:
+    if isinstance(buffer, bytes):
+        return C.cast(C.c_char_p(buffer), C.c_void_p).value or 0
+    return C.addressof((C.c_char * len(buffer)).from_buffer(buffer))
+
+class PinnedBufferTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.reads : list[tuple[int, int]] = []
+        self.writes : list[tuple[int, int]] = []
+        self.chunk = 0
+
+        replacements = {
+            "OverlappedOperation": mock.Mock,
+            "read_file_at": self.read_file_at,
+            "write_file_at": self.write_file_at,
+            "set_comm_mask": lambda fd, mask: None,
+        }
+
+        for name, replacement in replacements.items():
+            patcher = mock.patch.object(Serial, name, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.transport = OverlappedSerialTransport(C.c_void_p(5))
+
+    def read_file_at(
+        self,
+        fd : C.c_void_p,
+        address : int,
+        size : int,
+        operation : object,
+    ) -> int:
+        self.reads.append((address, size))
+        C.memmove(address, b"ok\n", min(size, 3))
+        return min(size, 3)
+
+    def write_file_at(
+        self,
+        fd : C.c_void_p,
+        address : int,
+        size : int,
+        operation : object,
+    ) -> int:
+        self.writes.append((address, size))
+        return size if self.chunk == 0 else min(size, self.chunk)
+
+    def test_reads_use_the_pinned_port_buffer(
+        self,
+    ) -> None:
+        port = SerialPort(self.transport, 64)
+        address = address_of(port._buffer)
+
+        self.assertEqual(bytes(port.read_view(16)), b"ok\n")
+        self.assertEqual(bytes(port.read_view()), b"ok\n")
+        self.assertEqual(self.reads, [(address, 16), (address, 64)])
+        self.assertEqual(port.stats.reads, 2)
+
+    def test_receiver_reads_at_an_offset_of_its_pinned_buffer(
+        self,
+    ) -> None:
+        receiver = EventDrivenReceiver(SerialPort(self.transport, 64))
+        address = address_of(receiver._buffer)
+
+        self.assertEqual(bytes(receiver.receive()), b"ok\n")
+        self.assertEqual(bytes(receiver.receive()), b"ok\n")
+        self.assertEqual(self.reads, [(address, 64), (address, 64)])
+
+    def test_partial_writes_continue_in_place(
+        self,
+    ) -> None:
+        port = SerialPort(self.transport, 64)
+        data = b"0123456789"
+        self.chunk = 4
+
+        port.write_all(data)
+
+        address = address_of(data)
+        self.assertEqual(self.writes, [(address, 10), (address + 4, 6), (address + 8, 2)])
+        self.assertEqual(port.stats.bytes_written, 10)
+
+    def test_range_outside_the_buffer_is_rejected(
+        self,
+    ) -> None:
+        buffer = bytearray(8)
+        self.transport.pin(buffer)
+
+        with self.assertRaises(ValueError):
+            self.transport.readinto_at(buffer, 4, 8)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import ctypes as C
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from SilvaViridis.Python.WinAPI.Wrapper import Recording
+from SilvaViridis.Python.WinAPI.Wrapper.Exceptions import NoSuchDevice
+from SilvaViridis.Python.WinAPI.Wrapper.Types import (
+    ControllerInfo,
+    HCFeatureFlags,
+    USBControllerFlavors,
+    USBDescriptorTypes,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.Views import USBDescriptorRequestView
+
+class FakeDevice:
+    def __init__(
+        self,
+    ) -> None:
+        self.calls = 0
+        self.view = USBDescriptorRequestView(64)
+
+    def controller_info(
+        self,
+        fd : C.c_void_p,
+    ) -> ControllerInfo:
+        self.calls += 1
+        return ControllerInfo(
+            pci_vendor_id = 0x8086,
+            pci_device_id = 0xA36D,
+            pci_revision = 16,
+            number_of_root_ports = 4,
+            controller_flavor = USBControllerFlavors.USB_HcGeneric,
+            hc_feature_flags = HCFeatureFlags.PORT_POWER_SWITCHING | HCFeatureFlags.SEL_SUSPEND,
+        )
+
+    def descriptor(
+        self,
+        fd : C.c_void_p,
+        descriptor_type : USBDescriptorTypes,
+    ) -> memoryview:
+        self.calls += 1
+        self.view._buffer[self.view.data_offset:self.view.data_offset + 4] = b"\x04\x03\x09\x04"
+        self.view.bytes_returned.value = self.view.data_offset + 4
+        return self.view.payload
+
+    def strings(
+        self,
+        fd : C.c_void_p,
+    ) -> tuple[C.c_void_p, dict[tuple[int, int], str]]:
+        self.calls += 1
+        return C.c_void_p(0x1234), {(1, 0x0409): "Vendor", (2, 0x0409): "Product"}
+
+    def fail(
+        self,
+        fd : C.c_void_p,
+    ) -> None:
+        self.calls += 1
+        ex = NoSuchDevice()
+        ex.code = 433
+        raise ex
+
+device = FakeDevice()
+
+@Recording.recordable
+def controller_info(
+    fd : C.c_void_p,
+) -> ControllerInfo:
+    return device.controller_info(fd)
+
+@Recording.recordable
+def descriptor(
+    fd : C.c_void_p,
+    descriptor_type : USBDescriptorTypes,
+) -> memoryview:
+    return device.descriptor(fd, descriptor_type)
+
+@Recording.recordable
+def strings(
+    fd : C.c_void_p,
+) -> tuple[C.c_void_p, dict[tuple[int, int], str]]:
+    return device.strings(fd)
+
+@Recording.recordable
+def fail(
+    fd : C.c_void_p,
+) -> None:
+    device.fail(fd)
+
+def run_calls(
+) -> tuple[ControllerInfo, bytes, tuple[C.c_void_p, dict[tuple[int, int], str]], int | None]:
+    fd = C.c_void_p(42)
+    code = None
+
+    try:
+        fail(fd)
+    except NoSuchDevice as ex:
+        code = ex.code
+
+    return (
+        controller_info(fd),
+        bytes(descriptor(fd, USBDescriptorTypes.STRING)),
+        strings(fd),
+        code,
+    )
+
+class RecordingRoundTripTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "calls.json.gz")
+
+    def test_record_save_load_replay(
+        self,
+    ) -> None:
+        with Recording.Recorder(self.path):
+            recorded = run_calls()
+
+        calls = device.calls
+        header, loaded = Recording.load_recording(self.path)
+
+        self.assertEqual(header["version"], Recording.RECORDING_VERSION)
+        self.assertEqual(len(loaded), 4)
+
+        with Recording.Player(self.path, strict = True) as player:
+            replayed = run_calls()
+
+        self.assertEqual(device.calls, calls)
+        self.assertEqual(player.remaining, 0)
+        self.assertEqual(replayed[0], recorded[0])
+        self.assertEqual(replayed[1], b"\x04\x03\x09\x04")
+        self.assertEqual(replayed[1], recorded[1])
+        self.assertEqual(replayed[2][0].value, 0x1234)
+        self.assertEqual(replayed[2][1], recorded[2][1])
+        self.assertEqual(replayed[3], 433)
+
+    def test_recording_is_json(
+        self,
+    ) -> None:
+        with Recording.Recorder(self.path):
+            run_calls()
+
+        with gzip.open(self.path, "rt", encoding = "utf-8") as file:
+            document = json.load(file)
+
+        self.assertEqual([call["name"] for call in document["calls"]], [
+            "test_recording.fail",
+            "test_recording.controller_info",
+            "test_recording.descriptor",
+            "test_recording.strings",
+        ])
+
+    def test_foreign_types_are_rejected(
+        self,
+    ) -> None:
+        document = {
+            "header": {"version": Recording.RECORDING_VERSION},
+            "calls": [{
+                "name": "IO.create_file",
+                "key": None,
+                "failed": True,
+                "value": {"$error": "os:system", "args": ["echo pwned"], "code": None},
+                "elapsed_ns": 0,
+            }],
+        }
+
+        with gzip.open(self.path, "wt", encoding = "utf-8") as file:
+            json.dump(document, file)
+
+        with self.assertRaises(ValueError):
+            Recording.load_recording(self.path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+
+from uuid import UUID
+
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import (
+    SimulatedConnection,
+    SimulatedHostController,
+    SimulatedHub,
+    SimulatedUSBMachine,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.Types import DevProperties
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    USBConnector,
+    USBDevice,
+    USBDeviceIndex,
+    USBNode,
+    build_usb_connectors,
+    build_usb_device_index,
+    build_usb_tree,
+)
+
+from .helpers import use_machine
+
+def device(
+    name : str,
+    hub : str,
+) -> USBDevice:
+    return USBDevice(
+        UUID(int = 0),
+        UUID(int = 0),
+        f"\\\\?\\{name}",
+        name,
+        hub,
+        {DevProperties.DRIVER: name, DevProperties.DEVICEDESC: "Simulated device"},
+        {},
+    )
+
+def companion_topology(
+) -> USBDeviceIndex:
+    root = SimulatedHub(
+        "HC0.ROOT",
+        [
+            SimulatedConnection("HC0.HUB2", True, 1),
+            SimulatedConnection("HC0.MOUSE", False, 2),
+            SimulatedConnection("HC0.HUB3", True, 3),
+            None,
+            SimulatedConnection("HC0.CAMERA", False, 6),
+        ],
+        0.0,
+        "HC0",
+        {1: ("HC0.ROOT", 3), 2: ("HC0.ROOT", 4), 3: ("HC0.ROOT", 1), 4: ("HC0.ROOT", 2)},
+    )
+    usb2 = SimulatedHub(
+        "HC0.HUB2",
+        [None, SimulatedConnection("HC0.KEYBOARD", False, 4)],
+        0.0,
+        "HC0.ROOT",
+        {1: ("HC0.HUB3", 1), 2: ("HC0.HUB3", 2)},
+    )
+    usb3 = SimulatedHub(
+        "HC0.HUB3",
+        [SimulatedConnection("HC0.DISK", False, 5), None],
+        0.0,
+        "HC0.ROOT",
+        {1: ("HC0.HUB2", 1), 2: ("HC0.HUB2", 2)},
+    )
+
+    return USBDeviceIndex(
+        controllers = [SimulatedHostController("HC0", "HC0.ROOT", 0.0)],
+        hubs = [root, usb2, usb3],
+        devices = [
+            device("HC0.MOUSE", "HC0.ROOT"),
+            device("HC0.CAMERA", "HC0.ROOT"),
+            device("HC0.KEYBOARD", "HC0.HUB2"),
+            device("HC0.DISK", "HC0.HUB3"),
+        ],
+    )
+
+def port_key(
+    node : USBNode,
+) -> tuple[str, int]:
+    assert node.parent is not None
+    return (getattr(node.parent.device, "id"), getattr(node.device, "index"))
+
+def describe(
+    connectors : list[USBConnector],
+) -> list[tuple[list[tuple[str, int]], list[str]]]:
+    return sorted(
+        (
+            sorted(port_key(node) for node in connector.ports),
+            sorted(getattr(node.device, "id") for node in connector.connected),
+        ) for connector in connectors
+    )
+
+EXPECTED = [
+    ([("HC0.HUB2", 1), ("HC0.HUB3", 1)], ["HC0.DISK"]),
+    ([("HC0.HUB2", 2), ("HC0.HUB3", 2)], ["HC0.KEYBOARD"]),
+    ([("HC0.ROOT", 1), ("HC0.ROOT", 3)], ["HC0.HUB2", "HC0.HUB3"]),
+    ([("HC0.ROOT", 2), ("HC0.ROOT", 4)], ["HC0.MOUSE"]),
+    ([("HC0.ROOT", 5)], ["HC0.CAMERA"]),
+]
+
+class USBConnectorTests(unittest.TestCase):
+    def test_companion_ports_are_joined(
+        self,
+    ) -> None:
+        usb_tree = build_usb_tree(companion_topology(), fields = {"connection", "devices", "connector"})
+
+        self.assertEqual(describe(build_usb_connectors(usb_tree)), EXPECTED)
+
+    def test_companion_ports_are_joined_through_ioctls(
+        self,
+    ) -> None:
+        use_machine(self, SimulatedUSBMachine(companion_topology()))
+        usb_tree = build_usb_tree(build_usb_device_index(), fields = {"connection", "devices", "connector"})
+        connectors = build_usb_connectors(usb_tree)
+
+        self.assertEqual(describe(connectors), EXPECTED)
+        self.assertTrue(all(connector.is_user_connectable for connector in connectors))
+        self.assertFalse(any(connector.is_type_c for connector in connectors))
+
+    def test_ports_without_connector_properties_stay_separate(
+        self,
+    ) -> None:
+        usb_tree = build_usb_tree(companion_topology())
+
+        self.assertEqual(len(build_usb_connectors(usb_tree)), 5 + 2 + 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import build_simulated_topology
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import USBDevice, USBHub
+
+class USBDeviceIndexTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.index = build_simulated_topology(controllers = 2, depth = 3, delay = 0.0)
+        self.hubs = {hub.id: hub for hub in self.index.hubs}
+        self.devices = {device.id: device for device in self.index.devices}
+
+    def test_find_connected_by_driver_key(
+        self,
+    ) -> None:
+        self.assertIs(self.index.find_connected("HC0.ROOT.1.1", True), self.hubs["HC0.ROOT.1.1"])
+        self.assertIs(self.index.find_connected("HC1.ROOT.1.1.3", False), self.devices["HC1.ROOT.1.1.3"])
+        self.assertIs(self.index.find_connected("hc1.root.1.1.3", False), self.devices["HC1.ROOT.1.1.3"])
+        self.assertIs(self.index.find_connected("HC0.ROOT.2.1", True), self.hubs["HC0.ROOT.2.1"])
+
+    def test_find_connected_matches_the_node_kind(
+        self,
+    ) -> None:
+        self.assertIsNone(self.index.find_connected("HC0.ROOT.1.1", False))
+        self.assertIsNone(self.index.find_connected("HC0.ROOT.3", True))
+        self.assertIsNone(self.index.find_connected("HC0.ROOT.4", False))
+        self.assertIsNone(self.index.find_connected(None, False))
+
+    def test_find_root_hub_ignores_case(
+        self,
+    ) -> None:
+        for name in ("HC1.ROOT", "hc1.root", "Hc1.Root"):
+            with self.subTest(name = name):
+                self.assertIs(self.index.find_root_hub(name), self.hubs["HC1.ROOT"])
+
+        self.assertIsNone(self.index.find_root_hub("HC2.ROOT"))
+
+    def test_find_hub_by_path_or_instance_id(
+        self,
+    ) -> None:
+        hub = self.hubs["HC0.ROOT.2"]
+
+        for key in ("\\\\?\\HC0.ROOT.2", "\\??\\hc0.root.2", "HC0.ROOT.2", "hc0.root.2"):
+            with self.subTest(key = key):
+                self.assertIs(self.index.find_hub(key), hub)
+
+        self.assertIsNone(self.index.find_hub("HC0.ROOT.3"))
+        self.assertIsNone(self.index.find_hub("\\\\?\\HC0.ROOT.9"))
+
+    def test_every_node_is_indexed(
+        self,
+    ) -> None:
+        self.assertEqual(len(self.index.hubs_by_driver), len(self.index.hubs))
+        self.assertEqual(len(self.index.devices_by_driver), len(self.index.devices))
+
+        for node in [*self.index.hubs, *self.index.devices]:
+            with self.subTest(node = node.id):
+                found = self.index.find_connected(node.id.upper(), isinstance(node, USBHub))
+                self.assertIs(found, node)
+                self.assertIs(self.index.by_instance_id[node.id.lower()], node)
+                self.assertIsInstance(found, USBHub if node.id in self.hubs else USBDevice)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from SilvaViridis.Python.WinAPI import instrumentation
+from SilvaViridis.Python.WinAPI.Wrapper.IOAPISet import ioctl_cache
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import SimulatedUSBMachine, build_simulated_topology
+from SilvaViridis.Python.WinAPI.Wrapper.Types import CtlCodes
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    USBHub,
+    USBNode,
+    USBPort,
+    build_usb_device_index,
+    build_usb_tree,
+    walk_usb_tree,
+)
+
+from .helpers import ioctl_calls, use_machine
+
+def hub_levels(
+    usb_tree : list[USBNode],
+) -> list[tuple[USBNode, int]]:
+    return [
+        (node, (depth - 1) // 2) for node, depth in walk_usb_tree(usb_tree, expand_lazy = False) \
+            if isinstance(node.device, USBHub)
+    ]
+
+class USBNodeTests(unittest.TestCase):
+    def test_children_argument_is_stored(
+        self,
+    ) -> None:
+        child = USBNode(None, USBPort(1))
+        children = [child]
+        node = USBNode(None, USBPort(2), children)
+
+        self.assertIs(node.children, children)
+        self.assertTrue(node.is_expanded)
+
+    def test_nodes_compare_by_identity(
+        self,
+    ) -> None:
+        port = USBPort(1)
+
+        self.assertNotEqual(USBNode(None, port), USBNode(None, port))
+
+class LazyUSBTreeTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        use_machine(self, SimulatedUSBMachine(build_simulated_topology(controllers = 1, depth = 3, delay = 0.0)))
+        self.index = build_usb_device_index()
+
+    def test_hub_is_probed_on_first_children_access(
+        self,
+    ) -> None:
+        usb_tree = build_usb_tree(self.index, lazy = True)
+        root = usb_tree[0].children[0]
+        probes = ioctl_calls(CtlCodes.USB_GET_NODE_INFORMATION)
+
+        self.assertFalse(root.is_expanded)
+        self.assertEqual(ioctl_calls(CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX), 0)
+
+        ports = root.children
+
+        self.assertTrue(root.is_expanded)
+        self.assertEqual([port.device.index for port in ports], [1, 2, 3, 4])
+        self.assertEqual(ioctl_calls(CtlCodes.USB_GET_NODE_INFORMATION), probes + 1)
+        self.assertEqual(ioctl_calls(CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX), 4)
+
+        self.assertIs(root.children, ports)
+        self.assertEqual(ioctl_calls(CtlCodes.USB_GET_NODE_INFORMATION), probes + 1)
+        self.assertEqual(ioctl_calls(CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX), 4)
+
+        self.assertFalse(ports[0].children[0].is_expanded)
+
+    def test_eager_depth_is_respected(
+        self,
+    ) -> None:
+        for max_workers in (1, 4):
+            with self.subTest(max_workers = max_workers):
+                ioctl_cache.clear()
+                instrumentation.reset()
+
+                usb_tree = build_usb_tree(self.index, max_workers = max_workers, lazy = True, eager_depth = 2)
+                levels = hub_levels(usb_tree)
+
+                self.assertEqual(sorted(level for _, level in levels), [0, 1, 1, 2, 2, 2, 2])
+                for node, level in levels:
+                    self.assertEqual(node.is_expanded, level < 2, node.device.id)
+                self.assertEqual(ioctl_calls(CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX), 3 * 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+
+from SilvaViridis.Python.WinAPI import instrumentation
+from SilvaViridis.Python.WinAPI.Wrapper.HandlePool import handle_pool
+from SilvaViridis.Python.WinAPI.Wrapper.IOAPISet import ioctl_cache
+from SilvaViridis.Python.WinAPI.Wrapper.Recording import Backend, Player, Recorder, load_recording
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import SimulatedUSBMachine, build_simulated_topology
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    build_usb_device_index,
+    build_usb_tree,
+    render_usb_tree,
+)
+
+def enumerate_and_render(
+    backend : Recorder | Player,
+) -> str:
+    ioctl_cache.clear()
+    stream = io.StringIO()
+
+    with backend:
+        try:
+            render_usb_tree(build_usb_tree(build_usb_device_index()), stream)
+        finally:
+            handle_pool.clear()
+
+    return stream.getvalue()
+
+class USBRecordingReplayTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "usb.json.gz")
+        self.addCleanup(ioctl_cache.clear)
+        instrumentation.reset()
+        self.addCleanup(instrumentation.reset)
+        self.addCleanup(instrumentation.disable)
+
+    def record(
+        self,
+        source : Backend,
+    ) -> str:
+        return enumerate_and_render(Recorder(self.path, source))
+
+    def test_replay_builds_the_same_tree_without_native_calls(
+        self,
+    ) -> None:
+        machine = SimulatedUSBMachine(build_simulated_topology(controllers = 2, depth = 2, delay = 0.0))
+        recorded = self.record(machine)
+
+        self.assertIn("[USBHub] HC1.ROOT.1", recorded)
+        self.assertGreater(machine.native_calls, 0)
+
+        instrumentation.enable()
+        player = Player(self.path, strict = True)
+        replayed = enumerate_and_render(player)
+
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(player.remaining, 0)
+        self.assertEqual(instrumentation.snapshot(), {})
+
+    def test_replay_reproduces_recorded_latencies(
+        self,
+    ) -> None:
+        started = time.perf_counter_ns()
+        recorded = self.record(SimulatedUSBMachine(build_simulated_topology(controllers = 1, depth = 2, delay = 0.0), 0.002))
+        recording_ns = time.perf_counter_ns() - started
+        _, calls = load_recording(self.path)
+        recorded_ns = sum(call.elapsed_ns for call in calls)
+
+        started = time.perf_counter_ns()
+        replayed = enumerate_and_render(Player(self.path, latency_scale = 1.0))
+        replay_ns = time.perf_counter_ns() - started
+
+        self.assertEqual(replayed, recorded)
+        self.assertGreaterEqual(replay_ns, recorded_ns)
+        self.assertLess(replay_ns, 2 * recording_ns)
+
+if __name__ == "__main__":
+    unittest.main()
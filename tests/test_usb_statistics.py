@@ -0,0 +1,127 @@
+import ctypes as C
+import unittest
+
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any, cast
+from unittest import mock
+
+from SilvaViridis.Python.WinAPI.Wrapper import USBStatistics
+from SilvaViridis.Python.WinAPI.Wrapper.Exceptions import GenFailure
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import USBHostController
+
+class FakeClock:
+    def __init__(
+        self,
+    ) -> None:
+        self.now = 0.0
+
+    def __call__(
+        self,
+    ) -> float:
+        return self.now
+
+class FakeController:
+    def __init__(
+        self,
+    ) -> None:
+        self.open_failures = 0
+
+    @contextmanager
+    def open_file(
+        self,
+    ) -> Generator[C.c_void_p]:
+        if self.open_failures > 0:
+            self.open_failures -= 1
+            raise OSError("controller is powered down")
+        yield C.c_void_p(7)
+
+def gen_failure(
+) -> GenFailure:
+    ex = GenFailure()
+    ex.code = 31
+    return ex
+
+class USBBusSamplerTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.clock = FakeClock()
+        self.controller = FakeController()
+        self.errors : list[Exception] = []
+        self.bandwidth_failures = 0
+        self.sampler = USBStatistics.USBBusSampler(
+            cast(list[USBHostController], [self.controller]),
+            interval = 1.0,
+            clock = self.clock,
+            max_backoff = 4.0,
+            on_error = self.errors.append,
+        )
+
+        def bandwidth(
+            fd : C.c_void_p,
+            view : Any = None,
+        ) -> Any:
+            if self.bandwidth_failures > 0:
+                self.bandwidth_failures -= 1
+                raise gen_failure()
+            return view
+
+        for name, replacement in (
+            ("ioctl_view_usb_bus_statistics", lambda fd, view = None: view),
+            ("ioctl_view_usb_bandwidth_info", bandwidth),
+            ("ioctl_view_usb_power_info", lambda fd, view = None: view),
+        ):
+            patcher = mock.patch.object(USBStatistics, name, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tick(
+        self,
+    ) -> int:
+        self.sampler.sample_once()
+        self.clock.now += 1.0
+        samples = self.sampler.samples()
+        return samples[-1].flags if len(samples) > 0 else 0
+
+    def test_transient_failure_is_retried_on_next_tick(
+        self,
+    ) -> None:
+        self.bandwidth_failures = 1
+
+        self.assertEqual(self.tick(), USBStatistics.SAMPLE_HAS_BUS_STATISTICS | USBStatistics.SAMPLE_HAS_POWER_STATE)
+        self.assertEqual(self.tick(), 0x7)
+        self.assertEqual(len(self.errors), 1)
+
+    def test_repeated_failures_back_off_and_recover(
+        self,
+    ) -> None:
+        self.bandwidth_failures = 3
+        polled : list[bool] = []
+
+        for _ in range(8):
+            polled.append(self.tick() & USBStatistics.SAMPLE_HAS_BANDWIDTH != 0)
+
+        self.assertEqual(self.sampler.errors, 3)
+        self.assertEqual(polled, [False, False, False, False, False, True, True, True])
+
+    def test_open_failure_does_not_stop_sampling(
+        self,
+    ) -> None:
+        self.controller.open_failures = 1
+
+        self.assertEqual(self.tick(), 0)
+        self.assertEqual(self.tick(), 0x7)
+        self.assertIsInstance(self.sampler.last_error, OSError)
+
+    def test_rate_percentiles_use_nearest_rank(
+        self,
+    ) -> None:
+        with mock.patch.object(self.sampler, "rates", lambda controller_index, field: [7.0, 3.0, 10.0, 1.0, 5.0, 2.0, 9.0, 4.0, 8.0, 6.0]):
+            self.assertEqual(self.sampler.rate_percentiles(0, "bulk_bytes", (0, 50, 90, 99)), {0: 1.0, 50: 5.0, 90: 9.0, 99: 10.0})
+
+        with mock.patch.object(self.sampler, "rates", lambda controller_index, field: []):
+            self.assertEqual(self.sampler.rate_percentiles(0, "bulk_bytes", (50,)), {50: 0.0})
+
+if __name__ == "__main__":
+    unittest.main()
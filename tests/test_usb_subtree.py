@@ -0,0 +1,74 @@
+import unittest
+
+from typing import Any
+
+from SilvaViridis.Python.WinAPI.Wrapper.IOAPISet import ioctl_cache
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import SimulatedUSBMachine, build_simulated_topology
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    USB_TREE_FIELDS,
+    USBNode,
+    USBPort,
+    build_usb_device_index,
+    build_usb_subtree,
+    build_usb_tree,
+    format_usb_node,
+    walk_usb_tree,
+)
+
+from .helpers import use_machine
+
+def branch(
+    node : USBNode,
+) -> list[tuple[int, str, Any, Any, Any]]:
+    return [
+        (
+            depth,
+            format_usb_node(child),
+            child.device.connection_state if isinstance(child.device, USBPort) else None,
+            child.device.connection_info if isinstance(child.device, USBPort) else None,
+            child.device.connector_props if isinstance(child.device, USBPort) else None,
+        ) for child, depth in walk_usb_tree([node])
+    ]
+
+def find(
+    usb_tree : list[USBNode],
+    instance_id : str,
+) -> USBNode:
+    return next(node for node, _ in walk_usb_tree(usb_tree) if getattr(node.device, "id", None) == instance_id)
+
+class USBSubtreeTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        use_machine(self, SimulatedUSBMachine(build_simulated_topology(controllers = 2, depth = 3, delay = 0.0)))
+        self.index = build_usb_device_index(include_interfaces = True)
+        self.usb_tree = build_usb_tree(self.index, fields = USB_TREE_FIELDS)
+
+    def test_subtree_matches_the_full_tree(
+        self,
+    ) -> None:
+        for hub_id in ("HC0.ROOT.1", "HC1.ROOT.2", "HC1.ROOT.2.1", "HC0.ROOT"):
+            with self.subTest(hub_id = hub_id):
+                ioctl_cache.clear()
+                subtree = build_usb_subtree(hub_id, self.index, fields = USB_TREE_FIELDS)
+
+                assert subtree is not None
+                self.assertIsNone(subtree.parent)
+                self.assertEqual(branch(subtree), branch(find(self.usb_tree, hub_id)))
+
+    def test_subtree_by_path_with_its_own_index(
+        self,
+    ) -> None:
+        subtree = build_usb_subtree("\\\\?\\hc1.root.1", fields = USB_TREE_FIELDS)
+
+        assert subtree is not None
+        self.assertEqual(branch(subtree), branch(find(self.usb_tree, "HC1.ROOT.1")))
+
+    def test_unknown_hub(
+        self,
+    ) -> None:
+        self.assertIsNone(build_usb_subtree("HC0.ROOT.3", self.index))
+        self.assertIsNone(build_usb_subtree("HC9.ROOT", self.index))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+
+from uuid import UUID
+
+from SilvaViridis.Python.WinAPI.Wrapper.Types import DevProperties
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    Device,
+    USBDevice,
+    USBHostController,
+    USBHub,
+    USBInterface,
+    USBNode,
+    USBPort,
+    build_usb_tree,
+    update_usb_tree,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.USBTopology import USBTopologyIndex, parse_vid_pid
+
+from .helpers import SimulatedBus
+
+CONTROLLER = "PCI\\VEN_8086&DEV_A36D&SUBSYS_00000000&REV_10\\3&11583659&0&A0"
+ROOT_HUB = "USB\\ROOT_HUB30\\4&2E7F3A5B&0&0"
+SERIAL = "USB\\VID_0403&PID_6001\\A50285BI"
+COMPOSITE = "USB\\VID_0403&PID_6010\\FT4232"
+INTERFACE = "USB\\VID_0403&PID_6010&MI_00\\6&1"
+
+def device[T : Device](
+    device_type : type[T],
+    instance_id : str,
+    parent : str,
+    driver : str | None = None,
+) -> T:
+    properties : dict[DevProperties, str | int | bytes | None] = {} if driver is None else {DevProperties.DRIVER: driver}
+    return device_type(UUID(int = 0), UUID(int = 0), "", instance_id, parent, properties, {})
+
+def attach(
+    parent : USBNode,
+    device : USBHub | USBPort | USBDevice | USBInterface,
+) -> USBNode:
+    node = USBNode(parent, device)
+    parent.children.append(node)
+    return node
+
+class USBTopologyIndexLookupTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.controller = USBNode(None, device(USBHostController, CONTROLLER, ""))
+        self.root_hub = attach(self.controller, device(USBHub, ROOT_HUB, CONTROLLER, "{36fc9e60}\\0001"))
+        self.serial = attach(attach(self.root_hub, USBPort(1)), device(USBDevice, SERIAL, ROOT_HUB, "{36fc9e60}\\0002"))
+        self.composite = attach(attach(self.root_hub, USBPort(3)), device(USBDevice, COMPOSITE, ROOT_HUB, "{36fc9e60}\\0003"))
+        self.interface = attach(self.composite, device(USBInterface, INTERFACE, COMPOSITE))
+        self.index = USBTopologyIndex([self.controller])
+
+    def test_parse_vid_pid(
+        self,
+    ) -> None:
+        self.assertEqual(parse_vid_pid(SERIAL.lower()), (0x0403, 0x6001))
+        self.assertIsNone(parse_vid_pid(ROOT_HUB))
+
+    def test_find_by_instance_id(
+        self,
+    ) -> None:
+        self.assertIs(self.index.find_by_instance_id(SERIAL.lower()), self.serial)
+        self.assertIs(self.index.find_by_instance_id(INTERFACE), self.interface)
+        self.assertIsNone(self.index.find_by_instance_id("USB\\VID_0000&PID_0000\\0"))
+
+    def test_find_by_driver_key(
+        self,
+    ) -> None:
+        self.assertIs(self.index.find_by_driver_key("{36fc9e60}\\0001"), self.root_hub)
+        self.assertIs(self.index.find_by_driver_key("{36fc9e60}\\0003"), self.composite)
+
+    def test_find_by_vid_pid(
+        self,
+    ) -> None:
+        self.assertCountEqual(self.index.find_by_vid_pid(0x0403), [self.serial, self.composite, self.interface])
+        self.assertCountEqual(self.index.find_by_vid_pid(0x0403, 0x6010), [self.composite, self.interface])
+        self.assertEqual(self.index.find_by_vid_pid(0x0403, 0x6015), [])
+
+    def test_find_by_parent_id(
+        self,
+    ) -> None:
+        self.assertCountEqual(self.index.find_by_parent_id(ROOT_HUB.lower()), [self.serial, self.composite])
+        self.assertEqual(self.index.find_by_parent_id(COMPOSITE), [self.interface])
+
+    def test_find_by_location(
+        self,
+    ) -> None:
+        self.assertIs(self.index.find_by_location(0), self.root_hub)
+        self.assertIs(self.index.find_by_location(0, 1), self.serial)
+        self.assertIs(self.index.find_by_location(0, 3), self.composite)
+        self.assertIsNone(self.index.find_by_location(0, 2))
+        self.assertEqual(self.index.location_of(self.interface), (0, 3))
+
+class USBTopologyIndexUpdateTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.bus = SimulatedBus()
+
+    def test_apply_removal_and_addition(
+        self,
+    ) -> None:
+        usb_tree = build_usb_tree(self.bus.index())
+        index = USBTopologyIndex(usb_tree)
+        removed = index.find_by_instance_id("HC0.ROOT.1.2")
+
+        self.assertIsNotNone(removed)
+        self.assertEqual(index.find_by_location(0, 1, 2), removed)
+
+        self.bus.unplug("HC0.ROOT.1", 2)
+        index.apply(update_usb_tree(usb_tree, self.bus.index))
+
+        self.assertIsNone(index.find_by_instance_id("HC0.ROOT.1.2"))
+        self.assertIsNone(index.find_by_location(0, 1, 2))
+        self.assertNotIn(removed, index.find_by_parent_id("HC0.ROOT.1"))
+
+        self.bus.plug("HC0.ROOT.1", 4, "NEW", 9)
+        index.apply(update_usb_tree(usb_tree, self.bus.index))
+
+        added = index.find_by_instance_id("new")
+
+        self.assertIsNotNone(added)
+        self.assertIs(index.find_by_location(0, 1, 4), added)
+        self.assertIs(index.find_by_driver_key("NEW"), added)
+        self.assertIn(added, index.find_by_parent_id("HC0.ROOT.1"))
+
+    def test_lazily_expanded_hubs_are_indexed(
+        self,
+    ) -> None:
+        usb_tree = build_usb_tree(self.bus.index(), lazy = True, eager_depth = 1)
+        index = USBTopologyIndex(usb_tree)
+        hub = index.find_by_instance_id("HC0.ROOT.1")
+
+        assert hub is not None
+        self.assertFalse(hub.is_expanded)
+        self.assertIsNone(index.find_by_instance_id("HC0.ROOT.1.1"))
+
+        hub.children
+
+        device = index.find_by_instance_id("HC0.ROOT.1.1")
+
+        self.assertIsNotNone(device)
+        self.assertIs(index.find_by_location(0, 1, 1), device)
+        self.assertEqual(index.location_of(hub.children[2]), (0, 1, 3))
+        self.assertEqual(len(index.find_by_parent_id("HC0.ROOT.1")), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+from SilvaViridis.Python.WinAPI import instrumentation
+from SilvaViridis.Python.WinAPI.Wrapper.IOAPISet import ioctl_cache
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import SimulatedUSBMachine, build_simulated_topology
+from SilvaViridis.Python.WinAPI.Wrapper.Types import CtlCodes
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    USB_TREE_FIELDS,
+    USBDevice,
+    USBHub,
+    USBNode,
+    build_usb_device_index,
+    build_usb_subtree,
+    build_usb_tree,
+    walk_usb_tree,
+)
+
+from .helpers import ioctl_calls, use_machine
+
+PORT_IOCTLS = [
+    CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX,
+    CtlCodes.USB_GET_NODE_CONNECTION_DRIVERKEY_NAME,
+    CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX_V2,
+    CtlCodes.USB_GET_PORT_CONNECTOR_PROPERTIES,
+    CtlCodes.USB_GET_HUB_INFORMATION_EX,
+    CtlCodes.USB_GET_HUB_CAPABILITIES_EX,
+]
+
+def count_nodes(
+    usb_tree : list[USBNode],
+    device_type : type,
+) -> int:
+    return sum(isinstance(node.device, device_type) for node, _ in walk_usb_tree(usb_tree))
+
+class USBTreeFieldSelectionTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.machine = use_machine(self, SimulatedUSBMachine(build_simulated_topology(controllers = 1, depth = 2, delay = 0.0)))
+        self.index = build_usb_device_index(include_interfaces = True)
+
+    def build(
+        self,
+        fields : set[str] | frozenset[str],
+    ) -> tuple[list[USBNode], list[int]]:
+        ioctl_cache.clear()
+        instrumentation.reset()
+        self.machine.calls.clear()
+        usb_tree = build_usb_tree(self.index, fields = fields)
+        return usb_tree, [ioctl_calls(code) for code in PORT_IOCTLS]
+
+    def descriptor_calls(
+        self,
+    ) -> tuple[int, int]:
+        return (
+            self.machine.calls.get("IOAPISet.ioctl_get_usb_configuration_descriptor", 0),
+            self.machine.calls.get("IOAPISet.ioctl_get_usb_device_strings", 0),
+        )
+
+    def test_connection_only_skips_device_driver_keys(
+        self,
+    ) -> None:
+        usb_tree, calls = self.build({"connection"})
+
+        self.assertEqual(calls, [12, 2, 0, 0, 0, 0])
+        self.assertEqual(self.descriptor_calls(), (0, 0))
+        self.assertEqual(count_nodes(usb_tree, USBHub), 3)
+        self.assertEqual(count_nodes(usb_tree, USBDevice), 0)
+
+    def test_devices_resolve_every_connected_port(
+        self,
+    ) -> None:
+        usb_tree, calls = self.build({"connection", "devices"})
+
+        self.assertEqual(calls, [12, 9, 0, 0, 0, 0])
+        self.assertEqual(self.descriptor_calls(), (0, 0))
+        self.assertEqual(count_nodes(usb_tree, USBDevice), 7)
+
+    def test_each_field_adds_only_its_ioctls(
+        self,
+    ) -> None:
+        for field, expected, descriptors in (
+            ("speed_v2", [12, 9, 12, 0, 0, 0], (0, 0)),
+            ("connector", [12, 9, 0, 12, 0, 0], (0, 0)),
+            ("hub_info", [12, 9, 0, 0, 3, 0], (0, 0)),
+            ("capabilities", [12, 9, 0, 0, 0, 3], (0, 0)),
+            ("descriptor", [12, 9, 0, 0, 0, 0], (9, 0)),
+            ("strings", [12, 9, 0, 0, 0, 0], (0, 9)),
+        ):
+            with self.subTest(field = field):
+                _, calls = self.build({"connection", "devices", field})
+
+                self.assertEqual(calls, expected)
+                self.assertEqual(self.descriptor_calls(), descriptors)
+
+        _, calls = self.build(USB_TREE_FIELDS)
+
+        self.assertEqual(calls, [12, 9, 12, 12, 3, 3])
+        self.assertEqual(self.descriptor_calls(), (9, 9))
+
+    def test_unknown_fields_are_rejected(
+        self,
+    ) -> None:
+        self.machine.calls.clear()
+
+        with self.assertRaisesRegex(ValueError, "speed, topology"):
+            build_usb_tree(self.index, fields = {"connection", "topology", "speed"})
+        with self.assertRaises(ValueError):
+            build_usb_subtree("HC0.ROOT.1", self.index, fields = {"connectors"})
+
+        self.assertEqual(self.machine.calls, {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import threading
+import unittest
+
+from collections.abc import Callable
+from typing import Any
+from unittest import mock
+
+from SilvaViridis.Python.WinAPI.Wrapper import USBDeviceManager
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import build_simulated_topology
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    USBHub,
+    USBNode,
+    USBPort,
+    build_usb_tree,
+    format_usb_node,
+    walk_usb_tree,
+)
+
+def tree_shape(
+    usb_tree : list[USBNode],
+) -> list[tuple[int, str, Any]]:
+    return [
+        (depth, format_usb_node(node), node.device.connection_state if isinstance(node.device, USBPort) else None) \
+            for node, depth in walk_usb_tree(usb_tree)
+    ]
+
+class ConcurrencyProbe:
+    def __init__(
+        self,
+        expand_hub : Callable[..., Any],
+    ) -> None:
+        self.expand_hub = expand_hub
+        self.lock = threading.Lock()
+        self.in_flight : dict[str, int] = {}
+        self.peak : dict[str, int] = {}
+
+    def __call__(
+        self,
+        node : USBNode,
+        hub : Any,
+        *args : Any,
+    ) -> Any:
+        controller = hub.id.split(".", 1)[0]
+
+        with self.lock:
+            self.in_flight[controller] = self.in_flight.get(controller, 0) + 1
+            self.peak[controller] = max(self.peak.get(controller, 0), self.in_flight[controller])
+
+        try:
+            return self.expand_hub(node, hub, *args)
+        finally:
+            with self.lock:
+                self.in_flight[controller] -= 1
+
+class ParallelUSBTreeTests(unittest.TestCase):
+    def test_parallel_build_matches_serial_build(
+        self,
+    ) -> None:
+        index = build_simulated_topology(controllers = 3, depth = 3, delay = 0.0)
+        serial = build_usb_tree(index)
+        expected = tree_shape(serial)
+
+        self.assertEqual(sum(isinstance(node.device, USBHub) for node, _ in walk_usb_tree(serial)), 3 * 7)
+
+        for max_workers, max_per_controller in ((2, 1), (8, 2), (16, 16)):
+            with self.subTest(max_workers = max_workers, max_per_controller = max_per_controller):
+                usb_tree = build_usb_tree(index, max_workers = max_workers, max_per_controller = max_per_controller)
+                self.assertEqual(tree_shape(usb_tree), expected)
+
+    def test_per_controller_limit_is_respected(
+        self,
+    ) -> None:
+        index = build_simulated_topology(controllers = 2, depth = 3, hubs_per_hub = 3, delay = 0.002)
+
+        for max_per_controller in (1, 2):
+            with self.subTest(max_per_controller = max_per_controller):
+                probe = ConcurrencyProbe(USBDeviceManager._expand_hub)
+
+                with mock.patch.object(USBDeviceManager, "_expand_hub", probe):
+                    build_usb_tree(index, max_workers = 8, max_per_controller = max_per_controller)
+
+                self.assertEqual(probe.peak, {"HC0": max_per_controller, "HC1": max_per_controller})
+                self.assertEqual(probe.in_flight, {"HC0": 0, "HC1": 0})
+
+if __name__ == "__main__":
+    unittest.main()
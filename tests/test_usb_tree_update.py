@@ -0,0 +1,168 @@
+import ctypes as C
+import unittest
+
+from unittest import mock
+
+from uuid import UUID
+
+from SilvaViridis.Python.WinAPI import instrumentation
+from SilvaViridis.Python.WinAPI.Wrapper import USBDeviceManager
+from SilvaViridis.Python.WinAPI.Wrapper.IOAPISet import ioctl_cache
+from SilvaViridis.Python.WinAPI.Wrapper.Simulation import (
+    SimulatedConnection,
+    SimulatedHub,
+    SimulatedUSBMachine,
+    build_simulated_topology,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.Types import CtlCodes, DevProperties
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    USBDevice,
+    USBNode,
+    USBPort,
+    build_usb_device_index,
+    build_usb_tree,
+    update_usb_hubs,
+    update_usb_tree,
+    walk_usb_tree,
+)
+
+from .helpers import SimulatedBus, ioctl_calls, use_machine
+
+def device_ids(
+    usb_tree : list[USBNode],
+) -> list[str]:
+    return sorted(
+        node.device.id for node, _ in walk_usb_tree(usb_tree) \
+            if not isinstance(node.device, USBPort)
+    )
+
+class UpdateUSBTreeTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.bus = SimulatedBus()
+        self.usb_tree = build_usb_tree(self.bus.index())
+
+    def test_no_change(
+        self,
+    ) -> None:
+        before = device_ids(self.usb_tree)
+        changes = update_usb_tree(self.usb_tree, self.bus.index)
+
+        self.assertTrue(changes.is_empty)
+        self.assertEqual(device_ids(self.usb_tree), before)
+        self.assertEqual(self.bus.builds, 1)
+
+    def test_removal(
+        self,
+    ) -> None:
+        device_id = self.bus.unplug("HC0.ROOT.1", 2)
+        changes = update_usb_tree(self.usb_tree, self.bus.index)
+
+        self.assertEqual([node.device.id for node in changes.removed], [device_id])
+        self.assertEqual(changes.added, [])
+        self.assertNotIn(device_id, device_ids(self.usb_tree))
+
+    def test_replug_with_same_address(
+        self,
+    ) -> None:
+        device_id = self.bus.unplug("HC0.ROOT.1", 2)
+        self.bus.plug("HC0.ROOT.1", 2, "REPLUGGED", 2)
+        changes = update_usb_tree(self.usb_tree, self.bus.index)
+
+        self.assertEqual([node.device.id for node in changes.removed], [device_id])
+        self.assertEqual([node.device.id for node in changes.added], ["REPLUGGED"])
+        self.assertIn("REPLUGGED", device_ids(self.usb_tree))
+
+    def test_hub_replug_is_rebuilt(
+        self,
+    ) -> None:
+        root = self.usb_tree[0].children[0]
+        hub_port = root.children[0]
+        hub_node = hub_port.children[0]
+
+        self.bus.plug("HC0.ROOT.1", 1, "NEW", 7)
+        changes = update_usb_hubs([root, hub_node], self.bus.index)
+
+        self.assertEqual([node.device.id for node in changes.added], ["NEW"])
+        self.assertEqual(len(changes.changed_ports), 1)
+
+    def test_fewer_fields_than_the_build_is_not_a_change(
+        self,
+    ) -> None:
+        changes = update_usb_tree(self.usb_tree, self.bus.index, fields = {"connection"})
+
+        self.assertTrue(changes.is_empty)
+        self.assertEqual(self.bus.builds, 1)
+
+        device_id = self.bus.unplug("HC0.ROOT", 2)
+        changes = update_usb_tree(self.usb_tree, self.bus.index)
+
+        self.assertEqual([node.device.id for node in changes.removed], [device_id])
+
+class UpdateIOCTLTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.machine = use_machine(self, SimulatedUSBMachine(build_simulated_topology(controllers = 1, depth = 2, delay = 0.0)))
+        self.usb_tree = build_usb_tree(build_usb_device_index())
+        self.ports = sum(1 for node, _ in walk_usb_tree(self.usb_tree) if isinstance(node.device, USBPort))
+        instrumentation.reset()
+
+    def hub(
+        self,
+        hub_id : str,
+    ) -> SimulatedHub:
+        hub = next(hub for hub in self.machine.topology.hubs if hub.id == hub_id)
+        assert isinstance(hub, SimulatedHub)
+        return hub
+
+    def test_no_change_does_not_read_driver_keys(
+        self,
+    ) -> None:
+        changes = update_usb_tree(self.usb_tree, build_usb_device_index)
+
+        self.assertTrue(changes.is_empty)
+        self.assertEqual(ioctl_calls(CtlCodes.USB_GET_NODE_CONNECTION_INFORMATION_EX), self.ports)
+        self.assertEqual(ioctl_calls(CtlCodes.USB_GET_NODE_CONNECTION_DRIVERKEY_NAME), 0)
+
+    def test_changed_port_reads_its_driver_key(
+        self,
+    ) -> None:
+        self.hub("HC0.ROOT.1").ports[3] = SimulatedConnection("HC0.ROOT.1.4", False, 9)
+        self.machine.topology.devices.append(USBDevice(
+            UUID(int = 0),
+            UUID(int = 0),
+            "\\\\?\\HC0.ROOT.1.4",
+            "HC0.ROOT.1.4",
+            "HC0.ROOT.1",
+            {DevProperties.DRIVER: "HC0.ROOT.1.4"},
+            {},
+        ))
+
+        changes = update_usb_tree(self.usb_tree, build_usb_device_index)
+
+        self.assertEqual([node.device.id for node in changes.added], ["HC0.ROOT.1.4"])
+        self.assertEqual(ioctl_calls(CtlCodes.USB_GET_NODE_CONNECTION_DRIVERKEY_NAME), 1)
+
+class DriverKeyRefreshTests(unittest.TestCase):
+    def test_refresh_bypasses_cached_driver_key(
+        self,
+    ) -> None:
+        ioctl_cache.clear()
+        self.addCleanup(ioctl_cache.clear)
+
+        port = USBPort(1, "\\\\?\\hub")
+        names = iter(["{old}\\0001", "{new}\\0002"])
+
+        with mock.patch.object(
+            USBDeviceManager,
+            "ioctl_get_usb_node_connection_driver_key_name",
+            lambda fd, connection_index: next(names),
+        ):
+            self.assertEqual(port.get_connection_driver_key_name(C.c_void_p(1)), "{old}\\0001")
+            self.assertEqual(port.get_connection_driver_key_name(C.c_void_p(1)), "{old}\\0001")
+            self.assertEqual(port.get_connection_driver_key_name(C.c_void_p(1), refresh = True), "{new}\\0002")
+
+if __name__ == "__main__":
+    unittest.main()
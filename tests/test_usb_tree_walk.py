@@ -0,0 +1,112 @@
+import io
+import unittest
+
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import (
+    USBHub,
+    USBNode,
+    USBPort,
+    build_usb_tree,
+    render_usb_tree,
+    walk_usb_tree,
+)
+
+from .helpers import SimulatedBus
+
+def label(
+    node : USBNode,
+) -> str:
+    return f"P{node.device.index}" if isinstance(node.device, USBPort) else node.device.id
+
+class WalkUSBTreeTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.bus = SimulatedBus()
+
+    def test_depth_first_order_and_depth(
+        self,
+    ) -> None:
+        usb_tree = build_usb_tree(self.bus.index())
+
+        self.assertEqual(
+            [(label(node), depth) for node, depth in walk_usb_tree(usb_tree)],
+            [
+                ("HC0", 0),
+                ("HC0.ROOT", 1),
+                ("P1", 2),
+                ("HC0.ROOT.1", 3),
+                ("P1", 4),
+                ("HC0.ROOT.1.1", 5),
+                ("P2", 4),
+                ("HC0.ROOT.1.2", 5),
+                ("P3", 4),
+                ("HC0.ROOT.1.3", 5),
+                ("P4", 4),
+                ("P2", 2),
+                ("HC0.ROOT.2", 3),
+                ("P3", 2),
+                ("HC0.ROOT.3", 3),
+                ("P4", 2),
+            ],
+        )
+
+    def test_prune_and_level(
+        self,
+    ) -> None:
+        usb_tree = build_usb_tree(self.bus.index())
+        walked = walk_usb_tree(usb_tree, prune = lambda node, depth: isinstance(node.device, USBHub) and depth > 11, level = 10)
+
+        self.assertEqual(
+            [(label(node), depth) for node, depth in walked],
+            [
+                ("HC0", 10),
+                ("HC0.ROOT", 11),
+                ("P1", 12),
+                ("HC0.ROOT.1", 13),
+                ("P2", 12),
+                ("HC0.ROOT.2", 13),
+                ("P3", 12),
+                ("HC0.ROOT.3", 13),
+                ("P4", 12),
+            ],
+        )
+
+    def test_expand_lazy(
+        self,
+    ) -> None:
+        usb_tree = build_usb_tree(self.bus.index(), lazy = True, eager_depth = 1)
+        hub = usb_tree[0].children[0].children[0].children[0]
+
+        self.assertEqual(hub.device.id, "HC0.ROOT.1")
+        self.assertEqual([label(node) for node, _ in walk_usb_tree(usb_tree, expand_lazy = False)][3:5], ["HC0.ROOT.1", "P2"])
+        self.assertFalse(hub.is_expanded)
+
+        self.assertIn(("HC0.ROOT.1.3", 5), [(label(node), depth) for node, depth in walk_usb_tree(usb_tree)])
+        self.assertTrue(hub.is_expanded)
+
+class RenderUSBTreeTests(unittest.TestCase):
+    def test_render(
+        self,
+    ) -> None:
+        bus = SimulatedBus(hubs_per_hub = 0, devices_per_hub = 1, ports_per_hub = 2)
+        stream = io.StringIO()
+
+        render_usb_tree(
+            build_usb_tree(bus.index()),
+            stream,
+            get_additional_info = lambda node: f" @{node.device.connection_state[1]}" \
+                if isinstance(node.device, USBPort) and node.device.connection_state is not None else "",
+            indent = ". ",
+        )
+
+        self.assertEqual(
+            stream.getvalue(),
+            "[SimulatedHostController] HC0 (Simulated host controller)\n"
+            ". [SimulatedHub] HC0.ROOT (Simulated hub)\n"
+            ". . [USBPort] Port 01 @1\n"
+            ". . . [USBDevice] HC0.ROOT.1 (Simulated device)\n"
+            ". . [USBPort] Port 02 @0\n",
+        )
+
+if __name__ == "__main__":
+    unittest.main()
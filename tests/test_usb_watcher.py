@@ -0,0 +1,108 @@
+import threading
+import unittest
+
+from SilvaViridis.Python.WinAPI.Wrapper.Types import CMNotifyActions
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import USBTreeChanges, build_usb_tree
+from SilvaViridis.Python.WinAPI.Wrapper.USBWatcher import ManualNotificationSource, USBTopologyWatcher
+
+from .helpers import SimulatedBus, notification
+
+class USBTopologyWatcherTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.bus = SimulatedBus()
+        self.source = ManualNotificationSource()
+        self.usb_tree = build_usb_tree(self.bus.index())
+        self.watcher = USBTopologyWatcher(
+            self.usb_tree,
+            self.source,
+            debounce = 0.0,
+            build_index = self.bus.index,
+        )
+
+    def test_removal_updates_tree_and_topology(
+        self,
+    ) -> None:
+        device_id = self.bus.unplug("HC0.ROOT", 2)
+        self.watcher.notify(notification(CMNotifyActions.DEVICEINTERFACEREMOVAL, device_id))
+
+        changes = self.watcher.flush()
+
+        self.assertEqual([node.device.id for node in changes.removed], [device_id])
+        self.assertEqual(changes.added, [])
+        self.assertIsNone(self.watcher.topology.find_by_instance_id(device_id))
+
+    def test_arrival_updates_tree_and_topology(
+        self,
+    ) -> None:
+        self.bus.plug("HC0.ROOT.1", 4, "NEW", 4)
+        self.watcher.notify(notification(CMNotifyActions.DEVICEINTERFACEARRIVAL, "NEW"))
+
+        changes = self.watcher.flush()
+
+        self.assertEqual([node.device.id for node in changes.added], ["NEW"])
+        node = self.watcher.topology.find_by_instance_id("NEW")
+        self.assertIsNotNone(node)
+        assert node is not None and node.parent is not None and node.parent.parent is not None
+        self.assertEqual(node.parent.parent.device.id, "HC0.ROOT.1")
+
+    def test_unknown_removal_is_ignored(
+        self,
+    ) -> None:
+        self.watcher.notify(notification(CMNotifyActions.DEVICEINTERFACEREMOVAL, "MISSING"))
+
+        self.assertTrue(self.watcher.flush().is_empty)
+        self.assertEqual(self.bus.builds, 1)
+
+    def test_background_thread_survives_errors(
+        self,
+    ) -> None:
+        failures = [OSError("index failed")]
+        received : list[USBTreeChanges] = []
+        errors : list[Exception] = []
+        delivered = threading.Event()
+
+        def build_index(
+        ):
+            if len(failures) > 0:
+                raise failures.pop()
+            return self.bus.index()
+
+        def on_changes(
+            changes : USBTreeChanges,
+        ) -> None:
+            received.append(changes)
+            delivered.set()
+
+        watcher = USBTopologyWatcher(
+            self.usb_tree,
+            self.source,
+            on_changes = on_changes,
+            debounce = 0.0,
+            build_index = build_index,
+            on_error = errors.append,
+        )
+        watcher.start()
+        self.addCleanup(watcher.stop)
+
+        self.bus.plug("HC0.ROOT.1", 4, "NEW", 4)
+        self.source.push(notification(CMNotifyActions.DEVICEINTERFACEARRIVAL, "NEW"))
+
+        self.bus.plug("HC0.ROOT.1", 3, "NEWER", 3)
+        for _ in range(200):
+            if len(errors) > 0:
+                break
+            delivered.wait(0.01)
+        self.source.push(notification(CMNotifyActions.DEVICEINTERFACEARRIVAL, "NEWER"))
+
+        self.assertTrue(delivered.wait(2.0))
+        self.assertEqual(watcher.errors, 1)
+        self.assertIsInstance(errors[0], OSError)
+        self.assertEqual(
+            sorted(node.device.id for changes in received for node in changes.added),
+            ["NEW", "NEWER"],
+        )
+
+if __name__ == "__main__":
+    unittest.main()
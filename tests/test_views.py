@@ -0,0 +1,234 @@
+import ctypes as C
+import ctypes.wintypes as W
+import struct
+import unittest
+
+from collections.abc import Sequence
+from unittest import mock
+
+from SilvaViridis.Python.WinAPI.Wrapper import IOAPISet
+from SilvaViridis.Python.WinAPI.Wrapper.Types import (
+    USBConnectionStatuses,
+    USBDeviceDescriptor,
+    USBDeviceSpeeds,
+    USBEndpointDescriptor,
+    USBHubNodeInformation,
+    USBMIParentNodeInformation,
+    USBPipeInfo,
+)
+from SilvaViridis.Python.WinAPI.Wrapper.USBDeviceManager import USBPort
+from SilvaViridis.Python.WinAPI.Wrapper.Views import USBNodeConnectionInfoExView, USBNodeInformationView
+
+ULONG = "I" if C.sizeof(W.ULONG) == 4 else "Q"
+WINDOWS_ABI = C.sizeof(W.ULONG) == 4 and C.sizeof(C.c_wchar) == 2
+
+def hub_node_information(
+    ports : int,
+    characteristics : int,
+    bus_powered : bool,
+) -> bytearray:
+    buffer = bytearray(C.sizeof(USBNodeInformationView().data))
+    struct.pack_into("<iBBBHBB", buffer, 0, 0, 9, 0x29, ports, characteristics, 50, 100)
+    buffer[11] = 0b0110
+    buffer[75] = int(bus_powered)
+    return buffer
+
+def connection_information(
+    index : int,
+    vendor_id : int,
+    product_id : int,
+    pipes : Sequence[tuple[int, int, int, int, int]] = (),
+) -> bytearray:
+    header = f"<{ULONG} BBHBBBBHHHBBBB BBBH{ULONG}i"
+    buffer = bytearray(C.sizeof(USBNodeConnectionInfoExView().data))
+    struct.pack_into(
+        header,
+        buffer,
+        0,
+        index,
+        18, 1, 0x0200, 0xEF, 0x02, 0x01, 64, vendor_id, product_id, 0x0600, 1, 2, 3, 1,
+        1, 2, 0, 7, len(pipes), 1,
+    )
+    pipe = f"<BBBBHB{ULONG}"
+    for i, (address, attributes, max_packet_size, interval, schedule_offset) in enumerate(pipes):
+        struct.pack_into(
+            pipe,
+            buffer,
+            struct.calcsize(header) + i * struct.calcsize(pipe),
+            7, 5, address, attributes, max_packet_size, interval, schedule_offset,
+        )
+    return buffer
+
+class StructViewDecodingTests(unittest.TestCase):
+    def test_hub_node_information(
+        self,
+    ) -> None:
+        view = USBNodeInformationView(hub_node_information(7, 0x00A9, True))
+
+        self.assertEqual(
+            view.to_info(),
+            USBHubNodeInformation(
+                is_bus_powered = True,
+                number_of_ports = 7,
+                hub_characteristics = 0x00A9,
+                power_on_to_power_good = 50,
+                hub_control_current = 100,
+                remove_and_power_mask = [0b0110, *([0] * 63)],
+            ),
+        )
+
+    def test_mi_parent_node_information(
+        self,
+    ) -> None:
+        buffer = bytearray(C.sizeof(USBNodeInformationView().data))
+        struct.pack_into(f"<i{ULONG}", buffer, 0, 1, 3)
+
+        self.assertEqual(USBNodeInformationView(buffer).to_info(), USBMIParentNodeInformation(number_of_interfaces = 3))
+
+    def test_connection_information(
+        self,
+    ) -> None:
+        info = USBNodeConnectionInfoExView(connection_information(4, 0x0403, 0x6010)).to_info()
+
+        self.assertEqual(info.connection_index, 4)
+        self.assertEqual(
+            info.device_descriptor,
+            USBDeviceDescriptor(
+                bcd_usb = 0x0200,
+                device_class = 0xEF,
+                device_sub_class = 0x02,
+                device_protocol = 0x01,
+                max_packet_size_0 = 64,
+                vendor_id = 0x0403,
+                product_id = 0x6010,
+                bcd_device = 0x0600,
+                manufacturer_index = 1,
+                product_index = 2,
+                serial_number_index = 3,
+                number_of_configurations = 1,
+            ),
+        )
+        self.assertEqual(info.current_configuration_value, 1)
+        self.assertEqual(info.speed, USBDeviceSpeeds.UsbHighSpeed)
+        self.assertFalse(info.device_is_hub)
+        self.assertEqual(info.device_address, 7)
+        self.assertEqual(info.connection_status, USBConnectionStatuses.DeviceConnected)
+        self.assertEqual(info.pipe_list, [])
+
+    def test_view_reads_the_buffer_in_place(
+        self,
+    ) -> None:
+        buffer = connection_information(1, 0x0403, 0x6001)
+        view = USBNodeConnectionInfoExView(buffer)
+        struct.pack_into("<H", buffer, struct.calcsize(f"<{ULONG}BBHBBBBH"), 0x6015)
+
+        self.assertEqual(view.product_id, 0x6015)
+        self.assertEqual(bytes(view.buffer), bytes(buffer))
+
+class ConnectionInformationIOCTLTests(unittest.TestCase):
+    def setUp(
+        self,
+    ) -> None:
+        self.requested : list[int] = []
+        self.response = bytearray()
+
+        def device_io_control(
+            *args : object,
+        ) -> int:
+            data = getattr(args[2], "_obj")
+            self.requested.append(data.ConnectionIndex)
+            C.memmove(C.addressof(data), bytes(self.response), len(self.response))
+            getattr(args[6], "_obj").value = len(self.response)
+            return 1
+
+        patcher = mock.patch.object(IOAPISet, "DeviceIoControl", device_io_control)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connection_index_is_zero_based(
+        self,
+    ) -> None:
+        port = USBPort(3)
+        self.response = connection_information(3, 0x0403, 0x6001)
+
+        self.assertEqual(port.connection_index, 2)
+
+        info = port.get_connection_info(C.c_void_p(1))
+
+        self.assertEqual(self.requested, [3])
+        self.assertIsNotNone(info)
+
+    def test_open_pipes_are_decoded(
+        self,
+    ) -> None:
+        self.response = connection_information(2, 0x0403, 0x6010, [
+            (0x81, 0x02, 512, 0, 0),
+            (0x02, 0x02, 512, 0, 0),
+            (0x83, 0x03, 16, 4, 2),
+        ])
+
+        info = USBPort(2).get_connection_info(C.c_void_p(1))
+
+        assert info is not None
+        self.assertEqual(info.number_of_open_pipes, 3)
+        self.assertEqual(
+            info.pipe_list,
+            [
+                USBPipeInfo(USBEndpointDescriptor(0x81, 0x02, 512, 0), 0),
+                USBPipeInfo(USBEndpointDescriptor(0x02, 0x02, 512, 0), 0),
+                USBPipeInfo(USBEndpointDescriptor(0x83, 0x03, 16, 4), 2),
+            ],
+        )
+        self.assertEqual(info.device_descriptor.product_id, 0x6010)
+
+    def test_pipe_count_is_clamped_to_the_pipe_list(
+        self,
+    ) -> None:
+        self.response = connection_information(1, 0x0403, 0x6001)
+        struct.pack_into(f"<{ULONG}", self.response, struct.calcsize(f"<{ULONG} BBHBBBBHHHBBBB BBBH"), 1000)
+
+        info = USBPort(1).get_connection_info(C.c_void_p(1))
+
+        assert info is not None
+        self.assertEqual(info.number_of_open_pipes, 30)
+        self.assertEqual(len(info.pipe_list), 30)
+
+class StringOffsetTests(unittest.TestCase):
+    def test_offsets_follow_the_headers(
+        self,
+    ) -> None:
+        self.assertEqual(IOAPISet._HCD_DRIVERKEY_NAME_OFFSET, struct.calcsize(f"<{ULONG}"))
+        self.assertEqual(IOAPISet._ROOT_HUB_NAME_OFFSET, struct.calcsize(f"<{ULONG}"))
+        self.assertEqual(IOAPISet._COMPANION_HUB_SYMLINK_OFFSET, struct.calcsize(f"<{ULONG}{ULONG}{ULONG}HH"))
+        self.assertEqual(IOAPISet._NODE_CONNECTION_DRIVERKEY_NAME_OFFSET, struct.calcsize(f"<{ULONG}{ULONG}"))
+        self.assertEqual(IOAPISet._NODE_CONNECTION_NAME_OFFSET, struct.calcsize(f"<{ULONG}{ULONG}"))
+
+    @unittest.skipUnless(WINDOWS_ABI, "Requires the Windows ABI")
+    def test_offsets_match_the_windows_layout(
+        self,
+    ) -> None:
+        self.assertEqual(IOAPISet._HCD_DRIVERKEY_NAME_OFFSET, 4)
+        self.assertEqual(IOAPISet._ROOT_HUB_NAME_OFFSET, 4)
+        self.assertEqual(IOAPISet._COMPANION_HUB_SYMLINK_OFFSET, 16)
+        self.assertEqual(IOAPISet._NODE_CONNECTION_DRIVERKEY_NAME_OFFSET, 8)
+        self.assertEqual(IOAPISet._NODE_CONNECTION_NAME_OFFSET, 8)
+
+    @unittest.skipUnless(WINDOWS_ABI, "Requires the Windows ABI")
+    def test_names_are_extracted_after_the_header(
+        self,
+    ) -> None:
+        name = "{36fc9e60-c465-11cf-8056-444553540000}\\0007"
+
+        for offset, header in (
+            (IOAPISet._HCD_DRIVERKEY_NAME_OFFSET, struct.pack("<I", 0)),
+            (IOAPISet._NODE_CONNECTION_DRIVERKEY_NAME_OFFSET, struct.pack("<II", 3, 0)),
+            (IOAPISet._COMPANION_HUB_SYMLINK_OFFSET, struct.pack("<IIIHH", 2, 0, 0, 1, 2)),
+        ):
+            with self.subTest(offset = offset):
+                data = header + f"{name}\0".encode("utf-16-le")
+                buffer = C.create_string_buffer(data, len(data))
+
+                self.assertEqual(IOAPISet._extract_str(C.c_void_p(C.addressof(buffer)), len(data), offset), name)
+
+if __name__ == "__main__":
+    unittest.main()